@@ -39,6 +39,11 @@ namespace ARNavExperiment.Logging
 
             csvWriter = new CSVWriter(path, Headers);
             Debug.Log($"[EventLogger] Session started: {path}");
+
+            // 같은 파일명으로 data/raw/headpose/ 에 고빈도 머리 자세 스트림 기록
+            string posePath = Path.Combine(Application.persistentDataPath, "data", "raw", "headpose",
+                Path.ChangeExtension(fileName, ".hpose"));
+            HeadTracker.Instance?.StartStream(posePath);
         }
 
         public void SetCondition(string condition) => currentCondition = condition;
@@ -81,6 +86,7 @@ namespace ARNavExperiment.Logging
 
         public void EndSession()
         {
+            HeadTracker.Instance?.StopStream();
             csvWriter?.Dispose();
             csvWriter = null;
             Debug.Log("[EventLogger] Session ended");
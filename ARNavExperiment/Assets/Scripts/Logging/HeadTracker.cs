@@ -1,6 +1,7 @@
 using UnityEngine;
 using UnityEngine.XR;
 using System.Collections.Generic;
+using ARNavExperiment.Utils;
 
 namespace ARNavExperiment.Logging
 {
@@ -9,10 +10,16 @@ namespace ARNavExperiment.Logging
         public static HeadTracker Instance { get; private set; }
 
         public Vector3 CurrentRotation { get; private set; }
+        public bool IsStreaming => poseWriter != null;
 
         [SerializeField] private float sampleRate = 10f;
+        [Tooltip("세션 중 이진 머리 자세 스트림(.hpose) 샘플링 주기 (Hz). 디스플레이 프레임보다 높으면 매 프레임 기록")]
+        [SerializeField] private float streamRate = 72f;
         private float nextSampleTime;
 
+        private readonly List<InputDevice> devices = new List<InputDevice>();
+        private HeadPoseWriter poseWriter;
+
         private void Awake()
         {
             if (Instance != null && Instance != this) { Destroy(gameObject); return; }
@@ -22,18 +29,48 @@ namespace ARNavExperiment.Logging
         private void Update()
         {
             if (Time.time < nextSampleTime) return;
-            nextSampleTime = Time.time + (1f / sampleRate);
+            nextSampleTime = Time.time + (1f / (IsStreaming ? Mathf.Max(sampleRate, streamRate) : sampleRate));
 
-            var devices = new List<InputDevice>();
+            uint flags = 0;
+            devices.Clear();
             InputDevices.GetDevicesAtXRNode(XRNode.Head, devices);
             if (devices.Count > 0 && devices[0].TryGetFeatureValue(CommonUsages.deviceRotation, out Quaternion rotation))
             {
                 CurrentRotation = rotation.eulerAngles;
+                flags = HeadPoseWriter.FlagXRDevice;
             }
             else if (Camera.main != null)
             {
                 CurrentRotation = Camera.main.transform.eulerAngles;
             }
+            else
+            {
+                return;
+            }
+
+            poseWriter?.WriteSample(CurrentRotation, flags);
+        }
+
+        /// <summary>세션 이진 머리 자세 스트림 기록 시작 (EventLogger.StartSession에서 호출).</summary>
+        public void StartStream(string path)
+        {
+            StopStream();
+            poseWriter = new HeadPoseWriter(path, streamRate);
+            nextSampleTime = 0f;
+            Debug.Log($"[HeadTracker] Pose stream started: {path} ({streamRate} Hz)");
+        }
+
+        public void StopStream()
+        {
+            if (poseWriter == null) return;
+            Debug.Log($"[HeadTracker] Pose stream ended: {poseWriter.RecordCount} samples");
+            poseWriter.Dispose();
+            poseWriter = null;
+        }
+
+        private void OnDestroy()
+        {
+            poseWriter?.Dispose();
         }
     }
 }
@@ -0,0 +1,88 @@
+using System;
+using System.IO;
+using System.Text;
+using UnityEngine;
+
+namespace ARNavExperiment.Utils
+{
+    /// <summary>
+    /// 고정 폭 이진 머리 자세 스트림 (.hpose, little-endian).
+    /// 헤더 32 bytes: magic "ARHPOSE1"(8), header_size u32, record_size u32, sample_rate f32, reserved u32, session_start_us i64
+    /// 레코드 24 bytes: timestamp_us i64, rot_x f32, rot_y f32, rot_z f32, flags u32
+    /// timestamp_us는 EventLogger timestamp 컬럼과 같은 로컬 시각(DateTime.Now)의 1970-01-01 기준 마이크로초.
+    /// </summary>
+    public class HeadPoseWriter : IDisposable
+    {
+        public const int HeaderSize = 32;
+        public const int RecordSize = 24;
+        public const uint FlagXRDevice = 1;
+
+        private static readonly byte[] Magic = Encoding.ASCII.GetBytes("ARHPOSE1");
+        private static readonly DateTime Epoch = new DateTime(1970, 1, 1);
+
+        private BinaryWriter writer;
+        private readonly object lockObj = new object();
+        private readonly float flushInterval;
+        private float lastFlushTime;
+        private bool disposed;
+
+        public string FilePath { get; private set; }
+        public long RecordCount { get; private set; }
+
+        public HeadPoseWriter(string filePath, float sampleRate, float flushInterval = 1f)
+        {
+            FilePath = filePath;
+            this.flushInterval = flushInterval;
+            string dir = Path.GetDirectoryName(filePath);
+            if (!string.IsNullOrEmpty(dir) && !Directory.Exists(dir))
+                Directory.CreateDirectory(dir);
+
+            var stream = new FileStream(filePath, FileMode.Create, FileAccess.Write, FileShare.Read, 64 * 1024);
+            writer = new BinaryWriter(stream);
+            writer.Write(Magic);
+            writer.Write((uint)HeaderSize);
+            writer.Write((uint)RecordSize);
+            writer.Write(sampleRate);
+            writer.Write(0u);
+            writer.Write(NowMicros());
+            writer.Flush();
+        }
+
+        public static long NowMicros() => (DateTime.Now - Epoch).Ticks / 10;
+
+        public void WriteSample(Vector3 rotation, uint flags)
+        {
+            lock (lockObj)
+            {
+                if (disposed) return;
+                writer.Write(NowMicros());
+                writer.Write(rotation.x);
+                writer.Write(rotation.y);
+                writer.Write(rotation.z);
+                writer.Write(flags);
+                RecordCount++;
+
+                // 레코드 단위로 쓰되 디스크 반영은 flushInterval마다 (기록 중에도 분석 쪽에서 읽을 수 있게)
+                if (Time.unscaledTime - lastFlushTime >= flushInterval)
+                {
+                    writer.Flush();
+                    lastFlushTime = Time.unscaledTime;
+                }
+            }
+        }
+
+        public void Dispose()
+        {
+            lock (lockObj)
+            {
+                if (!disposed)
+                {
+                    disposed = true;
+                    writer?.Flush();
+                    writer?.Close();
+                    writer = null;
+                }
+            }
+        }
+    }
+}
@@ -6,6 +6,7 @@
 - 시각화: 조건별 boxplot, 트리거 전후 timeline
 """
 
+import argparse
 import os
 import glob
 import warnings
@@ -13,12 +14,20 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
-from scipy import stats
 
-matplotlib.rcParams["font.family"] = "AppleGothic"
-matplotlib.rcParams["axes.unicode_minus"] = False
+import event_store
+import figure_cache
+import profiling
+import synthetic
+from extra_data import add_extra_columns
+from event_tables import tables
+from figure_cache import cached_figure
+from lazy_imports import plt
+from intervals import overlap_totals
+from bootstrap import CI_LEVEL, N_BOOT, bootstrap_means, print_ci
+from paired_stats import paired_tests, print_paired_tests
+from window_join import window_counts, window_pairs
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 # ──────────────────────────────────────────────
@@ -42,230 +51,68 @@ BEAM_CONTENT_EVENTS = [
 BEAM_CONTENT_TYPES = ["poi_detail", "info_card", "comparison", "map", "mission_ref"]
 N_PARTICIPANTS = 24
 N_WAYPOINTS = 8
+CVI_METRICS = ["total_switches", "trigger_switches", "non_trigger_switches", "cvi"]
+BEAM_TIME_METRICS = ["beam_on_s", "beam_trigger_s", "beam_pause_s", "beam_mission_s"]
 
 
 def load_all_events() -> pd.DataFrame:
-    """data/raw/ 내 모든 이벤트 로그 CSV를 통합하여 반환."""
-    csv_files = sorted(RAW_DIR.glob("P*_*.csv"))
-    if not csv_files:
+    """data/raw/ 내 모든 이벤트 로그를 컬럼형 저장소(data/processed/event_store)를 거쳐 통합하여 반환."""
+    df = event_store.load_events(RAW_DIR)
+    if df.empty:
         print(f"[경고] {RAW_DIR}에 CSV 파일이 없습니다. 데모 데이터를 생성합니다.")
-        return generate_demo_data()
-
-    frames = []
-    for f in csv_files:
-        df = pd.read_csv(f, parse_dates=["timestamp"])
-        frames.append(df)
-    return pd.concat(frames, ignore_index=True)
+        return add_extra_columns(generate_demo_data())
+    return df
 
 
 def generate_demo_data() -> pd.DataFrame:
-    """분석 파이프라인 테스트용 데모 데이터 생성 (v2.1: 2조건, 미션 + 트리거 이벤트 포함)."""
-    rng = np.random.default_rng(42)
-    rows = []
-    waypoints = [f"WP{i:02d}" for i in range(1, N_WAYPOINTS + 1)]
-    missions = ["A1", "B1", "A2", "B2", "C1"]
-    mission_wps = {"A1": ("WP01", "WP02"), "B1": ("WP03",), "A2": ("WP04", "WP05"),
-                   "B2": ("WP06",), "C1": ("WP07", "WP08")}
-    trigger_at_wp = {"WP03": "T1", "WP06": "T4"}
-    base_time = pd.Timestamp("2026-03-15T10:00:00")
-
-    for pid in range(1, N_PARTICIPANTS + 1):
-        participant_id = f"P{pid:02d}"
-        for condition in CONDITIONS:
-            t = base_time
-            mission_idx = 0
-            current_mission = missions[mission_idx]
-            # ROUTE_START
-            rows.append(_event(t, participant_id, condition, "ROUTE_START", "", route="A"))
-            t += pd.Timedelta(seconds=rng.integers(5, 15))
-
-            # MISSION_START for first mission
-            rows.append(_event(t, participant_id, condition, "MISSION_START", "WP01",
-                               mission_id=current_mission))
-
-            for wp in waypoints:
-                # 이동 중 정지
-                if rng.random() < 0.3:
-                    pause_dur = rng.uniform(2, 8)
-                    rows.append(_event(t, participant_id, condition, "PAUSE_START", wp))
-                    t += pd.Timedelta(seconds=pause_dur)
-                    rows.append(_event(t, participant_id, condition, "PAUSE_END", wp,
-                                       pause_duration_s=round(pause_dur, 1)))
-
-                # 하이브리드: 기기 전환
-                if condition == "hybrid":
-                    switch_prob = 0.65 if wp in TRIGGER_WAYPOINTS else 0.25
-                    if rng.random() < switch_prob:
-                        rows.append(_event(t, participant_id, condition, "BEAM_SCREEN_ON", wp))
-                        # v2.1: 정보 허브 하위 이벤트 생성
-                        sub_t = t + pd.Timedelta(seconds=rng.uniform(0.5, 1.5))
-                        n_sub_events = rng.integers(1, 4)
-                        for _ in range(n_sub_events):
-                            content_type = rng.choice(BEAM_CONTENT_TYPES,
-                                                      p=[0.30, 0.25, 0.10, 0.25, 0.10])
-                            if content_type == "poi_detail":
-                                poi_id = f"poi_{rng.integers(1, 10):02d}"
-                                rows.append(_event(sub_t, participant_id, condition,
-                                                   "BEAM_POI_VIEWED", wp,
-                                                   beam_content_type="poi_detail",
-                                                   poi_id=poi_id,
-                                                   poi_type=rng.choice(["meeting_room", "vending_machine",
-                                                                        "restroom", "emergency_exit"]),
-                                                   view_duration_s=round(rng.uniform(1, 5), 1)))
-                            elif content_type == "info_card":
-                                card_id = f"card_{rng.integers(1, 8):02d}"
-                                rows.append(_event(sub_t, participant_id, condition,
-                                                   "BEAM_INFO_CARD_OPENED", wp,
-                                                   beam_content_type="info_card",
-                                                   card_id=card_id,
-                                                   card_type=rng.choice(["poi_detail", "sign_card",
-                                                                         "landmark"]),
-                                                   auto_shown=bool(rng.random() < 0.4)))
-                                sub_t += pd.Timedelta(seconds=rng.uniform(1, 4))
-                                rows.append(_event(sub_t, participant_id, condition,
-                                                   "BEAM_INFO_CARD_CLOSED", wp,
-                                                   beam_content_type="info_card",
-                                                   card_id=card_id,
-                                                   view_duration_s=round(rng.uniform(1, 4), 1)))
-                            elif content_type == "comparison":
-                                rows.append(_event(sub_t, participant_id, condition,
-                                                   "BEAM_COMPARISON_VIEWED", wp,
-                                                   beam_content_type="comparison",
-                                                   comparison_id=f"comp_{rng.integers(1, 3):02d}",
-                                                   items_compared=["item_A", "item_B"]))
-                            elif content_type == "map":
-                                rows.append(_event(sub_t, participant_id, condition,
-                                                   "BEAM_MAP_ZOOMED", wp,
-                                                   beam_content_type="map",
-                                                   zoom_level=round(rng.uniform(1.0, 3.0), 1)))
-                            elif content_type == "mission_ref":
-                                rows.append(_event(sub_t, participant_id, condition,
-                                                   "BEAM_MISSION_REF_VIEWED", wp,
-                                                   beam_content_type="mission_ref",
-                                                   mission_id=current_mission,
-                                                   ref_type="briefing_review"))
-                            sub_t += pd.Timedelta(seconds=rng.uniform(0.5, 2))
-                        switch_dur = (sub_t - t).total_seconds() + rng.uniform(0.5, 2)
-                        t = sub_t + pd.Timedelta(seconds=rng.uniform(0.5, 2))
-                        rows.append(_event(t, participant_id, condition, "BEAM_SCREEN_OFF", wp,
-                                           duration_s=round(switch_dur, 1)))
-
-                # 트리거 이벤트
-                if wp in trigger_at_wp:
-                    ttype = trigger_at_wp[wp]
-                    rows.append(_event(t, participant_id, condition, "TRIGGER_ACTIVATED", wp,
-                                       trigger_type=ttype))
-                    t += pd.Timedelta(seconds=rng.uniform(8, 15))
-                    rows.append(_event(t, participant_id, condition, "TRIGGER_DEACTIVATED", wp,
-                                       trigger_type=ttype, duration_s=round(rng.uniform(8, 15), 1)))
-
-                # 웨이포인트 도달
-                t += pd.Timedelta(seconds=rng.integers(30, 90))
-                conf = _generate_confidence(condition, wp, rng)
-                rows.append(_event(t, participant_id, condition, "WAYPOINT_REACHED", wp))
-                rows.append(_event(t, participant_id, condition, "CONFIDENCE_RATED", wp,
-                                   confidence=conf))
-
-                # 미션 검증
-                if mission_idx < len(missions):
-                    cm = missions[mission_idx]
-                    end_wps = mission_wps[cm]
-                    if wp == end_wps[-1]:
-                        acc_base = {"glass_only": 0.60, "hybrid": 0.88}
-                        correct = rng.random() < acc_base[condition]
-                        t += pd.Timedelta(seconds=rng.uniform(2, 6))
-                        rows.append(_event(t, participant_id, condition, "VERIFICATION_ANSWERED", wp,
-                                           mission_id=cm, correct=correct,
-                                           rt_s=round(rng.uniform(2, 8), 1)))
-                        rows.append(_event(t, participant_id, condition, "MISSION_COMPLETE", wp,
-                                           mission_id=cm, correct=correct))
-
-                        # 난이도 평정
-                        diff_base = {"glass_only": 4.5, "hybrid": 3.0}
-                        diff_rating = int(np.clip(round(rng.normal(diff_base[condition], 1)), 1, 7))
-                        rows.append(_event(t, participant_id, condition, "DIFFICULTY_RATED", wp,
-                                           mission_id=cm, rating=diff_rating))
-
-                        mission_idx += 1
-                        if mission_idx < len(missions):
-                            t += pd.Timedelta(seconds=rng.integers(3, 8))
-                            rows.append(_event(t, participant_id, condition, "MISSION_START",
-                                               wp, mission_id=missions[mission_idx]))
-
-            # ROUTE_END
-            t += pd.Timedelta(seconds=rng.integers(5, 15))
-            rows.append(_event(t, participant_id, condition, "ROUTE_END", ""))
-
-    df = pd.DataFrame(rows)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
-    return df
-
+    """분석 파이프라인 테스트용 데모 데이터 생성 (v2.1: 2조건, 미션 + 트리거 이벤트 포함).
 
-def _generate_confidence(condition: str, wp: str, rng) -> int:
-    """조건과 웨이포인트에 따라 확신도 생성 (데모용)."""
-    if wp in TRIGGER_WAYPOINTS:
-        base = {"glass_only": 3.2, "hybrid": 4.8}
-    else:
-        base = {"glass_only": 5.0, "hybrid": 5.8}
-    val = rng.normal(base[condition], 0.8)
-    return int(np.clip(round(val), 1, 7))
-
-
-def _event(t, pid, cond, etype, wp, **extra) -> dict:
-    row = {
-        "timestamp": t.isoformat(),
-        "participant_id": pid,
-        "condition": cond,
-        "event_type": etype,
-        "waypoint_id": wp,
-        "head_rotation_x": round(np.random.uniform(-10, 10), 1),
-        "head_rotation_y": round(np.random.uniform(-180, 180), 1),
-        "head_rotation_z": round(np.random.uniform(-5, 5), 1),
-        "device_active": "glass" if cond == "glass_only" else "both",
-        "confidence_rating": extra.get("confidence", ""),
-        "beam_content_type": extra.get("beam_content_type", ""),
-        "extra_data": str({k: v for k, v in extra.items()
-                          if k not in ("confidence", "beam_content_type")}) if extra else "{}",
-    }
-    return row
+    synthetic.generate_events()의 배열 기반 생성기를 사용 (seed 고정, 전체 경로 이벤트).
+    """
+    return synthetic.generate_events(N_PARTICIPANTS, N_WAYPOINTS, seed=42)
 
 
 # ──────────────────────────────────────────────
 # 2. 기기 전환 분석
 # ──────────────────────────────────────────────
 
-def analyze_switching(df: pd.DataFrame) -> pd.DataFrame:
-    """하이브리드 조건의 기기 전환 통계 산출."""
-    hybrid = df[df["condition"] == "hybrid"]
-    beam_on = hybrid[hybrid["event_type"] == "BEAM_SCREEN_ON"]
-    beam_off = hybrid[hybrid["event_type"] == "BEAM_SCREEN_OFF"]
+def switching_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """참가자별 전환 횟수 / 평균 전환 지속시간 / Beam Pro 사용 시간 (Hybrid 조건)."""
+    t = tables(df)
+    beam_on = t.subset("BEAM_SCREEN_ON", "hybrid")
+    beam_off = t.subset("BEAM_SCREEN_OFF", "hybrid")
 
     # 참가자별 전환 횟수
-    switch_counts = beam_on.groupby("participant_id").size().reset_index(name="switch_count")
+    switch_counts = beam_on.groupby("participant_id", observed=True).size().reset_index(name="switch_count")
 
     # 전환 지속시간 (BEAM_SCREEN_OFF의 duration_s)
-    durations = []
-    for _, row in beam_off.iterrows():
-        extra = row.get("extra_data", "{}")
-        if isinstance(extra, str):
-            try:
-                d = eval(extra) if extra else {}
-            except Exception:
-                d = {}
-        else:
-            d = {}
-        dur = d.get("duration_s", np.nan)
-        durations.append({"participant_id": row["participant_id"], "duration_s": dur})
-
-    dur_df = pd.DataFrame(durations)
+    dur_df = beam_off[["participant_id", "duration_s"]]
     if not dur_df.empty:
-        avg_dur = dur_df.groupby("participant_id")["duration_s"].mean().reset_index(
+        avg_dur = dur_df.groupby("participant_id", observed=True)["duration_s"].mean().reset_index(
             name="avg_switch_duration_s"
         )
         switch_counts = switch_counts.merge(avg_dur, on="participant_id", how="left")
     else:
         switch_counts["avg_switch_duration_s"] = np.nan
 
+    # Beam Pro 화면 사용 시간: ON/OFF 구간을 복원하여 전체 / 트리거·정지·미션 구간과 겹친 시간(초)
+    beam_spans = t.beam_spans[t.beam_spans["condition"] == "hybrid"]
+    usage = beam_spans.groupby("participant_id", observed=True)["duration_s"].sum().reset_index(name="beam_on_s")
+    switch_counts = switch_counts.merge(usage, on="participant_id", how="left")
+    for name, windows in [("beam_trigger_s", t.trigger_spans), ("beam_pause_s", t.pause_spans),
+                          ("beam_mission_s", t.mission_spans)]:
+        totals = overlap_totals(windows[windows["condition"] == "hybrid"], beam_spans, name=name)
+        switch_counts = switch_counts.merge(totals[["participant_id", name]], on="participant_id", how="left")
+    switch_counts[BEAM_TIME_METRICS] = switch_counts[BEAM_TIME_METRICS].fillna(0).round(1)
+    return switch_counts
+
+
+def analyze_switching(df: pd.DataFrame) -> pd.DataFrame:
+    """하이브리드 조건의 기기 전환 통계 산출."""
+    t = tables(df)
+    beam_on = t.subset("BEAM_SCREEN_ON", "hybrid")
+    switch_counts = switching_metrics(df)
+
     # 트리거 전후 전환율
     trigger_switches = beam_on[beam_on["waypoint_id"].isin(TRIGGER_WAYPOINTS)]
 
@@ -276,10 +123,13 @@ def analyze_switching(df: pd.DataFrame) -> pd.DataFrame:
           f"(SD={switch_counts['switch_count'].std():.1f})")
     if "avg_switch_duration_s" in switch_counts.columns:
         print(f"평균 전환 지속시간: {switch_counts['avg_switch_duration_s'].mean():.1f}s")
+    print(f"참가자 평균 Beam Pro 사용 시간: {switch_counts['beam_on_s'].mean():.1f}s "
+          f"(트리거 중 {switch_counts['beam_trigger_s'].mean():.1f}s, 정지 중 {switch_counts['beam_pause_s'].mean():.1f}s, "
+          f"미션 중 {switch_counts['beam_mission_s'].mean():.1f}s)")
     print(f"트리거 지점 전환 비율: {trigger_rate:.1%}")
 
     # v2.1: 콘텐츠 유형별 접근 분석
-    content_events = hybrid[hybrid["event_type"].isin(BEAM_CONTENT_EVENTS)]
+    content_events = t.subset(BEAM_CONTENT_EVENTS, "hybrid")
     if not content_events.empty:
         print(f"\n  [콘텐츠 유형별 접근 빈도]")
         for ct in BEAM_CONTENT_TYPES:
@@ -298,10 +148,9 @@ def analyze_switching(df: pd.DataFrame) -> pd.DataFrame:
 # 2b. 교차검증 지수 (CVI) 분석 — v2
 # ──────────────────────────────────────────────
 
-def analyze_cross_verification(df: pd.DataFrame) -> pd.DataFrame:
-    """교차검증 지수(CVI) 계산: 트리거 구간 Beam Pro 참조율 ÷ 전체 참조율."""
-    hybrid = df[df["condition"] == "hybrid"]
-    beam_on = hybrid[hybrid["event_type"] == "BEAM_SCREEN_ON"]
+def cvi_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """참가자별 교차검증 지수(CVI): 트리거 구간 Beam Pro 참조율 ÷ 전체 참조율."""
+    beam_on = tables(df).subset("BEAM_SCREEN_ON", "hybrid")
 
     results = []
     for pid in beam_on["participant_id"].unique():
@@ -323,8 +172,21 @@ def analyze_cross_verification(df: pd.DataFrame) -> pd.DataFrame:
             "non_trigger_switches": non_trigger_switches,
             "cvi": round(cvi, 2) if not np.isnan(cvi) else np.nan,
         })
+    return pd.DataFrame(results)
+
 
-    cvi_df = pd.DataFrame(results)
+def cvi_ci(cvi_df: pd.DataFrame, n_boot: int = N_BOOT, ci: float = CI_LEVEL, seed: int = 0) -> pd.DataFrame:
+    """참가자별 CVI 지표 평균의 참가자 단위 부트스트랩 신뢰구간."""
+    if cvi_df.empty:
+        return pd.DataFrame()
+    return bootstrap_means(cvi_df.set_index("participant_id")[CVI_METRICS], n_boot, ci, seed)
+
+
+def analyze_cross_verification(df: pd.DataFrame) -> pd.DataFrame:
+    """교차검증 지수(CVI) 계산: 트리거 구간 Beam Pro 참조율 ÷ 전체 참조율."""
+    t = tables(df)
+    hybrid = t.hybrid
+    cvi_df = cvi_metrics(df)
 
     print(f"\n=== 교차검증 지수 (CVI) 분석 ===")
     if not cvi_df.empty:
@@ -333,12 +195,14 @@ def analyze_cross_verification(df: pd.DataFrame) -> pd.DataFrame:
         print(f"  (CVI > 1: 트리거 구간에서 더 많이 Beam Pro 참조)")
         cvi_above_1 = (cvi_df["cvi"] > 1).sum()
         print(f"  CVI > 1인 참가자: {cvi_above_1}/{len(cvi_df)} ({cvi_above_1/len(cvi_df):.0%})")
+        print(f"  [부트스트랩 95% CI] 참가자 평균")
+        print_ci(cvi_ci(cvi_df))
     else:
         print("  [경고] CVI 계산 불가 (Hybrid 조건 전환 데이터 없음)")
 
     # v2.1: 콘텐츠별 CVI
     if not cvi_df.empty and "beam_content_type" in hybrid.columns:
-        content_events = hybrid[hybrid["event_type"].isin(BEAM_CONTENT_EVENTS)]
+        content_events = t.subset(BEAM_CONTENT_EVENTS, "hybrid")
         if not content_events.empty:
             print(f"\n  [콘텐츠별 CVI]")
             for ct in BEAM_CONTENT_TYPES:
@@ -355,47 +219,25 @@ def analyze_cross_verification(df: pd.DataFrame) -> pd.DataFrame:
 
 def analyze_verification_episodes(df: pd.DataFrame) -> pd.DataFrame:
     """검증 에피소드 추출: Beam Pro 참조 전후 미션 정확도 비교 (Hybrid 조건)."""
-    hybrid = df[df["condition"] == "hybrid"]
+    t = tables(df)
 
-    mission_completes = hybrid[hybrid["event_type"] == "MISSION_COMPLETE"].copy()
+    mission_completes = t.subset("MISSION_COMPLETE", "hybrid").copy()
     if mission_completes.empty:
         print("\n=== 검증 에피소드 분석 ===")
         print("  [경고] MISSION_COMPLETE 이벤트 없음")
         return pd.DataFrame()
 
-    def extract_correct(extra):
-        if isinstance(extra, str):
-            try:
-                d = eval(extra) if extra else {}
-            except Exception:
-                d = {}
-        else:
-            d = {}
-        return d.get("correct", None)
-
-    mission_completes["correct"] = mission_completes["extra_data"].apply(extract_correct)
-
-    beam_on_times = hybrid[hybrid["event_type"] == "BEAM_SCREEN_ON"][
+    beam_on_times = t.subset("BEAM_SCREEN_ON", "hybrid")[
         ["participant_id", "timestamp", "waypoint_id"]
     ]
 
-    episodes = []
-    for _, mc in mission_completes.iterrows():
-        pid = mc["participant_id"]
-        mc_time = mc["timestamp"]
-        pid_beams = beam_on_times[beam_on_times["participant_id"] == pid]
-        recent_beams = pid_beams[
-            (pid_beams["timestamp"] < mc_time) &
-            (pid_beams["timestamp"] > mc_time - pd.Timedelta(seconds=60))
-        ]
-        episodes.append({
-            "participant_id": pid,
-            "waypoint_id": mc["waypoint_id"],
-            "correct": mc["correct"],
-            "beam_referenced": len(recent_beams) > 0,
-        })
-
-    ep_df = pd.DataFrame(episodes)
+    # 미션 완료 전 60초 이내 Beam Pro 참조 여부
+    ep_df = pd.DataFrame({
+        "participant_id": mission_completes["participant_id"].astype(object).to_numpy(),
+        "waypoint_id": mission_completes["waypoint_id"].to_numpy(),
+        "correct": mission_completes["correct"].astype(object).to_numpy(),
+        "beam_referenced": window_counts(mission_completes, beam_on_times, before=60) > 0,
+    })
 
     print(f"\n=== 검증 에피소드 분석 (Hybrid 조건) ===")
     if not ep_df.empty and ep_df["correct"].notna().any():
@@ -419,8 +261,8 @@ def analyze_verification_episodes(df: pd.DataFrame) -> pd.DataFrame:
 
 def analyze_content_access_patterns(df: pd.DataFrame) -> pd.DataFrame:
     """미션 타입 × 콘텐츠 유형 접근 패턴 분석 (v2.1)."""
-    hybrid = df[df["condition"] == "hybrid"]
-    content_events = hybrid[hybrid["event_type"].isin(BEAM_CONTENT_EVENTS)].copy()
+    t = tables(df)
+    content_events = t.subset(BEAM_CONTENT_EVENTS, "hybrid").copy()
 
     if content_events.empty or "beam_content_type" not in content_events.columns:
         print("\n=== 콘텐츠 접근 패턴 분석 ===")
@@ -428,12 +270,6 @@ def analyze_content_access_patterns(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
 
     # 미션 구간에 콘텐츠 이벤트 매핑
-    missions = hybrid[hybrid["event_type"] == "MISSION_START"].copy()
-    missions["parsed"] = missions["extra_data"].apply(
-        lambda x: eval(x) if isinstance(x, str) and x else {}
-    )
-    missions["mission_id"] = missions["parsed"].apply(lambda d: d.get("mission_id", ""))
-
     mission_types_map = {"A1": "A", "A2": "A", "B1": "B", "B2": "B", "C1": "C"}
     results = []
 
@@ -463,43 +299,34 @@ def analyze_content_access_patterns(df: pd.DataFrame) -> pd.DataFrame:
 
 def analyze_information_utilization(df: pd.DataFrame) -> pd.DataFrame:
     """콘텐츠 열람 후 미션 정확도 분석 (v2.1)."""
-    hybrid = df[df["condition"] == "hybrid"]
+    t = tables(df)
 
-    mc = hybrid[hybrid["event_type"] == "MISSION_COMPLETE"].copy()
+    mc = t.subset("MISSION_COMPLETE", "hybrid").copy()
     if mc.empty:
         print("\n=== 정보 활용도 분석 ===")
         print("  [경고] MISSION_COMPLETE 이벤트 없음")
         return pd.DataFrame()
 
-    mc["parsed"] = mc["extra_data"].apply(
-        lambda x: eval(x) if isinstance(x, str) and x else {}
+    content_events = t.subset(BEAM_CONTENT_EVENTS, "hybrid")
+
+    # 미션 완료 전 120초 이내 콘텐츠 열람 (미션-열람 이벤트 쌍)
+    pairs = window_pairs(mc, content_events, before=120).sort_values(["anchor", "event"])
+    pairs["content_type"] = content_events.loc[pairs["event"], "beam_content_type"].astype(object).to_numpy()
+    content_count = pairs.groupby("anchor").size().reindex(mc.index, fill_value=0)
+    content_types = (
+        pairs.dropna(subset=["content_type"])
+        .groupby("anchor")["content_type"]
+        .agg(lambda s: ",".join(s.unique()))
+        .reindex(mc.index, fill_value="none")
     )
-    mc["mission_id"] = mc["parsed"].apply(lambda d: d.get("mission_id", ""))
-    mc["correct"] = mc["parsed"].apply(lambda d: d.get("correct", None))
-
-    content_events = hybrid[hybrid["event_type"].isin(BEAM_CONTENT_EVENTS)]
-
-    results = []
-    for _, row in mc.iterrows():
-        pid = row["participant_id"]
-        mc_time = row["timestamp"]
-        pid_content = content_events[
-            (content_events["participant_id"] == pid) &
-            (content_events["timestamp"] < mc_time) &
-            (content_events["timestamp"] > mc_time - pd.Timedelta(seconds=120))
-        ]
-        content_accessed = pid_content["beam_content_type"].unique().tolist() if (
-            "beam_content_type" in pid_content.columns and not pid_content.empty
-        ) else []
-        results.append({
-            "participant_id": pid,
-            "mission_id": row["mission_id"],
-            "correct": row["correct"],
-            "content_count": len(pid_content),
-            "content_types": ",".join(content_accessed) if content_accessed else "none",
-        })
 
-    util_df = pd.DataFrame(results)
+    util_df = pd.DataFrame({
+        "participant_id": mc["participant_id"].astype(object).to_numpy(),
+        "mission_id": mc["mission_id"].to_numpy(),
+        "correct": mc["correct"].astype(object).to_numpy(),
+        "content_count": content_count.to_numpy(),
+        "content_types": content_types.to_numpy(),
+    })
 
     print("\n=== 정보 활용도 분석 (Hybrid 조건) ===")
     if not util_df.empty and util_df["correct"].notna().any():
@@ -519,42 +346,32 @@ def analyze_information_utilization(df: pd.DataFrame) -> pd.DataFrame:
 # 3. 정지 횟수/시간 비교 (2조건)
 # ──────────────────────────────────────────────
 
-def analyze_pauses(df: pd.DataFrame) -> pd.DataFrame:
-    """조건별 정지 횟수 및 총 정지 시간 비교."""
-    pause_starts = df[df["event_type"] == "PAUSE_START"]
-    pause_ends = df[df["event_type"] == "PAUSE_END"]
+def pause_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """참가자 × 조건별 정지 횟수 / 총 정지 시간."""
+    t = tables(df)
+    pause_starts = t.subset("PAUSE_START")
+    pause_ends = t.subset("PAUSE_END")
 
     pause_counts = (
-        pause_starts.groupby(["participant_id", "condition"])
+        pause_starts.groupby(["participant_id", "condition"], observed=True)
         .size()
         .reset_index(name="pause_count")
     )
 
-    pause_durations = []
-    for _, row in pause_ends.iterrows():
-        extra = row.get("extra_data", "{}")
-        if isinstance(extra, str):
-            try:
-                d = eval(extra) if extra else {}
-            except Exception:
-                d = {}
-        else:
-            d = {}
-        dur = d.get("pause_duration_s", 0)
-        pause_durations.append({
-            "participant_id": row["participant_id"],
-            "condition": row["condition"],
-            "pause_duration_s": dur,
-        })
-
-    dur_df = pd.DataFrame(pause_durations)
+    dur_df = pause_ends[["participant_id", "condition", "pause_duration_s"]].fillna({"pause_duration_s": 0})
     if not dur_df.empty:
-        total_dur = dur_df.groupby(["participant_id", "condition"])["pause_duration_s"].sum().reset_index(
+        total_dur = dur_df.groupby(["participant_id", "condition"], observed=True)["pause_duration_s"].sum().reset_index(
             name="total_pause_s"
         )
         pause_counts = pause_counts.merge(total_dur, on=["participant_id", "condition"], how="left")
     else:
         pause_counts["total_pause_s"] = 0
+    return pause_counts
+
+
+def analyze_pauses(df: pd.DataFrame) -> pd.DataFrame:
+    """조건별 정지 횟수 및 총 정지 시간 비교."""
+    pause_counts = pause_metrics(df)
 
     print(f"\n=== 정지 분석 (2조건) ===")
     for cond, label in zip(CONDITIONS, CONDITION_LABELS):
@@ -569,16 +386,23 @@ def analyze_pauses(df: pd.DataFrame) -> pd.DataFrame:
 # 4. 과제 완료 시간 비교
 # ──────────────────────────────────────────────
 
-def analyze_completion_time(df: pd.DataFrame) -> pd.DataFrame:
-    """조건별 과제 완료 시간 산출."""
-    starts = df[df["event_type"] == "ROUTE_START"][["participant_id", "condition", "timestamp"]]
-    ends = df[df["event_type"] == "ROUTE_END"][["participant_id", "condition", "timestamp"]]
+def completion_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """참가자 × 조건별 과제 완료 시간 (ROUTE_START → ROUTE_END)."""
+    t = tables(df)
+    starts = t.subset("ROUTE_START")[["participant_id", "condition", "timestamp"]]
+    ends = t.subset("ROUTE_END")[["participant_id", "condition", "timestamp"]]
 
     starts = starts.rename(columns={"timestamp": "start_time"})
     ends = ends.rename(columns={"timestamp": "end_time"})
 
     merged = starts.merge(ends, on=["participant_id", "condition"])
     merged["completion_time_s"] = (merged["end_time"] - merged["start_time"]).dt.total_seconds()
+    return merged[["participant_id", "condition", "completion_time_s"]]
+
+
+def analyze_completion_time(df: pd.DataFrame) -> pd.DataFrame:
+    """조건별 과제 완료 시간 산출."""
+    merged = completion_metrics(df)
 
     print(f"\n=== 과제 완료 시간 (2조건) ===")
     for cond, label in zip(CONDITIONS, CONDITION_LABELS):
@@ -586,51 +410,24 @@ def analyze_completion_time(df: pd.DataFrame) -> pd.DataFrame:
         print(f"  {label}: M={subset['completion_time_s'].mean():.1f}s, "
               f"SD={subset['completion_time_s'].std():.1f}s")
 
-    return merged[["participant_id", "condition", "completion_time_s"]]
+    return merged
 
 
 # ──────────────────────────────────────────────
-# 5. Paired t-test / Wilcoxon signed-rank (2조건)
+# 5. 대응 비교 검정 (2조건)
 # ──────────────────────────────────────────────
 
 def run_paired_test(data: pd.DataFrame, dv: str, label: str):
-    """2조건 Paired t-test (pingouin) 또는 Wilcoxon signed-rank (scipy fallback)."""
-    try:
-        import pingouin as pg
-        test = pg.pairwise_tests(
-            data=data, dv=dv, within="condition", subject="participant_id",
-            parametric=True
-        )
-        print(f"\n=== Paired t-test: {label} ===")
-        if not test.empty:
-            row = test.iloc[0]
-            print(f"  {row['A']} vs {row['B']}: t={row['T']:.2f}, p={row['p-unc']:.4f}, "
-                  f"d={row['hedges']:.2f}")
-    except ImportError:
-        print(f"\n=== Wilcoxon signed-rank: {label} ===")
-        print("  (pingouin 미설치 → scipy.stats.wilcoxon 사용)")
-        glass_vals = data[data["condition"] == "glass_only"][dv].values
-        hybrid_vals = data[data["condition"] == "hybrid"][dv].values
-        min_len = min(len(glass_vals), len(hybrid_vals))
-        if min_len > 0:
-            # Paired t-test first
-            t_stat, t_p = stats.ttest_rel(glass_vals[:min_len], hybrid_vals[:min_len])
-            print(f"  Paired t-test: t={t_stat:.2f}, p={t_p:.4f}")
-            # Wilcoxon as robustness check
-            w_stat, w_p = stats.wilcoxon(glass_vals[:min_len], hybrid_vals[:min_len])
-            print(f"  Wilcoxon: W={w_stat:.1f}, p={w_p:.4f}")
-            # Effect size (Cohen's d)
-            diff = glass_vals[:min_len] - hybrid_vals[:min_len]
-            d = diff.mean() / diff.std() if diff.std() > 0 else 0
-            print(f"  Cohen's d = {d:.2f}")
-        else:
-            print("  [경고] 데이터 부족, 검정 불가")
+    """2조건 대응 비교 (Paired t-test, Wilcoxon, Hedges' g, 순열검정) — paired_stats 일괄 엔진 사용."""
+    print(f"\n=== 대응 비교: {label} ===")
+    print_paired_tests(paired_tests(data, [dv], [label]), indent="  ")
 
 
 # ──────────────────────────────────────────────
 # 6. 시각화
 # ──────────────────────────────────────────────
 
+@cached_figure("switching_boxplot.png")
 def plot_switching_boxplot(switch_df: pd.DataFrame):
     """하이브리드 조건 기기 전환 횟수 boxplot."""
     fig, ax = plt.subplots(1, 1, figsize=(6, 5))
@@ -643,6 +440,7 @@ def plot_switching_boxplot(switch_df: pd.DataFrame):
     plt.close(fig)
 
 
+@cached_figure("pause_comparison.png")
 def plot_pause_comparison(pause_df: pd.DataFrame):
     """2조건 정지 횟수 비교 boxplot."""
     fig, axes = plt.subplots(1, 2, figsize=(10, 5))
@@ -664,6 +462,7 @@ def plot_pause_comparison(pause_df: pd.DataFrame):
     plt.close(fig)
 
 
+@cached_figure("completion_time.png")
 def plot_completion_time(ct_df: pd.DataFrame):
     """2조건 과제 완료 시간 비교 boxplot."""
     fig, ax = plt.subplots(1, 1, figsize=(6, 5))
@@ -677,18 +476,31 @@ def plot_completion_time(ct_df: pd.DataFrame):
     plt.close(fig)
 
 
-def plot_trigger_timeline(df: pd.DataFrame):
-    """트리거 지점 전후 기기 전환 timeline 시각화."""
-    hybrid = df[df["condition"] == "hybrid"]
+def trigger_switch_rates(df: pd.DataFrame) -> pd.Series:
+    """웨이포인트별 Beam Pro 참조 비율 (Hybrid 조건, 웨이포인트에서 BEAM_SCREEN_ON이 있었던 참가자 비율)."""
+    t = tables(df)
     waypoints = [f"WP{i:02d}" for i in range(1, N_WAYPOINTS + 1)]
 
-    switch_rates = []
-    for wp in waypoints:
-        wp_events = hybrid[hybrid["waypoint_id"] == wp]
-        total = wp_events["participant_id"].nunique()
-        switches = wp_events[wp_events["event_type"] == "BEAM_SCREEN_ON"]["participant_id"].nunique()
-        rate = switches / max(total, 1)
-        switch_rates.append(rate)
+    # 웨이포인트별 참가자 수 / Beam Pro를 켠 참가자 수 (웨이포인트마다 마스크를 만들지 않고 groupby 한 번씩)
+    total = t.hybrid.groupby("waypoint_id", observed=True)["participant_id"].nunique()
+    switches = t.subset("BEAM_SCREEN_ON", "hybrid").groupby("waypoint_id", observed=True)["participant_id"].nunique()
+    rates = (switches.reindex(waypoints, fill_value=0)
+             / total.reindex(waypoints, fill_value=0).clip(lower=1))
+    return rates.rename("switch_rate").rename_axis("waypoint_id")
+
+
+def plot_trigger_timeline(df: pd.DataFrame):
+    """트리거 지점 전후 기기 전환 timeline 시각화.
+
+    캐시 키는 전체 이벤트 테이블 대신 웨이포인트별 비율로 만든다.
+    """
+    _plot_trigger_timeline(trigger_switch_rates(df))
+
+
+@cached_figure("trigger_timeline.png")
+def _plot_trigger_timeline(rates: pd.Series):
+    waypoints = rates.index.astype(str).tolist()
+    switch_rates = rates.tolist()
 
     fig, ax = plt.subplots(1, 1, figsize=(8, 5))
     colors = ["#e74c3c" if wp in TRIGGER_WAYPOINTS else "#3498db" for wp in waypoints]
@@ -711,6 +523,7 @@ def plot_trigger_timeline(df: pd.DataFrame):
     plt.close(fig)
 
 
+@cached_figure("content_access_heatmap.png")
 def plot_content_heatmap(pattern_df: pd.DataFrame):
     """미션 타입 × 콘텐츠 유형 접근 히트맵 (v2.1)."""
     if pattern_df.empty:
@@ -746,22 +559,9 @@ def plot_content_heatmap(pattern_df: pd.DataFrame):
 # 7. 메인
 # ──────────────────────────────────────────────
 
-def main():
-    print("=" * 60)
-    print("기기 전환 패턴 분석")
-    print("=" * 60)
-
-    df = load_all_events()
-    print(f"총 이벤트 수: {len(df)}")
-    print(f"참가자 수: {df['participant_id'].nunique()}")
-    print(f"조건: {df['condition'].unique().tolist()}")
-
-    # 분석
+def run_switching(df: pd.DataFrame):
+    """기기 전환·정지·완료 시간 분석, 대응 비교, 시각화 및 요약 CSV 저장."""
     switch_df = analyze_switching(df)
-    cvi_df = analyze_cross_verification(df)
-    ep_df = analyze_verification_episodes(df)
-    content_df = analyze_content_access_patterns(df)
-    util_df_content = analyze_information_utilization(df)
     pause_df = analyze_pauses(df)
     ct_df = analyze_completion_time(df)
 
@@ -777,13 +577,22 @@ def main():
     plot_pause_comparison(pause_df)
     plot_completion_time(ct_df)
     plot_trigger_timeline(df)
-    plot_content_heatmap(content_df)
 
     # 요약 CSV 저장
     summary = ct_df.merge(pause_df, on=["participant_id", "condition"], how="outer")
     summary.to_csv(OUTPUT_DIR / "device_switching_summary.csv", index=False)
     print(f"  → {OUTPUT_DIR / 'device_switching_summary.csv'} 저장")
 
+
+def run_cvi(df: pd.DataFrame):
+    """교차검증 지수(CVI)·검증 에피소드·콘텐츠 접근/활용 분석 및 결과 저장."""
+    cvi_df = analyze_cross_verification(df)
+    ep_df = analyze_verification_episodes(df)
+    content_df = analyze_content_access_patterns(df)
+    util_df_content = analyze_information_utilization(df)
+
+    plot_content_heatmap(content_df)
+
     if not cvi_df.empty:
         cvi_df.to_csv(OUTPUT_DIR / "cvi_summary.csv", index=False)
         print(f"  → {OUTPUT_DIR / 'cvi_summary.csv'} 저장")
@@ -800,8 +609,30 @@ def main():
         util_df_content.to_csv(OUTPUT_DIR / "information_utilization.csv", index=False)
         print(f"  → {OUTPUT_DIR / 'information_utilization.csv'} 저장")
 
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기기 전환 패턴 분석")
+    figure_cache.add_plot_argument(parser)
+    event_store.add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+    figure_cache.apply_plot_argument(args)
+    event_store.apply_filter_arguments(parser, args)
+
+    print("=" * 60)
+    print("기기 전환 패턴 분석")
+    print("=" * 60)
+
+    df = load_all_events()
+    print(f"총 이벤트 수: {len(df)}")
+    print(f"참가자 수: {df['participant_id'].nunique()}")
+    print(f"조건: {df['condition'].unique().tolist()}")
+
+    run_switching(df)
+    run_cvi(df)
+
     print("\n분석 완료.")
 
 
 if __name__ == "__main__":
-    main()
+    with profiling.session("analyze_device_switching"):
+        main()
@@ -0,0 +1,462 @@
+"""
+머리 움직임 분석 스크립트
+- 샘플: 이벤트 로그 각 행의 head_rotation_x/y/z (pitch/yaw/roll, 도).
+  세션 머리 자세 스트림(.hpose, head_pose)이 있으면 그 세션은 스트림 샘플을 대신 사용
+- yaw를 세션별로 펼치고(unwrap), SMOOTH_S 이상 앞선 같은 세션 샘플 기준 각속도를 searchsorted로 일괄 계산
+- 훑어보기(scan): |yaw 각속도| ≥ SCAN_YAW_SPEED 가 SCAN_MIN_DURATION 이상 이어진 구간
+- 내려다보기(glance): pitch ≥ GLANCE_PITCH 가 GLANCE_MIN_DURATION 이상 이어진 구간 (Beam Pro 확인)
+- 구간은 불리언 마스크의 연속 구간(run)을 배열 연산으로 찾음 → 행 단위 루프 없이 세션당 수백만 샘플 처리
+- TRIGGER_ACTIVATED / BEAM_SCREEN_ON 이후 RESPONSE_WINDOW초 안의 첫 내려다보기·훑어보기를 조건별로 비교
+"""
+
+import argparse
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import event_store
+import figure_cache
+import head_pose
+import profiling
+import synthetic
+from extra_data import add_extra_columns
+from event_tables import tables
+from figure_cache import cached_figure
+from lazy_imports import plt
+from paired_stats import paired_tests, print_paired_tests
+from window_join import asof_event
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+RAW_DIR = DATA_DIR / "raw"
+POSE_DIR = head_pose.POSE_DIR
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+OUTPUT_DIR.mkdir(exist_ok=True)
+
+CONDITIONS = ["glass_only", "hybrid"]
+CONDITION_LABELS = ["Glass Only", "Hybrid"]
+SESSION_KEYS = ["participant_id", "condition"]
+ROTATION_COLUMNS = ["head_rotation_x", "head_rotation_y", "head_rotation_z"]
+ANCHOR_EVENTS = ["TRIGGER_ACTIVATED", "BEAM_SCREEN_ON"]
+BOUT_KINDS = ["glance", "scan"]
+N_PARTICIPANTS = 8              # 데모 참가자 수
+DEMO_RATE = 72.0                # 데모 스트림 샘플링 주기 (Hz)
+
+SMOOTH_S = 0.2                  # 각속도 기준 간격 (초): 이만큼 앞선 가장 가까운 샘플과 비교
+MAX_SAMPLE_GAP = 1.0            # 샘플 간격이 이보다 길면 각속도 없음 / 구간 끊김 (초)
+SCAN_YAW_SPEED = 30.0           # 훑어보기 yaw 각속도 기준 (도/초)
+SCAN_MIN_DURATION = 0.5
+GLANCE_PITCH = head_pose.HEAD_DOWN_PITCH
+GLANCE_MIN_DURATION = 0.3
+RESPONSE_WINDOW = 10.0          # 기준 이벤트 이후 반응으로 볼 시간 (초)
+
+
+def load_events() -> pd.DataFrame:
+    """이벤트 저장소 로드 또는 데모 생성."""
+    df = event_store.load_events(RAW_DIR)
+    if not df.empty:
+        return df
+    print("[경고] 이벤트 로그 없음. 데모 데이터 생성.")
+    return add_extra_columns(generate_demo_data())
+
+
+# ──────────────────────────────────────────────
+# 2. 샘플 테이블 (이벤트 행 / 스트림 / 데모)
+# ──────────────────────────────────────────────
+# 샘플 테이블 컬럼: participant_id, condition, t_us(int64 µs), pitch, yaw, roll (−180–180, pitch는 아래가 +)
+# 세션 → 시각 순으로 정렬되어 있어야 하며, 아래 커널은 모두 이 순서를 가정한다.
+
+def wrap180(deg) -> np.ndarray:
+    """각도 → −180–180 (Unity 오일러각 0–360과 부호 있는 값 모두 허용)."""
+    return (np.asarray(deg, dtype=np.float64) + 180) % 360 - 180
+
+
+def _sort_samples(samples: pd.DataFrame) -> pd.DataFrame:
+    codes = samples.groupby(SESSION_KEYS, sort=True).ngroup().to_numpy()
+    order = np.lexsort((samples["t_us"].to_numpy(), codes))
+    return samples.iloc[order].reset_index(drop=True)
+
+
+def _session_codes(samples: pd.DataFrame) -> np.ndarray:
+    return samples.groupby(SESSION_KEYS, sort=True).ngroup().to_numpy(dtype=np.int64)
+
+
+def samples_from_events(df: pd.DataFrame) -> pd.DataFrame:
+    """이벤트 행의 머리 회전 컬럼 → 샘플 테이블."""
+    rot = df[ROTATION_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    ok = (rot.notna().all(axis=1) & df["timestamp"].notna() & df[SESSION_KEYS].notna().all(axis=1)).to_numpy()
+    rows = df[ok]
+    samples = pd.DataFrame({
+        "participant_id": rows["participant_id"].astype(str).to_numpy(),
+        "condition": rows["condition"].astype(str).to_numpy(),
+        "t_us": rows["timestamp"].to_numpy(dtype="datetime64[us]").astype(np.int64),
+        "pitch": wrap180(rot.loc[ok, "head_rotation_x"]),
+        "yaw": wrap180(rot.loc[ok, "head_rotation_y"]),
+        "roll": wrap180(rot.loc[ok, "head_rotation_z"]),
+    })
+    return _sort_samples(samples)
+
+
+def samples_from_streams(paths: list, sessions: set = None, events: pd.DataFrame = None) -> pd.DataFrame:
+    """머리 자세 스트림(.hpose) → 샘플 테이블. sessions가 있으면 그 (참가자, 조건)만.
+
+    스트림 하나가 두 조건을 이어 담으므로 events의 조건 구간(그 조건의 첫 ~ 마지막 이벤트)으로 나누어 구간마다 조건을 붙인다
+    (조건 사이 공백 샘플은 제외)
+    (events가 없으면 파일명의 조건).
+    """
+    frames = []
+    for path in paths:
+        stream = head_pose.HeadPoseStream(path)
+        if len(stream) == 0 or stream.participant_id is None:
+            continue
+        for condition, lo, hi in head_pose.condition_segments(stream, events):
+            if sessions is not None and (stream.participant_id, condition) not in sessions:
+                continue
+            frames.append(pd.DataFrame({
+                "participant_id": stream.participant_id, "condition": condition,
+                "t_us": np.asarray(stream.t_us[lo:hi]), "pitch": wrap180(stream.rot_x[lo:hi]),
+                "yaw": wrap180(stream.rot_y[lo:hi]), "roll": wrap180(stream.rot_z[lo:hi]),
+            }))
+    if not frames:
+        return pd.DataFrame(columns=SESSION_KEYS + ["t_us", "pitch", "yaw", "roll"])
+    return _sort_samples(pd.concat(frames, ignore_index=True))
+
+
+def load_samples(df: pd.DataFrame, pose_dir: Path = None) -> tuple:
+    """세션별 샘플: 스트림이 있는 세션은 스트림, 나머지는 이벤트 행. (샘플 테이블, 스트림 세션 수) 반환.
+
+    스트림의 조건 구간은 필터와 무관한 세션 전체의 조건 경계로 나눈 뒤 df에 있는 (참가자, 조건)만 남긴다.
+    """
+    rows = samples_from_events(df)
+    sessions = set(rows[SESSION_KEYS].drop_duplicates().itertuples(index=False, name=None))
+    paths = event_store.select_files(head_pose.pose_files(pose_dir or POSE_DIR))
+    streams = samples_from_streams(paths, sessions, head_pose.boundary_events(df))
+    if streams.empty:
+        return rows, 0
+    covered = set(streams[SESSION_KEYS].drop_duplicates().itertuples(index=False, name=None))
+    from_rows = ~pd.MultiIndex.from_frame(rows[SESSION_KEYS]).isin(list(covered))
+    return _sort_samples(pd.concat([streams, rows[from_rows]], ignore_index=True)), len(covered)
+
+
+def _session_pose(grp: pd.DataFrame, rate: float, seed: int) -> tuple:
+    """합성 세션 하나의 머리 자세: BEAM_SCREEN_ON 시각에 내려다보고 TRIGGER_ACTIVATED 시각에 훑어봄."""
+    return synthetic.generate_head_pose(
+        grp["timestamp"].min(), grp["timestamp"].max(),
+        grp.loc[grp["event_type"] == "BEAM_SCREEN_ON", "timestamp"].to_numpy(),
+        rate=rate, seed=seed,
+        scan_times=grp.loc[grp["event_type"] == "TRIGGER_ACTIVATED", "timestamp"].to_numpy(),
+    )
+
+
+def demo_samples(events: pd.DataFrame, rate: float = DEMO_RATE, seed: int = 0) -> pd.DataFrame:
+    """합성 이벤트 세션별 고빈도 스트림 샘플 테이블."""
+    frames = []
+    for i, ((pid, cond), grp) in enumerate(events.groupby(SESSION_KEYS, observed=True)):
+        t_us, rot = _session_pose(grp, rate, seed + i)
+        frames.append(pd.DataFrame({
+            "participant_id": str(pid), "condition": str(cond), "t_us": t_us,
+            "pitch": wrap180(rot[:, 0]), "yaw": wrap180(rot[:, 1]), "roll": wrap180(rot[:, 2]),
+        }))
+    return _sort_samples(pd.concat(frames, ignore_index=True))
+
+
+def generate_demo_data() -> pd.DataFrame:
+    """머리 움직임 데모 데이터: 합성 이벤트의 머리 회전 컬럼을 합성 10 Hz 자세의 직전 샘플 값으로 채움."""
+    events = synthetic.generate_events(n_participants=N_PARTICIPANTS, seed=31)
+    ev_t = events["timestamp"].to_numpy(dtype="datetime64[us]").astype(np.int64)
+    rot_at = np.zeros((len(events), 3))
+    for i, idx in enumerate(events.groupby(SESSION_KEYS, observed=True).indices.values()):
+        t_us, rot = _session_pose(events.iloc[idx], 10.0, i)
+        if len(t_us):
+            rot_at[idx] = rot[np.clip(np.searchsorted(t_us, ev_t[idx], side="right") - 1, 0, len(t_us) - 1)]
+    for j, col in enumerate(ROTATION_COLUMNS):
+        events[col] = np.round(rot_at[:, j], 1)
+    return events
+
+
+# ──────────────────────────────────────────────
+# 3. 배열 커널 (세션 → 시각 순 정렬 가정)
+# ──────────────────────────────────────────────
+
+def _session_starts(codes: np.ndarray) -> np.ndarray:
+    return np.r_[True, codes[1:] != codes[:-1]] if len(codes) else np.zeros(0, dtype=bool)
+
+
+def unwrap_yaw(yaw: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """세션별로 ±180 경계의 점프를 없앤 연속 yaw (세션 첫 샘플은 원래 값)."""
+    yaw = wrap180(yaw)
+    if len(yaw) == 0:
+        return yaw
+    start = _session_starts(codes)
+    # 인접 샘플 간 최단 회전량의 누적합, 세션 첫 샘플에서 원래 값으로 다시 맞춤
+    cs = np.cumsum(np.where(start, 0.0, wrap180(np.diff(yaw, prepend=yaw[0]))))
+    first = np.flatnonzero(start)
+    return cs + (yaw[first] - cs[first])[np.cumsum(start) - 1]
+
+
+def lagged_rate(codes: np.ndarray, t_us: np.ndarray, values: np.ndarray, smooth: float = SMOOTH_S,
+                max_gap: float = MAX_SAMPLE_GAP) -> np.ndarray:
+    """각 샘플과, smooth초 이상 앞선 가장 가까운 같은 세션 샘플 사이의 변화율 (단위/초).
+
+    기준 샘플이 없거나 간격이 max_gap초보다 길면 NaN. 세션마다 겹치지 않는 시각 범위를 배정한
+    단일 int64 축에 searchsorted 한 번으로 모든 샘플의 기준 샘플을 찾는다.
+    """
+    n = len(t_us)
+    if n == 0:
+        return np.zeros(0)
+    start = _session_starts(codes)
+    session = np.cumsum(start) - 1
+    t0 = int(t_us.min())
+    span = int(t_us.max()) - t0 + 1
+    if (int(session[-1]) + 1) * span >= 2 ** 62:
+        raise OverflowError("머리 움직임: 세션 수 × 시간 범위가 int64 범위를 초과")
+    axis = (t_us - t0) + session * span
+    ref = np.searchsorted(axis, axis - int(smooth * 1e6), side="right") - 1
+    ref_c = np.maximum(ref, 0)
+    dt = (t_us - t_us[ref_c]) / 1e6
+    ok = (ref >= np.flatnonzero(start)[session]) & (dt > 0) & (dt <= max_gap)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ok, (values - values[ref_c]) / dt, np.nan)
+
+
+def detect_runs(mask: np.ndarray, codes: np.ndarray, t_us: np.ndarray, min_duration: float,
+                max_gap: float = MAX_SAMPLE_GAP) -> tuple:
+    """mask가 연속으로 참인 구간의 (첫 샘플 위치, 마지막 샘플 위치) 배열.
+
+    세션이 바뀌거나 샘플 간격이 max_gap초를 넘으면 구간을 끊고,
+    지속 시간(마지막 − 첫 샘플 시각)이 min_duration초 미만인 구간은 버린다.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    brk = _session_starts(codes) | (np.diff(t_us, prepend=t_us[0]) > max_gap * 1e6)
+    cont = mask & np.r_[False, mask[:-1]] & ~brk        # 앞 샘플과 같은 구간
+    first = np.flatnonzero(mask & ~cont)
+    last = np.flatnonzero(mask & ~np.r_[cont[1:], False])
+    keep = (t_us[last] - t_us[first]) >= min_duration * 1e6
+    return first[keep], last[keep]
+
+
+# ──────────────────────────────────────────────
+# 4. 훑어보기 / 내려다보기 구간
+# ──────────────────────────────────────────────
+
+def detect_bouts(samples: pd.DataFrame) -> pd.DataFrame:
+    """훑어보기·내려다보기 구간 테이블.
+
+    반환 컬럼: participant_id, condition, kind(scan/glance), start, end, duration_s, n_samples,
+    turn_deg (구간 동안 yaw 순변화), mean_pitch
+    """
+    columns = SESSION_KEYS + ["kind", "start", "end", "duration_s", "n_samples", "turn_deg", "mean_pitch"]
+    if samples.empty:
+        return pd.DataFrame(columns=columns)
+    codes = _session_codes(samples)
+    t = samples["t_us"].to_numpy(dtype=np.int64)
+    pitch = samples["pitch"].to_numpy(dtype=np.float64)
+    yaw = unwrap_yaw(samples["yaw"].to_numpy(), codes)
+    yaw_speed = lagged_rate(codes, t, yaw)
+    pitch_cs = np.r_[0.0, np.cumsum(pitch)]
+
+    parts = []
+    for kind, mask, min_duration in [
+        ("glance", pitch >= GLANCE_PITCH, GLANCE_MIN_DURATION),
+        ("scan", np.abs(np.nan_to_num(yaw_speed)) >= SCAN_YAW_SPEED, SCAN_MIN_DURATION),
+    ]:
+        first, last = detect_runs(mask, codes, t, min_duration)
+        part = samples.iloc[first][SESSION_KEYS].reset_index(drop=True)
+        part["kind"] = kind
+        part["start"] = t[first].astype("datetime64[us]")
+        part["end"] = t[last].astype("datetime64[us]")
+        part["duration_s"] = (t[last] - t[first]) / 1e6
+        part["n_samples"] = last - first + 1
+        part["turn_deg"] = yaw[last] - yaw[first]
+        part["mean_pitch"] = (pitch_cs[last + 1] - pitch_cs[first]) / (last - first + 1)
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)[columns]
+
+
+def session_summary(samples: pd.DataFrame, bouts: pd.DataFrame) -> pd.DataFrame:
+    """세션별 샘플 수, 길이, 분당 내려다보기·훑어보기 횟수, 내려다본 시간 비율."""
+    out = samples.groupby(SESSION_KEYS, sort=True)["t_us"].agg(["size", "min", "max"]).reset_index()
+    out = out.rename(columns={"size": "n_samples"})
+    out["duration_min"] = (out.pop("max") - out.pop("min")) / 60e6
+    stats = bouts.groupby(SESSION_KEYS + ["kind"])["duration_s"].agg(["size", "sum"])
+    for kind in BOUT_KINDS:
+        part = stats.reindex(pd.MultiIndex.from_arrays([out[k] for k in SESSION_KEYS] + [[kind] * len(out)]))
+        out[f"{kind}s"] = part["size"].fillna(0).to_numpy(dtype=np.int64)
+        out[f"{kind}_s"] = part["sum"].fillna(0.0).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for kind in BOUT_KINDS:
+            out[f"{kind}s_per_min"] = np.where(out["duration_min"] > 0, out[f"{kind}s"] / out["duration_min"], np.nan)
+        out["head_down_share"] = np.where(out["duration_min"] > 0,
+                                          out["glance_s"] / (out["duration_min"] * 60), np.nan)
+    return out
+
+
+# ──────────────────────────────────────────────
+# 5. 기준 이벤트(트리거 / Beam Pro 화면) 대비 반응
+# ──────────────────────────────────────────────
+
+def anchor_responses(df: pd.DataFrame, bouts: pd.DataFrame, window: float = RESPONSE_WINDOW) -> pd.DataFrame:
+    """기준 이벤트마다 window초 안의 첫 내려다보기·훑어보기 시작까지 지연 ({kind}_latency_s, 없으면 NaN)."""
+    anchors = tables(df).subset(ANCHOR_EVENTS)[SESSION_KEYS + ["event_type", "timestamp"]].copy()
+    anchors = anchors[anchors["timestamp"].notna()]
+    for col in SESSION_KEYS + ["event_type"]:
+        anchors[col] = anchors[col].astype(str)
+    anchor_t = anchors["timestamp"].to_numpy(dtype="datetime64[us]")
+    for kind in BOUT_KINDS:
+        onsets = bouts[bouts["kind"] == kind].rename(columns={"start": "timestamp"})
+        latency = np.full(len(anchors), np.nan)
+        if len(onsets) and len(anchors):
+            nxt = asof_event(anchors, onsets, "forward", by=SESSION_KEYS, allow_exact_matches=True)
+            hit = nxt.notna().to_numpy()
+            onset_t = onsets["timestamp"].to_numpy(dtype="datetime64[us]")
+            pos = onsets.index.get_indexer(nxt[hit].astype(np.int64))
+            latency[hit] = (onset_t[pos] - anchor_t[hit]) / np.timedelta64(1, "s")
+        anchors[f"{kind}_latency_s"] = np.where(latency <= window, latency, np.nan)
+    return anchors.reset_index(drop=True)
+
+
+def analyze_anchor_responses(responses: pd.DataFrame) -> pd.DataFrame:
+    """조건 × 기준 이벤트 유형별 반응률(창 안에 구간 시작이 있는 비율)과 중앙 지연."""
+    print(f"\n=== 기준 이벤트 후 {RESPONSE_WINDOW:.0f}초 안의 머리 움직임 ===")
+    work = responses.copy()
+    for kind in BOUT_KINDS:
+        work[f"{kind}_rate"] = work[f"{kind}_latency_s"].notna()
+    agg = {"n": ("timestamp", "size")}
+    for kind in BOUT_KINDS:
+        agg[f"{kind}_rate"] = (f"{kind}_rate", "mean")
+        agg[f"{kind}_latency_median_s"] = (f"{kind}_latency_s", "median")
+    summary = work.groupby(["condition", "event_type"], sort=False).agg(**agg).reset_index()
+
+    results = []
+    for cond, label in zip(CONDITIONS, CONDITION_LABELS):
+        for event_type in ANCHOR_EVENTS:
+            row = summary[(summary["condition"] == cond) & (summary["event_type"] == event_type)]
+            if row.empty:
+                continue
+            row = row.iloc[0]
+            print(f"  {label} / {event_type} (n={row['n']}): "
+                  f"내려다보기 {row['glance_rate']:.1%} (중앙 {row['glance_latency_median_s']:.1f}s), "
+                  f"훑어보기 {row['scan_rate']:.1%} (중앙 {row['scan_latency_median_s']:.1f}s)")
+            results.append({
+                "condition": label, "event_type": event_type, "n": int(row["n"]),
+                **{f"{kind}_rate": round(row[f"{kind}_rate"], 3) for kind in BOUT_KINDS},
+                **{f"{kind}_latency_median_s": round(row[f"{kind}_latency_median_s"], 2) for kind in BOUT_KINDS},
+            })
+    return pd.DataFrame(results)
+
+
+def analyze_session_motion(sessions: pd.DataFrame) -> pd.DataFrame:
+    """조건별 분당 내려다보기·훑어보기 횟수와 내려다본 시간 비율 + 대응 비교."""
+    print("\n=== 세션별 머리 움직임 ===")
+    metrics = ["glances_per_min", "scans_per_min", "head_down_share"]
+    for cond, label in zip(CONDITIONS, CONDITION_LABELS):
+        sub = sessions[sessions["condition"] == cond]
+        if sub.empty:
+            continue
+        print(f"  {label} (n={len(sub)}): 내려다보기 {sub['glances_per_min'].mean():.2f}회/분, "
+              f"훑어보기 {sub['scans_per_min'].mean():.2f}회/분, "
+              f"내려다본 시간 {sub['head_down_share'].mean():.1%}")
+    print_paired_tests(paired_tests(sessions, metrics, ["내려다보기 빈도", "훑어보기 빈도", "내려다본 시간 비율"]))
+    return sessions
+
+
+# ──────────────────────────────────────────────
+# 6. 시각화
+# ──────────────────────────────────────────────
+
+@cached_figure("head_motion_response.png")
+def plot_anchor_responses(resp_df: pd.DataFrame):
+    """기준 이벤트 유형별 내려다보기·훑어보기 반응률 그룹 바 차트."""
+    if resp_df.empty:
+        return
+
+    fig, axes = plt.subplots(1, len(BOUT_KINDS), figsize=(12, 5), sharey=True)
+    x = np.arange(len(ANCHOR_EVENTS))
+    width = 0.35
+    titles = {"glance": "내려다보기 (Beam Pro 확인)", "scan": "좌우 훑어보기"}
+
+    for ax, kind in zip(axes, BOUT_KINDS):
+        for i, label in enumerate(CONDITION_LABELS):
+            rates = []
+            for event_type in ANCHOR_EVENTS:
+                row = resp_df[(resp_df["condition"] == label) & (resp_df["event_type"] == event_type)]
+                rates.append(row[f"{kind}_rate"].values[0] * 100 if len(row) > 0 else 0)
+            ax.bar(x + i * width, rates, width, label=label)
+        ax.set_title(titles[kind])
+        ax.set_xticks(x + width / 2)
+        ax.set_xticklabels(ANCHOR_EVENTS)
+        ax.set_ylim(0, 100)
+    axes[0].set_ylabel(f"{RESPONSE_WINDOW:.0f}초 안 반응률 (%)")
+    axes[0].legend()
+    fig.tight_layout()
+    fig.savefig(OUTPUT_DIR / "head_motion_response.png", dpi=150)
+    print(f"  → {OUTPUT_DIR / 'head_motion_response.png'} 저장")
+    plt.close(fig)
+
+
+# ──────────────────────────────────────────────
+# 7. 메인
+# ──────────────────────────────────────────────
+
+def run(df: pd.DataFrame, samples: pd.DataFrame = None):
+    """머리 움직임 분석 전체 실행. samples가 없으면 스트림 / 이벤트 행에서 구성."""
+    if samples is None:
+        samples, n_streams = load_samples(df)
+        print(f"\n머리 자세 샘플 {len(samples):,}개 (스트림 세션 {n_streams}개, 나머지는 이벤트 행)")
+    else:
+        print(f"\n머리 자세 샘플 {len(samples):,}개")
+
+    bouts = detect_bouts(samples)
+    sessions = analyze_session_motion(session_summary(samples, bouts))
+    resp_df = analyze_anchor_responses(anchor_responses(df, bouts))
+
+    print(f"\n=== 시각화 ===")
+    plot_anchor_responses(resp_df)
+
+    for name, result_df in [("head_motion_bouts", bouts),
+                            ("head_motion_sessions", sessions),
+                            ("head_motion_response", resp_df)]:
+        if not result_df.empty:
+            result_df.to_csv(OUTPUT_DIR / f"{name}.csv", index=False)
+            print(f"  → {OUTPUT_DIR / f'{name}.csv'} 저장")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="머리 움직임(훑어보기 / 내려다보기) 분석")
+    parser.add_argument("--demo", action="store_true",
+                        help=f"합성 이벤트 + 합성 {DEMO_RATE:.0f} Hz 스트림 샘플로 실행")
+    figure_cache.add_plot_argument(parser)
+    event_store.add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+    figure_cache.apply_plot_argument(args)
+    event_store.apply_filter_arguments(parser, args)
+
+    print("=" * 60)
+    print("머리 움직임 분석")
+    print("=" * 60)
+
+    if args.demo:
+        df = add_extra_columns(synthetic.generate_events(n_participants=N_PARTICIPANTS, seed=31))
+        print(f"총 이벤트 수: {len(df)}")
+        run(df, demo_samples(df))
+    else:
+        df = load_events()
+        print(f"총 이벤트 수: {len(df)}")
+        run(df)
+
+    print("\n분석 완료.")
+
+
+if __name__ == "__main__":
+    with profiling.session("analyze_head_motion"):
+        main()
@@ -6,17 +6,25 @@
 - 트리거-기기 전환 연관 분석 (Hybrid 조건)
 """
 
+import argparse
 import warnings
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
-from scipy import stats
 
-matplotlib.rcParams["font.family"] = "AppleGothic"
-matplotlib.rcParams["axes.unicode_minus"] = False
+import event_store
+import figure_cache
+import profiling
+import synthetic
+from extra_data import add_extra_columns
+from bootstrap import CI_LEVEL, N_BOOT, bootstrap_ratio
+from event_tables import tables
+from figure_cache import cached_figure
+from lazy_imports import plt
+from intervals import overlap_seconds
+from window_join import asof_event, window_counts, window_pairs
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 # ──────────────────────────────────────────────
@@ -59,20 +67,35 @@ TRIGGER_EXPECTED_CONTENT = {
 # ──────────────────────────────────────────────
 
 def load_events() -> pd.DataFrame:
-    """이벤트 로그 로드 또는 데모 생성."""
-    csv_files = sorted(RAW_DIR.glob("P*_*.csv"))
-    if csv_files:
-        frames = [pd.read_csv(f, parse_dates=["timestamp"]) for f in csv_files]
-        return pd.concat(frames, ignore_index=True)
+    """이벤트 저장소 로드 또는 데모 생성."""
+    df = event_store.load_events(RAW_DIR)
+    if not df.empty:
+        return df
     print("[경고] 이벤트 로그 없음. 데모 데이터 생성.")
-    return generate_demo_data()
+    return add_extra_columns(generate_demo_data())
+
+
+# 기대 콘텐츠 유형 → Beam Pro 이벤트 (기록 순서)
+CONTENT_TYPE_EVENTS = {
+    "map": ["BEAM_MAP_ZOOMED"],
+    "poi_detail": ["BEAM_POI_VIEWED"],
+    "info_card": ["BEAM_INFO_CARD_OPENED", "BEAM_INFO_CARD_CLOSED"],
+}
+
+# 데모 트리거 블록 하나의 이벤트 슬롯 (기록 순서, _CONTENT = 기대 콘텐츠 이벤트 자리)
+_CONTENT = "BEAM_CONTENT"
+DEMO_SLOTS = [
+    "CONFIDENCE_RATED", "TRIGGER_ACTIVATED", "BEAM_SCREEN_ON", _CONTENT, _CONTENT, _CONTENT,
+    "BEAM_SCREEN_OFF", "TRIGGER_DEACTIVATED", "WAYPOINT_SKIPPED", "CONFIDENCE_RATED", "TRIGGER_RESPONSE",
+]
 
 
 def generate_demo_data() -> pd.DataFrame:
-    """트리거 관련 데모 데이터 생성."""
+    """트리거 관련 데모 데이터 생성.
+
+    (세션 × 트리거 블록 × 이벤트 슬롯) 격자를 배열로 만들고 발생 마스크로 걸러 한 번에 구성한다.
+    """
     rng = np.random.default_rng(88)
-    rows = []
-    base_time = pd.Timestamp("2026-03-15T10:00:00")
 
     # 경로별 트리거 배치
     route_triggers = {
@@ -98,97 +121,114 @@ def generate_demo_data() -> pd.DataFrame:
         "hybrid":        {"T1": 0.05, "T2": 0.12, "T3": 0.08, "T4": 0.15},
     }
 
-    for pid in range(1, N_PARTICIPANTS + 1):
-        participant_id = f"P{pid:02d}"
-        # 참가자마다 하나의 경로 배정 (간략화: 순환)
-        route = ["A", "B"][pid % 2]
-
-        for cond in CONDITIONS:
-            t = base_time
-
-            for wp, ttype in route_triggers[route]:
-                # 트리거 전 확신도
-                pre_conf = int(np.clip(round(rng.normal(5.5, 0.8)), 1, 7))
-                t += pd.Timedelta(seconds=rng.integers(60, 120))
-                rows.append(_event(t, participant_id, cond, "CONFIDENCE_RATED",
-                                   _prev_wp(wp), confidence=pre_conf))
-
-                # 트리거 활성화
-                t += pd.Timedelta(seconds=rng.integers(10, 30))
-                rows.append(_event(t, participant_id, cond, "TRIGGER_ACTIVATED", wp,
-                                   trigger_type=ttype))
-
-                # 반응 시간
-                rt = max(1, rng.normal(rt_base[cond][ttype], 1.5))
-
-                # Hybrid: 기기 전환 여부
-                if cond == "hybrid":
-                    switch_prob = {"T1": 0.70, "T2": 0.80, "T3": 0.60, "T4": 0.85}
-                    if rng.random() < switch_prob[ttype]:
-                        t += pd.Timedelta(seconds=rt * 0.3)
-                        rows.append(_event(t, participant_id, cond, "BEAM_SCREEN_ON", wp))
-                        # v2.1: 트리거별 콘텐츠 접근 이벤트 생성
-                        sub_t = t + pd.Timedelta(seconds=rng.uniform(0.5, 1.5))
-                        expected_types = TRIGGER_EXPECTED_CONTENT.get(ttype, ["map"])
-                        for exp_ct in expected_types:
-                            if exp_ct == "map":
-                                rows.append(_event(sub_t, participant_id, cond,
-                                                   "BEAM_MAP_ZOOMED", wp,
-                                                   beam_content_type="map",
-                                                   zoom_level=round(rng.uniform(1.5, 3.0), 1)))
-                            elif exp_ct == "poi_detail":
-                                rows.append(_event(sub_t, participant_id, cond,
-                                                   "BEAM_POI_VIEWED", wp,
-                                                   beam_content_type="poi_detail",
-                                                   poi_id=f"poi_{rng.integers(1, 10):02d}",
-                                                   poi_type="meeting_room",
-                                                   view_duration_s=round(rng.uniform(2, 6), 1)))
-                            elif exp_ct == "info_card":
-                                card_id = f"card_{rng.integers(1, 5):02d}"
-                                rows.append(_event(sub_t, participant_id, cond,
-                                                   "BEAM_INFO_CARD_OPENED", wp,
-                                                   beam_content_type="info_card",
-                                                   card_id=card_id,
-                                                   card_type="sign_card",
-                                                   auto_shown=True))
-                                sub_t += pd.Timedelta(seconds=rng.uniform(1, 4))
-                                rows.append(_event(sub_t, participant_id, cond,
-                                                   "BEAM_INFO_CARD_CLOSED", wp,
-                                                   beam_content_type="info_card",
-                                                   card_id=card_id,
-                                                   view_duration_s=round(rng.uniform(1, 4), 1)))
-                            sub_t += pd.Timedelta(seconds=rng.uniform(0.5, 2))
-                        beam_dur = (sub_t - t).total_seconds() + rng.uniform(0.5, 2)
-                        t = sub_t + pd.Timedelta(seconds=rng.uniform(0.5, 2))
-                        rows.append(_event(t, participant_id, cond, "BEAM_SCREEN_OFF", wp,
-                                           duration_s=round(beam_dur, 1)))
-
-                # 트리거 비활성화
-                t += pd.Timedelta(seconds=rt)
-                rows.append(_event(t, participant_id, cond, "TRIGGER_DEACTIVATED", wp,
-                                   trigger_type=ttype, duration_s=round(rt + rng.uniform(2, 5), 1)))
-
-                # 오방향 선택 여부
-                wrong_dir = rng.random() < wrong_dir_base[cond][ttype]
-                if wrong_dir:
-                    rows.append(_event(t, participant_id, cond, "WAYPOINT_SKIPPED", wp,
-                                       reason="wrong_turn"))
-
-                # 트리거 후 확신도
-                post_conf_val = pre_conf + conf_drop[cond][ttype] + rng.normal(0, 0.5)
-                post_conf = int(np.clip(round(post_conf_val), 1, 7))
-                t += pd.Timedelta(seconds=rng.integers(20, 50))
-                rows.append(_event(t, participant_id, cond, "CONFIDENCE_RATED", wp,
-                                   confidence=post_conf))
-
-                # 반응 시간 기록 이벤트
-                rows.append(_event(t, participant_id, cond, "TRIGGER_RESPONSE", wp,
-                                   trigger_type=ttype, reaction_time_s=round(rt, 1),
-                                   wrong_direction=wrong_dir))
-
-    df = pd.DataFrame(rows)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
-    return df
+    # Hybrid 기기 전환 확률
+    switch_prob = {"T1": 0.70, "T2": 0.80, "T3": 0.60, "T4": 0.85}
+
+    def by_type(table: dict) -> np.ndarray:
+        return np.array([[table[c][tt] for tt in TRIGGER_TYPES] for c in CONDITIONS])
+
+    # 세션 × 트리거 블록 (참가자마다 하나의 경로 배정, 간략화: 순환)
+    pid_idx, cond_idx, session_start = synthetic.session_grid(N_PARTICIPANTS)
+    S, K = len(pid_idx), len(DEMO_SLOTS)
+    route = np.array(["A", "B"])[(pid_idx + 1) % 2]
+    block_type = {r: [TRIGGER_TYPES.index(tt) for _, tt in route_triggers[r]] for r in route_triggers}
+    ttype = np.where((route == "A")[:, None], block_type["A"], block_type["B"])
+    n_blocks = ttype.shape[1]
+    cond = cond_idx[:, None]
+
+    pre_conf = rng.normal(5.5, 0.8, size=(S, n_blocks))
+    rt = np.maximum(1, rng.normal(by_type(rt_base)[cond, ttype], 1.5))
+    switched = (CONDITIONS.index("hybrid") == cond) & (
+        rng.random((S, n_blocks)) < np.array([switch_prob[tt] for tt in TRIGGER_TYPES])[ttype]
+    )
+    wrong_dir = rng.random((S, n_blocks)) < by_type(wrong_dir_base)[cond, ttype]
+    post_conf = np.clip(np.round(pre_conf), 1, 7) + by_type(conf_drop)[cond, ttype] + rng.normal(0, 0.5, size=(S, n_blocks))
+
+    # 트리거 유형별 콘텐츠 슬롯의 이벤트 코드 / 콘텐츠 유형 코드 (빈 슬롯은 -1)
+    event_names = list(dict.fromkeys(
+        [e for e in DEMO_SLOTS if e != _CONTENT] + [e for es in CONTENT_TYPE_EVENTS.values() for e in es]
+    ))
+    content_slots = DEMO_SLOTS.count(_CONTENT)
+    content_event = np.full((len(TRIGGER_TYPES), content_slots), -1)
+    content_type = np.full((len(TRIGGER_TYPES), content_slots), -1)
+    for i, tt in enumerate(TRIGGER_TYPES):
+        sequence = [(e, ct) for ct in TRIGGER_EXPECTED_CONTENT[tt] for e in CONTENT_TYPE_EVENTS[ct]]
+        for j, (e, ct) in enumerate(sequence):
+            content_event[i, j] = event_names.index(e)
+            content_type[i, j] = BEAM_CONTENT_TYPES.index(ct)
+    slot_code = np.array([event_names.index(e) if e != _CONTENT else -1 for e in DEMO_SLOTS])
+
+    # 발생 마스크 / 간격 (세션 × 블록 × 슬롯)
+    slot = np.array(DEMO_SLOTS)
+    is_content = slot == _CONTENT
+    first_content, screen_on = DEMO_SLOTS.index(_CONTENT), DEMO_SLOTS.index("BEAM_SCREEN_ON")
+    mask = np.ones((S, n_blocks, K), dtype=bool)
+    mask[:, :, np.isin(slot, ["BEAM_SCREEN_ON", "BEAM_SCREEN_OFF"])] = switched[:, :, None]
+    mask[:, :, is_content] = switched[:, :, None] & (content_event[ttype] >= 0)
+    mask[:, :, slot == "WAYPOINT_SKIPPED"] = wrong_dir[:, :, None]
+
+    u = rng.random((S, n_blocks, K))
+    gaps = np.zeros((S, n_blocks, K))
+    gaps[:, :, 0] = rng.integers(60, 120, size=(S, n_blocks))         # 트리거 전 확신도
+    gaps[:, :, 1] = rng.integers(10, 30, size=(S, n_blocks))          # 트리거 활성화
+    gaps[:, :, 2] = rt * 0.3                                          # 기기 전환
+    gaps[:, :, 3] = 0.5 + 1.0 * u[:, :, 3]                            # 첫 콘텐츠
+    gaps[:, :, 4] = 0.5 + 1.5 * u[:, :, 4]                            # 다음 콘텐츠
+    gaps[:, :, 5] = 1.0 + 3.0 * u[:, :, 5]                            # 정보 카드 닫힘
+    gaps[:, :, 6] = 1.0 + 1.5 * (u[:, :, 6] + u[:, :, 7])             # 화면 꺼짐
+    gaps[:, :, 7] = rt                                                # 트리거 비활성화
+    gaps[:, :, 9] = rng.integers(20, 50, size=(S, n_blocks))          # 트리거 후 확신도
+    elapsed = synthetic.elapsed_ms(gaps.reshape(S, -1), mask.reshape(S, -1))
+
+    # 발생한 슬롯만 행으로
+    sess, col = np.nonzero(mask.reshape(S, -1))
+    blk, k = col // K, col % K
+    n = len(sess)
+    r_type = ttype[sess, blk]
+    r_content = is_content[k]
+    content_slot = np.clip(k - first_content, 0, content_slots - 1)
+    code = np.where(r_content, content_event[r_type, content_slot], slot_code[k])
+    event_type = pd.Categorical.from_codes(code, event_names)
+
+    card_no = rng.integers(1, 5, size=(S, n_blocks))
+    uniform = rng.random(n)
+    since_on = (elapsed[sess, col] - elapsed[sess, blk * K + screen_on]) / 1000
+    triggers = pd.Categorical.from_codes(r_type, TRIGGER_TYPES)
+    card_ids = pd.Categorical.from_codes(card_no[sess, blk] - 1, [f"card_{i:02d}" for i in range(1, 5)])
+    extra = synthetic.json_extra(event_type, {
+        "TRIGGER_ACTIVATED": [("trigger_type", triggers)],
+        "BEAM_MAP_ZOOMED": [("zoom_level", 1.5 + 1.5 * uniform)],
+        "BEAM_POI_VIEWED": [("poi_id", pd.Categorical.from_codes(rng.integers(0, 9, size=n),
+                                                                 [f"poi_{i:02d}" for i in range(1, 10)])),
+                            ("poi_type", "meeting_room"), ("view_duration_s", 2 + 4 * uniform)],
+        "BEAM_INFO_CARD_OPENED": [("card_id", card_ids), ("card_type", "sign_card"), ("auto_shown", True)],
+        "BEAM_INFO_CARD_CLOSED": [("card_id", card_ids), ("view_duration_s", gaps.reshape(S, -1)[sess, col])],
+        "BEAM_SCREEN_OFF": [("duration_s", since_on)],
+        "TRIGGER_DEACTIVATED": [("trigger_type", triggers), ("duration_s", rt[sess, blk] + 2 + 3 * uniform)],
+        "WAYPOINT_SKIPPED": [("reason", "wrong_turn")],
+        "TRIGGER_RESPONSE": [("trigger_type", triggers), ("reaction_time_s", rt[sess, blk]),
+                             ("wrong_direction", wrong_dir[sess, blk])],
+    })
+
+    # 트리거 전 확신도는 이전 웨이포인트에서 평정
+    trigger_wps = [wp for wp, _ in route_triggers["A"]]
+    wp_names = [w for wp in trigger_wps for w in (_prev_wp(wp), wp)]
+    is_pre = k == 0
+    is_conf = code == event_names.index("CONFIDENCE_RATED")
+
+    return synthetic.events_frame(
+        rng,
+        session_start[sess] + elapsed[sess, col].astype("timedelta64[ms]"),
+        pd.Categorical.from_codes(pid_idx[sess], synthetic.participant_ids(N_PARTICIPANTS)),
+        pd.Categorical.from_codes(cond_idx[sess], CONDITIONS),
+        event_type,
+        waypoint_id=pd.Categorical.from_codes(blk * 2 + (k != 0), wp_names),
+        confidence_rating=synthetic.rating(np.where(is_pre, pre_conf[sess, blk], post_conf[sess, blk]), is_conf),
+        beam_content_type=pd.Categorical.from_codes(
+            np.where(r_content, content_type[r_type, content_slot], -1), BEAM_CONTENT_TYPES
+        ),
+        extra_data=extra,
+    )
 
 
 def _prev_wp(wp: str) -> str:
@@ -197,44 +237,13 @@ def _prev_wp(wp: str) -> str:
     return f"WP{num - 1:02d}" if num > 1 else "WP01"
 
 
-def _event(t, pid, cond, etype, wp, **extra) -> dict:
-    row = {
-        "timestamp": t.isoformat(),
-        "participant_id": pid,
-        "condition": cond,
-        "event_type": etype,
-        "waypoint_id": wp,
-        "head_rotation_x": round(np.random.uniform(-10, 10), 1),
-        "head_rotation_y": round(np.random.uniform(-180, 180), 1),
-        "head_rotation_z": round(np.random.uniform(-5, 5), 1),
-        "device_active": "glass" if cond == "glass_only" else "both",
-        "confidence_rating": extra.get("confidence", ""),
-        "beam_content_type": extra.get("beam_content_type", ""),
-        "extra_data": str({k: v for k, v in extra.items()
-                          if k not in ("confidence", "beam_content_type")}) if extra else "{}",
-    }
-    return row
-
-
-def _parse_extra(extra_str) -> dict:
-    if isinstance(extra_str, str) and extra_str:
-        try:
-            return eval(extra_str)
-        except Exception:
-            return {}
-    return {}
-
-
 # ──────────────────────────────────────────────
 # 3. 트리거 반응시간 분석
 # ──────────────────────────────────────────────
 
 def analyze_trigger_reaction_time(df: pd.DataFrame) -> pd.DataFrame:
     """트리거 유형별, 조건별 반응시간 분석."""
-    tr = df[df["event_type"] == "TRIGGER_RESPONSE"].copy()
-    tr["parsed"] = tr["extra_data"].apply(_parse_extra)
-    tr["trigger_type"] = tr["parsed"].apply(lambda d: d.get("trigger_type", ""))
-    tr["reaction_time_s"] = tr["parsed"].apply(lambda d: d.get("reaction_time_s", np.nan))
+    tr = tables(df).subset("TRIGGER_RESPONSE")
     tr = tr.dropna(subset=["reaction_time_s"])
 
     print("\n=== 트리거 반응시간 분석 ===")
@@ -263,12 +272,16 @@ def analyze_trigger_reaction_time(df: pd.DataFrame) -> pd.DataFrame:
 
 def analyze_trigger_confidence_drop(df: pd.DataFrame) -> pd.DataFrame:
     """트리거 전후 확신도 변화량을 트리거 유형별로 분석."""
-    triggers = df[df["event_type"] == "TRIGGER_ACTIVATED"].copy()
-    triggers["parsed"] = triggers["extra_data"].apply(_parse_extra)
-    triggers["trigger_type"] = triggers["parsed"].apply(lambda d: d.get("trigger_type", ""))
+    t = tables(df)
+    triggers = t.subset("TRIGGER_ACTIVATED").copy()
+    conf_events = t.confidence
 
-    conf_events = df[df["event_type"] == "CONFIDENCE_RATED"].copy()
-    conf_events["confidence_rating"] = pd.to_numeric(conf_events["confidence_rating"], errors="coerce")
+    # 트리거 직전/직후 확신도 (같은 참가자·조건)
+    by = ["participant_id", "condition"]
+    pre_idx = asof_event(triggers, conf_events, "backward", by=by)
+    post_idx = asof_event(triggers, conf_events, "forward", by=by)
+    rating = conf_events["confidence_rating"]
+    triggers["conf_drop"] = rating.reindex(post_idx).to_numpy() - rating.reindex(pre_idx).to_numpy()
 
     print("\n=== 트리거 유형별 확신도 변화 ===")
     results = []
@@ -279,27 +292,9 @@ def analyze_trigger_confidence_drop(df: pd.DataFrame) -> pd.DataFrame:
         print(f"\n  {ttype} ({t_label}):")
         for cond, label in zip(CONDITIONS, CONDITION_LABELS):
             cond_triggers = tt_triggers[tt_triggers["condition"] == cond]
-            drops = []
-
-            for _, trig in cond_triggers.iterrows():
-                pid = trig["participant_id"]
-                trig_time = trig["timestamp"]
+            drops = cond_triggers["conf_drop"].dropna().to_numpy()
 
-                pid_conf = conf_events[
-                    (conf_events["participant_id"] == pid) &
-                    (conf_events["condition"] == cond)
-                ].sort_values("timestamp")
-
-                pre = pid_conf[pid_conf["timestamp"] < trig_time]
-                post = pid_conf[pid_conf["timestamp"] > trig_time]
-
-                if not pre.empty and not post.empty:
-                    pre_val = pre.iloc[-1]["confidence_rating"]
-                    post_val = post.iloc[0]["confidence_rating"]
-                    if not np.isnan(pre_val) and not np.isnan(post_val):
-                        drops.append(post_val - pre_val)
-
-            if drops:
+            if len(drops) > 0:
                 m = np.mean(drops)
                 sd = np.std(drops)
                 print(f"    {label}: Δ확신도 = {m:+.2f} (SD={sd:.2f}, n={len(drops)})")
@@ -318,10 +313,8 @@ def analyze_trigger_confidence_drop(df: pd.DataFrame) -> pd.DataFrame:
 
 def analyze_wrong_direction(df: pd.DataFrame) -> pd.DataFrame:
     """트리거 유형별 오방향 선택률 분석."""
-    tr = df[df["event_type"] == "TRIGGER_RESPONSE"].copy()
-    tr["parsed"] = tr["extra_data"].apply(_parse_extra)
-    tr["trigger_type"] = tr["parsed"].apply(lambda d: d.get("trigger_type", ""))
-    tr["wrong_direction"] = tr["parsed"].apply(lambda d: d.get("wrong_direction", False))
+    tr = tables(df).subset("TRIGGER_RESPONSE").copy()
+    tr["wrong_direction"] = tr["wrong_direction"].fillna(False)
 
     print("\n=== 오방향 선택률 분석 ===")
     results = []
@@ -346,61 +339,69 @@ def analyze_wrong_direction(df: pd.DataFrame) -> pd.DataFrame:
 # 6. Hybrid 조건 트리거-기기전환 연관 분석
 # ──────────────────────────────────────────────
 
+def trigger_switches(df: pd.DataFrame) -> pd.DataFrame:
+    """Hybrid 조건 트리거 이벤트 + 30초 이내 Beam Pro 전환 여부(switched)."""
+    t = tables(df)
+    triggers = t.subset("TRIGGER_ACTIVATED", "hybrid").copy()
+    beam_ons = t.subset("BEAM_SCREEN_ON", "hybrid")
+    triggers["switched"] = window_counts(triggers, beam_ons, after=30) > 0
+    return triggers
+
+
+def trigger_switch_ci(triggers: pd.DataFrame, n_boot: int = N_BOOT, ci: float = CI_LEVEL,
+                      seed: int = 0) -> pd.DataFrame:
+    """트리거 유형별 전환율(Σ전환 / Σ트리거)의 참가자 단위 부트스트랩 신뢰구간."""
+    grouped = triggers.groupby(["participant_id", "trigger_type"], observed=True)["switched"]
+    switched = grouped.sum().unstack("trigger_type").reindex(columns=TRIGGER_TYPES).fillna(0)
+    total = grouped.size().unstack("trigger_type").reindex(columns=TRIGGER_TYPES).fillna(0)
+    return bootstrap_ratio(switched.to_numpy(), total.to_numpy(),
+                           [f"switch_rate[{t}]" for t in TRIGGER_TYPES], n_boot, ci, seed)
+
+
 def analyze_trigger_switching(df: pd.DataFrame) -> pd.DataFrame:
     """트리거 유형별 Beam Pro 전환 확률 (Hybrid 조건)."""
-    hybrid = df[df["condition"] == "hybrid"]
-    triggers = hybrid[hybrid["event_type"] == "TRIGGER_ACTIVATED"].copy()
-    triggers["parsed"] = triggers["extra_data"].apply(_parse_extra)
-    triggers["trigger_type"] = triggers["parsed"].apply(lambda d: d.get("trigger_type", ""))
-    beam_ons = hybrid[hybrid["event_type"] == "BEAM_SCREEN_ON"]
+    t = tables(df)
+    # 트리거 후 30초 이내 Beam Pro 전환 여부
+    triggers = trigger_switches(df)
+    rate_ci = trigger_switch_ci(triggers)
+    # 트리거 구간(ACTIVATED → DEACTIVATED)과 Beam Pro 사용 구간의 겹침(초)
+    trigger_spans = t.trigger_spans[t.trigger_spans["condition"] == "hybrid"].copy()
+    trigger_spans["beam_s"] = overlap_seconds(trigger_spans, t.beam_spans[t.beam_spans["condition"] == "hybrid"])
 
     print("\n=== 트리거-기기전환 연관 (Hybrid) ===")
     results = []
-    for ttype in TRIGGER_TYPES:
+    for ttype, (_, ci_row) in zip(TRIGGER_TYPES, rate_ci.iterrows()):
         tt_triggers = triggers[triggers["trigger_type"] == ttype]
-        switch_count = 0
-        total = 0
-
-        for _, trig in tt_triggers.iterrows():
-            pid = trig["participant_id"]
-            trig_time = trig["timestamp"]
-            total += 1
-
-            pid_beams = beam_ons[beam_ons["participant_id"] == pid]
-            post_beams = pid_beams[
-                (pid_beams["timestamp"] > trig_time) &
-                (pid_beams["timestamp"] < trig_time + pd.Timedelta(seconds=30))
-            ]
-            if len(post_beams) > 0:
-                switch_count += 1
+        switch_count = int(tt_triggers["switched"].sum())
+        total = len(tt_triggers)
 
         rate = switch_count / total if total > 0 else 0
         t_label = TRIGGER_LABELS.get(ttype, ttype)
-        print(f"  {ttype} ({t_label}): 전환율 = {rate:.1%} ({switch_count}/{total})")
+        ci_text = f", {CI_LEVEL:.0%} CI [{ci_row['ci_low']:.1%}, {ci_row['ci_high']:.1%}]" if total > 0 else ""
+        print(f"  {ttype} ({t_label}): 전환율 = {rate:.1%} ({switch_count}/{total}){ci_text}")
+        tt_spans = trigger_spans[trigger_spans["trigger_type"] == ttype]
+        beam_s = tt_spans["beam_s"].mean() if len(tt_spans) else 0.0
+        span_s = tt_spans["duration_s"].sum()
+        beam_share = tt_spans["beam_s"].sum() / span_s if span_s > 0 else 0.0
+        if len(tt_spans):
+            print(f"    트리거 구간 중 Beam Pro 사용: 평균 {beam_s:.1f}s ({beam_share:.1%})")
         results.append({
             "trigger_type": ttype, "trigger_label": t_label,
             "switch_rate": round(rate, 3), "n": total,
+            "ci_low": round(ci_row["ci_low"], 3), "ci_high": round(ci_row["ci_high"], 3),
+            "beam_on_s": round(beam_s, 2), "beam_share": round(beam_share, 3),
         })
 
     # v2.1: 트리거별 콘텐츠 접근 유형 분석
-    content_events = hybrid[hybrid["event_type"].isin(BEAM_CONTENT_EVENTS)]
+    content_events = t.subset(BEAM_CONTENT_EVENTS, "hybrid")
     if not content_events.empty and "beam_content_type" in content_events.columns:
         print(f"\n  [트리거별 콘텐츠 접근 유형 (v2.1)]")
+        pairs = window_pairs(triggers, content_events, after=30)
+        pairs["trigger_type"] = triggers.loc[pairs["anchor"], "trigger_type"].to_numpy()
+        pairs["content_type"] = content_events.loc[pairs["event"], "beam_content_type"].to_numpy()
         for ttype in TRIGGER_TYPES:
-            tt_triggers = triggers[triggers["trigger_type"] == ttype]
-            ct_counts = {ct: 0 for ct in BEAM_CONTENT_TYPES}
-
-            for _, trig in tt_triggers.iterrows():
-                pid = trig["participant_id"]
-                trig_time = trig["timestamp"]
-                post_content = content_events[
-                    (content_events["participant_id"] == pid) &
-                    (content_events["timestamp"] > trig_time) &
-                    (content_events["timestamp"] < trig_time + pd.Timedelta(seconds=30))
-                ]
-                for ct in post_content["beam_content_type"].dropna():
-                    if ct in ct_counts:
-                        ct_counts[ct] += 1
+            tt_counts = pairs.loc[pairs["trigger_type"] == ttype, "content_type"].value_counts()
+            ct_counts = {ct: int(tt_counts.get(ct, 0)) for ct in BEAM_CONTENT_TYPES}
 
             t_label = TRIGGER_LABELS.get(ttype, ttype)
             top_ct = max(ct_counts, key=ct_counts.get) if any(ct_counts.values()) else "none"
@@ -414,6 +415,7 @@ def analyze_trigger_switching(df: pd.DataFrame) -> pd.DataFrame:
 # 7. 시각화
 # ──────────────────────────────────────────────
 
+@cached_figure("trigger_reaction_time.png")
 def plot_reaction_time_by_trigger(rt_df: pd.DataFrame):
     """트리거 유형별 반응시간 그룹 바 차트."""
     if rt_df.empty:
@@ -442,6 +444,7 @@ def plot_reaction_time_by_trigger(rt_df: pd.DataFrame):
     plt.close(fig)
 
 
+@cached_figure("trigger_confidence_heatmap.png")
 def plot_confidence_drop_by_trigger(drop_df: pd.DataFrame):
     """트리거 유형별 확신도 변화량 히트맵."""
     if drop_df.empty:
@@ -477,6 +480,7 @@ def plot_confidence_drop_by_trigger(drop_df: pd.DataFrame):
     plt.close(fig)
 
 
+@cached_figure("trigger_switch_rate.png")
 def plot_trigger_switch_rate(switch_df: pd.DataFrame):
     """트리거 유형별 Hybrid 기기 전환율 바 차트."""
     if switch_df.empty:
@@ -510,14 +514,8 @@ def plot_trigger_switch_rate(switch_df: pd.DataFrame):
 # 8. 메인
 # ──────────────────────────────────────────────
 
-def main():
-    print("=" * 60)
-    print("트리거 반응 분석 (v2.1)")
-    print("=" * 60)
-
-    df = load_events()
-    print(f"총 이벤트 수: {len(df)}")
-
+def run(df: pd.DataFrame):
+    """트리거 분석 전체 실행 (분석 → 시각화 → CSV 저장)."""
     # 분석
     rt_df = analyze_trigger_reaction_time(df)
     drop_df = analyze_trigger_confidence_drop(df)
@@ -539,8 +537,27 @@ def main():
             result_df.to_csv(OUTPUT_DIR / f"{name}.csv", index=False)
             print(f"  → {OUTPUT_DIR / f'{name}.csv'} 저장")
 
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="트리거 반응 분석 (v2.1)")
+    figure_cache.add_plot_argument(parser)
+    event_store.add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+    figure_cache.apply_plot_argument(args)
+    event_store.apply_filter_arguments(parser, args)
+
+    print("=" * 60)
+    print("트리거 반응 분석 (v2.1)")
+    print("=" * 60)
+
+    df = load_events()
+    print(f"총 이벤트 수: {len(df)}")
+
+    run(df)
+
     print("\n분석 완료.")
 
 
 if __name__ == "__main__":
-    main()
+    with profiling.session("analyze_triggers"):
+        main()
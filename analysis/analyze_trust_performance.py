@@ -7,18 +7,24 @@
 - 통계: Paired t-test / Wilcoxon signed-rank
 """
 
+import argparse
 import os
 import warnings
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
-from scipy import stats
 
-matplotlib.rcParams["font.family"] = "AppleGothic"
-matplotlib.rcParams["axes.unicode_minus"] = False
+import event_store
+import figure_cache
+import profiling
+from bootstrap import CI_LEVEL, N_BOOT, add_contrasts, bootstrap_means, participant_matrix, print_ci
+from event_tables import tables
+from figure_cache import cached_figure
+from lazy_imports import plt
+from grouped_corr import corr, grouped_corr
+from paired_stats import paired_tests, print_paired_test, print_paired_tests
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 # ──────────────────────────────────────────────
@@ -37,6 +43,7 @@ TRIGGER_WAYPOINTS = ["WP03", "WP06"]
 WAYPOINTS = [f"WP{i:02d}" for i in range(1, 9)]
 N_PARTICIPANTS = 24
 TRIGGER_TYPES = ["T1", "T2", "T3", "T4"]
+CALIBRATION_CI_COLUMNS = [f"calibration_r[{c}]" for c in CONDITIONS] + ["calibration_r[hybrid − glass_only]"]
 
 BEAM_CONTENT_EVENTS = [
     "BEAM_TAB_SWITCH", "BEAM_POI_VIEWED", "BEAM_INFO_CARD_OPENED",
@@ -53,6 +60,25 @@ TLX_LABELS_KR = [
     "수행", "노력", "좌절",
 ]
 
+# 데모 데이터 효과 가정 (power.py 검정력 모의실험도 같은 값을 사용)
+DEMO_TLX_MEANS = {
+    "glass_only":  {"mental_demand": 12, "physical_demand": 5, "temporal_demand": 9,
+                    "performance": 8, "effort": 11, "frustration": 9},
+    "hybrid":      {"mental_demand": 10, "physical_demand": 6, "temporal_demand": 8,
+                    "performance": 5, "effort": 9, "frustration": 6},
+}
+DEMO_TLX_SD = 3
+DEMO_TRUST_MEANS = {"glass_only": 4.2, "hybrid": 5.5}
+DEMO_TRUST_SD = 0.9
+N_TRUST_ITEMS = 7
+DEMO_CONFIDENCE_BASE = {
+    "glass_only":    [5.2, 5.5, 3.2, 4.5, 4.8, 3.0, 4.8, 5.0],
+    "hybrid":        [5.8, 6.0, 4.8, 5.5, 5.7, 4.5, 5.7, 5.9],
+}
+DEMO_CONFIDENCE_SD = 0.7
+DEMO_ACCURACY = {"glass_only": 0.60, "hybrid": 0.88}
+MISSION_WAYPOINTS = ["WP02", "WP03", "WP05", "WP06", "WP08"]
+
 
 # ──────────────────────────────────────────────
 # 2. 데이터 로드 / 데모 생성
@@ -62,25 +88,19 @@ def load_nasa_tlx() -> pd.DataFrame:
     """NASA-TLX 설문 데이터 로드 또는 데모 생성."""
     path = SURVEY_DIR / "nasa_tlx.csv"
     if path.exists():
-        return pd.read_csv(path)
+        return event_store.filter_rows(pd.read_csv(path), event_store.key_filter())
     print(f"[경고] {path} 없음. 데모 데이터 생성.")
-    return _generate_demo_tlx()
+    return event_store.filter_rows(_generate_demo_tlx(), event_store.key_filter())
 
 
 def _generate_demo_tlx() -> pd.DataFrame:
     rng = np.random.default_rng(42)
     rows = []
-    means = {
-        "glass_only":  {"mental_demand": 12, "physical_demand": 5, "temporal_demand": 9,
-                        "performance": 8, "effort": 11, "frustration": 9},
-        "hybrid":      {"mental_demand": 10, "physical_demand": 6, "temporal_demand": 8,
-                        "performance": 5, "effort": 9, "frustration": 6},
-    }
     for pid in range(1, N_PARTICIPANTS + 1):
         for cond in CONDITIONS:
             row = {"participant_id": f"P{pid:02d}", "condition": cond}
             for sub in TLX_SUBSCALES:
-                val = rng.normal(means[cond][sub], 3)
+                val = rng.normal(DEMO_TLX_MEANS[cond][sub], DEMO_TLX_SD)
                 row[sub] = int(np.clip(round(val), 0, 21))
             rows.append(row)
     return pd.DataFrame(rows)
@@ -90,37 +110,35 @@ def load_trust_scale() -> pd.DataFrame:
     """시스템 신뢰 척도 데이터 로드 또는 데모 생성."""
     path = SURVEY_DIR / "trust_scale.csv"
     if path.exists():
-        return pd.read_csv(path)
+        return event_store.filter_rows(pd.read_csv(path), event_store.key_filter())
     print(f"[경고] {path} 없음. 데모 데이터 생성.")
-    return _generate_demo_trust()
+    return event_store.filter_rows(_generate_demo_trust(), event_store.key_filter())
 
 
 def _generate_demo_trust() -> pd.DataFrame:
     rng = np.random.default_rng(123)
     rows = []
-    trust_means = {"glass_only": 4.2, "hybrid": 5.5}
     for pid in range(1, N_PARTICIPANTS + 1):
         for cond in CONDITIONS:
             row = {"participant_id": f"P{pid:02d}", "condition": cond}
-            for q in range(1, 8):
-                val = rng.normal(trust_means[cond], 0.9)
+            for q in range(1, N_TRUST_ITEMS + 1):
+                val = rng.normal(DEMO_TRUST_MEANS[cond], DEMO_TRUST_SD)
                 row[f"trust_q{q}"] = int(np.clip(round(val), 1, 7))
-            row["trust_mean"] = round(np.mean([row[f"trust_q{q}"] for q in range(1, 8)]), 2)
+            row["trust_mean"] = round(np.mean([row[f"trust_q{q}"] for q in range(1, N_TRUST_ITEMS + 1)]), 2)
             rows.append(row)
     return pd.DataFrame(rows)
 
 
-def load_confidence_from_events() -> pd.DataFrame:
+def load_events() -> pd.DataFrame:
+    """이벤트 저장소 로드. 이벤트 로그가 없으면 None."""
+    df = event_store.load_events(RAW_DIR)
+    return None if df.empty else df
+
+
+def load_confidence_from_events(all_events: pd.DataFrame = None) -> pd.DataFrame:
     """이벤트 로그에서 확신도 데이터 추출 또는 데모 생성."""
-    csv_files = sorted(RAW_DIR.glob("P*_*.csv"))
-    if csv_files:
-        frames = []
-        for f in csv_files:
-            df = pd.read_csv(f, parse_dates=["timestamp"])
-            frames.append(df)
-        all_events = pd.concat(frames, ignore_index=True)
-        conf = all_events[all_events["event_type"] == "CONFIDENCE_RATED"].copy()
-        conf["confidence_rating"] = pd.to_numeric(conf["confidence_rating"], errors="coerce")
+    if all_events is not None:
+        conf = tables(all_events).confidence
         return conf[["participant_id", "condition", "waypoint_id", "confidence_rating"]].dropna()
     print(f"[경고] 이벤트 로그 없음. 데모 확신도 데이터 생성.")
     return _generate_demo_confidence()
@@ -129,14 +147,10 @@ def load_confidence_from_events() -> pd.DataFrame:
 def _generate_demo_confidence() -> pd.DataFrame:
     rng = np.random.default_rng(77)
     rows = []
-    base_conf = {
-        "glass_only":    [5.2, 5.5, 3.2, 4.5, 4.8, 3.0, 4.8, 5.0],
-        "hybrid":        [5.8, 6.0, 4.8, 5.5, 5.7, 4.5, 5.7, 5.9],
-    }
     for pid in range(1, N_PARTICIPANTS + 1):
         for cond in CONDITIONS:
             for i, wp in enumerate(WAYPOINTS):
-                val = rng.normal(base_conf[cond][i], 0.7)
+                val = rng.normal(DEMO_CONFIDENCE_BASE[cond][i], DEMO_CONFIDENCE_SD)
                 rows.append({
                     "participant_id": f"P{pid:02d}",
                     "condition": cond,
@@ -153,14 +167,16 @@ def _generate_demo_confidence() -> pd.DataFrame:
 def analyze_nasa_tlx(tlx_df: pd.DataFrame):
     """NASA-TLX 하위척도별 조건 간 비교."""
     print("\n=== NASA-TLX 하위척도별 분석 ===")
+    # 6개 하위척도를 한 번의 피벗 / 일괄 검정으로 계산
+    tests = paired_tests(tlx_df, TLX_SUBSCALES, TLX_LABELS_KR)
     results = []
-    for sub, label in zip(TLX_SUBSCALES, TLX_LABELS_KR):
+    for sub, label, (_, test) in zip(TLX_SUBSCALES, TLX_LABELS_KR, tests.iterrows()):
         print(f"\n  [{label}]")
         for cond, clabel in zip(CONDITIONS, CONDITION_LABELS):
             vals = tlx_df[tlx_df["condition"] == cond][sub]
             print(f"    {clabel}: M={vals.mean():.1f}, SD={vals.std():.1f}")
 
-        _run_paired_test(tlx_df, sub, label)
+        print_paired_test(test)
 
         results.append({
             "subscale": label,
@@ -195,7 +211,7 @@ def analyze_confidence_trajectory(conf_df: pd.DataFrame):
     """확신도 변화 궤적 분석 — 트리거 전후 비교."""
     print("\n=== 확신도 궤적 분석 ===")
 
-    pivot = conf_df.groupby(["condition", "waypoint_id"])["confidence_rating"].mean().reset_index()
+    pivot = conf_df.groupby(["condition", "waypoint_id"], observed=True)["confidence_rating"].mean().reset_index()
     print("\n  조건별 웨이포인트 평균 확신도:")
     for cond, label in zip(CONDITIONS, CONDITION_LABELS):
         subset = pivot[pivot["condition"] == cond].sort_values("waypoint_id")
@@ -220,94 +236,101 @@ def analyze_confidence_trajectory(conf_df: pd.DataFrame):
 # 5b. 확신도-정확도 보정(Calibration) 분석 — v2
 # ──────────────────────────────────────────────
 
-def analyze_calibration(conf_df: pd.DataFrame, events_df: pd.DataFrame = None):
-    """확신도-정확도 상관(calibration index) 분석."""
-    print("\n=== 확신도-정확도 보정(Calibration) 분석 ===")
+def mission_accuracy(events_df: pd.DataFrame) -> pd.DataFrame:
+    """MISSION_COMPLETE 이벤트의 참가자 × 조건 × 웨이포인트별 정답 여부."""
+    mc = tables(events_df).mission_completes
+    return mc[["participant_id", "condition", "waypoint_id", "correct"]].dropna()
 
-    if events_df is not None and "MISSION_COMPLETE" in events_df["event_type"].values:
-        mc = events_df[events_df["event_type"] == "MISSION_COMPLETE"].copy()
-
-        def extract_correct(extra):
-            if isinstance(extra, str):
-                try:
-                    d = eval(extra) if extra else {}
-                except Exception:
-                    d = {}
-            else:
-                d = {}
-            return d.get("correct", None)
-
-        mc["correct"] = mc["extra_data"].apply(extract_correct)
-        acc_df = mc[["participant_id", "condition", "waypoint_id", "correct"]].dropna()
-    else:
-        rng = np.random.default_rng(99)
-        acc_rows = []
-        acc_base = {"glass_only": 0.60, "hybrid": 0.88}
-        mission_wps = ["WP02", "WP03", "WP05", "WP06", "WP08"]
-        for pid in range(1, N_PARTICIPANTS + 1):
-            for cond in CONDITIONS:
-                for wp in mission_wps:
-                    correct = rng.random() < acc_base[cond]
-                    acc_rows.append({
-                        "participant_id": f"P{pid:02d}",
-                        "condition": cond,
-                        "waypoint_id": wp,
-                        "correct": correct,
-                    })
-        acc_df = pd.DataFrame(acc_rows)
 
+def _generate_demo_accuracy() -> pd.DataFrame:
+    rng = np.random.default_rng(99)
+    acc_rows = []
+    for pid in range(1, N_PARTICIPANTS + 1):
+        for cond in CONDITIONS:
+            for wp in MISSION_WAYPOINTS:
+                correct = rng.random() < DEMO_ACCURACY[cond]
+                acc_rows.append({
+                    "participant_id": f"P{pid:02d}",
+                    "condition": cond,
+                    "waypoint_id": wp,
+                    "correct": correct,
+                })
+    return pd.DataFrame(acc_rows)
+
+
+def calibration_index(conf_df: pd.DataFrame, acc_df: pd.DataFrame) -> pd.DataFrame:
+    """참가자 × 조건별 확신도-정확도 point-biserial 상관 (미션 3개 이상, 정오 모두 있을 때).
+
+    모든 집단을 grouped_corr 한 번으로 계산. r을 정의할 수 없는 집단은 NaN이고 calibration_status에
+    사유(too_few: 미션 3개 미만, constant_x: 정오가 한쪽뿐, constant_y: 확신도가 모두 같음)를 남긴다.
+    """
     merged = conf_df.merge(acc_df, on=["participant_id", "condition", "waypoint_id"], how="inner")
     if merged.empty:
-        print("  [경고] 확신도-정확도 결합 데이터 없음")
         return pd.DataFrame()
 
     merged["correct_num"] = merged["correct"].astype(int)
+    cal = grouped_corr(merged, "correct_num", "confidence_rating", by=["participant_id", "condition"])
+    return pd.DataFrame({
+        "participant_id": cal["participant_id"],
+        "condition": cal["condition"],
+        "calibration_r": cal["r"].round(3),
+        "calibration_p": cal["p"].round(4),
+        "n_missions": cal["n"],
+        "calibration_status": cal["status"],
+    })
 
-    cal_results = []
-    for (pid, cond), grp in merged.groupby(["participant_id", "condition"]):
-        if len(grp) >= 3 and grp["correct_num"].std() > 0:
-            r, p = stats.pointbiserialr(grp["correct_num"], grp["confidence_rating"])
-            cal_results.append({
-                "participant_id": pid,
-                "condition": cond,
-                "calibration_r": round(r, 3),
-                "calibration_p": round(p, 4),
-                "n_missions": len(grp),
-            })
-        else:
-            cal_results.append({
-                "participant_id": pid,
-                "condition": cond,
-                "calibration_r": np.nan,
-                "calibration_p": np.nan,
-                "n_missions": len(grp),
-            })
 
-    cal_df = pd.DataFrame(cal_results)
+def calibration_matrix(cal_df: pd.DataFrame) -> pd.DataFrame:
+    """참가자 × (조건별 calibration r, 조건 간 대응 차이) 행렬."""
+    if cal_df.empty:
+        return pd.DataFrame(columns=CALIBRATION_CI_COLUMNS, dtype=float)
+    wide = participant_matrix(cal_df, ["calibration_r"], by="condition")
+    wide = wide.reindex(columns=CALIBRATION_CI_COLUMNS[:2])
+    return add_contrasts(wide, {CALIBRATION_CI_COLUMNS[2]: tuple(reversed(CALIBRATION_CI_COLUMNS[:2]))})
+
+
+def calibration_ci(cal_df: pd.DataFrame, n_boot: int = N_BOOT, ci: float = CI_LEVEL,
+                   seed: int = 0) -> pd.DataFrame:
+    """조건별 평균 calibration r과 조건 간 차이의 참가자 단위 부트스트랩 신뢰구간."""
+    return bootstrap_means(calibration_matrix(cal_df), n_boot, ci, seed)
+
+
+def analyze_calibration(conf_df: pd.DataFrame, events_df: pd.DataFrame = None):
+    """확신도-정확도 상관(calibration index) 분석."""
+    print("\n=== 확신도-정확도 보정(Calibration) 분석 ===")
+
+    if events_df is not None and not tables(events_df).mission_completes.empty:
+        acc_df = mission_accuracy(events_df)
+    else:
+        acc_df = _generate_demo_accuracy()
+
+    cal_df = calibration_index(conf_df, acc_df)
+    if cal_df.empty:
+        print("  [경고] 확신도-정확도 결합 데이터 없음")
+        return pd.DataFrame()
 
     for cond, label in zip(CONDITIONS, CONDITION_LABELS):
         subset = cal_df[cal_df["condition"] == cond]["calibration_r"].dropna()
         if len(subset) > 0:
             print(f"  {label}: 평균 calibration r = {subset.mean():.3f} (SD={subset.std():.3f})")
 
+    print(f"  [부트스트랩 {CI_LEVEL:.0%} CI] 참가자 평균")
+    print_ci(calibration_ci(cal_df), digits=3)
+
     cal_valid = cal_df.dropna(subset=["calibration_r"])
     if len(cal_valid) >= N_PARTICIPANTS:
         _run_paired_test(cal_valid, "calibration_r", "Calibration Index")
 
     # v2.1: 정보 접근량과 calibration index 상관
     if events_df is not None and "beam_content_type" in events_df.columns:
-        content_events = events_df[
-            (events_df["condition"] == "hybrid") &
-            (events_df["event_type"].isin(BEAM_CONTENT_EVENTS))
-        ]
+        content_events = tables(events_df).subset(BEAM_CONTENT_EVENTS, "hybrid")
         if not content_events.empty:
-            content_counts = content_events.groupby("participant_id").size().reset_index(name="content_access_count")
+            content_counts = content_events.groupby("participant_id", observed=True).size().reset_index(name="content_access_count")
             hybrid_cal = cal_df[cal_df["condition"] == "hybrid"].copy()
             merged_cal = hybrid_cal.merge(content_counts, on="participant_id", how="left")
             merged_cal["content_access_count"] = merged_cal["content_access_count"].fillna(0)
-            valid = merged_cal.dropna(subset=["calibration_r"])
-            if len(valid) >= 5:
-                r, p = stats.pearsonr(valid["content_access_count"], valid["calibration_r"])
+            r, p, n = corr(merged_cal, "content_access_count", "calibration_r")
+            if n >= 5:
                 print(f"\n  [v2.1] 정보 접근량-Calibration 상관: r={r:.3f}, p={p:.4f}")
 
     return cal_df
@@ -326,19 +349,8 @@ def analyze_trigger_type_effects(events_df: pd.DataFrame = None):
             print(f"  {tt}: 확신도 변화 = {drop:+.1f}, 반응시간 = {rt:.1f}s")
         return
 
-    triggers = events_df[events_df["event_type"] == "TRIGGER_ACTIVATED"].copy()
-
-    def extract_trigger_type(extra):
-        if isinstance(extra, str):
-            try:
-                d = eval(extra) if extra else {}
-            except Exception:
-                d = {}
-        else:
-            d = {}
-        return d.get("trigger_type", "unknown")
-
-    triggers["trigger_type"] = triggers["extra_data"].apply(extract_trigger_type)
+    triggers = tables(events_df).subset("TRIGGER_ACTIVATED").copy()
+    triggers["trigger_type"] = triggers["trigger_type"].astype(object).fillna("unknown")
 
     for tt in TRIGGER_TYPES:
         tt_events = triggers[triggers["trigger_type"] == tt]
@@ -372,11 +384,8 @@ def analyze_information_load_tlx(tlx_df: pd.DataFrame, events_df: pd.DataFrame =
             "content_access_count": rng.integers(3, 25, size=N_PARTICIPANTS),
         })
     else:
-        content_events = events_df[
-            (events_df["condition"] == "hybrid") &
-            (events_df["event_type"].isin(BEAM_CONTENT_EVENTS))
-        ]
-        content_counts = content_events.groupby("participant_id").size().reset_index(
+        content_events = tables(events_df).subset(BEAM_CONTENT_EVENTS, "hybrid")
+        content_counts = content_events.groupby("participant_id", observed=True).size().reset_index(
             name="content_access_count"
         )
 
@@ -396,17 +405,19 @@ def analyze_information_load_tlx(tlx_df: pd.DataFrame, events_df: pd.DataFrame =
     if available_subs:
         merged["tlx_total"] = merged[available_subs].mean(axis=1)
 
-        r, p = stats.pearsonr(merged["content_access_count"], merged["tlx_total"])
-        print(f"  정보 접근량 vs TLX 총점: r={r:.3f}, p={p:.4f}")
+        # 총점과 하위척도 상관을 한 번에 계산
+        tlx_corr = grouped_corr(merged, "content_access_count", ["tlx_total"] + available_subs).set_index("y")
+        total = tlx_corr.loc["tlx_total"]
+        print(f"  정보 접근량 vs TLX 총점: r={total['r']:.3f}, p={total['p']:.4f}")
 
         # 하위척도별 상관
         print(f"  [하위척도별 상관]")
         for sub, label in zip(available_subs,
                               ["정신적 요구", "신체적 요구", "시간적 압박",
                                "수행", "노력", "좌절"][:len(available_subs)]):
-            r_sub, p_sub = stats.pearsonr(merged["content_access_count"], merged[sub])
-            sig = "*" if p_sub < 0.05 else ""
-            print(f"    {label}: r={r_sub:.3f}, p={p_sub:.4f} {sig}")
+            row = tlx_corr.loc[sub]
+            sig = "*" if row["p"] < 0.05 else ""
+            print(f"    {label}: r={row['r']:.3f}, p={row['p']:.4f} {sig}")
 
 
 # ──────────────────────────────────────────────
@@ -414,34 +425,15 @@ def analyze_information_load_tlx(tlx_df: pd.DataFrame, events_df: pd.DataFrame =
 # ──────────────────────────────────────────────
 
 def _run_paired_test(data: pd.DataFrame, dv: str, label: str):
-    """2조건 Paired t-test (pingouin) 또는 Wilcoxon signed-rank (fallback)."""
-    try:
-        import pingouin as pg
-        test = pg.pairwise_tests(
-            data=data, dv=dv, within="condition", subject="participant_id",
-            parametric=True
-        )
-        if not test.empty:
-            row = test.iloc[0]
-            print(f"    Paired t-test ({label}): t={row['T']:.2f}, p={row['p-unc']:.4f}, "
-                  f"d={row['hedges']:.2f}")
-    except ImportError:
-        glass_vals = data[data["condition"] == "glass_only"][dv].dropna().values
-        hybrid_vals = data[data["condition"] == "hybrid"][dv].dropna().values
-        min_len = min(len(glass_vals), len(hybrid_vals))
-        if min_len > 0:
-            t_stat, t_p = stats.ttest_rel(glass_vals[:min_len], hybrid_vals[:min_len])
-            print(f"    Paired t-test ({label}): t={t_stat:.2f}, p={t_p:.4f}")
-            w_stat, w_p = stats.wilcoxon(glass_vals[:min_len], hybrid_vals[:min_len])
-            print(f"    Wilcoxon ({label}): W={w_stat:.1f}, p={w_p:.4f}")
-        else:
-            print(f"    [경고] {label}: 데이터 부족, 검정 불가")
+    """2조건 대응 비교 (Paired t-test, Wilcoxon, Hedges' g, 순열검정) — paired_stats 일괄 엔진 사용."""
+    print_paired_tests(paired_tests(data, [dv], [label]))
 
 
 # ──────────────────────────────────────────────
 # 7. 시각화
 # ──────────────────────────────────────────────
 
+@cached_figure("nasa_tlx_comparison.png")
 def plot_tlx_comparison(tlx_df: pd.DataFrame):
     """NASA-TLX 하위척도별 조건 비교 그룹 바 차트."""
     fig, ax = plt.subplots(figsize=(12, 6))
@@ -467,6 +459,7 @@ def plot_tlx_comparison(tlx_df: pd.DataFrame):
     plt.close(fig)
 
 
+@cached_figure("trust_comparison.png")
 def plot_trust_comparison(trust_df: pd.DataFrame):
     """시스템 신뢰 척도 조건별 비교 boxplot."""
     fig, ax = plt.subplots(figsize=(7, 5))
@@ -481,6 +474,7 @@ def plot_trust_comparison(trust_df: pd.DataFrame):
     plt.close(fig)
 
 
+@cached_figure("confidence_trajectory.png")
 def plot_confidence_trajectory(pivot: pd.DataFrame):
     """확신도 변화 궤적 라인 차트."""
     fig, ax = plt.subplots(figsize=(10, 6))
@@ -508,6 +502,7 @@ def plot_confidence_trajectory(pivot: pd.DataFrame):
     plt.close(fig)
 
 
+@cached_figure("confidence_drop.png")
 def plot_confidence_drop(conf_df: pd.DataFrame):
     """트리거 지점 전후 확신도 변화량 비교."""
     fig, axes = plt.subplots(1, 2, figsize=(10, 5))
@@ -537,15 +532,12 @@ def plot_confidence_drop(conf_df: pd.DataFrame):
 # 8. 메인
 # ──────────────────────────────────────────────
 
-def main():
-    print("=" * 60)
-    print("신뢰 및 수행 분석")
-    print("=" * 60)
-
+def run(events_df: pd.DataFrame = None):
+    """설문·확신도 분석 전체 실행. events_df가 None이면 확신도/미션 데이터는 데모로 대체."""
     # 데이터 로드
     tlx_df = load_nasa_tlx()
     trust_df = load_trust_scale()
-    conf_df = load_confidence_from_events()
+    conf_df = load_confidence_from_events(events_df)
 
     print(f"NASA-TLX: {len(tlx_df)} rows ({tlx_df['participant_id'].nunique()} 참가자)")
     print(f"신뢰 척도: {len(trust_df)} rows ({trust_df['participant_id'].nunique()} 참가자)")
@@ -556,13 +548,6 @@ def main():
     analyze_trust(trust_df)
     pivot = analyze_confidence_trajectory(conf_df)
 
-    # 이벤트 데이터 로드 (v2.1 콘텐츠 분석용)
-    csv_files = sorted(RAW_DIR.glob("P*_*.csv"))
-    events_df = None
-    if csv_files:
-        frames = [pd.read_csv(f, parse_dates=["timestamp"]) for f in csv_files]
-        events_df = pd.concat(frames, ignore_index=True)
-
     # v2: calibration 분석
     cal_df = analyze_calibration(conf_df, events_df)
     analyze_trigger_type_effects(events_df)
@@ -589,8 +574,24 @@ def main():
         cal_df.to_csv(OUTPUT_DIR / "calibration_summary.csv", index=False)
         print(f"  → {OUTPUT_DIR / 'calibration_summary.csv'} 저장")
 
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="신뢰 및 수행 분석")
+    figure_cache.add_plot_argument(parser)
+    event_store.add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+    figure_cache.apply_plot_argument(args)
+    event_store.apply_filter_arguments(parser, args)
+
+    print("=" * 60)
+    print("신뢰 및 수행 분석")
+    print("=" * 60)
+
+    run(load_events())
+
     print("\n분석 완료.")
 
 
 if __name__ == "__main__":
-    main()
+    with profiling.session("analyze_trust_performance"):
+        main()
@@ -4,20 +4,28 @@
 - 검증 행동 분류 (proactive vs reactive)
 - 미션별 소요시간 분석
 - 난이도 평정 분석
-- 통계: Paired t-test / Wilcoxon signed-rank
+- 통계: Paired t-test / Wilcoxon signed-rank / 순열검정 (paired_stats)
 """
 
+import argparse
 import warnings
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
-from scipy import stats
 
-matplotlib.rcParams["font.family"] = "AppleGothic"
-matplotlib.rcParams["axes.unicode_minus"] = False
+import event_store
+import figure_cache
+import profiling
+import synthetic
+from extra_data import add_extra_columns
+from event_tables import tables
+from figure_cache import cached_figure
+from lazy_imports import plt
+from intervals import span_index
+from paired_stats import paired_tests, print_paired_tests
+from window_join import window_counts
+
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 # ──────────────────────────────────────────────
@@ -46,22 +54,26 @@ N_PARTICIPANTS = 24
 # ──────────────────────────────────────────────
 
 def load_events() -> pd.DataFrame:
-    """이벤트 로그 로드 또는 데모 생성."""
-    csv_files = sorted(RAW_DIR.glob("P*_*.csv"))
-    if csv_files:
-        frames = [pd.read_csv(f, parse_dates=["timestamp"]) for f in csv_files]
-        return pd.concat(frames, ignore_index=True)
+    """이벤트 저장소 로드 또는 데모 생성."""
+    df = event_store.load_events(RAW_DIR)
+    if not df.empty:
+        return df
     print("[경고] 이벤트 로그 없음. 데모 데이터 생성.")
-    return generate_demo_data()
+    return add_extra_columns(generate_demo_data())
+
+
+# 데모 미션 하나의 이벤트 슬롯 (기록 순서)
+DEMO_SLOTS = ["MISSION_START", "BEAM_SCREEN_ON", "VERIFICATION_ANSWERED", "MISSION_COMPLETE", "DIFFICULTY_RATED"]
 
 
 def generate_demo_data() -> pd.DataFrame:
-    """미션 관련 데모 데이터 생성."""
+    """미션 관련 데모 데이터 생성.
+
+    (세션 × 미션 × 이벤트 슬롯) 격자를 배열로 만들고 발생 마스크로 걸러 한 번에 구성한다.
+    """
     rng = np.random.default_rng(42)
-    rows = []
     missions = ["A1", "B1", "A2", "B2", "C1"]
     mission_end_wps = {"A1": "WP02", "B1": "WP03", "A2": "WP05", "B2": "WP06", "C1": "WP08"}
-    base_time = pd.Timestamp("2026-03-15T10:00:00")
 
     acc_base = {
         "glass_only":    {"A": 0.70, "B": 0.50, "C": 0.55},
@@ -75,103 +87,63 @@ def generate_demo_data() -> pd.DataFrame:
         "glass_only":    {"A": 3.5, "B": 5.2, "C": 5.0},
         "hybrid":        {"A": 2.5, "B": 3.5, "C": 3.2},
     }
+    ref_prob = {"A": 0.5, "B": 0.7, "C": 0.6}
 
-    for pid in range(1, N_PARTICIPANTS + 1):
-        participant_id = f"P{pid:02d}"
-        for cond in CONDITIONS:
-            t = base_time
-            for m_id in missions:
-                m_type = MISSION_TYPES[m_id]
-                wp = mission_end_wps[m_id]
-
-                # MISSION_START
-                rows.append({
-                    "timestamp": t.isoformat(),
-                    "participant_id": participant_id,
-                    "condition": cond,
-                    "event_type": "MISSION_START",
-                    "waypoint_id": wp,
-                    "extra_data": str({"mission_id": m_id, "type": m_type}),
-                })
-
-                dur = max(30, rng.normal(dur_base[cond][m_type], 20))
-                t += pd.Timedelta(seconds=dur)
-
-                # Hybrid: Beam Pro 참조 여부
-                beam_referenced = False
-                if cond == "hybrid":
-                    ref_prob = 0.5 if m_type == "A" else (0.7 if m_type == "B" else 0.6)
-                    beam_referenced = rng.random() < ref_prob
-                    if beam_referenced:
-                        ref_time = t - pd.Timedelta(seconds=rng.uniform(5, 30))
-                        rows.append({
-                            "timestamp": ref_time.isoformat(),
-                            "participant_id": participant_id,
-                            "condition": cond,
-                            "event_type": "BEAM_SCREEN_ON",
-                            "waypoint_id": wp,
-                            "extra_data": "{}",
-                        })
-
-                # VERIFICATION_ANSWERED
-                correct = rng.random() < acc_base[cond][m_type]
-                rt = max(1, rng.normal(5, 2))
-                rows.append({
-                    "timestamp": t.isoformat(),
-                    "participant_id": participant_id,
-                    "condition": cond,
-                    "event_type": "VERIFICATION_ANSWERED",
-                    "waypoint_id": wp,
-                    "extra_data": str({
-                        "mission_id": m_id, "correct": correct,
-                        "rt_s": round(rt, 1),
-                    }),
-                })
-
-                # MISSION_COMPLETE
-                rows.append({
-                    "timestamp": t.isoformat(),
-                    "participant_id": participant_id,
-                    "condition": cond,
-                    "event_type": "MISSION_COMPLETE",
-                    "waypoint_id": wp,
-                    "extra_data": str({
-                        "mission_id": m_id, "correct": correct,
-                        "duration_s": round(dur, 1),
-                    }),
-                })
-
-                # DIFFICULTY_RATED
-                diff = int(np.clip(round(rng.normal(diff_base[cond][m_type], 1)), 1, 7))
-                rows.append({
-                    "timestamp": t.isoformat(),
-                    "participant_id": participant_id,
-                    "condition": cond,
-                    "event_type": "DIFFICULTY_RATED",
-                    "waypoint_id": wp,
-                    "extra_data": str({"mission_id": m_id, "rating": diff}),
-                })
+    def by_mission(table: dict) -> np.ndarray:
+        return np.array([[table[c][MISSION_TYPES[m]] for m in missions] for c in CONDITIONS])
 
-                t += pd.Timedelta(seconds=rng.integers(5, 15))
+    pid_idx, cond_idx, session_start = synthetic.session_grid(N_PARTICIPANTS)
+    S, M, K = len(pid_idx), len(missions), len(DEMO_SLOTS)
+    cond = cond_idx[:, None]
 
-    df = pd.DataFrame(rows)
-    for col in ["head_rotation_x", "head_rotation_y", "head_rotation_z",
-                 "device_active", "confidence_rating", "mission_id",
-                 "difficulty_rating", "verification_correct"]:
-        if col not in df.columns:
-            df[col] = ""
-    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
-    return df
-
-
-def _parse_extra(extra_str) -> dict:
-    """extra_data 문자열을 딕셔너리로 파싱."""
-    if isinstance(extra_str, str) and extra_str:
-        try:
-            return eval(extra_str)
-        except Exception:
-            return {}
-    return {}
+    # 세션 × 미션 단위 값
+    dur = np.maximum(30, rng.normal(by_mission(dur_base)[cond_idx], 20))
+    referenced = (CONDITIONS.index("hybrid") == cond) & (
+        rng.random((S, M)) < np.array([ref_prob[MISSION_TYPES[m]] for m in missions])
+    )
+    ref_before = rng.uniform(5, 30, size=(S, M))      # Beam Pro 참조: 검증 응답 5–30초 전
+    correct = rng.random((S, M)) < by_mission(acc_base)[cond_idx]
+    rt = np.maximum(1, rng.normal(5, 2, size=(S, M)))
+    difficulty = rng.normal(by_mission(diff_base)[cond_idx], 1)
+
+    # 발생 마스크 / 간격 (세션 × 미션 × 슬롯)
+    mask = np.ones((S, M, K), dtype=bool)
+    mask[:, :, DEMO_SLOTS.index("BEAM_SCREEN_ON")] = referenced
+    gaps = np.zeros((S, M, K))
+    gaps[:, 1:, 0] = rng.integers(5, 15, size=(S, M - 1))     # 미션 간 이동
+    gaps[:, :, 1] = dur - ref_before
+    gaps[:, :, 2] = np.where(referenced, ref_before, dur)
+    elapsed = synthetic.elapsed_ms(gaps.reshape(S, -1), mask.reshape(S, -1))
+
+    # 발생한 슬롯만 행으로
+    sess, col = np.nonzero(mask.reshape(S, -1))
+    m, k = col // K, col % K
+    event_type = pd.Categorical.from_codes(k, DEMO_SLOTS)
+    mission_ids = pd.Categorical.from_codes(m, missions)
+    r_correct = correct[sess, m]
+    duration = (elapsed[sess, col] - elapsed[sess, m * K]) / 1000
+    extra = synthetic.json_extra(event_type, {
+        "MISSION_START": [("mission_id", mission_ids),
+                          ("type", pd.Categorical([MISSION_TYPES[x] for x in missions])[m])],
+        "VERIFICATION_ANSWERED": [("mission_id", mission_ids), ("correct", r_correct), ("rt_s", rt[sess, m])],
+        "MISSION_COMPLETE": [("mission_id", mission_ids), ("correct", r_correct), ("duration_s", duration)],
+        "DIFFICULTY_RATED": [("mission_id", mission_ids),
+                             ("rating", np.clip(np.round(difficulty[sess, m]), 1, 7).astype(np.int64))],
+    })
+
+    is_verification = k == DEMO_SLOTS.index("VERIFICATION_ANSWERED")
+    return synthetic.events_frame(
+        rng,
+        session_start[sess] + elapsed[sess, col].astype("timedelta64[ms]"),
+        pd.Categorical.from_codes(pid_idx[sess], synthetic.participant_ids(N_PARTICIPANTS)),
+        pd.Categorical.from_codes(cond_idx[sess], CONDITIONS),
+        event_type,
+        waypoint_id=pd.Categorical([mission_end_wps[x] for x in missions])[m],
+        mission_id=mission_ids,
+        difficulty_rating=synthetic.rating(difficulty[sess, m], k == DEMO_SLOTS.index("DIFFICULTY_RATED")),
+        verification_correct=pd.Categorical.from_codes(np.where(is_verification, r_correct, -1), ["false", "true"]),
+        extra_data=extra,
+    )
 
 
 # ──────────────────────────────────────────────
@@ -180,10 +152,7 @@ def _parse_extra(extra_str) -> dict:
 
 def analyze_mission_accuracy(df: pd.DataFrame) -> pd.DataFrame:
     """조건별, 미션 타입별 정확도 분석."""
-    mc = df[df["event_type"] == "MISSION_COMPLETE"].copy()
-    mc["parsed"] = mc["extra_data"].apply(_parse_extra)
-    mc["mission_id"] = mc["parsed"].apply(lambda d: d.get("mission_id", ""))
-    mc["correct"] = mc["parsed"].apply(lambda d: d.get("correct", None))
+    mc = tables(df).subset("MISSION_COMPLETE").copy()
     mc["mission_type"] = mc["mission_id"].map(MISSION_TYPES)
     mc = mc.dropna(subset=["correct"])
     mc["correct_num"] = mc["correct"].astype(int)
@@ -215,7 +184,7 @@ def analyze_mission_accuracy(df: pd.DataFrame) -> pd.DataFrame:
                 })
 
     # 참가자별 정확도 (조건 간 비교용)
-    pid_acc = mc.groupby(["participant_id", "condition"])["correct_num"].mean().reset_index(
+    pid_acc = mc.groupby(["participant_id", "condition"], observed=True)["correct_num"].mean().reset_index(
         name="accuracy"
     )
 
@@ -228,86 +197,93 @@ def analyze_mission_accuracy(df: pd.DataFrame) -> pd.DataFrame:
 # 4. 검증 행동 분류
 # ──────────────────────────────────────────────
 
+def mission_episodes(df: pd.DataFrame, condition: str = "hybrid") -> pd.DataFrame:
+    """참가자 × mission_id 별 미션 에피소드 (MISSION_START → 첫 VERIFICATION_ANSWERED, 없으면 MISSION_COMPLETE).
+
+    반환 컬럼: participant_id, condition, mission_id, start, end, correct (참가자 → 시작 시각 순, 행 위치 = 에피소드 번호).
+    """
+    t = tables(df)
+    keys = ["participant_id", "condition", "mission_id"]
+    columns = keys + ["start", "end", "correct"]
+    if "mission_id" not in df.columns:
+        return pd.DataFrame(columns=columns)
+
+    def first(event_type: str, prefix: str) -> pd.DataFrame:
+        # 참가자 × 미션별 첫 이벤트 (기록 순서 기준)
+        rows = t.subset(event_type, condition).dropna(subset=["mission_id"]).drop_duplicates(keys)
+        out = rows[keys].copy()
+        out[f"{prefix}_time"] = rows["timestamp"]
+        out[f"{prefix}_correct"] = rows["correct"] if "correct" in rows.columns else np.nan
+        return out
+
+    ep = (first("MISSION_START", "start")
+          .merge(first("VERIFICATION_ANSWERED", "v"), on=keys, how="left")
+          .merge(first("MISSION_COMPLETE", "c"), on=keys, how="left"))
+    ep["start"] = pd.to_datetime(ep["start_time"])
+    ep["end"] = pd.to_datetime(ep["v_time"].fillna(ep["c_time"]))
+    ep["correct"] = ep["v_correct"].astype(object).where(ep["v_time"].notna(), ep["c_correct"].astype(object))
+    ep = ep[ep["end"].notna() & (ep["end"] >= ep["start"])]
+    return ep.sort_values(["participant_id", "start"], kind="stable")[columns].reset_index(drop=True)
+
+
 def analyze_verification_behavior(df: pd.DataFrame) -> pd.DataFrame:
-    """Hybrid 조건에서 검증 행동을 proactive/reactive로 분류."""
-    hybrid = df[df["condition"] == "hybrid"]
-    missions = hybrid[hybrid["event_type"] == "MISSION_START"].copy()
-    verifications = hybrid[hybrid["event_type"] == "VERIFICATION_ANSWERED"].copy()
-    beam_ons = hybrid[hybrid["event_type"] == "BEAM_SCREEN_ON"].copy()
+    """Hybrid 조건에서 검증 행동을 proactive/reactive로 분류.
+
+    미션 에피소드 표를 만든 뒤 Beam Pro 전환·콘텐츠 이벤트를 정렬 한 번으로 에피소드에 태깅하고,
+    에피소드별 집계(첫 참조 시각, 콘텐츠 유형 집합)로 분류한다.
+    """
+    t = tables(df)
+    episodes = mission_episodes(df)
 
-    if missions.empty or verifications.empty:
+    if episodes.empty:
         print("\n=== 검증 행동 분류 (Hybrid) ===")
         print("  [경고] 데이터 부족")
         return pd.DataFrame()
 
-    missions["parsed"] = missions["extra_data"].apply(_parse_extra)
-    missions["mission_id"] = missions["parsed"].apply(lambda d: d.get("mission_id", ""))
-    verifications["parsed"] = verifications["extra_data"].apply(_parse_extra)
-    verifications["mission_id"] = verifications["parsed"].apply(lambda d: d.get("mission_id", ""))
-    verifications["correct"] = verifications["parsed"].apply(lambda d: d.get("correct", None))
-
-    behaviors = []
-    for pid in hybrid["participant_id"].unique():
-        pid_missions = missions[missions["participant_id"] == pid]
-        pid_verif = verifications[verifications["participant_id"] == pid]
-        pid_beams = beam_ons[beam_ons["participant_id"] == pid]
-
-        for _, m_row in pid_missions.iterrows():
-            m_id = m_row["mission_id"]
-            m_start = m_row["timestamp"]
-
-            v_match = pid_verif[pid_verif["mission_id"] == m_id]
-            if v_match.empty:
-                continue
-            v_row = v_match.iloc[0]
-            m_end = v_row["timestamp"]
-
-            refs = pid_beams[(pid_beams["timestamp"] >= m_start) & (pid_beams["timestamp"] <= m_end)]
-
-            # v2.1: 콘텐츠 기반 검증 행동 분류
-            pid_content = hybrid[
-                (hybrid["participant_id"] == pid) &
-                (hybrid["event_type"].isin(BEAM_CONTENT_EVENTS)) &
-                (hybrid["timestamp"] >= m_start) &
-                (hybrid["timestamp"] <= m_end)
-            ]
-            content_types = pid_content["beam_content_type"].unique().tolist() if (
-                "beam_content_type" in pid_content.columns and not pid_content.empty
-            ) else []
-
-            if len(refs) == 0 and len(pid_content) == 0:
-                behavior = "none"
-            else:
-                first_ref_time = refs["timestamp"].min() if len(refs) > 0 else (
-                    pid_content["timestamp"].min() if not pid_content.empty else m_end
-                )
-                mission_duration = (m_end - m_start).total_seconds()
-                ref_timing = (first_ref_time - m_start).total_seconds()
-                is_early = (ref_timing / mission_duration < 0.4) if mission_duration > 0 else False
-
-                if is_early:
-                    if "poi_detail" in content_types or "info_card" in content_types:
-                        behavior = "proactive_poi"
-                    else:
-                        behavior = "proactive_map"
-                else:
-                    if "comparison" in content_types:
-                        behavior = "reactive_comparison"
-                    elif "info_card" in content_types or "poi_detail" in content_types:
-                        behavior = "reactive_info_card"
-                    else:
-                        behavior = "reactive_info_card"  # default reactive with beam reference
-
-            behaviors.append({
-                "participant_id": pid,
-                "mission_id": m_id,
-                "mission_type": MISSION_TYPES.get(m_id, ""),
-                "behavior": behavior,
-                "correct": v_row["correct"],
-                "beam_ref_count": len(refs),
-            })
+    events = t.subset(["BEAM_SCREEN_ON"] + BEAM_CONTENT_EVENTS, "hybrid")
+    ep_idx = span_index(events, episodes)
+    tagged = events[ep_idx >= 0].assign(episode=ep_idx[ep_idx >= 0])
+    is_ref = (tagged["event_type"] == "BEAM_SCREEN_ON").to_numpy()
+    refs, content = tagged[is_ref], tagged[~is_ref]
+    n_ep = np.arange(len(episodes))
+
+    ref_count = refs.groupby("episode").size().reindex(n_ep, fill_value=0).to_numpy()
+    content_count = content.groupby("episode").size().reindex(n_ep, fill_value=0).to_numpy()
+    first_ref = refs.groupby("episode")["timestamp"].min().reindex(n_ep)
+    first_content = content.groupby("episode")["timestamp"].min().reindex(n_ep)
+    first_time = first_ref.fillna(first_content).to_numpy()
+
+    # v2.1: 에피소드별 콘텐츠 유형 집합
+    if "beam_content_type" in content.columns and not content.empty:
+        typed = content.dropna(subset=["beam_content_type"])
+        type_sets = typed.groupby("episode")["beam_content_type"].agg(
+            lambda x: "|".join(sorted(set(x.astype(str))))
+        ).reindex(n_ep, fill_value="")
+    else:
+        type_sets = pd.Series("", index=n_ep)
+    has = {ct: type_sets.str.contains(ct, regex=False).to_numpy() for ct in ["poi_detail", "info_card", "comparison"]}
+
+    duration = (episodes["end"] - episodes["start"]).dt.total_seconds().to_numpy()
+    ref_timing = (pd.Series(first_time) - episodes["start"]).dt.total_seconds().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        is_early = (duration > 0) & (ref_timing / duration < 0.4)
+    info = has["poi_detail"] | has["info_card"]
+    # 비교 화면 외의 reactive 참조는 모두 reactive_info_card로 분류
+    behavior = np.select(
+        [(ref_count == 0) & (content_count == 0), is_early & info, is_early, has["comparison"]],
+        ["none", "proactive_poi", "proactive_map", "reactive_comparison"],
+        default="reactive_info_card",
+    )
 
-    beh_df = pd.DataFrame(behaviors)
+    beh_df = pd.DataFrame({
+        "participant_id": episodes["participant_id"],
+        "mission_id": episodes["mission_id"],
+        "mission_type": episodes["mission_id"].astype(object).map(MISSION_TYPES).fillna(""),
+        "behavior": behavior,
+        "correct": episodes["correct"],
+        "beam_ref_count": ref_count,
+        "content_types": type_sets.to_numpy(),
+    })
 
     print("\n=== 검증 행동 분류 (Hybrid 조건) ===")
     behavior_types = ["proactive_poi", "proactive_map", "reactive_info_card",
@@ -335,10 +311,7 @@ def analyze_verification_behavior(df: pd.DataFrame) -> pd.DataFrame:
 
 def analyze_mission_duration(df: pd.DataFrame) -> pd.DataFrame:
     """조건별, 미션 타입별 소요시간 분석."""
-    mc = df[df["event_type"] == "MISSION_COMPLETE"].copy()
-    mc["parsed"] = mc["extra_data"].apply(_parse_extra)
-    mc["mission_id"] = mc["parsed"].apply(lambda d: d.get("mission_id", ""))
-    mc["duration_s"] = mc["parsed"].apply(lambda d: d.get("duration_s", np.nan))
+    mc = tables(df).subset("MISSION_COMPLETE").copy()
     mc["mission_type"] = mc["mission_id"].map(MISSION_TYPES)
     mc = mc.dropna(subset=["duration_s"])
 
@@ -366,10 +339,7 @@ def analyze_mission_duration(df: pd.DataFrame) -> pd.DataFrame:
 
 def analyze_difficulty_ratings(df: pd.DataFrame) -> pd.DataFrame:
     """조건별, 미션 타입별 주관적 난이도 분석."""
-    dr = df[df["event_type"] == "DIFFICULTY_RATED"].copy()
-    dr["parsed"] = dr["extra_data"].apply(_parse_extra)
-    dr["mission_id"] = dr["parsed"].apply(lambda d: d.get("mission_id", ""))
-    dr["rating"] = dr["parsed"].apply(lambda d: d.get("rating", np.nan))
+    dr = tables(df).subset("DIFFICULTY_RATED").copy()
     dr["mission_type"] = dr["mission_id"].map(MISSION_TYPES)
     dr = dr.dropna(subset=["rating"])
 
@@ -383,7 +353,7 @@ def analyze_difficulty_ratings(df: pd.DataFrame) -> pd.DataFrame:
             print(f"  {label}: M={m:.1f}, SD={sd:.1f}")
             results.append({"condition": label, "mean_difficulty": round(m, 1), "sd": round(sd, 1)})
 
-    pid_diff = dr.groupby(["participant_id", "condition"])["rating"].mean().reset_index()
+    pid_diff = dr.groupby(["participant_id", "condition"], observed=True)["rating"].mean().reset_index()
     _run_paired_test(pid_diff, "rating", "주관적 난이도")
 
     return pd.DataFrame(results)
@@ -395,18 +365,15 @@ def analyze_difficulty_ratings(df: pd.DataFrame) -> pd.DataFrame:
 
 def analyze_content_accuracy_correlation(df: pd.DataFrame) -> pd.DataFrame:
     """콘텐츠 유형별 열람과 미션 정확도 간 상관 분석 (v2.1)."""
-    hybrid = df[df["condition"] == "hybrid"]
-    mc = hybrid[hybrid["event_type"] == "MISSION_COMPLETE"].copy()
-    content_events = hybrid[hybrid["event_type"].isin(BEAM_CONTENT_EVENTS)]
+    t = tables(df)
+    mc = t.subset("MISSION_COMPLETE", "hybrid").copy()
+    content_events = t.subset(BEAM_CONTENT_EVENTS, "hybrid")
 
     if mc.empty or content_events.empty:
         print("\n=== 콘텐츠-정확도 상관 분석 (v2.1) ===")
         print("  [경고] 데이터 부족")
         return pd.DataFrame()
 
-    mc["parsed"] = mc["extra_data"].apply(_parse_extra)
-    mc["mission_id"] = mc["parsed"].apply(lambda d: d.get("mission_id", ""))
-    mc["correct"] = mc["parsed"].apply(lambda d: d.get("correct", None))
     mc = mc.dropna(subset=["correct"])
     mc["correct_num"] = mc["correct"].astype(int)
 
@@ -419,22 +386,12 @@ def analyze_content_accuracy_correlation(df: pd.DataFrame) -> pd.DataFrame:
             content_events.get("beam_content_type", pd.Series()) == ct
         ] if "beam_content_type" in content_events.columns else pd.DataFrame()
 
-        # 각 미션에서 해당 콘텐츠를 열람했는지 여부
-        mission_ct_access = []
-        for _, m_row in mc.iterrows():
-            pid = m_row["participant_id"]
-            mc_time = m_row["timestamp"]
-            accessed = len(ct_events_filtered[
-                (ct_events_filtered["participant_id"] == pid) &
-                (ct_events_filtered["timestamp"] < mc_time) &
-                (ct_events_filtered["timestamp"] > mc_time - pd.Timedelta(seconds=120))
-            ]) > 0
-            mission_ct_access.append({
-                "accessed": accessed,
-                "correct": m_row["correct_num"],
-            })
-
-        access_df = pd.DataFrame(mission_ct_access)
+        # 각 미션에서 해당 콘텐츠를 열람했는지 여부 (미션 완료 전 120초 이내)
+        if ct_events_filtered.empty:
+            accessed = np.zeros(len(mc), dtype=bool)
+        else:
+            accessed = window_counts(mc, ct_events_filtered, before=120) > 0
+        access_df = pd.DataFrame({"accessed": accessed, "correct": mc["correct_num"].to_numpy()})
         if not access_df.empty and access_df["accessed"].sum() > 0:
             acc_with = access_df[access_df["accessed"]]["correct"].mean()
             acc_without = access_df[~access_df["accessed"]]["correct"].mean()
@@ -457,34 +414,15 @@ def analyze_content_accuracy_correlation(df: pd.DataFrame) -> pd.DataFrame:
 # ──────────────────────────────────────────────
 
 def _run_paired_test(data: pd.DataFrame, dv: str, label: str):
-    """2조건 Paired t-test (pingouin) 또는 Wilcoxon signed-rank (fallback)."""
-    try:
-        import pingouin as pg
-        test = pg.pairwise_tests(
-            data=data, dv=dv, within="condition", subject="participant_id",
-            parametric=True
-        )
-        if not test.empty:
-            row = test.iloc[0]
-            print(f"    Paired t-test ({label}): t={row['T']:.2f}, p={row['p-unc']:.4f}, "
-                  f"d={row['hedges']:.2f}")
-    except ImportError:
-        glass_vals = data[data["condition"] == "glass_only"][dv].dropna().values
-        hybrid_vals = data[data["condition"] == "hybrid"][dv].dropna().values
-        min_len = min(len(glass_vals), len(hybrid_vals))
-        if min_len > 0:
-            t_stat, t_p = stats.ttest_rel(glass_vals[:min_len], hybrid_vals[:min_len])
-            print(f"    Paired t-test ({label}): t={t_stat:.2f}, p={t_p:.4f}")
-            w_stat, w_p = stats.wilcoxon(glass_vals[:min_len], hybrid_vals[:min_len])
-            print(f"    Wilcoxon ({label}): W={w_stat:.1f}, p={w_p:.4f}")
-        else:
-            print(f"    [경고] {label}: 데이터 부족, 검정 불가")
+    """2조건 대응 비교 (Paired t-test, Wilcoxon, Hedges' g, 순열검정) — paired_stats 일괄 엔진 사용."""
+    print_paired_tests(paired_tests(data, [dv], [label]))
 
 
 # ──────────────────────────────────────────────
 # 8. 시각화
 # ──────────────────────────────────────────────
 
+@cached_figure("mission_accuracy_by_type.png", ignore=("df",))
 def plot_accuracy_by_type(df: pd.DataFrame, type_results: pd.DataFrame):
     """미션 타입별 정확도 그룹 바 차트."""
     if type_results.empty:
@@ -516,6 +454,7 @@ def plot_accuracy_by_type(df: pd.DataFrame, type_results: pd.DataFrame):
     plt.close(fig)
 
 
+@cached_figure("verification_behavior.png")
 def plot_behavior_distribution(beh_df: pd.DataFrame):
     """검증 행동 유형 분포 파이 차트."""
     if beh_df.empty:
@@ -547,14 +486,8 @@ def plot_behavior_distribution(beh_df: pd.DataFrame):
 # 9. 메인
 # ──────────────────────────────────────────────
 
-def main():
-    print("=" * 60)
-    print("미션 정확도 및 검증 행동 분석 (v2.1)")
-    print("=" * 60)
-
-    df = load_events()
-    print(f"총 이벤트 수: {len(df)}")
-
+def run(df: pd.DataFrame):
+    """미션 정확도·검증 행동 분석 전체 실행 (분석 → 시각화 → CSV 저장)."""
     # 분석
     type_results = analyze_mission_accuracy(df)
     beh_df = analyze_verification_behavior(df)
@@ -584,8 +517,27 @@ def main():
         content_corr.to_csv(OUTPUT_DIR / "content_accuracy_correlation.csv", index=False)
         print(f"  → {OUTPUT_DIR / 'content_accuracy_correlation.csv'} 저장")
 
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="미션 정확도 및 검증 행동 분석 (v2.1)")
+    figure_cache.add_plot_argument(parser)
+    event_store.add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+    figure_cache.apply_plot_argument(args)
+    event_store.apply_filter_arguments(parser, args)
+
+    print("=" * 60)
+    print("미션 정확도 및 검증 행동 분석 (v2.1)")
+    print("=" * 60)
+
+    df = load_events()
+    print(f"총 이벤트 수: {len(df)}")
+
+    run(df)
+
     print("\n분석 완료.")
 
 
 if __name__ == "__main__":
-    main()
+    with profiling.session("analyze_verification"):
+        main()
@@ -0,0 +1,375 @@
+"""
+분석 파이프라인 벤치마크
+- synthetic.py 합성 로그로 참가자 규모별(기본 24 / 240 / 2,400 / 24,000명) 단계별 소요 시간 측정
+- 단계: 합성 생성 → 원본 CSV 기록 → 저장소 변환(ingest) → 로드 → extra_data 디코딩
+        → 이벤트 유형·조건 마스크 → 시간 창 조인 → 참가자 지표·대응 비교 → 분할 스트리밍 지표
+        → 시각화 → 시각화(그림 캐시 적중)
+        → 전체 분석 그룹(run_analyses)
+- 규모마다 새 프로세스에서 실행하고 단계마다 최대 메모리(peak RSS)를 초기화하여 측정
+  (Linux /proc/self/clear_refs; 그 외 OS는 프로세스 누적 최대값)
+- 결과: analysis/output/benchmark_results.json (wall/CPU 시간, 처리량 rows/s, peak RSS)
+- 주요 스크립트의 import(시작) 시간과 그때 matplotlib/scipy가 로드되었는지도 새 인터프리터로 따로 측정
+- --baseline 으로 이전 결과와 비교하여 느려진 단계를 표시 (회귀가 있으면 종료 코드 1)
+
+사용법:
+    python analysis/benchmark.py
+    python analysis/benchmark.py --sizes 24 240 --skip analyses
+    python analysis/benchmark.py --sizes 240 --baseline analysis/output/benchmark_results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import event_store
+import figure_cache
+import synthetic
+from profiling import peak_rss_mb, reset_peak_rss
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+RESULTS_NAME = "benchmark_results.json"
+
+DEFAULT_SIZES = [24, 240, 2400, 24000]
+STAGES = [
+    "generate", "write_raw", "ingest", "load", "extra_decode", "masks",
+    "window_joins", "stats", "stream", "plots", "plots_cached", "analyses",
+]
+# masks 단계: 이벤트 유형별 마스크를 MASK_REPEAT번 반복
+MASK_EVENT_TYPES = ["BEAM_SCREEN_ON", "TRIGGER_ACTIVATED", "MISSION_COMPLETE", "CONFIDENCE_RATED", "PAUSE_START"]
+MASK_REPEAT = 10
+# 시작 시간: 새 인터프리터에서 모듈 import만 STARTUP_REPEAT번 (최솟값 기록)
+STARTUP_MODULES = ["run_analyses", "incremental", "power", "analyze_trust_performance"]
+STARTUP_REPEAT = 3
+# 뒤 단계의 입력이 되므로 생략할 수 없는 단계
+REQUIRED_STAGES = ["generate", "write_raw", "ingest", "load"]
+
+# 기준 결과 대비 이 배율 이상 느려지면 회귀 (기준 0.05초 미만 단계는 측정 잡음으로 보고 제외)
+DEFAULT_TOLERANCE = 1.25
+MIN_COMPARE_S = 0.05
+
+
+# ──────────────────────────────────────────────
+# 2. 측정
+# ──────────────────────────────────────────────
+
+class StageRecorder:
+    """단계별 wall/CPU 시간, 입출력 행 수, 최대 RSS 기록."""
+
+    def __init__(self):
+        self.records = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows_in: int = 0):
+        rec = {"stage": name, "rows_in": int(rows_in), "rows_out": 0}
+        reset_peak_rss()
+        wall, cpu = time.perf_counter(), time.process_time()
+        yield rec
+        rec["wall_s"] = round(time.perf_counter() - wall, 4)
+        rec["cpu_s"] = round(time.process_time() - cpu, 4)
+        rows = rec["rows_in"] or rec["rows_out"]
+        rec["rows_per_s"] = round(rows / rec["wall_s"]) if rec["wall_s"] > 0 else None
+        rec["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        self.records.append(rec)
+
+
+# ──────────────────────────────────────────────
+# 3. 규모별 실행 (작업 프로세스)
+# ──────────────────────────────────────────────
+
+def _redirect_outputs(modules: list, out_dir: Path):
+    """분석 모듈의 결과 파일 경로를 임시 디렉토리로 바꿈 (analysis/output 덮어쓰기 방지)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for module in modules:
+        module.OUTPUT_DIR = out_dir
+
+
+def bench_size(n_participants: int, n_waypoints: int, beam_events: int, seed: int,
+               skip: list, workdir: Path) -> dict:
+    """참가자 n_participants명 규모로 전체 단계를 한 번 실행하고 단계별 측정값을 반환."""
+    import analyze_device_switching as ads
+    import analyze_head_motion
+    import analyze_triggers
+    import analyze_trust_performance as trust
+    import analyze_verification
+    import run_analyses
+    from event_tables import tables
+    from extra_data import decode_extra
+    from window_join import asof_event, window_counts, window_pairs
+
+    workdir = Path(workdir)
+    raw_dir, store_dir = workdir / "raw", workdir / "store"
+    _redirect_outputs([ads, analyze_triggers, trust, analyze_verification, analyze_head_motion], workdir / "output")
+    analyze_head_motion.POSE_DIR = workdir / "headpose"
+    rec = StageRecorder()
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    with rec.stage("generate") as r:
+        events = synthetic.generate_events(n_participants, n_waypoints, beam_events, seed)
+        r["rows_out"] = len(events)
+    with rec.stage("write_raw", len(events)) as r:
+        r["rows_out"] = len(synthetic.write_raw_logs(events, raw_dir))
+    with rec.stage("ingest", len(events)) as r:
+        manifest = event_store.ingest(raw_dir, store_dir, verbose=False)
+        r["rows_out"] = sum(e["rows"] for e in manifest["files"].values())
+    with rec.stage("load") as r:
+        ev = event_store.load_events(raw_dir, store_dir)
+        r["rows_out"] = len(ev)
+
+    if "extra_decode" not in skip:
+        with rec.stage("extra_decode", len(events)) as r:
+            r["rows_out"] = len(decode_extra(events["extra_data"]))
+    del events
+
+    if "masks" not in skip:
+        # 분석 스크립트에서 반복되는 형태의 불리언 마스크 (category 코드 비교)
+        with rec.stage("masks", len(ev)) as r:
+            n_out = 0
+            for _ in range(MASK_REPEAT):
+                for event_type in MASK_EVENT_TYPES:
+                    n_out += int((ev["event_type"] == event_type).sum())
+                n_out += int(((ev["condition"] == "hybrid") & ev["event_type"].isin(ads.BEAM_CONTENT_EVENTS)).sum())
+                n_out += int(ev["waypoint_id"].isin(ads.TRIGGER_WAYPOINTS).sum())
+            r["rows_out"] = n_out
+
+    if "window_joins" not in skip:
+        with rec.stage("window_joins", len(ev)) as r:
+            t = tables(ev)
+            triggers = t.subset("TRIGGER_ACTIVATED")
+            by = ["participant_id", "condition"]
+            n_out = len(window_counts(t.mission_completes, t.subset("BEAM_SCREEN_ON"), before=60, by=by))
+            n_out += len(window_pairs(triggers, t.subset(ads.BEAM_CONTENT_EVENTS), after=30, by=by))
+            n_out += len(asof_event(triggers, t.confidence, "backward", by=by))
+            n_out += len(asof_event(triggers, t.confidence, "forward", by=by))
+            r["rows_out"] = n_out
+
+    metrics = None
+    if "stats" not in skip or "plots" not in skip:
+        with rec.stage("stats", len(ev)) as r, quiet:
+            metrics = {
+                "switching": ads.switching_metrics(ev),
+                "cvi": ads.cvi_metrics(ev),
+                "pauses": ads.pause_metrics(ev),
+                "completion": ads.completion_metrics(ev),
+                "calibration": trust.calibration_index(
+                    trust.load_confidence_from_events(ev), trust.mission_accuracy(ev)),
+            }
+            ads.run_paired_test(metrics["pauses"], "pause_count", "정지 횟수")
+            ads.run_paired_test(metrics["completion"], "completion_time_s", "과제 완료 시간")
+            trust._run_paired_test(metrics["calibration"].dropna(subset=["calibration_r"]),
+                                   "calibration_r", "Calibration Index")
+            r["rows_out"] = sum(len(m) for m in metrics.values())
+        if "stats" in skip:
+            rec.records.pop()
+
+    if "stream" not in skip:
+        # 통합 테이블 없이 참가자 묶음씩 읽어 참가자 × 조건 지표 계산
+        with rec.stage("stream", len(ev)) as r:
+            n_out = 0
+            for batch in event_store.iter_partitions(raw_dir, store_dir):
+                n_out += len(ads.pause_metrics(batch)) + len(ads.completion_metrics(batch))
+            r["rows_out"] = n_out
+
+    def plots():
+        ads.plot_switching_boxplot(metrics["switching"])
+        ads.plot_pause_comparison(metrics["pauses"])
+        ads.plot_completion_time(metrics["completion"])
+        ads.plot_trigger_timeline(ev)
+        return 4
+
+    if "plots" not in skip:
+        # --keep으로 같은 작업 폴더를 다시 쓰더라도 plots 단계는 항상 실제 렌더링을 측정
+        shutil.rmtree(ads.OUTPUT_DIR / figure_cache.CACHE_DIRNAME, ignore_errors=True)
+        with rec.stage("plots", len(ev)) as r, quiet:
+            r["rows_out"] = plots()
+        if "plots_cached" not in skip and figure_cache.ENABLED:
+            # 입력이 그대로인 두 번째 호출: 키 계산 + 캐시 확인만
+            with rec.stage("plots_cached", len(ev)) as r, quiet:
+                r["rows_out"] = plots()
+
+    if "analyses" not in skip:
+        with rec.stage("analyses", len(ev)) as r, quiet:
+            names = list(run_analyses.ANALYSES)
+            run_analyses.run_analyses(names, run_analyses.EventSource(ev))
+            r["rows_out"] = len(names)
+
+    return {
+        "participants": n_participants,
+        "sessions": len(manifest["files"]),
+        "events": len(ev),
+        "events_mb": round(ev.memory_usage(deep=True).sum() / 2 ** 20, 1),
+        "stages": rec.records,
+        "total_wall_s": round(sum(s["wall_s"] for s in rec.records), 3),
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in rec.records),
+    }
+
+
+def measure_startup(modules: list = STARTUP_MODULES, repeat: int = STARTUP_REPEAT) -> list:
+    """모듈마다 새 인터프리터에서 import 시간(최솟값)과 import 후 matplotlib/scipy 로드 여부."""
+    probe = "import sys, time; t = time.perf_counter(); import {m}; " \
+            "print(time.perf_counter() - t, 'matplotlib' in sys.modules, 'scipy' in sys.modules)"
+    results = []
+    for module in modules:
+        times, loaded = [], None
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, "-c", probe.format(m=module)], cwd=Path(__file__).resolve().parent,
+                                 capture_output=True, text=True)
+            if out.returncode != 0:
+                break
+            wall, mpl, scipy = out.stdout.split()[-3:]
+            times.append(float(wall))
+            loaded = {"matplotlib": mpl == "True", "scipy": scipy == "True"}
+        results.append({"module": module, "import_s": round(min(times), 3) if times else None, **(loaded or {})})
+    return results
+
+
+def _bench_in_tempdir(n_participants, n_waypoints, beam_events, seed, skip, keep_dir):
+    if keep_dir is not None:
+        workdir = Path(keep_dir) / f"n{n_participants}"
+        return bench_size(n_participants, n_waypoints, beam_events, seed, skip, workdir)
+    with tempfile.TemporaryDirectory(prefix="arnav_bench_") as tmp:
+        return bench_size(n_participants, n_waypoints, beam_events, seed, skip, Path(tmp))
+
+
+def run_benchmark(sizes: list, n_waypoints: int = 8, beam_events: int = 3, seed: int = 0,
+                  skip: list = (), keep_dir: Path = None) -> dict:
+    """규모마다 새 프로세스(spawn)에서 bench_size를 실행하여 결과 문서를 만듦."""
+    runs = []
+    ctx = multiprocessing.get_context("spawn")
+    for n in sizes:
+        print(f"[벤치마크] 참가자 {n:,}명 ...", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            run = pool.submit(_bench_in_tempdir, n, n_waypoints, beam_events, seed, list(skip), keep_dir).result()
+        _print_run(run)
+        runs.append(run)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "params": {"waypoints": n_waypoints, "beam_events": beam_events, "seed": seed, "skip": list(skip)},
+        "runs": runs,
+        "startup": measure_startup(),
+    }
+
+
+def _environment() -> dict:
+    env = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": event_store.pa.__version__ if event_store.pa is not None else None,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        env["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        env["git_commit"] = None
+    return env
+
+
+# ──────────────────────────────────────────────
+# 4. 출력 / 기준 결과 비교
+# ──────────────────────────────────────────────
+
+def _print_run(run: dict):
+    print(f"  이벤트 {run['events']:,}개 ({run.get('events_mb', float('nan')):.1f}MB) / 세션 {run['sessions']:,}개, "
+          f"합계 {run['total_wall_s']:.2f}s, peak RSS {run['peak_rss_mb']:.0f}MB")
+    for s in run["stages"]:
+        rate = f"{s['rows_per_s']:>12,} rows/s" if s["rows_per_s"] else " " * 19
+        print(f"    {s['stage']:<13} {s['wall_s']:>9.3f}s (CPU {s['cpu_s']:>8.3f}s) {rate}  "
+              f"peak {s['peak_rss_mb']:>7.0f}MB")
+
+
+def _print_startup(startup: list):
+    print("  시작(import) 시간:")
+    for s in startup:
+        if s["import_s"] is None:
+            print(f"    {s['module']:<26} 실패")
+            continue
+        heavy = [name for name in ("matplotlib", "scipy") if s.get(name)]
+        print(f"    {s['module']:<26} {s['import_s']:>7.3f}s  로드: {', '.join(heavy) or '-'}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """같은 규모·단계의 wall 시간을 기준 결과와 비교하여 회귀 목록 반환."""
+    base = {(r["participants"], s["stage"]): s for r in baseline["runs"] for s in r["stages"]}
+    regressions = []
+    print(f"\n=== 기준 결과 대비 (허용 배율 {tolerance:.2f}) ===")
+    if not any(r["participants"] == b["participants"] for r in results["runs"] for b in baseline["runs"]):
+        print("  같은 규모의 기준 결과 없음")
+    for run in results["runs"]:
+        for s in run["stages"]:
+            b = base.get((run["participants"], s["stage"]))
+            if b is None or b["wall_s"] < MIN_COMPARE_S:
+                continue
+            ratio = s["wall_s"] / b["wall_s"]
+            flag = ""
+            if ratio > tolerance:
+                flag = "  ← 회귀"
+                regressions.append({"participants": run["participants"], "stage": s["stage"],
+                                    "baseline_s": b["wall_s"], "wall_s": s["wall_s"], "ratio": round(ratio, 2)})
+            print(f"  {run['participants']:>6,}명 {s['stage']:<13} {b['wall_s']:>9.3f}s → {s['wall_s']:>9.3f}s "
+                  f"(×{ratio:.2f}){flag}")
+    return regressions
+
+
+# ──────────────────────────────────────────────
+# 5. 메인
+# ──────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분석 파이프라인 규모별 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="참가자 수 목록")
+    parser.add_argument("--waypoints", type=int, default=8)
+    parser.add_argument("--beam-events", type=int, default=3, help="기기 전환 1회당 최대 콘텐츠 이벤트 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip", nargs="*", default=[], metavar="STAGE",
+                        help=f"생략할 단계 ({', '.join(s for s in STAGES if s not in REQUIRED_STAGES)})")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR / RESULTS_NAME, help="결과 JSON 경로")
+    parser.add_argument("--baseline", type=Path, help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="회귀 판정 배율")
+    parser.add_argument("--keep", type=Path, metavar="DIR", help="합성 로그/저장소를 지우지 않고 DIR에 보관")
+    args = parser.parse_args(argv)
+    invalid = [s for s in args.skip if s not in STAGES or s in REQUIRED_STAGES]
+    if invalid:
+        parser.error(f"생략할 수 없는 단계: {', '.join(invalid)}")
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+
+    results = run_benchmark(args.sizes, args.waypoints, args.beam_events, args.seed, args.skip, args.keep)
+    _print_startup(results["startup"])
+    if baseline is not None:
+        results["regressions"] = compare(results, baseline, args.tolerance)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=1, ensure_ascii=False), encoding="utf-8")
+    print(f"\n  → {args.output} 저장")
+
+    if results.get("regressions"):
+        print(f"[경고] 느려진 단계 {len(results['regressions'])}개")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+참가자 단위(cluster) 부트스트랩 신뢰구간
+- 참가자를 복원추출: 참가자 × 지표 행렬을 한 번 만든 뒤, 재표집 인덱스 배열을 참가자별 추출 횟수 행렬로
+  바꿔 행렬곱 한 번으로 모든 반복·모든 지표의 평균(또는 합의 비율)을 계산 (pandas 파이프라인 재실행 없음)
+- 같은 참가자의 두 조건 값은 함께 뽑히므로 조건 간 차이(대응 대비)도 참가자 단위로 재표집
+- 이벤트에서 다시 계산해야 하는 무거운 지표는 recompute 모드: 참가자 단위로 이벤트를 재표집하고
+  지표 함수를 반복마다 실행 (프로세스 풀, 이벤트는 Arrow 스냅샷으로 공유)
+- 결과: analysis/output/bootstrap_ci.csv (analysis, metric, n, estimate, ci_low, ci_high, se)
+
+사용법:
+    python analysis/bootstrap.py                                   # 행렬 재표집 (기본 5,000회)
+    python analysis/bootstrap.py --n-boot 20000 --ci 0.99
+    python analysis/bootstrap.py --recompute --n-boot 500 --jobs 0  # 이벤트부터 재계산 (CPU 코어 수만큼 병렬)
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import event_store
+import profiling
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+N_BOOT = 5000
+CI_LEVEL = 0.95
+# 추출 횟수 행렬 한 묶음의 최대 원소 수 (반복 수 × 참가자 수)
+_CHUNK_CELLS = 4_000_000
+_SNAPSHOT_PATH = event_store.STORE_DIR / "bootstrap_events.arrow"
+
+
+# ──────────────────────────────────────────────
+# 2. 참가자 × 지표 행렬
+# ──────────────────────────────────────────────
+
+def participant_matrix(frame: pd.DataFrame, metrics: list, by: str = None,
+                       subject: str = "participant_id") -> pd.DataFrame:
+    """참가자 × 지표 행렬 (참가자당 한 행). by를 주면 '지표[수준]' 컬럼으로 펼침."""
+    if by is None:
+        return frame.groupby(subject, observed=True)[metrics].mean()
+    wide = frame.groupby([subject, by], observed=True)[metrics].mean().unstack(by)
+    wide.columns = [f"{metric}[{level}]" for metric, level in wide.columns]
+    return wide
+
+
+def add_contrasts(wide: pd.DataFrame, contrasts: dict) -> pd.DataFrame:
+    """참가자별 대응 차이 컬럼 추가. contrasts: {새 컬럼: (컬럼 a, 컬럼 b)} → a − b."""
+    wide = wide.copy()
+    for name, (a, b) in contrasts.items():
+        if a in wide.columns and b in wide.columns:
+            wide[name] = wide[a] - wide[b]
+    return wide
+
+
+# ──────────────────────────────────────────────
+# 3. 행렬 재표집
+# ──────────────────────────────────────────────
+
+def resample_counts(n_subjects: int, n_boot: int, rng: np.random.Generator) -> np.ndarray:
+    """(n_boot, n_subjects) 추출 횟수 행렬: 복원추출 인덱스 배열을 반복별로 bincount."""
+    draws = rng.integers(0, n_subjects, size=(n_boot, n_subjects))
+    draws += (np.arange(n_boot) * n_subjects)[:, None]
+    counts = np.bincount(draws.ravel(), minlength=n_boot * n_subjects)
+    return counts.reshape(n_boot, n_subjects).astype(np.float64)
+
+
+def _summarize(columns: list, n: np.ndarray, estimate: np.ndarray, replicates: np.ndarray,
+               ci: float) -> pd.DataFrame:
+    alpha = (1 - ci) / 2
+    finite = np.isfinite(replicates)
+    replicates = np.where(finite, replicates, np.nan)
+    low = np.full(len(columns), np.nan)
+    high = np.full(len(columns), np.nan)
+    se = np.full(len(columns), np.nan)
+    ok = finite.sum(axis=0) >= 2
+    if ok.any():
+        low[ok], high[ok] = np.nanquantile(replicates[:, ok], [alpha, 1 - alpha], axis=0)
+        se[ok] = np.nanstd(replicates[:, ok], axis=0, ddof=1)
+    return pd.DataFrame({
+        "metric": list(columns), "n": n, "estimate": estimate,
+        "ci_low": low, "ci_high": high, "se": se,
+    })
+
+
+def bootstrap_ratio(num: np.ndarray, den: np.ndarray, columns: list, n_boot: int = N_BOOT,
+                    ci: float = CI_LEVEL, seed: int = 0) -> pd.DataFrame:
+    """참가자 단위 재표집으로 Σ분자 / Σ분모 의 백분위 신뢰구간 (num, den: 참가자 × 지표 배열).
+
+    분모가 참가자별 유효 값 개수면 평균, 사건 수면 비율(예: 전환 수 / 트리거 수)이 된다.
+    """
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    n_subjects = num.shape[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        estimate = num.sum(axis=0) / den.sum(axis=0)
+    replicates = np.full((n_boot, num.shape[1]), np.nan)
+    if n_subjects > 0:
+        rng = np.random.default_rng(seed)
+        chunk = max(1, _CHUNK_CELLS // n_subjects)
+        for start in range(0, n_boot, chunk):
+            counts = resample_counts(n_subjects, min(chunk, n_boot - start), rng)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                replicates[start:start + len(counts)] = (counts @ num) / (counts @ den)
+    return _summarize(columns, (den > 0).sum(axis=0), estimate, replicates, ci)
+
+
+def bootstrap_means(wide: pd.DataFrame, n_boot: int = N_BOOT, ci: float = CI_LEVEL,
+                    seed: int = 0) -> pd.DataFrame:
+    """참가자 × 지표 행렬의 컬럼별 평균 신뢰구간 (NaN은 해당 지표에서만 제외)."""
+    values = wide.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    return bootstrap_ratio(np.where(valid, values, 0.0), valid, list(wide.columns), n_boot, ci, seed)
+
+
+def format_ci(row, digits: int = 2) -> str:
+    return f"{row['estimate']:.{digits}f} [{row['ci_low']:.{digits}f}, {row['ci_high']:.{digits}f}]"
+
+
+def print_ci(ci_df: pd.DataFrame, ci: float = CI_LEVEL, indent: str = "    ", digits: int = 2):
+    """지표별 '추정값 [하한, 상한]' 출력."""
+    for _, row in ci_df.iterrows():
+        print(f"{indent}{row['metric']}: {format_ci(row, digits)} ({ci:.0%} CI, n={row['n']})")
+
+
+# ──────────────────────────────────────────────
+# 4. 이벤트 재계산 모드 (프로세스 풀)
+# ──────────────────────────────────────────────
+# 작업 프로세스는 이벤트 스냅샷을 한 번 읽고 참가자별 행 인덱스를 만든 뒤,
+# 반복마다 참가자를 복원추출하여 이벤트 테이블을 재구성하고 지표 함수를 실행한다.
+# 같은 참가자가 여러 번 뽑히면 서로 다른 참가자로 취급하도록 participant_id를 새로 붙인다.
+
+_worker_snapshot = None
+_worker_events = None
+_worker_rows = None
+
+
+def _init_worker(snapshot, events):
+    global _worker_snapshot, _worker_events, _worker_rows
+    _worker_snapshot, _worker_events, _worker_rows = snapshot, events, None
+
+
+def _subject_rows(events: pd.DataFrame, subject: str) -> list:
+    codes, _ = pd.factorize(events[subject], sort=True)
+    order = np.argsort(codes, kind="stable")
+    return np.split(order, np.cumsum(np.bincount(codes))[:-1])
+
+
+def resample_events(events: pd.DataFrame, rows: list, draw: np.ndarray,
+                    subject: str = "participant_id") -> pd.DataFrame:
+    """draw(참가자 번호 배열) 순서대로 참가자 이벤트를 이어 붙이고 participant_id를 B001.. 로 다시 부여."""
+    picked = [rows[i] for i in draw]
+    out = events.take(np.concatenate(picked)).reset_index(drop=True)
+    width = max(3, len(str(len(draw))))
+    labels = [f"B{k:0{width}d}" for k in range(1, len(draw) + 1)]
+    codes = np.repeat(np.arange(len(draw)), [len(r) for r in picked])
+    out[subject] = pd.Categorical.from_codes(codes, labels)
+    return out
+
+
+def _run_replicates(statistic, replicate_ids: np.ndarray, seed: int, subject: str) -> list:
+    global _worker_events, _worker_rows
+    if _worker_events is None:
+        _worker_events = event_store.read_snapshot(_worker_snapshot)
+    if _worker_rows is None:
+        _worker_rows = _subject_rows(_worker_events, subject)
+    n_subjects = len(_worker_rows)
+    results = []
+    for i in replicate_ids:
+        # 반복 번호로 난수열을 고정 → 작업 프로세스 수와 관계없이 같은 결과
+        draw = np.random.default_rng([seed, int(i)]).integers(0, n_subjects, size=n_subjects)
+        results.append(statistic(resample_events(_worker_events, _worker_rows, draw, subject)))
+    return results
+
+
+def bootstrap_recompute(events: pd.DataFrame, statistic, n_boot: int = 1000, ci: float = CI_LEVEL,
+                        seed: int = 0, jobs: int = 1, subject: str = "participant_id") -> pd.DataFrame:
+    """참가자 단위로 이벤트를 재표집하여 statistic(events) → pd.Series 를 반복 계산한 신뢰구간.
+
+    statistic은 작업 프로세스로 전달되므로 모듈 최상위 함수여야 한다.
+    """
+    estimate = statistic(events)
+    chunks = [c for c in np.array_split(np.arange(n_boot), max(1, jobs) * 4) if len(c)]
+    if jobs <= 1:
+        _init_worker(None, events)
+        batches = [_run_replicates(statistic, c, seed, subject) for c in chunks]
+    else:
+        snapshot, shared = None, events
+        if event_store.pa is not None:
+            snapshot, shared = event_store.write_snapshot(events, _SNAPSHOT_PATH), None
+        print(f"[병렬] 부트스트랩 {n_boot:,}회 / 작업 프로세스 {jobs}개")
+        try:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(snapshot, shared)) as pool:
+                futures = [pool.submit(_run_replicates, statistic, c, seed, subject) for c in chunks]
+                batches = [f.result() for f in futures]
+        finally:
+            if snapshot is not None:
+                snapshot.unlink(missing_ok=True)
+    replicates = pd.DataFrame([s for batch in batches for s in batch]).reindex(columns=estimate.index)
+    n = np.full(len(estimate), events[subject].nunique())
+    return _summarize(list(estimate.index), n, estimate.to_numpy(dtype=np.float64),
+                      replicates.to_numpy(dtype=np.float64), ci)
+
+
+# ── 재계산 모드용 지표 함수 (모듈 최상위: 작업 프로세스로 pickle 전달) ──
+
+def cvi_statistic(events: pd.DataFrame) -> pd.Series:
+    import analyze_device_switching as ads
+    cvi_df = ads.cvi_metrics(events)
+    return cvi_df[ads.CVI_METRICS].mean() if not cvi_df.empty else pd.Series(np.nan, ads.CVI_METRICS)
+
+
+def trigger_switch_statistic(events: pd.DataFrame) -> pd.Series:
+    import analyze_triggers as trig
+    triggers = trig.trigger_switches(events)
+    rates = triggers.groupby("trigger_type", observed=True)["switched"].mean()
+    return rates.reindex(trig.TRIGGER_TYPES).rename(lambda t: f"switch_rate[{t}]")
+
+
+def calibration_statistic(events: pd.DataFrame) -> pd.Series:
+    import analyze_trust_performance as trust
+    cal_df = trust.calibration_index(trust.load_confidence_from_events(events), trust.mission_accuracy(events))
+    wide = trust.calibration_matrix(cal_df)
+    return wide.mean().reindex(trust.CALIBRATION_CI_COLUMNS)
+
+
+# ──────────────────────────────────────────────
+# 5. 메인
+# ──────────────────────────────────────────────
+
+def _load_events() -> pd.DataFrame:
+    df = event_store.load_events()
+    if not df.empty:
+        return df
+    import synthetic
+    from extra_data import add_extra_columns
+    print("[경고] 이벤트 로그 없음 → 합성 데모 이벤트로 부트스트랩")
+    return add_extra_columns(synthetic.generate_events(seed=42))
+
+
+def run_matrix(events: pd.DataFrame, n_boot: int, ci: float, seed: int) -> pd.DataFrame:
+    """분석별 참가자 × 지표 행렬을 한 번 만들고 행렬 재표집으로 신뢰구간 계산."""
+    import analyze_device_switching as ads
+    import analyze_triggers as trig
+    import analyze_trust_performance as trust
+
+    cal_df = trust.calibration_index(trust.load_confidence_from_events(events), trust.mission_accuracy(events))
+    parts = {
+        "cvi": ads.cvi_ci(ads.cvi_metrics(events), n_boot, ci, seed),
+        "trigger_switching": trig.trigger_switch_ci(trig.trigger_switches(events), n_boot, ci, seed),
+        "calibration": trust.calibration_ci(cal_df, n_boot, ci, seed),
+    }
+    return pd.concat([p.assign(analysis=name) for name, p in parts.items()], ignore_index=True)
+
+
+def run_recompute(events: pd.DataFrame, n_boot: int, ci: float, seed: int, jobs: int) -> pd.DataFrame:
+    """분석별 지표를 재표집한 이벤트에서 매번 다시 계산 (프로세스 풀)."""
+    parts = {
+        "cvi": cvi_statistic,
+        "trigger_switching": trigger_switch_statistic,
+        "calibration": calibration_statistic,
+    }
+    return pd.concat([bootstrap_recompute(events, fn, n_boot, ci, seed, jobs).assign(analysis=name)
+                      for name, fn in parts.items()], ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="참가자 단위 부트스트랩 신뢰구간 (CVI / 트리거 전환율 / Calibration)")
+    parser.add_argument("--n-boot", type=int, default=None,
+                        help=f"반복 수 (기본: 행렬 모드 {N_BOOT:,}, 재계산 모드 1,000)")
+    parser.add_argument("--ci", type=float, default=CI_LEVEL, help="신뢰수준 (기본 0.95)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--recompute", action="store_true",
+                        help="지표를 재표집한 이벤트에서 매번 다시 계산 (느림, --jobs로 병렬)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="재계산 모드 작업 프로세스 수 (기본 1, 0 = CPU 코어 수)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR / "bootstrap_ci.csv")
+    event_store.add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+    event_store.apply_filter_arguments(parser, args)
+    if not 0 < args.ci < 1:
+        parser.error("--ci 는 0과 1 사이")
+    n_boot = args.n_boot or (1000 if args.recompute else N_BOOT)
+    if n_boot < 2:
+        parser.error("--n-boot 는 2 이상")
+
+    events = _load_events()
+    if args.recompute:
+        jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+        result = run_recompute(events, n_boot, args.ci, args.seed, jobs)
+    else:
+        result = run_matrix(events, n_boot, args.ci, args.seed)
+    result = result[["analysis", "metric", "n", "estimate", "ci_low", "ci_high", "se"]]
+
+    mode = "이벤트 재계산" if args.recompute else "행렬 재표집"
+    print(f"\n=== 참가자 단위 부트스트랩 ({mode}, {n_boot:,}회, {args.ci:.0%} CI) ===")
+    for name, part in result.groupby("analysis", sort=False):
+        print(f"\n  [{name}]")
+        print_ci(part, args.ci)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    result.to_csv(args.output, index=False)
+    print(f"\n  → {args.output} 저장")
+
+
+if __name__ == "__main__":
+    with profiling.session("bootstrap"):
+        main()
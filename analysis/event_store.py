@@ -0,0 +1,700 @@
+"""
+이벤트 로그 컬럼형 저장소
+- data/raw/P*_*.csv 원본 로그를 data/processed/event_store/ 에 참가자 × 조건 분할 Parquet으로 변환
+  (participant_id=P01/condition=hybrid/<원본 파일명>.parquet; 한 원본 파일에 여러 참가자·조건이 섞여 있으면 분할마다 한 파일)
+- 원본 CSV는 CHUNK_ROWS행 단위로 읽고 조각마다 정규화·extra_data 디코딩 후 분할 파일에 행 그룹으로 이어 씀
+  → 변환 메모리는 원본 파일 크기와 무관 (연속 머리 추적 로그처럼 큰 파일도 처리)
+- 반복 문자열 컬럼(event_type, condition, participant_id, waypoint_id, device_active 등)은 category,
+  평정은 Int8, 머리 회전은 float32로 저장 (고정 어휘 컬럼은 파일과 무관하게 같은 범주 코드)
+- extra_data는 변환 시 한 번만 디코딩하여 타입 컬럼(mission_id, correct, duration_s 등)으로 저장하고,
+  원본 텍스트는 저장소에만 두고 기본 로드에서는 읽지 않음
+- manifest.json에 원본 파일 크기/수정시각/해시를 기록하여 신규·변경 파일만 재변환
+- 분석 스크립트는 load_events()로 저장소에서 통합 이벤트 테이블을 읽음
+- 참가자 × 조건 단위 지표는 iter_partitions() / map_partitions()로 참가자 묶음씩 읽어 계산 가능 (통합 테이블 불필요)
+- 파일 선택 필터(참가자 / 조건 / 경로 / 시작 날짜)는 파싱 전에 파일명(참가자·시작 시각)과 최신 manifest의 분할 정보로
+  원본 파일을, 분할 키(참가자·조건·경로)로 Parquet 분할을 거름
+  → 선택한 파일만 변환하고 선택한 분할만 읽음 (스크립트의 --participants P01-P12 --condition hybrid 등)
+  (파일명의 조건·경로는 세션 첫 블록의 값일 뿐이고 두 조건이 한 파일에 기록되므로 조건·경로는 분할 단위로 판정)
+- 병렬 실행 시 통합 테이블을 Arrow IPC 스냅샷으로 한 번 기록하고 작업 프로세스는 메모리 맵으로 읽음
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from extra_data import add_extra_columns, parse_extra
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+RAW_DIR = DATA_DIR / "raw"
+PROCESSED_DIR = DATA_DIR / "processed"
+STORE_DIR = PROCESSED_DIR / "event_store"
+# 분석 스크립트의 결과 파일 폴더 (필터 실행 경고 표시용)
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_NAME = "events.arrow"
+
+# EventLogger 파일명: P{id}_{condition}_{route}_{yyyyMMdd_HHmmss}.csv (condition: glass / hybrid)
+RAW_NAME_PATTERN = re.compile(
+    r"^(?P<participant_id>P\d+)_(?P<condition>glass_only|glass|hybrid)_(?P<route>[^_]+)_(?P<started>\d{8}_\d{6})"
+)
+FILE_CONDITIONS = {"glass": "glass_only", "glass_only": "glass_only", "hybrid": "hybrid"}
+
+# 저장 포맷이 바뀌면 올려서 기존 Parquet을 모두 재변환
+STORE_VERSION = 5
+
+# 원본 CSV를 이 행 수씩 읽어 변환 (변환 메모리 상한)
+CHUNK_ROWS = 250_000
+# iter_partitions 한 묶음의 최대 행 수 (한 참가자의 분할은 나누지 않음)
+BATCH_ROWS = 2_000_000
+PARTITION_KEYS = ["participant_id", "condition"]
+
+# 파일 선택 필터 (set_filter / 스크립트의 --participants 등으로 지정, 비어 있으면 전체).
+# set_filter가 환경 변수 ARNAV_FILTER(JSON)에도 기록하므로 작업 프로세스도 같은 필터를 씀
+FILTER_ENV = "ARNAV_FILTER"
+FILTER = json.loads(os.environ.get(FILTER_ENV) or "{}")
+# 파일명으로만 판단하는 항목 (형식이 다른 파일명이면 이 항목이 필터에 있을 때 제외). 참가자·조건·경로는 분할 단계에서 거름
+NAME_ONLY_FILTERS = ("since", "until")
+
+# 고정 어휘 (데이터 포맷 명세 + EventLogger 기록값). 범주 순서를 고정하여 파일·세션과 무관하게 같은 코드를 쓰고,
+# 어휘 밖 값은 버리지 않고 뒤에 이어 붙인다.
+EVENT_TYPES = sorted([
+    "EXPERIMENT_START", "EXPERIMENT_END", "ROUTE_START", "ROUTE_END", "CONDITION_CHANGE",
+    "PRACTICE_START", "SURVEY_START",
+    "WAYPOINT_REACHED", "WAYPOINT_SKIPPED", "WAYPOINT_FALLBACK_USED", "WAYPOINT_LATE_ANCHOR_BOUND",
+    "BEAM_SCREEN_ON", "BEAM_SCREEN_OFF", "BEAM_TAB_SWITCH", "BEAM_POI_VIEWED", "BEAM_INFO_CARD_OPENED",
+    "BEAM_INFO_CARD_CLOSED", "BEAM_MAP_ZOOMED", "BEAM_COMPARISON_VIEWED", "BEAM_MISSION_REF_VIEWED",
+    "GLASS_ARROW_SHOWN", "GLASS_ARROW_HIDDEN", "GLASS_ARROW_OFFSET",
+    "PAUSE_START", "PAUSE_END",
+    "MISSION_START", "MISSION_ARRIVAL", "VERIFICATION_ANSWERED", "MISSION_COMPLETE", "DIFFICULTY_RATED",
+    "TRIGGER_ACTIVATED", "TRIGGER_DEACTIVATED", "TRIGGER_RESPONSE", "CONFIDENCE_RATED",
+    "RELOCALIZATION_START", "RELOCALIZATION_RETRY", "RELOCALIZATION_PROCEED_PARTIAL", "RELOCALIZATION_COMPLETE",
+])
+VOCABULARIES = {
+    "event_type": EVENT_TYPES,
+    "condition": ["glass_only", "hybrid"],
+    "device_active": ["beam_pro", "both", "glass", "none"],
+    "beam_content_type": ["comparison", "info_card", "map", "mission_ref", "poi_detail"],
+    "verification_correct": ["false", "true"],
+    "trigger_type": ["T1", "T2", "T3", "T4"],
+}
+# 값이 반복되는 문자열 컬럼은 모두 category (어휘가 열린 컬럼은 데이터의 값을 정렬하여 범주로 사용)
+CATEGORICAL_COLUMNS = ["participant_id", "waypoint_id", "mission_id"] + list(VOCABULARIES)
+TEXT_COLUMNS = ["extra_data"]
+RATING_COLUMNS = ["confidence_rating", "difficulty_rating"]
+ROTATION_COLUMNS = ["head_rotation_x", "head_rotation_y", "head_rotation_z"]
+NUMERIC_COLUMNS = ROTATION_COLUMNS + RATING_COLUMNS
+# 원본 텍스트 그대로의 extra_data는 변환 시 타입 컬럼으로 분리되므로 기본 로드에서는 읽지 않음
+DEFERRED_COLUMNS = ["extra_data"]
+
+
+# ──────────────────────────────────────────────
+# 2. 원본 파일 목록 / 선택 / 지문
+# ──────────────────────────────────────────────
+
+def raw_files(raw_dir: Path = RAW_DIR) -> list:
+    """원본 이벤트 로그 CSV 목록 (파일명 정렬)."""
+    return sorted(Path(raw_dir).glob("P*_*.csv"))
+
+
+def parse_raw_name(path: Path) -> dict:
+    """원본 파일명에서 participant_id / condition(로그 컬럼 값) / route / started 추출. 형식이 다르면 None."""
+    m = RAW_NAME_PATTERN.match(Path(path).name)
+    if m is None:
+        return None
+    info = m.groupdict()
+    info["condition"] = FILE_CONDITIONS[info["condition"]]
+    return info
+
+
+def parse_participants(spec) -> set:
+    """참가자 지정 → 참가자 번호 집합. "P01-P12,P15", "3", ["P01", "P04-P06"] 형식 (P와 앞자리 0은 생략 가능)."""
+    numbers = set()
+    for token in _split(spec):
+        m = re.fullmatch(r"[Pp]?(\d+)(?:-[Pp]?(\d+))?", token)
+        if m is None:
+            raise ValueError(f"참가자 지정 형식 오류: {token!r} (예: P01-P12,P15)")
+        lo, hi = sorted((int(m.group(1)), int(m.group(2) or m.group(1))))
+        numbers.update(range(lo, hi + 1))
+    return numbers
+
+
+def _split(values) -> list:
+    if values is None:
+        return []
+    if isinstance(values, str):
+        values = [values]
+    return [v for value in values for v in re.split(r"[,\s]+", str(value)) if v]
+
+
+def _timestamp(value, end: bool = False) -> str:
+    """날짜(시각) → 파일명의 started 형식 yyyyMMdd_HHmmss. 20260315, 2026-03-15, 20260315_1430 등.
+
+    end=True면 생략한 자리를 끝값으로 채움 (--until 20260331은 그 날 마지막 세션까지 포함).
+    """
+    digits = re.sub(r"\D", "", str(value))
+    if len(digits) not in (8, 10, 12, 14):
+        raise ValueError(f"날짜 형식 오류: {value!r} (yyyyMMdd 또는 yyyyMMdd_HHmmss)")
+    digits += ("235959" if end else "000000")[len(digits) - 8:]
+    return f"{digits[:8]}_{digits[8:]}"
+
+
+def make_filter(participants=None, conditions=None, routes=None, since=None, until=None) -> dict:
+    """파일 선택 필터 (지정한 항목만 담은 dict). 형식이 잘못된 값은 ValueError.
+
+    conditions는 파일명 표기(glass)와 로그 컬럼 값(glass_only) 모두 허용하고, since/until은 세션 시작 시각 기준 (양 끝 포함).
+    """
+    flt = {}
+    if participants:
+        flt["participants"] = sorted(parse_participants(participants))
+    conditions = _split(conditions)
+    if conditions:
+        unknown = [c for c in conditions if c not in FILE_CONDITIONS]
+        if unknown:
+            raise ValueError(f"조건 지정 오류: {', '.join(unknown)} (glass / glass_only / hybrid)")
+        flt["conditions"] = sorted({FILE_CONDITIONS[c] for c in conditions})
+    routes = _split(routes)
+    if routes:
+        flt["routes"] = sorted(set(routes))
+    if since:
+        flt["since"] = _timestamp(since)
+    if until:
+        flt["until"] = _timestamp(until, end=True)
+    if flt.get("since", "") > flt.get("until", "~"):
+        raise ValueError(f"날짜 범위 오류: {since} > {until}")
+    return flt
+
+
+def set_filter(flt: dict = None):
+    """이번 실행의 기본 필터 지정 (load_events / partitions / iter_partitions / ingest에 filters를 주지 않으면 사용)."""
+    global FILTER
+    FILTER = dict(flt or {})
+    if FILTER:
+        os.environ[FILTER_ENV] = json.dumps(FILTER)
+    else:
+        os.environ.pop(FILTER_ENV, None)
+
+
+def describe_filter(flt: dict = None) -> str:
+    flt = FILTER if flt is None else flt
+    if not flt:
+        return "전체"
+    parts = []
+    if "participants" in flt:
+        parts.append(f"참가자 {len(flt['participants'])}명")
+    if "conditions" in flt:
+        parts.append("조건 " + "/".join(flt["conditions"]))
+    if "routes" in flt:
+        parts.append("경로 " + "/".join(flt["routes"]))
+    if "since" in flt or "until" in flt:
+        parts.append(f"시작 {flt.get('since', '')}~{flt.get('until', '')}")
+    return ", ".join(parts)
+
+
+def _match_participant(participant_id, flt: dict) -> bool:
+    if "participants" not in flt:
+        return True
+    m = re.fullmatch(r"P(\d+)", str(participant_id))
+    return m is not None and int(m.group(1)) in flt["participants"]
+
+
+def _match_keys(participant_id, condition, flt: dict) -> bool:
+    """참가자 × 조건 분할이 필터에 맞는지."""
+    return _match_participant(participant_id, flt) and ("conditions" not in flt or condition in flt["conditions"])
+
+
+def _match_part(part: dict, flt: dict) -> bool:
+    """저장소 분할(manifest parts 항목)이 필터에 맞는지: 참가자 × 조건 키와 그 분할에서 수행한 경로."""
+    return (_match_keys(part["participant_id"], part["condition"], flt)
+            and ("routes" not in flt or bool(set(part.get("routes", [])) & set(flt["routes"]))))
+
+
+def _current_entry(path: Path, entries: dict) -> dict:
+    """원본 파일이 변환 이후 바뀌지 않았으면 manifest 항목, 아니면 None."""
+    entry = entries.get(Path(path).name)
+    if entry is None:
+        return None
+    try:
+        key = _stat_key(Path(path))
+    except OSError:
+        return None
+    return entry if entry["size"] == key["size"] and entry["mtime_ns"] == key["mtime_ns"] else None
+
+
+def _match_name(info: dict, flt: dict, entry: dict = None) -> bool:
+    if info is None:
+        if any(k in flt for k in NAME_ONLY_FILTERS):
+            return False
+    elif not (_match_participant(info["participant_id"], flt)
+              and flt.get("since", "") <= info["started"] <= flt.get("until", "~")):
+        return False
+    # 파일명의 조건·경로는 세션 첫 블록의 값일 뿐 (두 번째 조건의 행도 같은 파일에 기록됨)
+    # → 조건·경로는 최신 manifest 항목이 있을 때 그 파일이 만든 분할로만 판단, 없으면 남겨 두고 분할 단계에서 거름
+    return entry is None or any(_match_part(p, flt) for p in entry["parts"])
+
+
+def select_files(files: list, flt: dict = None, manifest: dict = None) -> list:
+    """필터에 맞을 수 있는 원본 파일 선택 (파일을 열지 않음). flt=None이면 FILTER.
+
+    파일명의 참가자·시작 시각으로 거르고, manifest를 주면 변환 후 바뀌지 않은 파일은 그 분할(조건·경로)로도 거른다.
+    """
+    flt = FILTER if flt is None else flt
+    if not flt:
+        return list(files)
+    entries = manifest["files"] if manifest else {}
+    return [f for f in files if _match_name(parse_raw_name(f), flt, _current_entry(f, entries) if entries else None)]
+
+
+def key_filter(flt: dict = None) -> dict:
+    """필터의 참가자·조건 항목만 (설문처럼 경로·시작 시각이 없는 참가자 × 조건 테이블에 filter_rows로 적용)."""
+    flt = FILTER if flt is None else flt
+    return {k: v for k, v in flt.items() if k in ("participants", "conditions")}
+
+
+def session_filter(flt: dict = None) -> dict:
+    """필터의 참가자·시작 시각 항목만 (조건·경로는 세션 안의 구간이므로 빼고 세션 전체를 고름).
+
+    선택한 조건의 행만으로는 조건 경계를 알 수 없는 경우(머리 자세 스트림의 조건 구간 등)에 사용.
+    """
+    flt = FILTER if flt is None else flt
+    return {k: v for k, v in flt.items() if k not in ("conditions", "routes")}
+
+
+def _partition_routes(df: pd.DataFrame) -> dict:
+    """(participant_id, condition) → ROUTE_START extra_data의 경로 집합."""
+    if df.empty or "extra_data" not in df or "event_type" not in df:
+        return {}
+    starts = df[df["event_type"] == "ROUTE_START"]
+    routes = {}
+    for pid, cond, extra in zip(starts["participant_id"].astype(object), starts["condition"].astype(object),
+                                parse_extra(starts["extra_data"])):
+        if extra.get("route") is not None:
+            routes.setdefault((pid, cond), set()).add(str(extra["route"]))
+    return routes
+
+
+def filter_rows(df: pd.DataFrame, flt: dict = None, info: dict = None) -> pd.DataFrame:
+    """participant_id / condition / 경로로 행 선택 (분할 정보 없이 원본 CSV를 직접 읽는 경로용).
+
+    경로는 ROUTE_START의 extra_data로 정하고, 조건이 하나뿐인 파일에서 ROUTE_START가 없으면 파일명 정보(info)의 경로.
+    """
+    flt = FILTER if flt is None else flt
+    if df.empty or not any(k in flt for k in ("participants", "conditions", "routes")):
+        return df
+    mask = pd.Series(True, index=df.index)
+    if "participants" in flt:
+        keep = [p for p in df["participant_id"].dropna().unique() if _match_participant(p, flt)]
+        mask &= df["participant_id"].isin(keep)
+    if "conditions" in flt:
+        mask &= df["condition"].isin(flt["conditions"])
+    if "routes" in flt:
+        keys = df[PARTITION_KEYS].astype(object)
+        routes = _partition_routes(df)
+        single = keys["condition"].nunique() == 1
+        keep = [k for k in keys.drop_duplicates().itertuples(index=False, name=None)
+                if routes.get(k, {info["route"]} if info and single else set()) & set(flt["routes"])]
+        mask &= pd.MultiIndex.from_frame(keys).isin(keep)
+    return df[mask].reset_index(drop=True)
+
+
+def add_filter_arguments(parser):
+    """명령행 파일 선택 옵션 추가 (--participants / --condition / --route / --since / --until)."""
+    group = parser.add_argument_group("파일 선택 (파싱 전에 파일명·분할 단위로 거름)")
+    group.add_argument("--participants", metavar="P01-P12,P15", help="참가자 (범위 / 쉼표 목록)")
+    group.add_argument("--condition", metavar="hybrid", help="조건 glass(=glass_only) / hybrid (쉼표 목록)")
+    group.add_argument("--route", metavar="A", help="경로 (쉼표 목록)")
+    group.add_argument("--since", metavar="20260315", help="이 날짜(시각) 이후 시작한 세션 (yyyyMMdd[_HHmmss])")
+    group.add_argument("--until", metavar="20260331", help="이 날짜(시각)까지 시작한 세션 (그 날 포함)")
+
+
+def apply_filter_arguments(parser, args) -> dict:
+    """add_filter_arguments 옵션으로 필터를 만들어 set_filter. 형식 오류는 parser.error로 종료.
+
+    결과 파일 경로는 필터와 무관하므로, 필터가 있으면 전체 실행 결과를 덮어쓴다는 경고도 출력.
+    """
+    try:
+        flt = make_filter(args.participants, args.condition, args.route, args.since, args.until)
+    except ValueError as e:
+        parser.error(str(e))
+    set_filter(flt)
+    if flt:
+        print(f"[필터] {describe_filter(flt)}")
+        print(f"[경고] 필터 실행 결과(부분 표본)가 {OUTPUT_DIR}의 CSV·PNG를 같은 파일명으로 덮어씁니다 "
+              f"→ 전체 실행 결과를 보존하려면 먼저 복사해 두세요")
+    return flt
+
+
+def file_digest(path: Path) -> str:
+    """원본 파일 내용 해시 (sha1)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat_key(path: Path) -> dict:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# ──────────────────────────────────────────────
+# 3. 파싱 / 타입 정규화
+# ──────────────────────────────────────────────
+
+def _csv_options() -> dict:
+    string_columns = ["timestamp"] + CATEGORICAL_COLUMNS + TEXT_COLUMNS
+    return {
+        "dtype": {c: str for c in string_columns},
+        "keep_default_na": False,
+        "na_values": {c: [""] for c in NUMERIC_COLUMNS + string_columns[1:]},
+    }
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    # 기록 중 잘린 행 등 시각을 해석할 수 없는 행은 제외
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce")
+    df = df.dropna(subset=["timestamp"]).reset_index(drop=True)
+    return compact_events(add_extra_columns(normalize_events(df)))
+
+
+def read_raw_csv(path: Path) -> pd.DataFrame:
+    """원본 CSV 한 파일(또는 같은 헤더의 텍스트 버퍼)을 타입이 고정된 DataFrame으로 읽음."""
+    return _prepare(pd.read_csv(path, **_csv_options()))
+
+
+def read_raw_chunks(path: Path, chunk_rows: int = CHUNK_ROWS):
+    """원본 CSV를 chunk_rows행씩 읽어 read_raw_csv와 같은 형태의 DataFrame 조각을 차례로 반환.
+
+    extra_data 디코딩도 조각 단위로 하므로 메모리에는 조각 하나만 올라간다.
+    """
+    with pd.read_csv(path, chunksize=chunk_rows, **_csv_options()) as reader:
+        for chunk in reader:
+            yield _prepare(chunk)
+
+
+def normalize_events(df: pd.DataFrame) -> pd.DataFrame:
+    """이벤트 테이블 컬럼 값 정규화 (숫자 파싱, 빈 문자열 → 결측)."""
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in CATEGORICAL_COLUMNS + TEXT_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object).where(df[col].notna() & (df[col] != ""), None)
+    if "verification_correct" in df.columns:
+        df["verification_correct"] = df["verification_correct"].astype(object).str.lower()
+    return df
+
+
+def _categorical(values: pd.Series, vocabulary: list = None) -> pd.Series:
+    """category 컬럼: 고정 어휘(있으면) 뒤에 어휘 밖 값을 정렬하여 잇고, 빈 문자열은 결측."""
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype("category")
+    values = values.cat.remove_unused_categories()
+    present = [c for c in values.cat.categories if c != ""]
+    if vocabulary is None:
+        categories = sorted(present, key=str)
+    else:
+        known = set(vocabulary)
+        categories = list(vocabulary) + sorted((c for c in present if c not in known), key=str)
+    return values.cat.set_categories(categories)
+
+
+def compact_events(df: pd.DataFrame) -> pd.DataFrame:
+    """메모리 효율 타입으로 변환.
+
+    반복 문자열 → category(고정 어휘는 코드 고정, 범주 수가 적어 int8 코드), 평정 → Int8,
+    머리 회전 → float32. 이벤트 유형 등의 비교(==, isin)는 문자열 대신 정수 코드 비교가 된다.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = _categorical(df[col], VOCABULARIES.get(col))
+    for col in RATING_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype("Int8")
+    for col in ROTATION_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    return df
+
+
+# ──────────────────────────────────────────────
+# 4. 저장소 갱신 (신규·변경 파일만 재변환)
+# ──────────────────────────────────────────────
+
+def _read_manifest(store_dir: Path) -> dict:
+    path = store_dir / MANIFEST_NAME
+    if path.exists():
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        if manifest.get("version") == STORE_VERSION:
+            return manifest
+    return {"version": STORE_VERSION, "files": {}}
+
+
+def _write_manifest(store_dir: Path, manifest: dict):
+    path = store_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _partition_dir(participant_id: str, condition: str) -> Path:
+    safe = [re.sub(r"[^\w.-]", "_", str(v)) for v in (participant_id, condition)]
+    return Path(f"participant_id={safe[0]}") / f"condition={safe[1]}"
+
+
+def _arrow_schema(df: pd.DataFrame):
+    """조각마다 달라지지 않는 저장 스키마: category → int32 코드 사전, 값이 모두 결측인 문자열 컬럼 → string."""
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    fields = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), pa.string()))
+        elif pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def _write_partitions(path: Path, store_dir: Path, chunk_rows: int = CHUNK_ROWS) -> list:
+    """원본 파일 하나를 조각 단위로 읽어 참가자 × 조건 분할 Parquet에 행 그룹으로 이어 씀.
+
+    참가자·조건이 비어 있는 행은 파일명 값(없으면 "unknown")으로 분할한다.
+    분할마다 수행한 경로(ROUTE_START의 route)를 기록하고, ROUTE_START가 없으면 조건이 하나뿐인 파일에서만 파일명의 경로를 쓴다.
+    반환: [{"path": 저장소 기준 상대 경로, "participant_id", "condition", "rows", "routes"}, ...]
+    """
+    info = parse_raw_name(path) or {}
+    writers, parts, routes, schema = {}, {}, {}, None
+    try:
+        for chunk in read_raw_chunks(path, chunk_rows):
+            if chunk.empty:
+                continue
+            schema = schema or _arrow_schema(chunk)
+            keys = pd.DataFrame({
+                k: (chunk[k].astype(object).where(chunk[k].notna(), info.get(k, "unknown")) if k in chunk
+                    else info.get(k, "unknown"))
+                for k in PARTITION_KEYS
+            }, index=chunk.index)
+            for key, found in _partition_routes(chunk.assign(**keys)).items():
+                routes.setdefault(key, set()).update(found)
+            for (pid, cond), idx in keys.groupby(PARTITION_KEYS, sort=False).indices.items():
+                rel = (_partition_dir(pid, cond) / f"{Path(path).stem}.parquet").as_posix()
+                if rel not in writers:
+                    (store_dir / rel).parent.mkdir(parents=True, exist_ok=True)
+                    writers[rel] = pq.ParquetWriter(store_dir / rel, schema)
+                    parts[rel] = {"path": rel, "participant_id": pid, "condition": cond, "rows": 0}
+                table = pa.Table.from_pandas(chunk.iloc[idx], preserve_index=False).cast(schema)
+                writers[rel].write_table(table)
+                parts[rel]["rows"] += len(idx)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    single = len({p["condition"] for p in parts.values()}) == 1
+    for part in parts.values():
+        found = routes.get((part["participant_id"], part["condition"]))
+        part["routes"] = sorted(found) if found else ([info["route"]] if single and "route" in info else [])
+    return sorted(parts.values(), key=lambda p: p["path"])
+
+
+def _remove_parts(store_dir: Path, entry: dict):
+    for part in entry.get("parts", []):
+        (store_dir / part["path"]).unlink(missing_ok=True)
+
+
+def ingest(raw_dir: Path = RAW_DIR, store_dir: Path = STORE_DIR, verbose: bool = True,
+           filters: dict = None) -> dict:
+    """원본 로그를 저장소에 반영하고 manifest를 반환. 바뀐 파일만 다시 파싱.
+
+    필터(filters=None이면 FILTER)가 있으면 선택한 파일만 확인·변환 (나머지 항목은 그대로 둠; 없어진 파일 항목은 항상 정리).
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(store_dir)
+    entries = manifest["files"]
+    if not entries:
+        # 이전 저장 형식(원본 파일당 Parquet 한 개)의 파일 정리
+        for old in store_dir.glob("*.parquet"):
+            old.unlink()
+
+    current = raw_files(raw_dir)
+    names = {f.name for f in current}
+    for name in list(entries):
+        if name not in names:
+            _remove_parts(store_dir, entries[name])
+            del entries[name]
+
+    selected = select_files(current, filters, manifest)
+    n_ingested = 0
+    for f in selected:
+        key = _stat_key(f)
+        entry = entries.get(f.name)
+        if entry and all((store_dir / p["path"]).exists() for p in entry["parts"]):
+            if entry["size"] == key["size"] and entry["mtime_ns"] == key["mtime_ns"]:
+                continue
+            digest = file_digest(f)
+            if digest == entry["sha1"]:
+                entry.update(key)
+                continue
+        else:
+            digest = file_digest(f)
+
+        if entry:
+            _remove_parts(store_dir, entry)
+        parts = _write_partitions(f, store_dir)
+        entries[f.name] = {**key, "sha1": digest, "parts": parts, "rows": sum(p["rows"] for p in parts)}
+        n_ingested += 1
+
+    _write_manifest(store_dir, manifest)
+    if verbose and n_ingested:
+        print(f"[저장소] {n_ingested}/{len(selected)}개 원본 파일 변환 → {store_dir}")
+    return manifest
+
+
+# ──────────────────────────────────────────────
+# 5. 로드
+# ──────────────────────────────────────────────
+
+def load_events(raw_dir: Path = RAW_DIR, store_dir: Path = STORE_DIR, files: list = None,
+                extra_text: bool = False, filters: dict = None) -> pd.DataFrame:
+    """저장소에서 이벤트 테이블 로드. 원본 로그가 없으면 빈 DataFrame.
+
+    files를 주면 해당 원본 파일(raw_files() 항목)만 로드한다.
+    필터(filters=None이면 FILTER)는 파일명으로 원본 파일을, 분할 키로 Parquet 분할을 골라 선택한 분할만 읽는다.
+    원본 extra_data 텍스트는 extra_text=True일 때만 포함 (디코딩된 타입 컬럼은 항상 포함).
+    필터가 있고 원본 로그도 있는데 맞는 이벤트가 없으면 SystemExit (스크립트가 데모 데이터로 실제 결과 파일을 덮어쓰지 않도록).
+    """
+    flt = FILTER if filters is None else filters
+    files = select_files(raw_files(raw_dir) if files is None else files, flt)
+    skip = [] if extra_text else DEFERRED_COLUMNS
+
+    if not files:
+        df = pd.DataFrame()
+    elif pq is None:
+        print("[경고] pyarrow 미설치 → 원본 CSV 직접 로드")
+        frames = [filter_rows(read_raw_csv(f), flt, parse_raw_name(f)).drop(columns=skip, errors="ignore")
+                  for f in files]
+        df = _unify_categories(pd.concat(frames, ignore_index=True))
+    else:
+        manifest = ingest(raw_dir, store_dir, filters=flt)
+        files = select_files(files, flt, manifest)
+        paths = [Path(store_dir) / p["path"] for f in files for p in manifest["files"][f.name]["parts"]
+                 if _match_part(p, flt)]
+        df = _read_parts(paths, skip)
+
+    if df.empty and flt and raw_files(raw_dir):
+        raise SystemExit(f"[오류] 필터({describe_filter(flt)})에 맞는 이벤트가 {raw_dir}에 없습니다 "
+                         f"→ 데모 데이터로 대체하지 않고 종료")
+    return df
+
+
+def _read_parts(paths: list, skip: list) -> pd.DataFrame:
+    tables = []
+    for path in paths:
+        columns = [c for c in pq.read_schema(path).names if c not in skip]
+        tables.append(pq.read_table(path, columns=columns))
+    if not tables:
+        return pd.DataFrame()
+    table = pa.concat_tables(tables, promote_options="default")
+    del tables
+    # 변환하면서 Arrow 버퍼를 바로 해제하여 최대 메모리를 줄임
+    return _unify_categories(table.to_pandas(self_destruct=True, split_blocks=True))
+
+
+def _unify_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """파일마다 다른 범주(사전)를 하나로 맞춤: 고정 어휘 코드 복원, 열린 어휘는 정렬된 합집합."""
+    return compact_events(df)
+
+
+# ──────────────────────────────────────────────
+# 6. 분할 스트리밍 (참가자 묶음 단위 로드)
+# ──────────────────────────────────────────────
+
+def partitions(raw_dir: Path = RAW_DIR, store_dir: Path = STORE_DIR, files: list = None,
+               filters: dict = None) -> pd.DataFrame:
+    """분할 목록 (participant_id, condition, path, rows, file; 참가자 → 조건 → 원본 파일 순). 저장소를 먼저 갱신.
+
+    필터(filters=None이면 FILTER)에 맞는 원본 파일의 맞는 분할만 포함.
+    """
+    columns = PARTITION_KEYS + ["path", "rows", "file"]
+    flt = FILTER if filters is None else filters
+    manifest = ingest(raw_dir, store_dir, verbose=False, filters=flt)
+    names = {Path(f).name for f in select_files(raw_files(raw_dir) if files is None else files, flt, manifest)}
+    rows = [{**part, "path": Path(store_dir) / part["path"], "file": name}
+            for name, entry in manifest["files"].items() if name in names
+            for part in entry["parts"] if _match_part(part, flt)]
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(rows)[columns].sort_values(PARTITION_KEYS + ["file"], ignore_index=True)
+
+
+def iter_partitions(raw_dir: Path = RAW_DIR, store_dir: Path = STORE_DIR, files: list = None,
+                    batch_rows: int = BATCH_ROWS, extra_text: bool = False, filters: dict = None):
+    """참가자 단위로 분할을 묶어 이벤트 테이블을 차례로 반환 (묶음마다 최대 batch_rows행).
+
+    한 참가자의 분할(두 조건)은 항상 같은 묶음에 들어가며, 한 참가자가 batch_rows보다 크면 그 참가자만 단독 묶음.
+    참가자 × 조건 단위 지표는 묶음별 결과를 이어 붙이면 통합 테이블에서 계산한 것과 같다.
+    """
+    skip = [] if extra_text else DEFERRED_COLUMNS
+    flt = FILTER if filters is None else filters
+    if pq is None:
+        # pyarrow 없음: 원본 파일 단위로 읽음
+        for f in select_files(files if files is not None else raw_files(raw_dir), flt):
+            yield filter_rows(read_raw_csv(f), flt, parse_raw_name(f)).drop(columns=skip, errors="ignore")
+        return
+
+    parts = partitions(raw_dir, store_dir, files, flt)
+    batch, n_rows = [], 0
+    for _, grp in parts.groupby("participant_id", sort=False):
+        size = int(grp["rows"].sum())
+        if batch and n_rows + size > batch_rows:
+            yield _read_parts(batch, skip)
+            batch, n_rows = [], 0
+        batch += grp["path"].tolist()
+        n_rows += size
+    if batch:
+        yield _read_parts(batch, skip)
+
+
+def map_partitions(fn, raw_dir: Path = RAW_DIR, store_dir: Path = STORE_DIR, files: list = None,
+                   batch_rows: int = BATCH_ROWS, filters: dict = None) -> pd.DataFrame:
+    """참가자 단위 지표 함수 fn(이벤트 테이블) → DataFrame을 분할 묶음마다 적용하여 이어 붙임."""
+    results = [fn(batch) for batch in iter_partitions(raw_dir, store_dir, files, batch_rows, filters=filters)]
+    results = [r for r in results if r is not None and not r.empty]
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+
+# ──────────────────────────────────────────────
+# 7. Arrow IPC 스냅샷 (병렬 실행용 공유 읽기 전용 테이블)
+# ──────────────────────────────────────────────
+
+def write_snapshot(df: pd.DataFrame, path: Path = STORE_DIR / SNAPSHOT_NAME) -> Path:
+    """통합 이벤트 테이블을 Arrow IPC 파일로 기록 (작업 프로세스가 memory-map으로 공유)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    tmp.replace(path)
+    return path
+
+
+def read_snapshot(path: Path = STORE_DIR / SNAPSHOT_NAME) -> pd.DataFrame:
+    """write_snapshot()으로 기록한 스냅샷을 memory-map으로 읽어 DataFrame으로 반환."""
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return _unify_categories(table.to_pandas())
@@ -0,0 +1,196 @@
+"""
+파생 테이블 캐시
+- 여러 분석이 공통으로 쓰는 부분 테이블(Hybrid 조건, BEAM_SCREEN_ON, MISSION_COMPLETE,
+  숫자형 CONFIDENCE_RATED 등)을 처음 요청될 때 한 번만 만들고 재사용
+- tables(df)는 같은 이벤트 테이블 객체에 대해 항상 같은 캐시를 반환
+- 시작/종료 이벤트 쌍 구간 테이블(Beam Pro 사용, 트리거, 정지, 미션)도 같은 방식으로 캐시
+- 이벤트 유형 × 조건 × 참가자 분할 색인: 전체 테이블을 (유형, 조건, 참가자, 시각) 순으로 한 번 정렬해 두고
+  부분 테이블은 정렬본의 연속 구간(iloc 슬라이스)으로 반환 → 부분 테이블마다 전체 테이블을 훑는 마스크 없음
+- 반환되는 테이블은 분석 간에 공유되므로, 컬럼을 추가·수정할 때는 .copy() 후 사용
+"""
+
+import weakref
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from intervals import pair_spans
+
+# ──────────────────────────────────────────────
+# 1. 분할 색인
+# ──────────────────────────────────────────────
+
+PARTITION_KEYS = ["event_type", "condition", "participant_id"]
+
+
+def _codes(values: pd.Series) -> tuple:
+    """(정수 코드 배열, 범주) — category면 기존 코드, 아니면 정렬된 고유값 기준. 결측은 -1."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(dtype=np.int64), values.cat.categories
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), pd.Index(uniques)
+
+
+class PartitionIndex:
+    """(event_type, condition, participant_id) 분할 색인.
+
+    테이블을 키 → 시각 순으로 한 번 정렬한 사본(frame)을 두고, 키 접두사
+    (유형) / (유형, 조건) / (유형, 조건, 참가자)마다 정렬본 안의 [lo, hi) 구간을 사전으로 기록한다.
+    조회는 사전 한 번 + iloc 슬라이스이며, 결과는 조건 → 참가자 → 시각 순이고 원래 인덱스 라벨을 유지한다.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        n = len(df)
+        self.levels, key = [], np.zeros(n, dtype=np.int64)
+        self._sizes = []
+        for col in PARTITION_KEYS:
+            codes, cats = _codes(df[col]) if col in df.columns else (np.full(n, -1, dtype=np.int64), pd.Index([]))
+            self.levels.append(cats)
+            self._sizes.append(len(cats) + 1)       # +1: 결측(-1) 자리
+            key = key * self._sizes[-1] + (codes + 1)
+        t = df["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        self.order = np.lexsort((np.arange(n), t, key))
+        self.frame = df.iloc[self.order]
+        sorted_key = key[self.order]
+
+        self._bounds = []
+        for depth in range(1, len(PARTITION_KEYS) + 1):
+            prefix = sorted_key // int(np.prod(self._sizes[depth:], dtype=np.int64))
+            starts = np.flatnonzero(np.r_[True, prefix[1:] != prefix[:-1]]) if n else np.zeros(0, dtype=np.int64)
+            ends = np.r_[starts[1:], n]
+            self._bounds.append(dict(zip(prefix[starts].tolist(), zip(starts.tolist(), ends.tolist()))))
+
+    def bounds(self, *values) -> tuple:
+        """키 접두사 값(유형[, 조건[, 참가자]]) → 정렬본 안의 [lo, hi). 없는 값이면 (0, 0)."""
+        prefix = 0
+        for value, cats, size in zip(values, self.levels, self._sizes):
+            code = cats.get_indexer([value])[0] if len(cats) else -1
+            if code < 0:
+                return 0, 0
+            prefix = prefix * size + code + 1
+        return self._bounds[len(values) - 1].get(prefix, (0, 0))
+
+    def get(self, event_type: str, condition: str = None, participant_id: str = None) -> pd.DataFrame:
+        """분할 하나 (조건 없이 참가자만 주면 유형 분할 안에서 거름)."""
+        if condition is None and participant_id is not None:
+            block = self.get(event_type)
+            return block[block["participant_id"] == participant_id]
+        values = [v for v in (event_type, condition, participant_id) if v is not None]
+        lo, hi = self.bounds(*values)
+        return self.frame.iloc[lo:hi]
+
+    def positions(self, event_types, condition: str = None) -> np.ndarray:
+        """여러 유형 분할에 속한 행의 원래 위치 (오름차순)."""
+        parts = []
+        for event_type in event_types:
+            lo, hi = self.bounds(event_type) if condition is None else self.bounds(event_type, condition)
+            parts.append(self.order[lo:hi])
+        return np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+
+
+# ──────────────────────────────────────────────
+# 2. 파생 테이블
+# ──────────────────────────────────────────────
+
+
+class EventTables:
+    """이벤트 테이블 하나에 대한 파생 테이블 모음 (지연 계산 + 메모이즈)."""
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = weakref.ref(df)
+        self._subsets = {}
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df()
+
+    @cached_property
+    def index(self) -> PartitionIndex:
+        """(event_type, condition, participant_id) 분할 색인 (처음 요청될 때 한 번 정렬)."""
+        return PartitionIndex(self.df)
+
+    def partition(self, event_type: str, condition: str = None, participant_id: str = None) -> pd.DataFrame:
+        """유형 하나(+ 조건, 참가자)의 연속 블록 (조건 → 참가자 → 시각 순)."""
+        return self.index.get(event_type, condition, participant_id)
+
+    def subset(self, event_type=None, condition: str = None) -> pd.DataFrame:
+        """event_type(문자열 또는 목록) / condition 으로 거른 부분 테이블.
+
+        유형 하나면 분할 색인의 연속 블록, 여러 유형이면 해당 분할들의 행을 원래 순서로 모은 테이블.
+        """
+        if event_type is None or isinstance(event_type, str):
+            types = event_type
+        else:
+            types = tuple(event_type)
+        if types is None and condition is None:
+            return self.df
+        key = (types, condition)
+        if key not in self._subsets:
+            if types is None:
+                self._subsets[key] = self.df[self.df["condition"] == condition]
+            elif isinstance(types, str):
+                self._subsets[key] = self.partition(types, condition)
+            else:
+                self._subsets[key] = self.df.iloc[self.index.positions(types, condition)]
+        return self._subsets[key]
+
+    @property
+    def hybrid(self) -> pd.DataFrame:
+        return self.subset(condition="hybrid")
+
+    @property
+    def mission_completes(self) -> pd.DataFrame:
+        return self.subset("MISSION_COMPLETE")
+
+    @cached_property
+    def confidence(self) -> pd.DataFrame:
+        """CONFIDENCE_RATED 이벤트 (confidence_rating 숫자형)."""
+        conf = self.subset("CONFIDENCE_RATED").copy()
+        conf["confidence_rating"] = pd.to_numeric(conf["confidence_rating"], errors="coerce")
+        return conf
+
+    # 시작/종료 이벤트 쌍 구간 (세션별, intervals.pair_spans)
+    @cached_property
+    def beam_spans(self) -> pd.DataFrame:
+        """Beam Pro 화면 사용 구간 (BEAM_SCREEN_ON → OFF)."""
+        return pair_spans(self.subset(["BEAM_SCREEN_ON", "BEAM_SCREEN_OFF", "ROUTE_END"]),
+                          "BEAM_SCREEN_ON", "BEAM_SCREEN_OFF", keep=["waypoint_id"])
+
+    @cached_property
+    def trigger_spans(self) -> pd.DataFrame:
+        """트리거 구간 (TRIGGER_ACTIVATED → DEACTIVATED)."""
+        keep = ["waypoint_id"] + (["trigger_type"] if "trigger_type" in self.df.columns else [])
+        return pair_spans(self.subset(["TRIGGER_ACTIVATED", "TRIGGER_DEACTIVATED", "ROUTE_END"]),
+                          "TRIGGER_ACTIVATED", "TRIGGER_DEACTIVATED", keep=keep)
+
+    @cached_property
+    def pause_spans(self) -> pd.DataFrame:
+        """정지 구간 (PAUSE_START → END)."""
+        return pair_spans(self.subset(["PAUSE_START", "PAUSE_END", "ROUTE_END"]),
+                          "PAUSE_START", "PAUSE_END", keep=["waypoint_id"])
+
+    @cached_property
+    def mission_spans(self) -> pd.DataFrame:
+        """미션 구간 (MISSION_START → COMPLETE)."""
+        keep = ["mission_id"] if "mission_id" in self.df.columns else []
+        return pair_spans(self.subset(["MISSION_START", "MISSION_COMPLETE", "ROUTE_END"]),
+                          "MISSION_START", "MISSION_COMPLETE", keep=keep)
+
+
+# ──────────────────────────────────────────────
+# 3. 이벤트 테이블별 캐시 조회
+# ──────────────────────────────────────────────
+
+_CACHE = {}
+
+
+def tables(df: pd.DataFrame) -> EventTables:
+    """df에 대한 EventTables (같은 객체면 캐시 재사용, df가 해제되면 캐시도 제거)."""
+    key = id(df)
+    hit = _CACHE.get(key)
+    if hit is not None and hit[0]() is df:
+        return hit[1]
+    t = EventTables(df)
+    _CACHE[key] = (weakref.ref(df, lambda _, k=key: _CACHE.pop(k, None)), t)
+    return t
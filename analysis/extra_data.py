@@ -0,0 +1,143 @@
+"""
+extra_data 일괄 디코더
+- 이벤트 로그의 extra_data 컬럼 전체를 한 번에 파싱하여 분석용 타입 컬럼으로 분리
+- EventLogger.cs가 기록하는 JSON과 데모 생성기가 기록하는 Python repr dict 모두 지원
+- eval()을 사용하지 않음 (json → ast.literal_eval 순으로 안전하게 해석)
+"""
+
+import ast
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+# ──────────────────────────────────────────────
+# 1. 디코딩 대상 필드
+# ──────────────────────────────────────────────
+
+# 필드명 → pandas dtype
+EXTRA_FIELDS = {
+    "mission_id": object,
+    "correct": "boolean",
+    "duration_s": "float64",
+    "trigger_type": object,
+    "reaction_time_s": "float64",
+    "pause_duration_s": "float64",
+    "rating": "Int8",
+    "wrong_direction": "boolean",
+}
+
+# Python repr → JSON 변환 규칙 (numpy 스칼라 repr 포함)
+_NP_WRAPPED = re.compile(r"np\.(?:str_|float\d*|int\d*|bool_?)\((.*?)\)(?=[,}\]])")
+_NP_BOOL = re.compile(r"np\.(True|False)_")
+_PY_LITERAL = re.compile(r"(?<=[:\[,] )(True|False|None)(?=[,}\]])")
+_JSON_LITERAL = {"True": "true", "False": "false", "None": "null"}
+# C# TriggerType 열거형 이름(T1_TrackingDegradation 등) → T1
+_TRIGGER_CODE = re.compile(r"^(T\d)(?:_.*)?$")
+
+
+# ──────────────────────────────────────────────
+# 2. 파싱
+# ──────────────────────────────────────────────
+
+def _repr_to_json(text: str) -> str:
+    """Python repr dict 문자열을 JSON 문자열로 변환 (작은따옴표 문자열만 포함된 경우)."""
+    text = _NP_BOOL.sub(r"\1", _NP_WRAPPED.sub(r"\1", text))
+    text = _PY_LITERAL.sub(lambda m: _JSON_LITERAL[m.group(1)], text)
+    return text.replace("'", '"')
+
+
+def _parse_one(text) -> dict:
+    """단일 extra_data 문자열 파싱 (일괄 파싱 실패 시 fallback)."""
+    if not isinstance(text, str) or not text:
+        return {}
+    try:
+        d = json.loads(text)
+    except ValueError:
+        try:
+            d = ast.literal_eval(_NP_BOOL.sub(r"\1", _NP_WRAPPED.sub(r"\1", text)))
+        except (ValueError, SyntaxError):
+            return {}
+    return d if isinstance(d, dict) else {}
+
+
+def parse_extra(values) -> list:
+    """extra_data 값 목록을 dict 목록으로 일괄 파싱.
+
+    고유 문자열만 JSON 배열 하나로 묶어 json.loads 한 번에 해석하고,
+    배열 파싱이 실패하면 문자열별 파싱으로 대체한다.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    texts = []
+    for u in uniques:
+        u = u.strip() if isinstance(u, str) else ""
+        if not u.startswith("{"):
+            u = "{}"
+        elif '"' not in u and "'" in u:
+            u = _repr_to_json(u)
+        texts.append(u)
+
+    try:
+        parsed = json.loads("[" + ",".join(texts) + "]") if texts else []
+        if any(not isinstance(d, dict) for d in parsed):
+            raise ValueError
+    except ValueError:
+        parsed = [_parse_one(u) for u in uniques]
+
+    parsed.append({})  # 결측값(-1) 위치
+    return [parsed[c] for c in codes]
+
+
+# ──────────────────────────────────────────────
+# 3. 타입 컬럼 생성
+# ──────────────────────────────────────────────
+
+def decode_extra(extra: pd.Series) -> pd.DataFrame:
+    """extra_data 컬럼을 EXTRA_FIELDS 타입 컬럼 DataFrame으로 변환 (인덱스 유지)."""
+    dicts = parse_extra(extra.to_numpy(dtype=object))
+    out = {}
+    for field, dtype in EXTRA_FIELDS.items():
+        vals = [d.get(field) for d in dicts]
+        if dtype == "boolean":
+            out[field] = pd.array([_to_bool(v) for v in vals], dtype="boolean")
+        elif dtype is object:
+            out[field] = np.array([None if v is None or v == "" else str(v) for v in vals], dtype=object)
+        else:
+            num = pd.to_numeric(pd.Series(vals, dtype=object), errors="coerce").astype("float64")
+            out[field] = (num.round() if dtype == "Int8" else num).astype(dtype).array
+    result = pd.DataFrame(out, index=extra.index)
+    result["trigger_type"] = result["trigger_type"].map(_trigger_code, na_action="ignore")
+    return result
+
+
+def add_extra_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """이벤트 테이블에 extra_data 디코딩 컬럼을 추가.
+
+    mission_id는 로그의 mission_id 컬럼(현재 진행 중 미션)보다 extra_data 값을 우선한다.
+    """
+    if "extra_data" not in df.columns:
+        df = df.copy()
+        df["extra_data"] = "{}"
+    decoded = decode_extra(df["extra_data"])
+    df = df.drop(columns=[c for c in EXTRA_FIELDS if c in df.columns and c != "mission_id"])
+    if "mission_id" in df.columns:
+        base = df["mission_id"].astype(object).where(df["mission_id"].notna() & (df["mission_id"] != ""), None)
+        decoded["mission_id"] = decoded["mission_id"].where(decoded["mission_id"].notna(), base)
+        df = df.drop(columns=["mission_id"])
+    return pd.concat([df, decoded], axis=1)
+
+
+def _to_bool(v):
+    if isinstance(v, (bool, np.bool_)):
+        return bool(v)
+    if isinstance(v, str) and v.lower() in ("true", "false"):
+        return v.lower() == "true"
+    if isinstance(v, (int, float)) and v in (0, 1):
+        return bool(v)
+    return None
+
+
+def _trigger_code(v):
+    m = _TRIGGER_CODE.match(v)
+    return m.group(1) if m else v
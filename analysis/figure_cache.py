@@ -0,0 +1,245 @@
+"""
+그림(PNG) 내용 주소 캐시
+- 그림 함수의 입력(DataFrame/Series는 값·인덱스·컬럼·dtype 해시, 그 밖의 인자는 repr),
+  함수 코드와 참조하는 모듈 상수(CONDITIONS, CONDITION_LABELS 등), matplotlib rcParams를 묶어 캐시 키를 만든다
+- 키가 같은 그림이 이미 출력 폴더에 있으면 렌더링을 건너뛰고, 출력 파일이 없어졌으면 저장본을 복사해 되살린다
+- 키가 달라지면 다시 그려 출력 파일을 교체하고 저장본을 추가한다
+- 저장본은 OUTPUT_DIR/.figure_cache/ 에 <키>.png로 두고, 전체 크기가 MAX_BYTES를 넘으면 가장 오래 쓰지 않은 것부터 삭제
+
+사용법:
+    @cached_figure("trigger_timeline.png")
+    def plot_trigger_timeline(...):
+        ...
+        fig.savefig(OUTPUT_DIR / "trigger_timeline.png", dpi=150)
+
+run_analyses --jobs로 여러 프로세스가 매니페스트를 동시에 갱신하면 일부 기록이 빠질 수 있지만
+(파일 교체는 원자적) 그 그림을 다음 실행에서 한 번 더 그릴 뿐 결과는 달라지지 않는다.
+출력 폴더는 호출 시점에 그림 함수가 정의된 모듈의 OUTPUT_DIR에서 읽는다 (benchmark의 출력 경로 교체와 호환).
+"""
+
+import functools
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+import types
+from pathlib import Path
+
+import pandas as pd
+
+from lazy_imports import setup_matplotlib
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+CACHE_DIRNAME = ".figure_cache"
+MANIFEST_NAME = "manifest.json"
+CACHE_VERSION = 1
+MAX_BYTES = 64 * 2 ** 20
+# ARNAV_FIGURE_CACHE=0 이면 캐시를 쓰지 않고 항상 다시 그림
+ENABLED = os.environ.get("ARNAV_FIGURE_CACHE", "1") != "0"
+# ARNAV_PLOTS=0 (각 스크립트의 --no-plots) 이면 그림을 만들지 않음 → 통계만 계산하는 실행은 matplotlib을 불러오지 않음
+PLOTS = os.environ.get("ARNAV_PLOTS", "1") != "0"
+
+_CONSTANT_TYPES = (str, int, float, bool, tuple, list, dict, frozenset, type(None))
+
+
+# ──────────────────────────────────────────────
+# 2. 캐시 키
+# ──────────────────────────────────────────────
+
+def _mtime(path: Path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _hash_frame(h, obj):
+    """DataFrame/Series 내용 해시 (값 + 인덱스 + 컬럼 + dtype)."""
+    h.update(type(obj).__name__.encode())
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr(list(obj.columns)).encode())
+        h.update(repr([str(t) for t in obj.dtypes]).encode())
+    else:
+        h.update(repr((obj.name, str(obj.dtype))).encode())
+    h.update(repr(list(obj.index.names)).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    except TypeError:
+        # 리스트·dict 등 해시할 수 없는 값이 들어 있는 컬럼
+        h.update(pickle.dumps(obj, protocol=4))
+
+
+def _hash_code(h, code: types.CodeType, names: set):
+    """함수 본문 해시. 중첩 함수·컴프리헨션 코드도 재귀로 포함하고 참조한 전역 이름을 모은다."""
+    h.update(code.co_code)
+    names.update(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(h, const, names)
+        else:
+            h.update(repr(const).encode())
+
+
+def figure_key(fn, args: tuple, kwargs: dict, ignore: tuple = ()) -> str:
+    """그림 함수 호출의 캐시 키 (sha256 hex)."""
+    h = hashlib.sha256(f"v{CACHE_VERSION}:{fn.__module__}.{fn.__qualname__}".encode())
+    names = set()
+    _hash_code(h, fn.__code__, names)
+    h.update(repr((fn.__defaults__, fn.__kwdefaults__)).encode())
+    # 그림에 들어가는 모듈 상수 (조건 라벨, 트리거 웨이포인트 등)
+    for name in sorted(names):
+        value = fn.__globals__.get(name)
+        if isinstance(value, _CONSTANT_TYPES) and not name.startswith("__"):
+            h.update(f"{name}={value!r}".encode())
+
+    bound = dict(zip(fn.__code__.co_varnames[:fn.__code__.co_argcount], args))
+    bound.update(kwargs)
+    for name in sorted(bound):
+        if name in ignore:
+            continue
+        value = bound[name]
+        h.update(name.encode())
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            _hash_frame(h, value)
+        else:
+            h.update(repr(value).encode())
+
+    # 글꼴·색상·선 굵기 등 스타일 설정 (백엔드·한글 글꼴 설정 후)
+    setup_matplotlib()
+    import matplotlib
+    h.update(matplotlib.__version__.encode())
+    params = matplotlib.rcParams
+    h.update(repr([(k, params[k]) for k in sorted(params.keys()) if k != "backend"]).encode())
+    return h.hexdigest()
+
+
+# ──────────────────────────────────────────────
+# 3. 저장소 (LRU)
+# ──────────────────────────────────────────────
+
+class FigureStore:
+    """OUTPUT_DIR/.figure_cache/ 저장본과 매니페스트.
+
+    매니페스트: {"version", "entries": {키: {"name", "bytes", "last_used"}}, "figures": {파일명: 키}}
+    figures는 출력 폴더의 각 PNG가 어떤 키로 그려졌는지 기록한다.
+    """
+
+    def __init__(self, output_dir: Path, max_bytes: int = MAX_BYTES):
+        self.output_dir = Path(output_dir)
+        self.dir = self.output_dir / CACHE_DIRNAME
+        self.max_bytes = max_bytes
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self) -> dict:
+        path = self.dir / MANIFEST_NAME
+        try:
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = None
+        if not manifest or manifest.get("version") != CACHE_VERSION:
+            manifest = {"version": CACHE_VERSION, "entries": {}, "figures": {}}
+        return manifest
+
+    def _write_manifest(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / (MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps(self.manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.dir / MANIFEST_NAME)
+
+    def blob(self, key: str) -> Path:
+        return self.dir / f"{key}.png"
+
+    def restore(self, name: str, key: str) -> bool:
+        """키의 그림을 출력 파일로 준비. 이미 같은 그림이면 그대로, 출력 파일이 없거나 다르면 저장본을 복사.
+
+        저장본이 없으면 False (다시 그려야 함).
+        """
+        entry = self.manifest["entries"].get(key)
+        blob = self.blob(key)
+        if entry is None or not blob.exists():
+            return False
+        out = self.output_dir / name
+        current = (self.manifest["figures"].get(name) == key and out.exists()
+                   and out.stat().st_size == entry["bytes"])
+        if not current:
+            shutil.copyfile(blob, out)
+            self.manifest["figures"][name] = key
+        entry["last_used"] = time.time()
+        self._write_manifest()
+        return True
+
+    def add(self, name: str, key: str):
+        """방금 그린 출력 파일을 저장본으로 추가하고 크기 한도를 넘는 오래된 저장본을 정리."""
+        out = self.output_dir / name
+        if not out.exists():
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(out, self.blob(key))
+        self.manifest["entries"][key] = {"name": name, "bytes": out.stat().st_size, "last_used": time.time()}
+        self.manifest["figures"][name] = key
+        self.evict()
+        self._write_manifest()
+
+    def evict(self):
+        entries = self.manifest["entries"]
+        total = sum(e["bytes"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entries.pop(key)["bytes"]
+            self.blob(key).unlink(missing_ok=True)
+        self.manifest["figures"] = {n: k for n, k in self.manifest["figures"].items() if k in entries}
+
+
+# ──────────────────────────────────────────────
+# 4. 데코레이터
+# ──────────────────────────────────────────────
+
+def cached_figure(name: str, ignore: tuple = ()):
+    """OUTPUT_DIR / name 에 PNG를 저장하는 그림 함수에 캐시를 적용.
+
+    ignore: 그림에 쓰이지 않아 키에서 뺄 인자 이름.
+    PLOTS가 False면 그림 함수를 호출하지 않는다. 그림 함수가 입력이 비어 파일을 만들지 않고 반환하면 아무것도 저장하지 않는다.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PLOTS:
+                return None
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            store = FigureStore(fn.__globals__["OUTPUT_DIR"])
+            key = figure_key(fn, args, kwargs, ignore)
+            if store.restore(name, key):
+                print(f"  → {store.output_dir / name} 변경 없음 (캐시)")
+                return None
+            out = store.output_dir / name
+            before = _mtime(out)
+            result = fn(*args, **kwargs)
+            if _mtime(out) != before:
+                store.add(name, key)
+            return result
+        return wrapper
+    return decorate
+
+
+# ──────────────────────────────────────────────
+# 5. 명령행 옵션
+# ──────────────────────────────────────────────
+
+def add_plot_argument(parser):
+    """--no-plots 옵션 추가 (apply_plot_argument와 함께 사용)."""
+    parser.add_argument("--no-plots", action="store_true", help="그림 생략 (통계·CSV만; ARNAV_PLOTS=0과 같음)")
+
+
+def apply_plot_argument(args):
+    """--no-plots이면 그림을 끔. 작업 프로세스(spawn)에도 전달되도록 환경 변수로도 지정."""
+    global PLOTS
+    if args.no_plots:
+        os.environ["ARNAV_PLOTS"] = "0"
+        PLOTS = False
@@ -0,0 +1,106 @@
+"""
+집단별 상관 계산 커널 (Pearson / point-biserial 일괄)
+- 집단(예: 참가자 × 조건) × 변수 쌍마다 n, Σx, Σy, Σxy, Σx², Σy² 를 groupby 한 번으로 모은 뒤
+  r, t, p를 배열 연산으로 계산 → 집단별 scipy 호출 없음
+- point-biserial r은 0/1 변수와의 Pearson r이므로 같은 커널을 사용
+- x 또는 y의 NaN은 해당 변수 쌍에서만 제외 (pairwise)
+- 분산 0(값이 모두 같음)·표본 부족 집단은 경고 없이 r, p = NaN으로 두고 status 컬럼에 사유 기록
+  (ok / too_few / constant_x / constant_y)
+"""
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import stats
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+MIN_N = 3
+STATUS_OK = "ok"
+STATUS_TOO_FEW = "too_few"
+STATUS_CONSTANT_X = "constant_x"
+STATUS_CONSTANT_Y = "constant_y"
+
+
+# ──────────────────────────────────────────────
+# 2. 커널
+# ──────────────────────────────────────────────
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def r_from_sums(n: np.ndarray, sx: np.ndarray, sy: np.ndarray, sxy: np.ndarray,
+                sxx: np.ndarray, syy: np.ndarray) -> tuple:
+    """합계 배열 → (r, p). 분산이 0이거나 n < 3이면 NaN."""
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        r = np.where((var_x > 0) & (var_y > 0) & (n >= 3), r, np.nan)
+        dof = n - 2
+        t = r * np.sqrt(dof / ((1 - r) * (1 + r)))
+        p = 2 * stats.t.sf(np.abs(t), dof)
+    return r, np.where(np.isnan(r), np.nan, p)
+
+
+def grouped_corr(frame: pd.DataFrame, x: str, ys, by=None, min_n: int = MIN_N) -> pd.DataFrame:
+    """x와 ys 각 변수의 상관을 by 집단별로 한 번에 계산.
+
+    반환 컬럼: by..., y, n(유효 쌍 수), r, p, status. by가 없으면 전체를 한 집단으로 본다.
+    집단 순서는 groupby(sort=True)와 같고, 유효 쌍이 없는 집단도 n=0, status=too_few 행으로 남긴다.
+    """
+    ys, by = _as_list(ys), _as_list(by)
+    work = frame[by].copy() if by else pd.DataFrame(index=frame.index)
+    work["_x"] = pd.to_numeric(frame[x], errors="coerce").astype("float64")
+    for y in ys:
+        work[y] = pd.to_numeric(frame[y], errors="coerce").astype("float64")
+    long = work.melt(id_vars=by + ["_x"], value_vars=ys, var_name="y", value_name="_y")
+
+    valid = long["_x"].notna() & long["_y"].notna()
+    cx, cy = long["_x"].where(valid), long["_y"].where(valid)
+    # 전체 평균으로 원점을 옮겨 합계 공식의 자릿수 손실을 줄임 (상관은 평행이동 불변)
+    cx, cy = cx - cx.mean(), cy - cy.mean()
+    parts = pd.DataFrame({
+        "n": valid.astype(np.int64),
+        "sx": cx.fillna(0.0), "sy": cy.fillna(0.0),
+        "sxy": (cx * cy).fillna(0.0), "sxx": (cx * cx).fillna(0.0), "syy": (cy * cy).fillna(0.0),
+        "x_min": cx, "x_max": cx, "y_min": cy, "y_max": cy,
+    })
+    keys = [long[c] for c in by + ["y"]]
+    agg = parts.groupby(keys, observed=True, sort=True).agg(
+        n=("n", "sum"), sx=("sx", "sum"), sy=("sy", "sum"), sxy=("sxy", "sum"),
+        sxx=("sxx", "sum"), syy=("syy", "sum"),
+        x_min=("x_min", "min"), x_max=("x_max", "max"), y_min=("y_min", "min"), y_max=("y_max", "max"),
+    )
+
+    n = agg["n"].to_numpy()
+    r, p = r_from_sums(n, *(agg[c].to_numpy() for c in ["sx", "sy", "sxy", "sxx", "syy"]))
+    # 분산 0 판정은 합계가 아니라 최솟값 = 최댓값으로 (부동소수 잔차에 흔들리지 않게)
+    status = np.select(
+        [n < max(min_n, 3), (agg["x_min"] == agg["x_max"]).to_numpy(), (agg["y_min"] == agg["y_max"]).to_numpy()],
+        [STATUS_TOO_FEW, STATUS_CONSTANT_X, STATUS_CONSTANT_Y],
+        default=STATUS_OK,
+    )
+    ok = status == STATUS_OK
+    out = agg.index.to_frame(index=False)
+    out["n"] = n
+    out["r"] = np.where(ok, r, np.nan)
+    out["p"] = np.where(ok, p, np.nan)
+    out["status"] = status
+    return out
+
+
+def corr(frame: pd.DataFrame, x: str, y: str, min_n: int = MIN_N) -> tuple:
+    """집단 없이 x, y 한 쌍의 (r, p, n)."""
+    result = grouped_corr(frame, x, y, min_n=min_n)
+    if result.empty:
+        return np.nan, np.nan, 0
+    row = result.iloc[0]
+    return row["r"], row["p"], int(row["n"])
@@ -0,0 +1,335 @@
+"""
+고빈도 머리 자세 스트림(.hpose) 읽기 / 이벤트 정렬
+- HeadTracker가 세션마다 data/raw/headpose/{이벤트 로그와 같은 파일명}.hpose 에 60–90 Hz로 기록
+- 헤더 32 bytes + 고정 폭 24 bytes 레코드 (timestamp_us int64, rot_x/rot_y/rot_z float32, flags uint32; little-endian)
+  timestamp_us는 EventLogger timestamp 컬럼과 같은 로컬 시각 기준 → datetime64[us]로 그대로 비교
+- np.memmap으로 열어 시각·회전 컬럼을 복사 없는 NumPy 배열(view)로 노출. 기록 중인 파일은 완결된 레코드까지만 읽음
+- 이벤트 시각 → 샘플 위치 정렬과 이벤트 주변 창의 샘플 구간을 searchsorted로 일괄 계산하고,
+  창 통계(고개 숙임 비율 등)는 누적합으로 창마다 O(1)
+- 스트림은 EventLogger 세션(참가자)마다 하나이고 두 조건을 이어 담으므로, 샘플의 조건은 파일명이 아니라
+  이벤트 로그의 condition 값이 이어지는 구간(첫 이벤트 ~ 마지막 이벤트)으로 나눔 (sample_conditions / condition_segments)
+- 결과: analysis/output/head_pose_summary.csv (스트림 × 조건별 샘플 수, 실측 주기, 트리거 전후 고개 숙임 비율)
+
+사용법:
+    python analysis/head_pose.py               # data/raw/headpose/*.hpose 요약
+    python analysis/head_pose.py --demo        # 합성 이벤트 + 합성 스트림(72 Hz)으로 요약
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import event_store
+import profiling
+from event_tables import tables
+
+# ──────────────────────────────────────────────
+# 1. 형식 / 설정
+# ──────────────────────────────────────────────
+
+POSE_DIR = event_store.RAW_DIR / "headpose"
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+SUFFIX = ".hpose"
+MAGIC = b"ARHPOSE1"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"), ("header_size", "<u4"), ("record_size", "<u4"),
+    ("sample_rate", "<f4"), ("reserved", "<u4"), ("session_start_us", "<i8"),
+])
+RECORD_DTYPE = np.dtype([
+    ("t_us", "<i8"), ("rot_x", "<f4"), ("rot_y", "<f4"), ("rot_z", "<f4"), ("flags", "<u4"),
+])
+FLAG_XR_DEVICE = 1
+
+# 고개 숙임 판정: 부호 있는 pitch(아래가 +)가 이 값 이상이면 Beam Pro를 내려다보는 것으로 봄
+HEAD_DOWN_PITCH = 25.0
+GLANCE_WINDOW = (0.0, 10.0)     # 트리거 기준 창 (전, 후; 초)
+
+
+def pose_files(pose_dir: Path = POSE_DIR) -> list:
+    """머리 자세 스트림 파일 목록 (파일명 정렬)."""
+    return sorted(Path(pose_dir).glob(f"P*_*{SUFFIX}"))
+
+
+def pose_path(raw_csv: Path, pose_dir: Path = POSE_DIR) -> Path:
+    """이벤트 로그 CSV에 대응하는 스트림 경로."""
+    return Path(pose_dir) / Path(raw_csv).with_suffix(SUFFIX).name
+
+
+def signed_pitch(rot_x: np.ndarray) -> np.ndarray:
+    """Unity 오일러 x(0–360) → 부호 있는 pitch(−180–180, 아래가 +)."""
+    return (np.asarray(rot_x, dtype=np.float32) + 180) % 360 - 180
+
+
+# ──────────────────────────────────────────────
+# 2. 기록 / 읽기
+# ──────────────────────────────────────────────
+
+def write_stream(path: Path, t_us: np.ndarray, rotation: np.ndarray, sample_rate: float,
+                 flags: int = FLAG_XR_DEVICE) -> Path:
+    """HeadPoseWriter와 같은 형식으로 스트림 기록 (합성 데이터·변환용)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = np.zeros(1, HEADER_DTYPE)
+    header[0] = (MAGIC, HEADER_DTYPE.itemsize, RECORD_DTYPE.itemsize, sample_rate, 0,
+                 int(t_us[0]) if len(t_us) else 0)
+    records = np.empty(len(t_us), RECORD_DTYPE)
+    records["t_us"] = t_us
+    records["rot_x"], records["rot_y"], records["rot_z"] = np.asarray(rotation, dtype=np.float32).T
+    records["flags"] = flags
+    with open(path, "wb") as f:
+        header.tofile(f)
+        records.tofile(f)
+    return path
+
+
+class HeadPoseStream:
+    """메모리 맵 머리 자세 스트림. 컬럼 속성은 파일을 가리키는 view (복사 없음)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        header = np.fromfile(self.path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header["magic"][0] != MAGIC:
+            raise ValueError(f"머리 자세 스트림 형식이 아님: {self.path}")
+        if header["record_size"][0] != RECORD_DTYPE.itemsize:
+            raise ValueError(f"지원하지 않는 레코드 크기 {header['record_size'][0]}: {self.path}")
+        offset = int(header["header_size"][0])
+        self.sample_rate = float(header["sample_rate"][0])
+        # 기록 중이면 마지막 레코드가 잘려 있을 수 있으므로 완결된 레코드까지만
+        n = (self.path.stat().st_size - offset) // RECORD_DTYPE.itemsize
+        self.records = (np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=offset, shape=(n,))
+                        if n > 0 else np.zeros(0, RECORD_DTYPE))
+        info = event_store.parse_raw_name(self.path) or {}
+        self.participant_id = info.get("participant_id")
+        # 파일명의 조건은 세션 첫 조건일 뿐 → 샘플별 조건은 sample_conditions(stream, events)
+        self.condition = info.get("condition")
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def t_us(self) -> np.ndarray:
+        return self.records["t_us"]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.t_us.view("datetime64[us]")
+
+    @property
+    def rot_x(self) -> np.ndarray:
+        return self.records["rot_x"]
+
+    @property
+    def rot_y(self) -> np.ndarray:
+        return self.records["rot_y"]
+
+    @property
+    def rot_z(self) -> np.ndarray:
+        return self.records["rot_z"]
+
+    @property
+    def pitch(self) -> np.ndarray:
+        return signed_pitch(self.rot_x)
+
+    @property
+    def duration_s(self) -> float:
+        return (int(self.t_us[-1]) - int(self.t_us[0])) / 1e6 if len(self) > 1 else 0.0
+
+    @property
+    def measured_rate(self) -> float:
+        return (len(self) - 1) / self.duration_s if self.duration_s > 0 else float("nan")
+
+    # ── 이벤트 정렬 ──
+
+    def locate(self, times) -> np.ndarray:
+        """각 시각 직전(같은 시각 포함) 샘플 위치 (스트림 시작 전이면 −1)."""
+        return np.searchsorted(self.t_us, _to_us(times), side="right") - 1
+
+    def window_bounds(self, times, before: float, after: float) -> tuple:
+        """각 시각 기준 [t − before, t + after) 창의 샘플 구간 (lo, hi)."""
+        t = _to_us(times)
+        lo = np.searchsorted(self.t_us, t - int(before * 1e6), side="left")
+        hi = np.searchsorted(self.t_us, t + int(after * 1e6), side="left")
+        return lo, np.maximum(hi, lo)
+
+    def window_mean(self, values: np.ndarray, times, before: float, after: float) -> np.ndarray:
+        """창마다 values 평균 (샘플이 없으면 NaN). 누적합 한 번으로 모든 창을 계산."""
+        lo, hi = self.window_bounds(times, before, after)
+        cs = np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(hi > lo, (cs[hi] - cs[lo]) / (hi - lo), np.nan)
+
+
+def _to_us(times) -> np.ndarray:
+    if isinstance(times, pd.Series):
+        times = times.to_numpy()
+    return np.asarray(times, dtype="datetime64[us]").astype(np.int64)
+
+
+def align_events(events: pd.DataFrame, stream: HeadPoseStream, max_gap: float = 0.5) -> pd.DataFrame:
+    """이벤트마다 직전 스트림 샘플의 회전값 (max_gap초보다 멀면 NaN). events 인덱스 유지."""
+    pos = stream.locate(events["timestamp"])
+    ok = pos >= 0
+    safe = np.maximum(pos, 0)
+    if len(stream):
+        ok &= (_to_us(events["timestamp"]) - stream.t_us[safe]) <= max_gap * 1e6
+    else:
+        ok[:] = False
+    out = pd.DataFrame(index=events.index)
+    for col in ["rot_x", "rot_y", "rot_z"]:
+        out[f"pose_{col}"] = np.where(ok, getattr(stream, col)[safe] if len(stream) else np.nan, np.nan)
+    out["pose_pitch"] = signed_pitch(out["pose_rot_x"].to_numpy())
+    return out
+
+
+def sample_conditions(stream: HeadPoseStream, events: pd.DataFrame = None) -> np.ndarray:
+    """샘플마다 조건. 그 참가자 이벤트에서 condition 값이 이어지는 블록 [첫 이벤트, 마지막 이벤트]로 searchsorted.
+
+    첫 이벤트 전 샘플은 첫 조건, 블록의 마지막 이벤트 뒤(다음 조건 전 공백·마지막 블록 뒤) 샘플은 None,
+    이벤트가 없으면 파일명의 조건.
+    """
+    fallback = np.full(len(stream), stream.condition, dtype=object)
+    if events is None or events.empty or not len(stream) or stream.participant_id is None:
+        return fallback
+    ev = events.loc[(events["participant_id"] == stream.participant_id) & events["condition"].notna()
+                    & events["timestamp"].notna(), ["timestamp", "condition"]]
+    if ev.empty:
+        return fallback
+    ev = ev.sort_values("timestamp", kind="stable")
+    cond = ev["condition"].astype(object).to_numpy()
+    t_us = _to_us(ev["timestamp"])
+    change = np.r_[True, cond[1:] != cond[:-1]]
+    last = np.r_[change[1:], True]
+    pos = np.maximum(np.searchsorted(t_us[change], stream.t_us, side="right") - 1, 0)
+    out = cond[change][pos]
+    out[stream.t_us > t_us[last][pos]] = None
+    return out
+
+
+def condition_segments(stream: HeadPoseStream, events: pd.DataFrame = None) -> list:
+    """조건이 이어지는 샘플 구간 [(condition, lo, hi), ...] (시각 순, hi 미포함, 조건 없는 샘플 제외)."""
+    cond = sample_conditions(stream, events)
+    if not len(cond):
+        return []
+    bounds = np.r_[0, np.flatnonzero(cond[1:] != cond[:-1]) + 1, len(cond)]
+    return [(cond[lo], int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if cond[lo] is not None]
+
+
+def boundary_events(events: pd.DataFrame = None) -> pd.DataFrame:
+    """조건 구간을 나눌 이벤트 (저장소 로드 경로용, 없으면 None).
+
+    필터에 조건·경로 항목이 있으면 events에는 선택한 조건의 행만 남아 그 조건이 스트림 전체로 번지므로,
+    참가자·시작 시각 항목만 남긴 필터로 세션 전체를 다시 읽어 경계를 만든다 (선택하지 않은 구간은 호출 측에서 버림).
+    """
+    if events is not None and not any(k in event_store.FILTER for k in ("conditions", "routes")):
+        return events
+    bounds = event_store.load_events(filters=event_store.session_filter())
+    return None if bounds.empty else bounds[["timestamp", "participant_id", "condition"]]
+
+
+def selected_sessions(events: pd.DataFrame) -> set:
+    """필터로 고른 (참가자, 조건) 집합. 조건·경로 필터가 없으면 None (모든 구간 사용)."""
+    if events is None or not any(k in event_store.FILTER for k in ("conditions", "routes")):
+        return None
+    return set(events[["participant_id", "condition"]].astype(object).drop_duplicates()
+               .itertuples(index=False, name=None))
+
+
+# ──────────────────────────────────────────────
+# 3. 세션 요약
+# ──────────────────────────────────────────────
+
+def summarize_stream(stream: HeadPoseStream, events: pd.DataFrame = None,
+                     threshold: float = HEAD_DOWN_PITCH, window: tuple = GLANCE_WINDOW,
+                     bounds: pd.DataFrame = None, sessions: set = None) -> list:
+    """스트림 하나의 조건 구간별 요약 행 목록: 샘플 수, 실측 주기, 전체 / 트리거 창 고개 숙임 비율.
+
+    조건 구간은 bounds(없으면 events)로 나누고, sessions가 있으면 그 (참가자, 조건) 구간만.
+    트리거는 그 조건 구간 안의 같은 조건 TRIGGER_ACTIVATED만 정렬한다.
+    """
+    down = (stream.pitch >= threshold).astype(np.float32)
+    rows = []
+    segments = condition_segments(stream, events if bounds is None else bounds) or [(stream.condition, 0, 0)]
+    for condition, lo, hi in segments:
+        if sessions is not None and (stream.participant_id, condition) not in sessions:
+            continue
+        t_us = stream.t_us[lo:hi]
+        duration_s = (int(t_us[-1]) - int(t_us[0])) / 1e6 if hi - lo > 1 else 0.0
+        row = {
+            "participant_id": stream.participant_id, "condition": condition,
+            "samples": hi - lo, "duration_s": round(duration_s, 1),
+            "rate_hz": round((hi - lo - 1) / duration_s, 1) if duration_s > 0 else np.nan,
+            "head_down_share": float(down[lo:hi].mean()) if hi > lo else np.nan,
+            "n_triggers": 0, "trigger_head_down_share": np.nan,
+        }
+        if events is not None and hi > lo:
+            session = tables(events).partition("TRIGGER_ACTIVATED", condition, stream.participant_id)
+            t = session["timestamp"].to_numpy(dtype="datetime64[us]")
+            t = t[(t >= stream.timestamps[lo]) & (t <= stream.timestamps[hi - 1])]
+            if len(t):
+                share = stream.window_mean(down, t, *window)
+                row["n_triggers"] = len(t)
+                row["trigger_head_down_share"] = float(np.nanmean(share))
+        rows.append(row)
+    return rows
+
+
+def _demo_streams(out_dir: Path, rate: float = 72.0) -> tuple:
+    """합성 이벤트 세션마다 BEAM_SCREEN_ON 시각에 고개를 숙이고 TRIGGER_ACTIVATED 시각에 훑어보는 합성 스트림 기록."""
+    import synthetic
+
+    events = synthetic.generate_events(n_participants=4, seed=42)
+    sessions = events.groupby(["participant_id", "condition"], observed=True)
+    paths = []
+    for i, ((pid, cond), grp) in enumerate(sessions):
+        glances = grp.loc[grp["event_type"] == "BEAM_SCREEN_ON", "timestamp"].to_numpy()
+        scans = grp.loc[grp["event_type"] == "TRIGGER_ACTIVATED", "timestamp"].to_numpy()
+        t_us, rot = synthetic.generate_head_pose(grp["timestamp"].min(), grp["timestamp"].max(), glances,
+                                                 rate=rate, seed=i, scan_times=scans)
+        name = f"{pid}_{synthetic.FILE_CONDITION_NAMES[cond]}_demo_20260315_100000{SUFFIX}"
+        paths.append(write_stream(out_dir / name, t_us, rot, rate))
+    return paths, events
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="머리 자세 스트림(.hpose) 요약")
+    parser.add_argument("--pose-dir", type=Path, default=POSE_DIR)
+    parser.add_argument("--demo", action="store_true", help="합성 이벤트 + 합성 스트림으로 실행")
+    parser.add_argument("--threshold", type=float, default=HEAD_DOWN_PITCH, help="고개 숙임 pitch 기준 (도)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR / "head_pose_summary.csv")
+    event_store.add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+    event_store.apply_filter_arguments(parser, args)
+
+    if args.demo:
+        paths, events = _demo_streams(event_store.PROCESSED_DIR / "headpose_demo")
+    else:
+        paths = event_store.select_files(pose_files(args.pose_dir))
+        if not paths:
+            print(f"[경고] {args.pose_dir}에 머리 자세 스트림 없음 (--demo로 합성 스트림 사용 가능)")
+            return
+        events = event_store.load_events()
+        events = None if events.empty else events
+    bounds = None if args.demo else boundary_events(events)
+    sessions = None if args.demo else selected_sessions(events)
+
+    print(f"\n=== 머리 자세 스트림 요약 (고개 숙임: pitch ≥ {args.threshold:.0f}°) ===")
+    rows = []
+    for path in paths:
+        stream = HeadPoseStream(path)
+        for row in summarize_stream(stream, events, args.threshold, bounds=bounds, sessions=sessions):
+            rows.append(row)
+            trig = (f", 트리거 후 {GLANCE_WINDOW[1]:.0f}초 고개 숙임 {row['trigger_head_down_share']:.1%}"
+                    f" (n={row['n_triggers']})" if row["n_triggers"] else "")
+            print(f"  {path.name} [{row['condition']}]: {row['samples']:,} 샘플 / {row['duration_s']:.0f}s / "
+                  f"{row['rate_hz']} Hz, 고개 숙임 {row['head_down_share']:.1%}{trig}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows).to_csv(args.output, index=False)
+    print(f"\n  → {args.output} 저장")
+
+
+if __name__ == "__main__":
+    with profiling.session("head_pose"):
+        main()
@@ -0,0 +1,291 @@
+"""
+참가자 × 조건 지표 증분 재계산
+- 참가자 단위 지표(전환 횟수, CVI, 정지 횟수/시간, 과제 완료 시간, calibration r)를
+  data/processed/participant_metrics/ 에 참가자 × 조건 행 단위로 캐시
+- 캐시 키: 해당 참가자 × 조건 분할을 가진 원본 로그 파일들의 내용 해시 (저장소 manifest의 sha1 조합)
+  (EventLogger 파일은 세션 첫 조건으로 이름이 붙지만 두 조건의 행이 함께 기록되므로 파일명이 아니라 manifest 분할 기준)
+- 새로 들어오거나 바뀐 참가자 × 조건만 저장소 분할에서 참가자 묶음씩 읽어 다시 계산하고, 조건별 집단 통계와 대응 비교는 캐시 전체에서 다시 집계
+- 결과 CSV는 전체 분석과 같은 경로(device_switching_summary.csv, cvi_summary.csv, calibration_summary.csv)
+
+사용법:
+    python analysis/incremental.py             # 바뀐 참가자만 재계산 후 집계
+    python analysis/incremental.py --rebuild   # 캐시 무시하고 전체 재계산
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+import event_store
+import profiling
+from analyze_device_switching import (
+    CONDITIONS, CONDITION_LABELS, N_PARTICIPANTS, OUTPUT_DIR,
+    completion_metrics, cvi_metrics, pause_metrics, run_paired_test, switching_metrics,
+)
+from analyze_trust_performance import (
+    _run_paired_test, calibration_index, load_confidence_from_events, mission_accuracy,
+)
+
+# ──────────────────────────────────────────────
+# 1. 설정 / 지표 정의
+# ──────────────────────────────────────────────
+
+CACHE_DIR = event_store.PROCESSED_DIR / "participant_metrics"
+STATE_NAME = "state.json"
+
+# 지표 계산 로직이 바뀌면 올려서 캐시 전체를 재계산
+CACHE_VERSION = 4
+
+KEY_COLUMNS = ["participant_id", "condition"]
+
+
+def _hybrid_only(metric_df: pd.DataFrame) -> pd.DataFrame:
+    metric_df = metric_df.copy()
+    metric_df.insert(1, "condition", "hybrid")
+    return metric_df
+
+
+def _calibration(df: pd.DataFrame) -> pd.DataFrame:
+    return calibration_index(load_confidence_from_events(df), mission_accuracy(df))
+
+
+# 지표 이름 → 계산 함수 (이벤트 테이블 → participant_id, condition 컬럼을 포함한 참가자 × 조건 테이블)
+METRICS = {
+    "switching": lambda df: _hybrid_only(switching_metrics(df)),
+    "cvi": lambda df: _hybrid_only(cvi_metrics(df)),
+    "pauses": pause_metrics,
+    "completion": completion_metrics,
+    "calibration": _calibration,
+}
+
+
+# ──────────────────────────────────────────────
+# 2. 참가자 × 조건 지문
+# ──────────────────────────────────────────────
+
+def _key_str(key: tuple) -> str:
+    return "/".join(key)
+
+
+def participant_files(raw_dir: Path = event_store.RAW_DIR) -> dict:
+    """(participant_id, condition) → 그 분할을 가진 원본 파일 목록 (저장소 manifest의 분할 기준, 파일 선택 필터 밖은 제외).
+
+    한 원본 파일이 여러 참가자 × 조건 분할을 만들 수 있으므로 (세션 파일에는 두 조건이 함께 기록됨)
+    파일 하나가 바뀌면 그 파일이 만든 모든 참가자 × 조건의 지문이 바뀐다.
+    """
+    parts = event_store.partitions(raw_dir)
+    groups = {}
+    for (pid, cond), grp in parts.groupby(KEY_COLUMNS, sort=True):
+        groups[(str(pid), str(cond))] = [Path(raw_dir) / name for name in sorted(grp["file"].unique())]
+    return groups
+
+
+def fingerprints(groups: dict, manifest: dict) -> dict:
+    """참가자 × 조건별 원본 파일 (이름, sha1) 조합의 해시."""
+    entries = manifest["files"]
+    result = {}
+    for key, files in groups.items():
+        h = hashlib.sha1()
+        for f in sorted(files):
+            h.update(f"{f.name}:{entries[f.name]['sha1']}\n".encode())
+        result[key] = h.hexdigest()
+    return result
+
+
+# ──────────────────────────────────────────────
+# 3. 캐시 읽기 / 쓰기
+# ──────────────────────────────────────────────
+
+def _read_state(cache_dir: Path) -> dict:
+    path = cache_dir / STATE_NAME
+    if path.exists():
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if state.get("version") == CACHE_VERSION:
+            return state
+    return {"version": CACHE_VERSION, "fingerprints": {}, "files": {}}
+
+
+def _write_state(cache_dir: Path, state: dict):
+    path = cache_dir / STATE_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=1, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _read_metric(cache_dir: Path, name: str) -> pd.DataFrame:
+    path = cache_dir / f"{name}.parquet"
+    return pd.read_parquet(path) if path.exists() else pd.DataFrame(columns=KEY_COLUMNS)
+
+
+def _with_key_strings(metric_df: pd.DataFrame) -> pd.DataFrame:
+    for col in KEY_COLUMNS:
+        metric_df[col] = metric_df[col].astype(str)
+    return metric_df
+
+
+# ──────────────────────────────────────────────
+# 4. 증분 갱신
+# ──────────────────────────────────────────────
+
+def update(raw_dir: Path = event_store.RAW_DIR, cache_dir: Path = CACHE_DIR,
+           rebuild: bool = False) -> dict:
+    """바뀐 참가자 × 조건만 재계산하여 캐시를 갱신하고 지표 이름 → 전체 참가자 테이블을 반환.
+
+    파일 선택 필터가 있으면 선택한 참가자 × 조건만 확인·재계산하고 (나머지 캐시는 유지) 그 행만 반환.
+    """
+    cache_dir = Path(cache_dir)
+    if rebuild and cache_dir.exists():
+        shutil.rmtree(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = event_store.ingest(raw_dir)
+    groups = participant_files(raw_dir)
+    current = {_key_str(k): v for k, v in fingerprints(groups, manifest).items()}
+
+    state = _read_state(cache_dir)
+    cached = state["fingerprints"]
+    changed = sorted(k for k, v in current.items() if cached.get(k) != v)
+    removed = set(cached) - set(current)
+    scoped = bool(event_store.FILTER)
+    if scoped:
+        # 필터로 고르지 않은 참가자 × 조건은 없어진 것이 아니므로 캐시에 남기고, 선택한 파일에서 사라진 분할만 제거
+        selected = {f.name for f in event_store.select_files(event_store.raw_files(raw_dir))}
+        removed = {k for k in removed if selected & set(state["files"].get(k, []))}
+    stale = set(changed) | removed
+
+    new_metrics = {}
+    if changed:
+        # 바뀐 참가자 × 조건의 분할만 참가자 묶음 단위로 읽어 계산 (통합 테이블을 만들지 않음)
+        files = {f for key in changed for f in groups[tuple(key.split("/"))]}
+        parts = {name: [] for name in METRICS}
+        for events in event_store.iter_partitions(raw_dir, files=sorted(files)):
+            for name, fn in METRICS.items():
+                parts[name].append(fn(events))
+        for name, frames in parts.items():
+            frames = [f for f in frames if not f.empty]
+            if frames:
+                # 바뀐 파일이 다른 (지문이 그대로인) 참가자 × 조건 분할도 함께 가질 수 있으므로 바뀐 키의 행만 사용
+                new_df = _with_key_strings(pd.concat(frames, ignore_index=True))
+                new_metrics[name] = new_df[(new_df["participant_id"] + "/" + new_df["condition"]).isin(changed)]
+
+    metrics = {}
+    for name in METRICS:
+        old = _read_metric(cache_dir, name)
+        if not old.empty:
+            old = old[~(old["participant_id"] + "/" + old["condition"]).isin(stale)]
+        frames = [f for f in [old, new_metrics.get(name)] if f is not None and not f.empty]
+        combined = _with_key_strings(pd.concat(frames, ignore_index=True)) if frames else pd.DataFrame(columns=KEY_COLUMNS)
+        combined = combined.sort_values(KEY_COLUMNS).reset_index(drop=True)
+        combined.to_parquet(cache_dir / f"{name}.parquet", index=False)
+        if scoped:
+            combined = combined[(combined["participant_id"] + "/" + combined["condition"]).isin(current)]
+            combined = combined.reset_index(drop=True)
+        metrics[name] = combined
+
+    key_files = {_key_str(k): sorted(f.name for f in v) for k, v in groups.items()}
+    if scoped:
+        state["fingerprints"] = {k: v for k, v in {**cached, **current}.items() if k not in removed}
+        state["files"] = {k: v for k, v in {**state["files"], **key_files}.items() if k not in removed}
+    else:
+        state["fingerprints"], state["files"] = current, key_files
+    _write_state(cache_dir, state)
+    print(f"[증분] 참가자 × 조건 {len(current)}개 중 {len(changed)}개 재계산 → {cache_dir}")
+    return metrics
+
+
+# ──────────────────────────────────────────────
+# 5. 집단 통계 / 대응 비교 재집계
+# ──────────────────────────────────────────────
+
+def report(metrics: dict):
+    """캐시된 참가자 지표로 조건별 요약·대응 비교를 출력하고 요약 CSV를 저장."""
+    switching = metrics["switching"]
+    print(f"\n=== 기기 전환 (Hybrid 조건) ===")
+    if not switching.empty:
+        print(f"총 전환 횟수: {int(switching['switch_count'].sum())}")
+        print(f"참가자 평균 전환 횟수: {switching['switch_count'].mean():.1f} "
+              f"(SD={switching['switch_count'].std():.1f})")
+        print(f"평균 전환 지속시간: {switching['avg_switch_duration_s'].mean():.1f}s")
+        print(f"참가자 평균 Beam Pro 사용 시간: {switching['beam_on_s'].mean():.1f}s "
+              f"(트리거 중 {switching['beam_trigger_s'].mean():.1f}s)")
+
+    cvi_df = metrics["cvi"]
+    print(f"\n=== 교차검증 지수 (CVI) ===")
+    if not cvi_df.empty:
+        print(f"참가자 수: {len(cvi_df)}")
+        print(f"평균 CVI: {cvi_df['cvi'].mean():.2f} (SD={cvi_df['cvi'].std():.2f})")
+
+    pause_df = metrics["pauses"]
+    ct_df = metrics["completion"]
+    print(f"\n=== 정지 / 과제 완료 시간 (2조건) ===")
+    for cond, label in zip(CONDITIONS, CONDITION_LABELS):
+        p = pause_df[pause_df["condition"] == cond] if not pause_df.empty else pause_df
+        c = ct_df[ct_df["condition"] == cond] if not ct_df.empty else ct_df
+        if len(p):
+            print(f"  {label}: 정지 평균 {p['pause_count'].mean():.1f}회, 총 {p['total_pause_s'].mean():.1f}s")
+        if len(c):
+            print(f"  {label}: 완료 시간 M={c['completion_time_s'].mean():.1f}s, "
+                  f"SD={c['completion_time_s'].std():.1f}s")
+    if not pause_df.empty:
+        run_paired_test(pause_df, "pause_count", "정지 횟수")
+    if not ct_df.empty:
+        run_paired_test(ct_df, "completion_time_s", "과제 완료 시간")
+
+    cal_df = metrics["calibration"]
+    print(f"\n=== 확신도-정확도 보정(Calibration) ===")
+    if not cal_df.empty:
+        for cond, label in zip(CONDITIONS, CONDITION_LABELS):
+            subset = cal_df[cal_df["condition"] == cond]["calibration_r"].dropna()
+            if len(subset) > 0:
+                print(f"  {label}: 평균 calibration r = {subset.mean():.3f} (SD={subset.std():.3f})")
+        cal_valid = cal_df.dropna(subset=["calibration_r"])
+        if len(cal_valid) >= N_PARTICIPANTS:
+            _run_paired_test(cal_valid, "calibration_r", "Calibration Index")
+
+    # 요약 CSV 저장 (전체 분석과 같은 파일)
+    if not ct_df.empty or not pause_df.empty:
+        summary = ct_df.merge(pause_df, on=KEY_COLUMNS, how="outer")
+        summary.to_csv(OUTPUT_DIR / "device_switching_summary.csv", index=False)
+        print(f"  → {OUTPUT_DIR / 'device_switching_summary.csv'} 저장")
+    for name, filename in [("cvi", "cvi_summary.csv"), ("calibration", "calibration_summary.csv")]:
+        result_df = metrics[name]
+        if not result_df.empty:
+            cols = [c for c in result_df.columns if not (name == "cvi" and c == "condition")]
+            result_df[cols].to_csv(OUTPUT_DIR / filename, index=False)
+            print(f"  → {OUTPUT_DIR / filename} 저장")
+
+
+# ──────────────────────────────────────────────
+# 6. 메인
+# ──────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="참가자 × 조건 지표 증분 재계산")
+    parser.add_argument("--rebuild", action="store_true", help="캐시를 비우고 전체 재계산")
+    event_store.add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+    event_store.apply_filter_arguments(parser, args)
+
+    print("=" * 60)
+    print("참가자 지표 증분 분석")
+    print("=" * 60)
+
+    if event_store.pq is None:
+        print("[경고] pyarrow 미설치 → 증분 캐시 사용 불가")
+        return
+    if not event_store.raw_files():
+        print(f"[경고] {event_store.RAW_DIR}에 CSV 파일이 없습니다.")
+        return
+
+    metrics = update(rebuild=args.rebuild)
+    report(metrics)
+    print("\n분석 완료.")
+
+
+if __name__ == "__main__":
+    with profiling.session("incremental"):
+        main()
@@ -0,0 +1,211 @@
+"""
+이벤트 구간(interval) 테이블과 구간 연산
+- 시작/종료 이벤트 쌍(BEAM_SCREEN_ON→OFF, TRIGGER_ACTIVATED→DEACTIVATED, PAUSE_START→END,
+  MISSION_START→COMPLETE)을 세션(참가자 × 조건)별 구간 테이블로 복원
+- 종료 없이 끝난 구간은 세션의 다음 ROUTE_END(없으면 세션 마지막 이벤트)에서 닫고 open=True로 표시
+  (ROUTE_END는 상태를 초기화하므로 그 뒤의 시작은 새 구간)
+- 연속된 시작(ON, ON)은 첫 시작만, 연속된 종료(OFF, OFF)는 첫 종료만 사용 → 한 세션 안의 구간은 서로 겹치지 않음
+- 겹침 질의: 세션별로 정렬된 구간 축에 np.searchsorted와 누적 길이를 적용하여
+  "각 구간 안에서 다른 구간이 차지한 시간(초)"을 모든 구간에 대해 한 번에 계산
+"""
+
+import numpy as np
+import pandas as pd
+
+# ──────────────────────────────────────────────
+# 1. 설정 / 정렬 축
+# ──────────────────────────────────────────────
+
+SESSION_KEYS = ["participant_id", "condition"]
+CLOSE_TYPES = ["ROUTE_END"]
+_US_PER_S = 1_000_000
+
+
+def _to_us(values) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[us]").astype(np.int64)
+
+
+def _group_codes(frames: list, by: list) -> list:
+    """frames 공통 그룹 코드 (키가 결측이면 -1)."""
+    keys = pd.concat([f[by] for f in frames], ignore_index=True)
+    for col in by:
+        if isinstance(keys[col].dtype, pd.CategoricalDtype):
+            keys[col] = keys[col].astype(object)
+    codes = keys.groupby(by, sort=False, dropna=True).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    return np.split(codes, np.cumsum([len(f) for f in frames])[:-1])
+
+
+def _axis_base(codes: list, times: list) -> np.ndarray:
+    """그룹마다 겹치지 않는 시각 범위를 배정하여 (그룹, 시각)을 단일 int64 축으로 바꾸는 그룹별 오프셋."""
+    all_k = np.concatenate(codes)
+    all_t = np.concatenate(times)
+    ok = all_k >= 0
+    n_groups = int(all_k.max(initial=-1)) + 1 or 1
+    t_min = np.full(n_groups, np.iinfo(np.int64).max)
+    t_max = np.full(n_groups, np.iinfo(np.int64).min)
+    np.minimum.at(t_min, all_k[ok], all_t[ok])
+    np.maximum.at(t_max, all_k[ok], all_t[ok])
+    used = t_max >= t_min
+    t_min = np.where(used, t_min, 0)
+    span = int((t_max[used] - t_min[used]).max(initial=0)) + 1
+    if n_groups * span >= 2 ** 62:
+        raise OverflowError("구간 연산: 그룹 수 × 시간 범위가 int64 범위를 초과")
+    return np.arange(n_groups, dtype=np.int64) * span - t_min
+
+
+# ──────────────────────────────────────────────
+# 2. 구간 테이블
+# ──────────────────────────────────────────────
+
+def pair_spans(df: pd.DataFrame, start_type: str, end_type: str, by: list = SESSION_KEYS,
+               close_types: list = CLOSE_TYPES, keep: list = (), time_col: str = "timestamp") -> pd.DataFrame:
+    """시작/종료 이벤트를 짝지은 구간 테이블.
+
+    반환 컬럼: by..., start, end, duration_s, open, start_index (시작 이벤트 인덱스 라벨), keep...
+    그룹 → 시작 시각 순. keep 컬럼은 시작 이벤트 행에서 가져온다.
+    """
+    by = list(by)
+    columns = by + ["start", "end", "duration_s", "open", "start_index"] + list(keep)
+    close_types = [c for c in close_types if c not in (start_type, end_type)]
+    rows = df[df["event_type"].isin([start_type, end_type] + close_types) & df[time_col].notna()]
+    if not (rows["event_type"] == start_type).any():
+        return pd.DataFrame(columns=columns)
+
+    (codes,) = _group_codes([rows], by)
+    t = _to_us(rows[time_col])
+    order = np.lexsort((np.arange(len(rows)), t, codes))
+    order = order[codes[order] >= 0]
+    k, tt = codes[order], t[order]
+    et = rows["event_type"].to_numpy()[order]
+    is_start = et == start_type
+    is_end = et == end_type
+
+    # 같은 그룹의 직전 표지가 시작이면 열린 상태. 종료와 ROUTE_END(close_types)는 모두 상태를 닫으므로
+    # ROUTE_END에서 닫힌 구간 뒤의 시작은 새 구간이 된다
+    prev_open = np.r_[False, is_start[:-1]] & np.r_[False, k[1:] == k[:-1]]
+    s_pos = np.flatnonzero(is_start & ~prev_open)
+    e_pos = np.flatnonzero(~is_start & prev_open)
+    # 시작과 닫는 표지가 번갈아 나오므로 각 시작의 짝은 그 뒤 첫 닫는 표지 (같은 그룹일 때만)
+    nxt = np.searchsorted(e_pos, s_pos)
+    has_end = nxt < len(e_pos)
+    has_end[has_end] = k[e_pos[nxt[has_end]]] == k[s_pos[has_end]]
+    end = np.full(len(s_pos), np.iinfo(np.int64).min)
+    end[has_end] = tt[e_pos[nxt[has_end]]]
+    # 종료 이벤트가 아닌 ROUTE_END나 세션 끝에서 닫힌 구간은 open
+    is_open = ~has_end
+    is_open[has_end] = ~is_end[e_pos[nxt[has_end]]]
+
+    starts = rows.iloc[order[s_pos]]
+    spans = starts[by + list(keep)].reset_index(drop=True)
+    spans.insert(len(by), "start", starts[time_col].to_numpy())
+    spans["start_index"] = starts.index.to_numpy()
+
+    # 닫는 표지가 없는 구간: 세션 마지막 이벤트에서 닫음
+    if not has_end.all():
+        tail = starts[~has_end]
+        last = df.groupby(by, observed=True)[time_col].max()
+        end[~has_end] = _to_us(last.reindex(pd.MultiIndex.from_frame(tail[by]) if len(by) > 1
+                                            else tail[by[0]]).to_numpy())
+
+    spans.insert(len(by) + 1, "end", end.astype("datetime64[us]"))
+    spans.insert(len(by) + 2, "duration_s", (end - tt[s_pos]) / _US_PER_S)
+    spans.insert(len(by) + 3, "open", is_open)
+    return spans[columns]
+
+
+def union_spans(spans: pd.DataFrame, by: list = SESSION_KEYS) -> pd.DataFrame:
+    """그룹별로 겹치거나 맞닿은 구간을 합친 구간 테이블 (by..., start, end, duration_s)."""
+    by = list(by)
+    if spans.empty:
+        return pd.DataFrame(columns=by + ["start", "end", "duration_s"])
+    (codes,) = _group_codes([spans], by)
+    s, e = _to_us(spans["start"]), _to_us(spans["end"])
+    base = _axis_base([codes, codes], [s, e])
+    valid = codes >= 0
+    order = np.flatnonzero(valid)[np.lexsort((s[valid], codes[valid]))]
+    s_ax, e_ax = s[order] + base[codes[order]], e[order] + base[codes[order]]
+    # 앞 구간들의 최대 종료 시각보다 늦게 시작하면 새 구간
+    reach = np.maximum.accumulate(e_ax)
+    new = np.r_[True, s_ax[1:] > reach[:-1]]
+    first = np.flatnonzero(new)
+    last = np.r_[first[1:], len(order)] - 1
+    g = codes[order][first]
+    out = spans.iloc[order[first]][by].reset_index(drop=True)
+    out["start"] = (s_ax[first] - base[g]).astype("datetime64[us]")
+    out["end"] = (reach[last] - base[g]).astype("datetime64[us]")
+    out["duration_s"] = (reach[last] - s_ax[first]) / _US_PER_S
+    return out
+
+
+# ──────────────────────────────────────────────
+# 3. 겹침 질의
+# ──────────────────────────────────────────────
+
+def overlap_seconds(spans: pd.DataFrame, others: pd.DataFrame, by: list = SESSION_KEYS) -> np.ndarray:
+    """spans 각 구간 안에서 others 구간이 차지한 시간(초, spans 순서). others는 내부에서 합쳐 중복 계산을 막는다."""
+    by = list(by)
+    if spans.empty:
+        return np.zeros(0)
+    merged = union_spans(others, by)
+    if merged.empty:
+        return np.zeros(len(spans))
+    a_key, m_key = _group_codes([spans, merged], by)
+    a_s, a_e = _to_us(spans["start"]), _to_us(spans["end"])
+    m_s, m_e = _to_us(merged["start"]), _to_us(merged["end"])
+    base = _axis_base([a_key, a_key, m_key, m_key], [a_s, a_e, m_s, m_e])
+    # union_spans 결과는 그룹 → 시작 시각 순이지만 코드 순서가 다를 수 있어 축 기준으로 다시 정렬
+    m_ok = m_key >= 0
+    m_s_ax, m_e_ax = m_s[m_ok] + base[m_key[m_ok]], m_e[m_ok] + base[m_key[m_ok]]
+    order = np.argsort(m_s_ax, kind="stable")
+    m_s_ax, m_e_ax = m_s_ax[order], m_e_ax[order]
+    length = m_e_ax - m_s_ax
+    cum = np.r_[0, np.cumsum(length)]
+
+    def covered(t_ax):
+        # 축 위 t까지 others가 덮은 누적 길이
+        j = np.searchsorted(m_s_ax, t_ax, side="right") - 1
+        jc = np.maximum(j, 0)
+        part = cum[jc] + np.clip(t_ax - m_s_ax[jc], 0, length[jc]) if len(length) else np.zeros(len(t_ax))
+        return np.where(j >= 0, part, 0)
+
+    a_ok = a_key >= 0
+    a_base = base[np.maximum(a_key, 0)]
+    result = (covered(a_e + a_base) - covered(a_s + a_base)) / _US_PER_S
+    return np.where(a_ok & (a_e > a_s), result, 0.0)
+
+
+def overlap_totals(spans: pd.DataFrame, others: pd.DataFrame, by: list = SESSION_KEYS,
+                   name: str = "overlap_s") -> pd.DataFrame:
+    """그룹별 spans 안의 others 시간 합계 (by..., name)."""
+    out = spans[list(by)].copy()
+    out[name] = overlap_seconds(spans, others, by)
+    return out.groupby(list(by), observed=True)[name].sum().reset_index()
+
+
+def span_index(events: pd.DataFrame, spans: pd.DataFrame, by: list = SESSION_KEYS,
+               time_col: str = "timestamp") -> np.ndarray:
+    """각 이벤트를 포함하는 spans 행 위치 (start ≤ t ≤ end, 없으면 -1; events 순서).
+
+    정렬된 구간 시작 축에 대한 searchsorted 한 번으로 모든 이벤트를 태깅한다.
+    같은 그룹 안의 spans는 서로 겹치지 않아야 한다 (pair_spans 결과는 이 조건을 만족).
+    """
+    by = list(by)
+    if events.empty or spans.empty:
+        return np.full(len(events), -1, dtype=np.int64)
+    e_key, s_key = _group_codes([events, spans], by)
+    e_ok = (e_key >= 0) & events[time_col].notna().to_numpy()
+    e_t = np.where(e_ok, _to_us(events[time_col]), 0)
+    s_s, s_e = _to_us(spans["start"]), _to_us(spans["end"])
+    base = _axis_base([e_key[e_ok], s_key, s_key], [e_t[e_ok], s_s, s_e])
+
+    s_pos = np.flatnonzero(s_key >= 0)
+    s_start = s_s[s_pos] + base[s_key[s_pos]]
+    order = np.argsort(s_start, kind="stable")
+    s_pos, s_start = s_pos[order], s_start[order]
+    s_end = s_e[s_pos] + base[s_key[s_pos]]
+
+    e_ax = e_t + base[np.maximum(e_key, 0)]
+    j = np.searchsorted(s_start, e_ax, side="right") - 1
+    jc = np.maximum(j, 0)
+    hit = e_ok & (j >= 0) & (e_ax <= s_end[jc]) if len(s_pos) else np.zeros(len(events), dtype=bool)
+    return np.where(hit, s_pos[jc] if len(s_pos) else -1, -1)
@@ -0,0 +1,112 @@
+"""
+무거운 의존성 지연 import / 헤드리스 그림 설정
+- matplotlib.pyplot, scipy.stats는 첫 속성 접근 때 import → 그림을 그리지 않는 실행(통계만, incremental 지표 갱신,
+  power 작업 프로세스 등)은 matplotlib을, 검정을 하지 않는 실행은 scipy를 불러오지 않음
+- pyplot을 처음 쓰기 직전에 비대화형 백엔드(Agg)를 지정하고 (MPLBACKEND 환경 변수가 있으면 그 값을 따름)
+  한글 글꼴을 설치된 글꼴 중에서 고름 → Linux 분석 노드에서 AppleGothic을 찾다 실패하는 글꼴 검색·경고 없음
+- 고른 글꼴은 matplotlib 캐시 폴더(arnav_korean_font.json)에 기록하여 다음 실행부터 글꼴 목록을 다시 훑지 않음
+  (글꼴을 새로 설치했으면 이 파일을 지우면 다시 고름)
+
+사용법:
+    from lazy_imports import plt, stats
+    fig, ax = plt.subplots()          # 여기서 처음 matplotlib import + 백엔드·글꼴 설정
+"""
+
+import importlib
+import json
+import os
+from pathlib import Path
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+# 앞에서부터 설치되어 있는 첫 글꼴 사용 (macOS / Windows / Linux 순)
+KOREAN_FONTS = [
+    "AppleGothic", "Apple SD Gothic Neo", "Malgun Gothic",
+    "NanumGothic", "NanumBarunGothic", "Noto Sans CJK KR", "Noto Sans KR", "Source Han Sans K", "UnDotum",
+]
+FALLBACK_FONT = "DejaVu Sans"
+FONT_CACHE_NAME = "arnav_korean_font.json"
+HEADLESS_BACKEND = "Agg"
+
+
+# ──────────────────────────────────────────────
+# 2. 지연 모듈
+# ──────────────────────────────────────────────
+
+class LazyModule:
+    """첫 속성 접근 때 import하는 모듈 대리 객체. before는 import 직전에 한 번 호출."""
+
+    def __init__(self, name: str, before=None):
+        self._name = name
+        self._before = before
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            if self._before is not None:
+                self._before()
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        if attr in ("_name", "_before", "_module"):
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+# ──────────────────────────────────────────────
+# 3. matplotlib 백엔드 / 한글 글꼴
+# ──────────────────────────────────────────────
+
+_configured = False
+
+
+def korean_font() -> str:
+    """설치된 한글 글꼴 family 이름 (없으면 FALLBACK_FONT). 결과는 matplotlib 캐시 폴더에 기록."""
+    import matplotlib
+
+    cache = Path(matplotlib.get_cachedir()) / FONT_CACHE_NAME
+    try:
+        cached = json.loads(cache.read_text(encoding="utf-8"))
+        if cached["matplotlib"] == matplotlib.__version__ and (cached["path"] is None or Path(cached["path"]).exists()):
+            return cached["family"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    from matplotlib import font_manager
+    available = {f.name: f.fname for f in font_manager.fontManager.ttflist}
+    family = next((name for name in KOREAN_FONTS if name in available), FALLBACK_FONT)
+    path = available.get(family) if family != FALLBACK_FONT else None
+    if path is None:
+        print(f"[글꼴] 한글 글꼴 없음 → {FALLBACK_FONT} (한글이 깨질 수 있음; 후보: {', '.join(KOREAN_FONTS)})")
+    try:
+        cache.write_text(json.dumps({"matplotlib": matplotlib.__version__, "family": family, "path": path},
+                                    ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        pass
+    return family
+
+
+def setup_matplotlib():
+    """비대화형 백엔드와 한글 글꼴 설정 (프로세스마다 한 번). pyplot 첫 사용 직전에 자동 호출."""
+    global _configured
+    if _configured:
+        return
+    import matplotlib
+
+    if not os.environ.get("MPLBACKEND"):
+        matplotlib.use(HEADLESS_BACKEND)
+    family = korean_font()
+    matplotlib.rcParams["font.family"] = [family] if family == FALLBACK_FONT else [family, FALLBACK_FONT]
+    matplotlib.rcParams["axes.unicode_minus"] = False
+    _configured = True
+
+
+plt = LazyModule("matplotlib.pyplot", before=setup_matplotlib)
+stats = LazyModule("scipy.stats")
@@ -0,0 +1,294 @@
+"""
+세션 진행 중 이벤트 로그 스트리밍 수집
+- EventLogger가 한 줄씩 기록 중인 data/raw/P*_*.csv 를 따라가며(tail) 새로 추가된 완전한 행만 파싱
+- 파일별 읽은 위치(byte offset)를 기억하므로 파일 전체를 다시 읽지 않음
+- 세션(파일 × 조건)별 누적 지표를 실시간 갱신: 기기 전환 횟수, 정지 횟수/시간, 트리거 반응시간, 확신도 궤적
+  (EventLogger는 두 조건을 한 파일에 이어 기록하므로 condition 컬럼이 바뀌면 새 세션 "<파일명>.<조건>"으로 집계)
+- 실험자용 실시간 지표 서버는 live_server.py 참고
+
+사용법:
+    python analysis/live_ingest.py                 # 2초 간격으로 data/raw 감시
+    python analysis/live_ingest.py --interval 0.5
+"""
+
+import argparse
+import io
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import event_store
+
+# ──────────────────────────────────────────────
+# 1. 파일 tail
+# ──────────────────────────────────────────────
+
+
+class CsvTail:
+    """기록 중인 EventLogger CSV 하나를 따라가며 새로 추가된 완전한 행만 반환."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.offset = 0
+        self.header = None
+        self._pending = b""
+
+    def poll(self) -> pd.DataFrame:
+        """마지막 poll 이후 추가된 행 (없으면 빈 DataFrame)."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return pd.DataFrame()
+        if size < self.offset:
+            # 파일이 새로 쓰였으면 처음부터 다시 읽음
+            self.offset, self.header, self._pending = 0, None, b""
+        if size == self.offset:
+            return pd.DataFrame()
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset += len(data)
+        buf = self._pending + data
+
+        # 마지막 줄바꿈까지만 처리 (따옴표로 감싼 필드 안의 줄바꿈은 행 경계가 아님)
+        cut = buf.rfind(b"\n")
+        while cut >= 0 and buf.count(b'"', 0, cut) % 2:
+            cut = buf.rfind(b"\n", 0, cut)
+        if cut < 0:
+            self._pending = buf
+            return pd.DataFrame()
+        complete, self._pending = buf[:cut + 1], buf[cut + 1:]
+
+        text = complete.decode("utf-8-sig" if self.header is None else "utf-8")
+        if self.header is None:
+            self.header, _, text = text.partition("\n")
+            self.header = self.header.rstrip("\r")
+        if not text.strip():
+            return pd.DataFrame()
+        return event_store.read_raw_csv(io.StringIO(self.header + "\n" + text))
+
+
+# ──────────────────────────────────────────────
+# 2. 세션별 누적 지표
+# ──────────────────────────────────────────────
+
+
+class SessionAggregates:
+    """세션(원본 파일 × 조건) 하나의 누적 지표. update()에 그 조건의 새 행만 넘기면 됨."""
+
+    def __init__(self, name: str, condition: str = None):
+        self.name = name
+        self.participant_id = None
+        self.condition = condition
+        self.n_events = 0
+        self.last_event_at = None
+
+        self.switch_count = 0
+        self.pause_count = 0
+        self.pause_total_s = 0.0
+        self.reaction_times = []        # {"timestamp", "waypoint_id", "trigger_type", "reaction_time_s"}
+        self.active_trigger = None      # 응답 전 트리거 {"timestamp", "waypoint_id", "trigger_type"}
+        self.confidence = []            # {"timestamp", "waypoint_id", "confidence_rating"}
+        self.waypoints = {}             # waypoint_id → {"first_at", "last_at", "switches"} (도달 순)
+
+    def update(self, rows: pd.DataFrame):
+        if rows.empty:
+            return
+        if self.participant_id is None:
+            self.participant_id = str(rows["participant_id"].iloc[0])
+        if self.condition is None:
+            self.condition = str(rows["condition"].iloc[0])
+        self.n_events += len(rows)
+        self.last_event_at = rows["timestamp"].iloc[-1]
+
+        et = rows["event_type"].astype(object).to_numpy()
+        is_switch = et == "BEAM_SCREEN_ON"
+        self.switch_count += int(is_switch.sum())
+        self.pause_count += int((et == "PAUSE_START").sum())
+        self.pause_total_s += float(rows.loc[et == "PAUSE_END", "pause_duration_s"].fillna(0).sum())
+
+        # 웨이포인트별 체류 구간 / 전환 횟수
+        wp = rows["waypoint_id"]
+        has_wp = wp.notna().to_numpy()
+        if has_wp.any():
+            per_wp = pd.DataFrame({
+                "waypoint_id": wp[has_wp].to_numpy(),
+                "timestamp": rows["timestamp"].to_numpy()[has_wp],
+                "switch": is_switch[has_wp],
+            }).groupby("waypoint_id", sort=False).agg(
+                first_at=("timestamp", "min"), last_at=("timestamp", "max"), switches=("switch", "sum"),
+            )
+            for w, r in zip(per_wp.index, per_wp.itertuples(index=False)):
+                acc = self.waypoints.setdefault(w, {"first_at": r.first_at, "last_at": r.last_at, "switches": 0})
+                acc["last_at"] = max(acc["last_at"], r.last_at)
+                acc["switches"] += int(r.switches)
+
+        # 트리거 반응시간
+        resp = rows[et == "TRIGGER_RESPONSE"]
+        self.reaction_times.extend(
+            {"timestamp": t, "waypoint_id": w, "trigger_type": tt,
+             "reaction_time_s": None if pd.isna(rt) else float(rt)}
+            for t, w, tt, rt in zip(resp["timestamp"], resp["waypoint_id"],
+                                    resp["trigger_type"], resp["reaction_time_s"])
+        )
+        # 응답(TRIGGER_RESPONSE) 또는 복구(TRIGGER_DEACTIVATED) 전까지 진행 중 트리거로 표시
+        trig = np.flatnonzero(et == "TRIGGER_ACTIVATED")
+        last_resp = np.flatnonzero((et == "TRIGGER_RESPONSE") | (et == "TRIGGER_DEACTIVATED"))
+        if len(trig) and (not len(last_resp) or trig[-1] > last_resp[-1]):
+            r = rows.iloc[trig[-1]]
+            self.active_trigger = {
+                "timestamp": r["timestamp"], "waypoint_id": r["waypoint_id"], "trigger_type": r["trigger_type"],
+            }
+        elif len(last_resp):
+            self.active_trigger = None
+
+        # 확신도 궤적
+        conf = rows[et == "CONFIDENCE_RATED"]
+        ratings = pd.to_numeric(conf["confidence_rating"], errors="coerce")
+        self.confidence.extend(
+            {"timestamp": t, "waypoint_id": w, "confidence_rating": float(c)}
+            for t, w, c in zip(conf["timestamp"], conf["waypoint_id"], ratings)
+            if not np.isnan(c)
+        )
+
+    def waypoint_metrics(self) -> list:
+        """웨이포인트별 지표 (도달 순): 체류 시간, Beam Pro 전환 횟수/분당 전환율,
+        트리거 반응시간, 확신도와 직전 웨이포인트 대비 변화량."""
+        rts, conf = {}, {}
+        for r in self.reaction_times:
+            if r["reaction_time_s"] is not None:
+                rts.setdefault(r["waypoint_id"], []).append(r["reaction_time_s"])
+        for c in self.confidence:
+            conf[c["waypoint_id"]] = c["confidence_rating"]
+
+        result = []
+        prev_conf = None
+        for wp, acc in self.waypoints.items():
+            dwell_s = (acc["last_at"] - acc["first_at"]).total_seconds()
+            rating = conf.get(wp)
+            result.append({
+                "waypoint_id": wp,
+                "dwell_s": round(dwell_s, 1),
+                "switches": acc["switches"],
+                "switch_rate_per_min": round(acc["switches"] / (dwell_s / 60), 2) if dwell_s > 0 else None,
+                "reaction_time_s": round(float(np.mean(rts[wp])), 2) if wp in rts else None,
+                "confidence": rating,
+                "confidence_delta": (
+                    rating - prev_conf if rating is not None and prev_conf is not None else None
+                ),
+            })
+            if rating is not None:
+                prev_conf = rating
+        return result
+
+    def summary(self) -> dict:
+        """현재 누적 지표 요약 (JSON 직렬화 가능)."""
+        rts = [r["reaction_time_s"] for r in self.reaction_times if r["reaction_time_s"] is not None]
+        return {
+            "session": self.name,
+            "participant_id": self.participant_id,
+            "condition": self.condition,
+            "n_events": self.n_events,
+            "last_event_at": _iso(self.last_event_at),
+            "switch_count": self.switch_count,
+            "pause_count": self.pause_count,
+            "pause_total_s": round(self.pause_total_s, 1),
+            "mean_reaction_time_s": round(float(np.mean(rts)), 2) if rts else None,
+            "reaction_times": [
+                {**r, "timestamp": _iso(r["timestamp"])} for r in self.reaction_times
+            ],
+            "active_trigger": (
+                {**self.active_trigger, "timestamp": _iso(self.active_trigger["timestamp"])}
+                if self.active_trigger else None
+            ),
+            "confidence": [
+                {**c, "timestamp": _iso(c["timestamp"])} for c in self.confidence
+            ],
+        }
+
+
+def _iso(ts):
+    return ts.isoformat(timespec="milliseconds") if ts is not None and not pd.isna(ts) else None
+
+
+# ──────────────────────────────────────────────
+# 3. 디렉토리 감시
+# ──────────────────────────────────────────────
+
+
+def session_name(stem: str, condition: str) -> str:
+    """세션 이름: <원본 파일명>.<조건> (URL 경로에 그대로 쓸 수 있음)."""
+    return f"{stem}.{condition}"
+
+
+class LiveIngest:
+    """data/raw 의 모든 세션 파일을 tail 하며 파일 × 조건별 누적 지표 유지."""
+
+    def __init__(self, raw_dir: Path = event_store.RAW_DIR):
+        self.raw_dir = Path(raw_dir)
+        self.tails = {}
+        self.sessions = {}
+        self._conditions = {}    # 파일 → 마지막 행의 조건 (condition이 비어 있는 행에 이어 붙임)
+
+    def poll(self) -> list:
+        """새 행이 들어온 세션 이름 목록 (새 파일·새 조건도 자동 추가)."""
+        for f in event_store.raw_files(self.raw_dir):
+            if f.stem not in self.tails:
+                self.tails[f.stem] = CsvTail(f)
+                info = event_store.parse_raw_name(f)
+                self._conditions[f.stem] = info["condition"] if info else "unknown"
+        updated = []
+        for stem, tail in self.tails.items():
+            rows = tail.poll()
+            if rows.empty:
+                continue
+            conditions = rows["condition"].astype(object).ffill().fillna(self._conditions[stem])
+            self._conditions[stem] = conditions.iloc[-1]
+            # 조건 블록별로 나누어 집계 (한 poll에 조건 전환이 걸쳐 있어도 각 조건 세션에 나뉘어 들어감)
+            for condition, part in rows.groupby(conditions.to_numpy(), sort=False):
+                name = session_name(stem, condition)
+                if name not in self.sessions:
+                    self.sessions[name] = SessionAggregates(name, condition)
+                self.sessions[name].update(part)
+                updated.append(name)
+        return updated
+
+
+# ──────────────────────────────────────────────
+# 4. 메인 (콘솔 출력)
+# ──────────────────────────────────────────────
+
+
+def _print_status(session: SessionAggregates):
+    s = session.summary()
+    conf = s["confidence"]
+    last_conf = f"{conf[-1]['confidence_rating']:.0f} @ {conf[-1]['waypoint_id']}" if conf else "-"
+    rt = f"{s['mean_reaction_time_s']:.1f}s" if s["mean_reaction_time_s"] is not None else "-"
+    trig = f"  [트리거 {s['active_trigger']['trigger_type']} 진행 중]" if s["active_trigger"] else ""
+    print(f"{s['session']}: 이벤트 {s['n_events']} | 전환 {s['switch_count']} | "
+          f"정지 {s['pause_count']}회/{s['pause_total_s']:.1f}s | 트리거 RT {rt} | "
+          f"확신도 {last_conf}{trig}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기록 중인 이벤트 로그 실시간 집계")
+    parser.add_argument("--raw-dir", type=Path, default=event_store.RAW_DIR)
+    parser.add_argument("--interval", type=float, default=2.0, help="감시 주기 (초)")
+    args = parser.parse_args(argv)
+
+    live = LiveIngest(args.raw_dir)
+    print(f"[실시간] {args.raw_dir} 감시 중 (Ctrl+C 종료)")
+    try:
+        while True:
+            for name in live.poll():
+                _print_status(live.sessions[name])
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n[실시간] 종료")
+
+
+if __name__ == "__main__":
+    main()
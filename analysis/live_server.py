@@ -0,0 +1,246 @@
+"""
+실험자 HUD용 실시간 지표 서버 (asyncio, 표준 라이브러리만 사용)
+- live_ingest.LiveIngest로 data/raw 의 기록 중인 세션 로그를 증분 수집 (파일 전체 재파싱 없음)
+- 웨이포인트별 지표(Beam Pro 전환율, 트리거 반응시간, 직전 웨이포인트 대비 확신도 변화)를
+  WebSocket으로 변경분만 push, HTTP로는 현재 상태를 JSON으로 조회
+- 여러 세션을 동시에 추적하며, 클라이언트는 전체 또는 특정 세션만 구독
+
+엔드포인트:
+    GET /sessions                      세션 요약 목록
+    GET /sessions/{세션}                세션 요약 + 웨이포인트별 지표
+    WS  /ws[?session={세션}]            웨이포인트 지표 변경 push (접속 시 현재 상태 먼저 전송)
+
+사용법:
+    python analysis/live_server.py --port 8765 --interval 0.25
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import event_store
+from live_ingest import LiveIngest
+
+# ──────────────────────────────────────────────
+# 1. WebSocket 프레임 (RFC 6455 최소 구현)
+# ──────────────────────────────────────────────
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_OP_TEXT, _OP_CLOSE, _OP_PING, _OP_PONG = 0x1, 0x8, 0x9, 0xA
+
+
+def _ws_accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+
+
+def _ws_frame(payload: bytes, opcode: int = _OP_TEXT) -> bytes:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+async def _ws_read_frame(reader: asyncio.StreamReader) -> tuple:
+    b1, b2 = await reader.readexactly(2)
+    n = b2 & 0x7F
+    if n == 126:
+        (n,) = struct.unpack("!H", await reader.readexactly(2))
+    elif n == 127:
+        (n,) = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if b2 & 0x80 else None
+    payload = await reader.readexactly(n)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return b1 & 0x0F, payload
+
+
+# ──────────────────────────────────────────────
+# 2. 서버
+# ──────────────────────────────────────────────
+
+
+class _Client:
+    def __init__(self, writer: asyncio.StreamWriter, session: str = None):
+        self.writer = writer
+        self.session = session
+
+    def wants(self, name: str) -> bool:
+        return self.session is None or self.session == name
+
+
+class LiveMetricsServer:
+    """세션 로그를 주기적으로 증분 수집하고 웨이포인트 지표 변경분을 WebSocket 구독자에게 push."""
+
+    def __init__(self, raw_dir: Path = event_store.RAW_DIR, interval: float = 0.25):
+        self.live = LiveIngest(raw_dir)
+        self.interval = interval
+        self.clients = set()
+        self._sent = {}     # 세션 → {waypoint_id: 마지막으로 보낸 지표}
+
+    # ── 수집 / push ──
+
+    async def watch(self):
+        while True:
+            # 이벤트 루프 스레드에서 수집: 새로 추가된 행만 읽으므로 짧고, HTTP/WebSocket 응답이 읽는 세션 상태를
+            # 다른 스레드가 바꾸는 일이 없음 (반복 중 dict 크기 변경, 반쯤 갱신된 스냅샷 방지)
+            updated = self.live.poll()
+            for name in updated:
+                message = self._waypoint_update(name)
+                if message is not None:
+                    await self._broadcast(name, message)
+            await asyncio.sleep(self.interval)
+
+    def _waypoint_update(self, name: str, full: bool = False) -> dict:
+        session = self.live.sessions[name]
+        metrics = session.waypoint_metrics()
+        sent = self._sent.setdefault(name, {})
+        changed = [m for m in metrics if full or sent.get(m["waypoint_id"]) != m]
+        if not full:
+            sent.update({m["waypoint_id"]: m for m in changed})
+        if not changed:
+            return None
+        s = session.summary()
+        return {
+            "type": "waypoints",
+            "session": name,
+            "participant_id": s["participant_id"],
+            "condition": s["condition"],
+            "last_event_at": s["last_event_at"],
+            "switch_count": s["switch_count"],
+            "active_trigger": s["active_trigger"],
+            "waypoints": changed,
+        }
+
+    async def _broadcast(self, name: str, message: dict):
+        frame = _ws_frame(json.dumps(message, ensure_ascii=False).encode())
+        for client in [c for c in self.clients if c.wants(name)]:
+            await self._send(client, frame)
+
+    async def _send(self, client: _Client, frame: bytes):
+        try:
+            client.writer.write(frame)
+            await asyncio.wait_for(client.writer.drain(), timeout=1.0)
+        except (ConnectionError, asyncio.TimeoutError):
+            self.clients.discard(client)
+            client.writer.close()
+
+    # ── 연결 처리 ──
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                k, _, v = line.partition(":")
+                headers[k.strip().lower()] = v.strip()
+            if len(request_line) < 2 or request_line[0] != "GET":
+                await self._respond(writer, 405, {"error": "GET만 지원"})
+                return
+
+            url = urlsplit(request_line[1])
+            if url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                session = parse_qs(url.query).get("session", [None])[0]
+                await self._serve_websocket(reader, writer, headers, session)
+            else:
+                await self._serve_http(writer, url.path)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_http(self, writer: asyncio.StreamWriter, path: str):
+        parts = [p for p in path.split("/") if p]
+        sessions = self.live.sessions
+        if parts == ["sessions"]:
+            body = [s.summary() for s in sessions.values()]
+            for b in body:
+                del b["reaction_times"], b["confidence"]
+            await self._respond(writer, 200, body)
+        elif len(parts) == 2 and parts[0] == "sessions" and parts[1] in sessions:
+            session = sessions[parts[1]]
+            await self._respond(writer, 200, {**session.summary(), "waypoints": session.waypoint_metrics()})
+        else:
+            await self._respond(writer, 404, {"error": f"알 수 없는 경로: {path}"})
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body):
+        payload = json.dumps(body, ensure_ascii=False).encode()
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Access-Control-Allow-Origin: *\r\n"
+            f"Connection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+
+    async def _serve_websocket(self, reader, writer, headers: dict, session: str):
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {_ws_accept_key(headers.get('sec-websocket-key', ''))}\r\n\r\n".encode()
+        )
+        await writer.drain()
+
+        client = _Client(writer, session)
+        # 접속 시 현재 상태 전체 전송 후 구독 등록
+        for name in list(self.live.sessions):
+            if client.wants(name):
+                message = self._waypoint_update(name, full=True)
+                if message is not None:
+                    await self._send(client, _ws_frame(json.dumps(message, ensure_ascii=False).encode()))
+        self.clients.add(client)
+        try:
+            while True:
+                opcode, payload = await _ws_read_frame(reader)
+                if opcode == _OP_CLOSE:
+                    writer.write(_ws_frame(b"", _OP_CLOSE))
+                    break
+                if opcode == _OP_PING:
+                    writer.write(_ws_frame(payload, _OP_PONG))
+                    await writer.drain()
+        finally:
+            self.clients.discard(client)
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"[실시간 서버] http://{host}:{port}/sessions  ws://{host}:{port}/ws "
+              f"(감시: {self.live.raw_dir}, 주기 {self.interval}s)")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.watch())
+
+
+# ──────────────────────────────────────────────
+# 3. 메인
+# ──────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="실험자 HUD용 실시간 지표 서버")
+    parser.add_argument("--raw-dir", type=Path, default=event_store.RAW_DIR)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.25, help="로그 감시 주기 (초)")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(LiveMetricsServer(args.raw_dir, args.interval).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n[실시간 서버] 종료")
+
+
+if __name__ == "__main__":
+    main()
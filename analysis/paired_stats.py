@@ -0,0 +1,160 @@
+"""
+2조건 대응 비교 통계 엔진 (여러 종속변수 일괄)
+- 참가자 × 조건 × 종속변수(DV) 배열로 한 번 피벗 (participant_id 기준 정렬; 한 조건 값만 있는 참가자는
+  해당 DV에서만 제외하며, 순서대로 잘라 짝짓지 않음)
+- 모든 DV에 대해 Paired t-test, Wilcoxon signed-rank, Hedges' g (d_av 보정), Cohen's d_z,
+  부호 뒤집기(sign-flip) 순열검정 p를 한 번에 계산 → DV당 한 행의 결과 표
+- 순열검정은 모든 DV가 같은 부호 행렬을 공유하므로 행렬곱으로 계산 (기본 10,000회, 메모리 제한 단위로 나눔)
+- 배열 단위 진입점 paired_arrays: 열마다 독립 검정이므로 모의 연구 반복을 열로 펼쳐 한 번에 검정 가능
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from lazy_imports import stats
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+CONDITIONS = ["glass_only", "hybrid"]
+N_PERMUTATIONS = 10_000
+# 순열 부호 행렬 한 묶음의 최대 원소 수 (순열 수 × 참가자 수)
+_PERM_CHUNK_CELLS = 4_000_000
+
+
+# ──────────────────────────────────────────────
+# 2. 피벗
+# ──────────────────────────────────────────────
+
+def paired_array(data: pd.DataFrame, dvs: list, subject: str = "participant_id",
+                 within: str = "condition", conditions: list = CONDITIONS) -> tuple:
+    """긴 형식 표 → (참가자 Index, 참가자 × 조건 × DV 배열).
+
+    같은 참가자 × 조건 행이 여러 개면 평균, 값이 없으면 NaN.
+    """
+    frame = data[[subject, within]].copy()
+    for dv in dvs:
+        frame[dv] = pd.to_numeric(data[dv], errors="coerce").astype("float64")
+    frame[within] = frame[within].astype(object)
+    frame = frame[frame[within].isin(conditions)]
+    grouped = frame.groupby([subject, within], observed=True, sort=True)[dvs].mean()
+    wide = grouped.unstack(within)
+    values = np.full((len(wide), len(conditions), len(dvs)), np.nan)
+    for j, dv in enumerate(dvs):
+        if dv in wide.columns.get_level_values(0):
+            values[:, :, j] = wide[dv].reindex(columns=conditions).to_numpy(dtype=np.float64)
+    return wide.index, values
+
+
+# ──────────────────────────────────────────────
+# 3. 검정
+# ──────────────────────────────────────────────
+
+def _sign_flip_p(diff: np.ndarray, n_perm: int, seed: int) -> np.ndarray:
+    """대응 차이의 부호 뒤집기 순열검정 양측 p (DV별). diff의 NaN은 0으로 채운 상태여야 함."""
+    n_subj, n_dv = diff.shape
+    observed = np.abs(diff.sum(axis=0))
+    tol = 1e-9 * np.maximum(1.0, observed)
+    rng = np.random.default_rng(seed)
+    exceed = np.zeros(n_dv, dtype=np.int64)
+    chunk = max(1, _PERM_CHUNK_CELLS // max(n_subj, 1))
+    for start in range(0, n_perm, chunk):
+        m = min(chunk, n_perm - start)
+        signs = rng.integers(0, 2, size=(m, n_subj)).astype(np.float64) * 2 - 1
+        exceed += (np.abs(signs @ diff) >= observed - tol).sum(axis=0)
+    return (exceed + 1) / (n_perm + 1)
+
+
+def paired_arrays(a: np.ndarray, b: np.ndarray, n_perm: int = N_PERMUTATIONS, seed: int = 0) -> dict:
+    """참가자 × 열 배열 두 개(앞 조건 a, 뒤 조건 b)의 대응 비교. 열마다 독립적으로 검정.
+
+    열은 DV여도 되고 DV × 모의 연구 반복이어도 된다 (검정력 분석). NaN 쌍은 해당 열에서만 제외.
+    n_perm = 0이면 순열검정을 건너뛰고 p_perm = NaN.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    n_cols = a.shape[1]
+    diff = a - b
+    valid = ~np.isnan(diff)
+    n = valid.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        def _mean(x):
+            return np.where(valid, x, 0.0).sum(axis=0) / n
+
+        def _sd(x, mean):
+            return np.sqrt(np.where(valid, (x - mean) ** 2, 0.0).sum(axis=0) / (n - 1))
+
+        mean_a, mean_b, mean_diff = _mean(a), _mean(b), _mean(diff)
+        sd_a, sd_b, sd_diff = _sd(a, mean_a), _sd(b, mean_b), _sd(diff, mean_diff)
+        t = mean_diff / (sd_diff / np.sqrt(n))
+        p_t = 2 * stats.t.sf(np.abs(t), n - 1)
+        cohen_dz = mean_diff / sd_diff
+        hedges_g = mean_diff / ((sd_a + sd_b) / 2) * (1 - 3 / (8 * n - 9))
+
+    w_stat = np.full(n_cols, np.nan)
+    w_p = np.full(n_cols, np.nan)
+    testable = (n >= 1) & (np.where(valid, diff, 0.0) != 0).any(axis=0)
+    if testable.any():
+        with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+            warnings.simplefilter("ignore", RuntimeWarning)
+            res = stats.wilcoxon(diff[:, testable], axis=0, nan_policy="omit")
+        w_stat[testable], w_p[testable] = res.statistic, res.pvalue
+
+    p_perm = np.full(n_cols, np.nan)
+    if n_perm > 0 and len(diff):
+        p_perm = np.where(n >= 2, _sign_flip_p(np.where(valid, diff, 0.0), n_perm, seed), np.nan)
+
+    return {
+        "n": n, "mean_a": mean_a, "sd_a": sd_a, "mean_b": mean_b, "sd_b": sd_b, "mean_diff": mean_diff,
+        "t": t, "p_t": p_t, "W": w_stat, "p_wilcoxon": w_p,
+        "hedges_g": hedges_g, "cohen_dz": cohen_dz, "p_perm": p_perm,
+    }
+
+
+def paired_tests(data: pd.DataFrame, dvs: list, labels: list = None, subject: str = "participant_id",
+                 within: str = "condition", conditions: list = CONDITIONS,
+                 n_perm: int = N_PERMUTATIONS, seed: int = 0) -> pd.DataFrame:
+    """여러 DV의 2조건 대응 비교를 한 번에 계산하여 DV당 한 행의 표로 반환.
+
+    컬럼: dv, label, n(짝지어진 참가자 수), mean_{조건}, sd_{조건}, mean_diff (앞 조건 − 뒤 조건),
+          t, p_t, W, p_wilcoxon, hedges_g, cohen_dz, p_perm, n_perm
+    Hedges' g는 평균 SD로 나눈 d_av에 소표본 보정 1 − 3/(4·2n − 9)을 곱한 값 (pingouin paired hedges와 같은 정의).
+    """
+    labels = list(labels) if labels is not None else list(dvs)
+    _, values = paired_array(data, dvs, subject, within, conditions)
+    res = paired_arrays(values[:, 0, :], values[:, 1, :], n_perm, seed)
+
+    out = pd.DataFrame({"dv": list(dvs), "label": labels, "n": res["n"]})
+    for cond, key in ((conditions[0], "a"), (conditions[1], "b")):
+        out[f"mean_{cond}"] = res[f"mean_{key}"]
+        out[f"sd_{cond}"] = res[f"sd_{key}"]
+    for col in ["mean_diff", "t", "p_t", "W", "p_wilcoxon", "hedges_g", "cohen_dz", "p_perm"]:
+        out[col] = res[col]
+    out["n_perm"] = n_perm
+    return out
+
+
+# ──────────────────────────────────────────────
+# 4. 출력
+# ──────────────────────────────────────────────
+
+def print_paired_test(row, indent: str = "    "):
+    """paired_tests() 결과 한 행 출력."""
+    label = row["label"]
+    if row["n"] < 2:
+        print(f"{indent}[경고] {label}: 데이터 부족, 검정 불가")
+        return
+    print(f"{indent}Paired t-test ({label}): t={row['t']:.2f}, p={row['p_t']:.4f}, "
+          f"g={row['hedges_g']:.2f}, d_z={row['cohen_dz']:.2f} (n={row['n']})")
+    if not np.isnan(row["W"]):
+        print(f"{indent}Wilcoxon ({label}): W={row['W']:.1f}, p={row['p_wilcoxon']:.4f}")
+    print(f"{indent}순열검정 ({label}): p={row['p_perm']:.4f} ({row['n_perm']:,}회)")
+
+
+def print_paired_tests(results: pd.DataFrame, indent: str = "    "):
+    for _, row in results.iterrows():
+        print_paired_test(row, indent)
@@ -0,0 +1,249 @@
+"""
+Monte Carlo 검정력 분석
+- 분석 스크립트 데모 생성기의 효과 가정으로 참가자 N명 모의 연구를 반복 생성
+  (NASA-TLX·신뢰·확신도·정확도: analyze_trust_performance.DEMO_*, 기기 전환 확률: synthetic.SWITCH_PROB)
+- 각 모의 연구에 실제 분석과 같은 대응 비교 엔진(paired_stats.paired_arrays)을 적용하고,
+  유의수준 미만 p의 비율을 검정력으로 보고 (Paired t / Wilcoxon / 순열검정)
+- 반복 × 참가자 × 조건 배열로 한 번에 생성하고, 반복을 검정 엔진의 열로 펼쳐 한 번의 호출로 검정
+- (지표, N, 반복 묶음) 단위 작업을 프로세스 풀로 분산. 묶음 난수는 (seed, 지표, N, 묶음 번호)로 고정 →
+  작업 프로세스 수와 관계없이 같은 결과
+- CVI는 Hybrid 조건만 있으므로 참가자별 CVI와 1의 대응 차이(= 1표본 검정)로 검정
+- 결과: analysis/output/power_curves.csv, power_curves.png
+
+사용법:
+    python analysis/power.py                                  # N = 12..48, 지표당 2,000회
+    python analysis/power.py --n 16 24 32 --sims 5000 --jobs 0
+    python analysis/power.py --outcomes calibration cvi --n-perm 0
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import analyze_device_switching as ads
+import analyze_trust_performance as trust
+import figure_cache
+import profiling
+import synthetic
+from grouped_corr import r_from_sums
+from lazy_imports import plt
+from paired_stats import paired_arrays
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+SAMPLE_SIZES = [12, 16, 20, 24, 32, 40, 48]
+N_SIMS = 2000
+N_PERM = 1000
+ALPHA = 0.05
+TARGET_POWER = 0.8
+# 작업 하나가 생성·검정하는 모의 연구 수
+SIM_CHUNK = 250
+TESTS = {"p_t": "power_t", "p_wilcoxon": "power_wilcoxon", "p_perm": "power_perm"}
+
+
+# ──────────────────────────────────────────────
+# 2. 모의 연구 생성 (반복 × 참가자 × DV, 조건별 배열 두 개)
+# ──────────────────────────────────────────────
+
+def simulate_tlx(rng: np.random.Generator, n: int, reps: int) -> tuple:
+    """NASA-TLX 하위척도 (0-21 정수)."""
+    means = np.array([[trust.DEMO_TLX_MEANS[c][s] for s in trust.TLX_SUBSCALES] for c in trust.CONDITIONS])
+    vals = np.clip(np.round(rng.normal(means, trust.DEMO_TLX_SD, size=(reps, n) + means.shape)), 0, 21)
+    return vals[:, :, 0], vals[:, :, 1]
+
+
+def simulate_trust(rng: np.random.Generator, n: int, reps: int) -> tuple:
+    """시스템 신뢰 척도 평균 (1-7 정수 문항 N_TRUST_ITEMS개의 평균)."""
+    means = np.array([trust.DEMO_TRUST_MEANS[c] for c in trust.CONDITIONS])[:, None]
+    items = np.clip(np.round(rng.normal(means, trust.DEMO_TRUST_SD, size=(reps, n, 2, trust.N_TRUST_ITEMS))), 1, 7)
+    score = np.round(items.mean(axis=-1), 2)
+    return score[:, :, :1], score[:, :, 1:]
+
+
+def simulate_calibration(rng: np.random.Generator, n: int, reps: int) -> tuple:
+    """참가자 × 조건별 미션 웨이포인트 확신도-정답 point-biserial r (정의 불가 집단은 NaN)."""
+    wp_idx = [trust.WAYPOINTS.index(wp) for wp in trust.MISSION_WAYPOINTS]
+    base = np.array([trust.DEMO_CONFIDENCE_BASE[c] for c in trust.CONDITIONS])[:, wp_idx]
+    shape = (reps, n) + base.shape
+    conf = np.clip(np.round(rng.normal(base, trust.DEMO_CONFIDENCE_SD, size=shape)), 1, 7)
+    acc = np.array([trust.DEMO_ACCURACY[c] for c in trust.CONDITIONS])[:, None]
+    correct = (rng.random(shape) < acc).astype(np.float64)
+    r, _ = r_from_sums(np.full(shape[:-1], len(wp_idx)), correct.sum(-1), conf.sum(-1),
+                       (correct * conf).sum(-1), (correct * correct).sum(-1), (conf * conf).sum(-1))
+    r = np.round(r, 3)
+    return r[:, :, :1], r[:, :, 1:]
+
+
+def simulate_cvi(rng: np.random.Generator, n: int, reps: int) -> tuple:
+    """Hybrid 참가자별 CVI (cvi_metrics와 같은 정의, 전환이 없는 참가자는 NaN) vs 1."""
+    wp = np.arange(ads.N_WAYPOINTS)
+    switch_p = np.where(synthetic.is_trigger_waypoint(wp), synthetic.SWITCH_PROB["trigger"],
+                        synthetic.SWITCH_PROB["normal"])
+    switched = rng.random((reps, n, ads.N_WAYPOINTS)) < switch_p
+    trigger_idx = [int(w[2:]) - 1 for w in ads.TRIGGER_WAYPOINTS]
+    total = switched.sum(axis=-1)
+    trigger_rate = switched[:, :, trigger_idx].sum(axis=-1) / len(trigger_idx)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cvi = np.where(total > 0, np.round(trigger_rate / (total / ads.N_WAYPOINTS), 2), np.nan)
+    return cvi[:, :, None], np.ones_like(cvi)[:, :, None]
+
+
+# 지표 이름 → (생성 함수, DV 목록, 표시 이름)
+OUTCOMES = {
+    "tlx": (simulate_tlx, trust.TLX_SUBSCALES, "NASA-TLX"),
+    "trust": (simulate_trust, ["trust_mean"], "시스템 신뢰"),
+    "calibration": (simulate_calibration, ["calibration_r"], "Calibration r"),
+    "cvi": (simulate_cvi, ["cvi"], "CVI (vs 1)"),
+}
+
+
+# ──────────────────────────────────────────────
+# 3. 모의 연구 검정 (작업 단위)
+# ──────────────────────────────────────────────
+
+def simulate_chunk(outcome: str, n: int, reps: int, seed: int, chunk: int,
+                   alpha: float = ALPHA, n_perm: int = N_PERM) -> dict:
+    """모의 연구 reps개를 생성·검정하여 DV별 유의 횟수와 Cohen's d_z 합계를 반환."""
+    simulate, dvs, _ = OUTCOMES[outcome]
+    rng = np.random.default_rng([seed, list(OUTCOMES).index(outcome), n, chunk])
+    a, b = simulate(rng, n, reps)
+
+    def columns(x):
+        # (반복, 참가자, DV) → (참가자, 반복 × DV): 반복이 검정 엔진의 독립 열이 됨
+        return x.transpose(1, 0, 2).reshape(n, reps * len(dvs))
+
+    res = paired_arrays(columns(a), columns(b), n_perm, seed=int(rng.integers(2 ** 32)))
+    # p가 NaN(검정 불가)인 모의 연구는 유의하지 않은 것으로 센다
+    out = {col: (res[key].reshape(reps, len(dvs)) < alpha).sum(axis=0) for key, col in TESTS.items()}
+    dz = res["cohen_dz"].reshape(reps, len(dvs))
+    out["dz_sum"] = np.nansum(np.where(np.isfinite(dz), dz, np.nan), axis=0)
+    out["dz_count"] = np.isfinite(dz).sum(axis=0)
+    out["reps"] = reps
+    return out
+
+
+def _run_task(task: tuple) -> tuple:
+    outcome, n, reps, seed, chunk, alpha, n_perm = task
+    return outcome, n, simulate_chunk(outcome, n, reps, seed, chunk, alpha, n_perm)
+
+
+def run_power(outcomes: list, sample_sizes: list, n_sims: int = N_SIMS, alpha: float = ALPHA,
+              n_perm: int = N_PERM, seed: int = 0, jobs: int = 1) -> pd.DataFrame:
+    """지표 × N 마다 n_sims개 모의 연구의 검정력 표 (지표 × DV × N 당 한 행)."""
+    tasks = [(o, n, min(SIM_CHUNK, n_sims - start), seed, k, alpha, n_perm)
+             for o in outcomes for n in sample_sizes
+             for k, start in enumerate(range(0, n_sims, SIM_CHUNK))]
+    if jobs <= 1:
+        results = [_run_task(t) for t in tasks]
+    else:
+        print(f"[병렬] 모의 연구 작업 {len(tasks)}개 / 작업 프로세스 {jobs}개")
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_run_task, tasks))
+
+    totals = {}
+    for outcome, n, part in results:
+        acc = totals.setdefault((outcome, n), {k: 0 for k in part})
+        for k, v in part.items():
+            acc[k] = acc[k] + v
+
+    rows = []
+    for (outcome, n), acc in totals.items():
+        _, dvs, label = OUTCOMES[outcome]
+        for j, dv in enumerate(dvs):
+            row = {"outcome": outcome, "label": label, "dv": dv, "n": n, "n_sims": acc["reps"]}
+            for col in TESTS.values():
+                row[col] = acc[col][j] / acc["reps"]
+            if n_perm <= 0:
+                row["power_perm"] = np.nan
+            row["mean_dz"] = acc["dz_sum"][j] / acc["dz_count"][j] if acc["dz_count"][j] else np.nan
+            rows.append(row)
+    return pd.DataFrame(rows).sort_values(["outcome", "dv", "n"], kind="stable").reset_index(drop=True)
+
+
+def required_n(power_df: pd.DataFrame, target: float = TARGET_POWER, test: str = "power_t") -> pd.DataFrame:
+    """DV별로 목표 검정력에 처음 도달하는 N (탐색 범위 안에서 도달하지 못하면 NaN)."""
+    rows = []
+    for (outcome, dv), grp in power_df.groupby(["outcome", "dv"], sort=False):
+        reached = grp.loc[grp[test] >= target, "n"]
+        rows.append({"outcome": outcome, "dv": dv, "required_n": reached.min() if len(reached) else np.nan})
+    return pd.DataFrame(rows)
+
+
+# ──────────────────────────────────────────────
+# 4. 시각화
+# ──────────────────────────────────────────────
+
+def plot_power_curves(power_df: pd.DataFrame, target: float = TARGET_POWER, path: Path = None):
+    """지표별 Paired t-test 검정력 곡선 (DV마다 한 선)."""
+    path = path or OUTPUT_DIR / "power_curves.png"
+    outcomes = list(dict.fromkeys(power_df["outcome"]))
+    fig, axes = plt.subplots(1, len(outcomes), figsize=(4.5 * len(outcomes), 4.5), squeeze=False)
+    for ax, outcome in zip(axes[0], outcomes):
+        subset = power_df[power_df["outcome"] == outcome]
+        for dv, grp in subset.groupby("dv", sort=False):
+            ax.plot(grp["n"], grp["power_t"], "o-", label=dv, markersize=4)
+        ax.axhline(target, color="gray", linestyle="--", linewidth=1)
+        ax.set_title(subset["label"].iloc[0])
+        ax.set_xlabel("참가자 수 (N)")
+        ax.set_ylim(0, 1.02)
+        if len(subset["dv"].unique()) > 1:
+            ax.legend(fontsize=7)
+    axes[0][0].set_ylabel("검정력 (Paired t-test)")
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    print(f"  → {path} 저장")
+    plt.close(fig)
+
+
+# ──────────────────────────────────────────────
+# 5. 메인
+# ──────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데모 효과 가정 기반 Monte Carlo 검정력 분석")
+    parser.add_argument("--outcomes", nargs="+", choices=list(OUTCOMES), default=list(OUTCOMES))
+    parser.add_argument("--n", nargs="+", type=int, default=SAMPLE_SIZES, help="참가자 수 목록")
+    parser.add_argument("--sims", type=int, default=N_SIMS, help=f"N마다 모의 연구 수 (기본 {N_SIMS:,})")
+    parser.add_argument("--alpha", type=float, default=ALPHA)
+    parser.add_argument("--target", type=float, default=TARGET_POWER, help="목표 검정력 (기본 0.8)")
+    parser.add_argument("--n-perm", type=int, default=N_PERM, help=f"순열검정 횟수 (기본 {N_PERM:,}, 0 = 생략)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="작업 프로세스 수 (기본 1, 0 = CPU 코어 수)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR / "power_curves.csv")
+    figure_cache.add_plot_argument(parser)
+    args = parser.parse_args(argv)
+    figure_cache.apply_plot_argument(args)
+    if min(args.n) < 3:
+        parser.error("--n 은 3 이상")
+    if args.sims < 1:
+        parser.error("--sims 는 1 이상")
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    power_df = run_power(args.outcomes, sorted(set(args.n)), args.sims, args.alpha, args.n_perm, args.seed, jobs)
+
+    print(f"\n=== 검정력 분석 (모의 연구 {args.sims:,}회, α={args.alpha}) ===")
+    need = required_n(power_df, args.target).set_index(["outcome", "dv"])["required_n"]
+    for (outcome, dv), grp in power_df.groupby(["outcome", "dv"], sort=False):
+        curve = ", ".join(f"N={r.n}:{r.power_t:.2f}" for r in grp.itertuples())
+        req = need[(outcome, dv)]
+        req_text = f"N={int(req)}" if not np.isnan(req) else f"N>{grp['n'].max()}"
+        print(f"  {grp['label'].iloc[0]} / {dv}: d_z≈{grp['mean_dz'].iloc[-1]:.2f} | {curve} "
+              f"| 검정력 {args.target:.0%} → {req_text}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    power_df.round(4).to_csv(args.output, index=False)
+    print(f"\n  → {args.output} 저장")
+    if figure_cache.PLOTS:
+        plot_power_curves(power_df, args.target, args.output.with_suffix(".png"))
+
+
+if __name__ == "__main__":
+    with profiling.session("power"):
+        main()
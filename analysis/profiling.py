@@ -0,0 +1,302 @@
+"""
+분석 단계 계측 (구간별 시간 / 행 수 / 메모리)
+- 켜져 있을 때만 analysis/ 모듈의 공개 함수(load_*, analyze_*, *_metrics, plot_*, run*, parse_extra,
+  asof_event, window_counts, paired_tests 등)와 DataFrame.to_csv를 감싸서 호출마다 구간을 기록
+  → 꺼져 있으면 함수를 바꾸지 않으므로 추가 비용 없음
+- 구간마다 wall 시간, CPU 시간, 입력 행 수(첫 DataFrame/Series 인자), 출력 행 수, 최대 RSS 증가량(MB) 기록
+  (최대 RSS는 Linux에서 구간 시작마다 초기화하여 측정; 그 외 OS는 프로세스 누적 최대값 기준)
+- 종료 시 analysis/output/profile_<이름>.trace.json (Chrome trace event 형식; chrome://tracing, Perfetto에서 열기)과
+  profile_<이름>_summary.csv (함수별 호출 수, 누적/자체 시간, 행 수) 저장, 자체 시간 상위 구간 출력
+- 켜는 방법: 환경 변수 ARNAV_PROFILE=1 (모든 스크립트) 또는 run_analyses.py --profile
+
+사용법:
+    ARNAV_PROFILE=1 python analysis/analyze_triggers.py
+    python analysis/run_analyses.py --profile --jobs 0
+"""
+
+import contextlib
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+ANALYSIS_DIR = Path(__file__).resolve().parent
+OUTPUT_DIR = ANALYSIS_DIR / "output"
+ENABLED = os.environ.get("ARNAV_PROFILE", "0") not in ("", "0")
+SUMMARY_TOP = 15
+# 감싸는 pandas 메서드 (결과 내보내기)
+PANDAS_METHODS = [(pd.DataFrame, "to_csv")]
+# 감싸지 않을 함수 (import 시점에만 쓰는 데코레이터 팩토리)
+SKIP_FUNCTIONS = {"cached_figure"}
+
+
+# ──────────────────────────────────────────────
+# 2. 메모리 측정
+# ──────────────────────────────────────────────
+
+def _status_mb(field: str) -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def reset_peak_rss():
+    """현재 프로세스의 최대 RSS 기록 초기화 (Linux만 지원, 그 외에는 무시)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    peak = _status_mb("VmHWM:")
+    if peak == peak or resource is None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def rss_mb() -> float:
+    """현재 RSS (Linux 외에는 최대 RSS로 대신함)."""
+    current = _status_mb("VmRSS:")
+    return current if current == current else peak_rss_mb()
+
+
+# ──────────────────────────────────────────────
+# 3. 구간 기록
+# ──────────────────────────────────────────────
+
+def _rows(value):
+    if isinstance(value, (pd.DataFrame, pd.Series, list)) or hasattr(value, "shape"):
+        try:
+            return len(value)
+        except TypeError:
+            return None
+    if isinstance(value, tuple):
+        counts = [n for n in (_rows(v) for v in value if not isinstance(v, tuple)) if n is not None]
+        return sum(counts) if counts else None
+    return None
+
+
+def _rows_in(args, kwargs):
+    for value in list(args) + list(kwargs.values()):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return len(value)
+    return None
+
+
+class Profiler:
+    """중첩 구간 기록기. 구간이 끝날 때마다 Chrome trace의 완료 이벤트(ph="X") 하나를 남김."""
+
+    def __init__(self):
+        self.events = []
+        self._stack = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, rows_in=None):
+        parent = self._stack[-1] if self._stack else None
+        if parent is not None:
+            # 하위 구간이 최대 RSS 기록을 초기화하기 전에 상위 구간의 최대값을 보존
+            parent["peak_mb"] = max(parent["peak_mb"], peak_rss_mb())
+        reset_peak_rss()
+        span = {"name": name, "rows_in": rows_in, "rows_out": None, "child_s": 0.0,
+                "rss_mb": rss_mb(), "peak_mb": float("-inf")}
+        self._stack.append(span)
+        ts = time.time()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield span
+        finally:
+            wall_s = time.perf_counter() - wall
+            cpu_s = time.process_time() - cpu
+            self._stack.pop()
+            peak = max(span["peak_mb"], peak_rss_mb())
+            if parent is not None:
+                parent["child_s"] += wall_s
+                parent["peak_mb"] = max(parent["peak_mb"], peak)
+            args = {
+                "wall_s": round(wall_s, 6),
+                "self_s": round(wall_s - span["child_s"], 6),
+                "cpu_s": round(cpu_s, 6),
+                "rows_in": span["rows_in"],
+                "rows_out": span["rows_out"],
+                "peak_rss_delta_mb": round(max(peak - span["rss_mb"], 0.0), 1) if peak == peak else None,
+            }
+            with self._lock:
+                self.events.append({
+                    "name": name, "cat": name.split(".", 1)[0], "ph": "X",
+                    "ts": int(ts * 1e6), "dur": int(wall_s * 1e6),
+                    "pid": os.getpid(), "tid": threading.get_ident() % 2 ** 31, "args": args,
+                })
+
+    def extend(self, events: list):
+        """작업 프로세스에서 모은 구간 합치기."""
+        with self._lock:
+            self.events.extend(events or [])
+
+    def summary(self) -> pd.DataFrame:
+        """구간 이름별 호출 수, 누적/자체 wall 시간, CPU 시간, 행 수, 최대 RSS 증가량 (자체 시간 내림차순)."""
+        columns = ["name", "calls", "wall_s", "self_s", "cpu_s", "rows_in", "rows_out", "peak_rss_delta_mb"]
+        if not self.events:
+            return pd.DataFrame(columns=columns)
+        rows = pd.DataFrame([{"name": e["name"], **e["args"]} for e in self.events])
+        for col in ["rows_in", "rows_out", "peak_rss_delta_mb"]:
+            rows[col] = pd.to_numeric(rows[col], errors="coerce")
+        out = rows.groupby("name", sort=False).agg(
+            calls=("wall_s", "size"), wall_s=("wall_s", "sum"), self_s=("self_s", "sum"), cpu_s=("cpu_s", "sum"),
+            rows_in=("rows_in", "sum"), rows_out=("rows_out", "sum"), peak_rss_delta_mb=("peak_rss_delta_mb", "max"),
+        ).reset_index()
+        return out.sort_values("self_s", ascending=False, ignore_index=True)[columns].round(4)
+
+    def write(self, name: str, output_dir: Path = None) -> tuple:
+        output_dir = Path(output_dir or OUTPUT_DIR)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        trace_path = output_dir / f"profile_{name}.trace.json"
+        summary_path = output_dir / f"profile_{name}_summary.csv"
+        trace = {"traceEvents": sorted(self.events, key=lambda e: (e["pid"], e["ts"])), "displayTimeUnit": "ms"}
+        trace_path.write_text(json.dumps(trace, ensure_ascii=False), encoding="utf-8")
+        summary = self.summary()
+        _to_csv(summary, summary_path, index=False)
+        return trace_path, summary_path, summary
+
+
+_profiler = None
+_to_csv = pd.DataFrame.to_csv
+
+
+# ──────────────────────────────────────────────
+# 4. 계측 (함수 감싸기)
+# ──────────────────────────────────────────────
+
+def _traced(fn, name: str):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profiler = _profiler
+        if profiler is None:
+            return fn(*args, **kwargs)
+        with profiler.span(name, _rows_in(args, kwargs)) as span:
+            result = fn(*args, **kwargs)
+            span["rows_out"] = _rows(result)
+        return result
+    wrapper._profiled = fn
+    return wrapper
+
+
+_wrappers = {}
+
+
+def _analysis_function(obj) -> bool:
+    if not inspect.isfunction(obj) or getattr(obj, "_profiled", None) is not None:
+        return False
+    if obj.__name__.startswith("_") or obj.__name__ in SKIP_FUNCTIONS:
+        return False
+    if inspect.isgeneratorfunction(obj) or inspect.iscoroutinefunction(obj):
+        return False
+    path = Path(obj.__code__.co_filename).resolve()
+    return path.parent == ANALYSIS_DIR and path != Path(__file__).resolve()
+
+
+def _span_name(obj) -> str:
+    """모듈.함수 (스크립트로 실행한 모듈은 __main__ 대신 파일 이름)."""
+    module = obj.__module__
+    if module == "__main__":
+        module = Path(getattr(sys.modules["__main__"], "__file__", "__main__")).stem
+    return f"{module}.{obj.__name__}"
+
+
+def instrument(modules: list = None):
+    """analysis/ 모듈의 공개 함수를 구간 기록 함수로 교체 (이미 불러온 모듈 전체가 기본).
+
+    `from window_join import asof_event`처럼 다른 모듈에 복사된 이름도 같은 감싼 함수로 바꾼다.
+    """
+    if modules is None:
+        modules = [m for m in list(sys.modules.values())
+                   if getattr(m, "__file__", None) and Path(m.__file__).resolve().parent == ANALYSIS_DIR]
+    for module in modules:
+        if module.__name__ == __name__:
+            continue
+        for attr, obj in list(vars(module).items()):
+            if not _analysis_function(obj):
+                continue
+            wrapper = _wrappers.get(obj)
+            if wrapper is None:
+                wrapper = _wrappers[obj] = _traced(obj, _span_name(obj))
+            setattr(module, attr, wrapper)
+    for cls, method in PANDAS_METHODS:
+        original = getattr(cls, method)
+        if getattr(original, "_profiled", None) is None:
+            setattr(cls, method, _traced(original, f"pandas.{method}"))
+
+
+def start(fresh: bool = False) -> Profiler:
+    """계측 시작. 이미 시작했으면 그 기록기를 반환.
+
+    fresh=True: 새 기록기로 시작 (fork된 작업 프로세스가 부모의 기록을 물려받지 않도록 작업 프로세스 초기화에서 사용).
+    """
+    global _profiler, ENABLED
+    ENABLED = True
+    os.environ["ARNAV_PROFILE"] = "1"  # spawn 작업 프로세스에도 전달
+    instrument()
+    if _profiler is None or fresh:
+        _profiler = Profiler()
+    return _profiler
+
+
+def span(name: str, rows_in=None):
+    """직접 지정하는 구간 (기록 중이 아니면 아무것도 하지 않음)."""
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.span(name, rows_in)
+
+
+def worker_events() -> list:
+    """작업 프로세스에서 모은 구간을 꺼내고 비움 (기록 중이 아니면 None)."""
+    if _profiler is None:
+        return None
+    events, _profiler.events = _profiler.events, []
+    return events
+
+
+def merge(events: list):
+    if _profiler is not None and events:
+        _profiler.extend(events)
+
+
+@contextlib.contextmanager
+def session(name: str, enabled: bool = None, output_dir: Path = None):
+    """스크립트 전체를 한 구간으로 기록하고 끝나면 trace/요약 저장. enabled=None이면 ARNAV_PROFILE을 따름."""
+    if not (ENABLED if enabled is None else enabled):
+        yield None
+        return
+    profiler = start()
+    try:
+        with profiler.span(name):
+            yield profiler
+    finally:
+        trace_path, summary_path, summary = profiler.write(name, output_dir)
+        print(f"\n[계측] 자체 시간 상위 {SUMMARY_TOP}개 구간")
+        print(summary.head(SUMMARY_TOP).to_string(index=False))
+        print(f"  → {trace_path} 저장 (chrome://tracing 또는 https://ui.perfetto.dev 에서 열기)")
+        print(f"  → {summary_path} 저장")
@@ -0,0 +1,186 @@
+"""
+통합 분석 실행기
+- 이벤트 저장소를 한 번만 로드하고, 모든 분석이 같은 이벤트 테이블과 파생 테이블 캐시(event_tables)를 공유
+- 분석 그룹: switching, cvi, triggers, verification, trust, head (기본: 전체)
+- 결과 파일은 각 분석 스크립트를 단독 실행했을 때와 같은 경로(analysis/output)에 저장
+
+사용법:
+    python analysis/run_analyses.py                    # 전체
+    python analysis/run_analyses.py triggers trust     # 일부만
+    python analysis/run_analyses.py --jobs 0           # 분석 그룹을 CPU 코어 수만큼 병렬 실행
+    python analysis/run_analyses.py --no-plots         # 통계만 (그림 생략, matplotlib 미사용)
+    python analysis/run_analyses.py --profile          # 단계별 계측 → output/profile_run_analyses.*
+    python analysis/run_analyses.py --participants P01-P12 --condition hybrid --since 20260315   # 파일 선택
+"""
+
+import argparse
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import analyze_device_switching
+import analyze_head_motion
+import analyze_triggers
+import analyze_trust_performance
+import analyze_verification
+import event_store
+import figure_cache
+import profiling
+from extra_data import add_extra_columns
+
+# ──────────────────────────────────────────────
+# 1. 분석 그룹
+# ──────────────────────────────────────────────
+
+# 이름 → (제목, 모듈, 실행 함수)
+ANALYSES = {
+    "switching": ("기기 전환 패턴 분석", analyze_device_switching, analyze_device_switching.run_switching),
+    "cvi": ("교차검증 지수(CVI) / 콘텐츠 활용 분석", analyze_device_switching, analyze_device_switching.run_cvi),
+    "triggers": ("트리거 반응 분석 (v2.1)", analyze_triggers, analyze_triggers.run),
+    "verification": ("미션 정확도 및 검증 행동 분석 (v2.1)", analyze_verification, analyze_verification.run),
+    "trust": ("신뢰 및 수행 분석", analyze_trust_performance, analyze_trust_performance.run),
+    "head": ("머리 움직임(훑어보기 / 내려다보기) 분석", analyze_head_motion, analyze_head_motion.run),
+}
+
+
+# ──────────────────────────────────────────────
+# 2. 이벤트 공급 (저장소 1회 로드, 없으면 스크립트별 데모) / 순차 실행
+# ──────────────────────────────────────────────
+
+class EventSource:
+    """분석 그룹에 넘길 이벤트 테이블. 저장소는 한 번만 읽고 데모 데이터도 모듈별로 한 번만 생성."""
+
+    def __init__(self, events: pd.DataFrame):
+        self.events = events
+        self._demo = {}
+
+    @classmethod
+    def load(cls, raw_dir=event_store.RAW_DIR) -> "EventSource":
+        return cls(event_store.load_events(raw_dir))
+
+    def for_module(self, module):
+        if not self.events.empty:
+            return self.events
+        if module is analyze_trust_performance:
+            return None
+        if module not in self._demo:
+            print(f"[경고] 원본 로그 없음 → {module.__name__} 데모 데이터 사용")
+            self._demo[module] = add_extra_columns(module.generate_demo_data())
+        return self._demo[module]
+
+
+def _run_group(name: str, source: EventSource):
+    title, module, run = ANALYSES[name]
+    print("\n" + "=" * 60)
+    print(f"[{name}] {title}")
+    print("=" * 60)
+    with profiling.span(f"run_analyses.{name}"):
+        run(source.for_module(module))
+
+
+def run_analyses(names: list, source: EventSource = None, jobs: int = 1):
+    """지정한 분석 그룹 실행. jobs > 1이면 프로세스 풀에서 병렬 실행 (출력 순서는 동일)."""
+    source = source or EventSource.load()
+    if not source.events.empty:
+        events = source.events
+        print(f"총 이벤트 수: {len(events)} (참가자 {events['participant_id'].nunique()}명)")
+
+    jobs = min(jobs, len(names))
+    if jobs <= 1:
+        for name in names:
+            _run_group(name, source)
+    else:
+        _run_parallel(names, source, jobs)
+
+
+# ──────────────────────────────────────────────
+# 3. 병렬 실행
+# ──────────────────────────────────────────────
+# 분석 그룹끼리는 서로 다른 output 파일만 쓰므로 독립적으로 실행 가능.
+# 이벤트 테이블은 Arrow IPC 스냅샷 한 파일로 공유하고(작업 프로세스는 memory-map으로 읽음),
+# 각 그룹의 표준 출력은 버퍼에 모았다가 요청한 순서대로 출력한다.
+
+_worker_snapshot = None
+_worker_events = None
+_worker_source = None
+
+
+def _init_worker(snapshot, events):
+    global _worker_snapshot, _worker_events
+    _worker_snapshot, _worker_events = snapshot, events
+    if profiling.ENABLED:
+        profiling.start(fresh=True)
+
+
+def _run_group_in_worker(name: str) -> tuple:
+    """(표준 출력, 계측 구간 목록 또는 None)."""
+    global _worker_source
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        if _worker_source is None:
+            if _worker_snapshot is not None:
+                events = event_store.read_snapshot(_worker_snapshot)
+            else:
+                events = _worker_events
+            _worker_source = EventSource(events)
+        _run_group(name, _worker_source)
+    return buf.getvalue(), profiling.worker_events()
+
+
+def _run_parallel(names: list, source: EventSource, jobs: int):
+    snapshot = None
+    events = source.events
+    if not events.empty and event_store.pa is not None:
+        snapshot = event_store.write_snapshot(events)
+        events = None
+    print(f"[병렬] {len(names)}개 분석 그룹 / 작업 프로세스 {jobs}개")
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(snapshot, events)) as pool:
+            futures = [pool.submit(_run_group_in_worker, name) for name in names]
+            for future in futures:
+                text, spans = future.result()
+                print(text, end="")
+                profiling.merge(spans)
+    finally:
+        if snapshot is not None:
+            snapshot.unlink(missing_ok=True)
+
+
+# ──────────────────────────────────────────────
+# 4. 메인
+# ──────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ARNav 분석 통합 실행 (이벤트 1회 로드)")
+    parser.add_argument(
+        "analyses", nargs="*", metavar="ANALYSIS",
+        help=f"실행할 분석 ({', '.join(ANALYSES)}; 생략 시 전체)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="병렬 작업 프로세스 수 (기본 1 = 순차 실행, 0 = CPU 코어 수)",
+    )
+    figure_cache.add_plot_argument(parser)
+    parser.add_argument("--profile", action="store_true",
+                        help="단계별 시간·행 수·메모리 계측 (ARNAV_PROFILE=1과 같음)")
+    event_store.add_filter_arguments(parser)
+    args = parser.parse_args(argv)
+    unknown = [a for a in args.analyses if a not in ANALYSES]
+    if unknown:
+        parser.error(f"알 수 없는 분석: {', '.join(unknown)} (선택: {', '.join(ANALYSES)})")
+    # 작업 프로세스에는 ARNAV_FILTER 환경 변수로 전달
+    event_store.apply_filter_arguments(parser, args)
+
+    figure_cache.apply_plot_argument(args)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    with profiling.session("run_analyses", enabled=args.profile or None):
+        run_analyses(args.analyses or list(ANALYSES), jobs=jobs)
+    print("\n분석 완료.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,576 @@
+"""
+대규모 합성 이벤트 로그 생성기 (데모 / 벤치마크 / 부하 테스트용)
+- 참가자 수 N, 웨이포인트 수 M, 기기 전환 1회당 Beam Pro 콘텐츠 이벤트 수를 지정하여 생성
+- 행 단위 dict 누적 없이 (세션 × 이벤트 슬롯) 격자를 NumPy 배열로 한 번에 만들고
+  발생 여부 마스크로 걸러 컬럼을 직접 구성 (시각은 간격 난수의 누적합, 범주형 컬럼은 정수 코드)
+- 하나의 seed(np.random.default_rng)로 완전히 재현 가능 (전역 난수 상태를 쓰지 않음)
+- 컬럼 구성과 extra_data(JSON) 형식은 EventLogger.cs 로그와 동일, write_raw_logs()로 세션별 원본 CSV 기록
+- 분석 스크립트의 데모 생성기도 같은 격자 도구(session_grid, events_frame, json_extra)를 사용
+
+사용법:
+    python analysis/synthetic.py --participants 240 --out /tmp/raw
+"""
+
+import argparse
+import functools
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ──────────────────────────────────────────────
+# 1. 설정
+# ──────────────────────────────────────────────
+
+CONDITIONS = ["glass_only", "hybrid"]
+FILE_CONDITION_NAMES = {"glass_only": "glass", "hybrid": "hybrid"}
+DEVICE_ACTIVE = {"glass_only": "glass", "hybrid": "both"}
+BASE_TIME = np.datetime64("2026-03-15T10:00:00", "ms")
+
+RAW_COLUMNS = [
+    "timestamp", "participant_id", "condition", "event_type",
+    "waypoint_id", "head_rotation_x", "head_rotation_y", "head_rotation_z",
+    "device_active", "confidence_rating", "mission_id",
+    "difficulty_rating", "verification_correct", "beam_content_type", "extra_data",
+]
+# 머리 회전 범위 (x, y, z 각 ±)
+HEAD_ROTATION_RANGE = np.array([10.0, 180.0, 5.0])
+
+# Beam Pro 콘텐츠 유형 → (이벤트 유형, 발생 확률)
+BEAM_CONTENT = {
+    "poi_detail": ("BEAM_POI_VIEWED", 0.30),
+    "info_card": ("BEAM_INFO_CARD_OPENED", 0.25),
+    "comparison": ("BEAM_COMPARISON_VIEWED", 0.10),
+    "map": ("BEAM_MAP_ZOOMED", 0.25),
+    "mission_ref": ("BEAM_MISSION_REF_VIEWED", 0.10),
+}
+BEAM_CONTENT_TYPES = list(BEAM_CONTENT)
+_CONTENT = "BEAM_CONTENT"   # 콘텐츠 슬롯 자리표시 (유형은 행마다 추첨)
+
+# 웨이포인트 하나의 이벤트 슬롯 (기록 순서) → 직전 이벤트로부터의 간격 범위(초)
+WAYPOINT_SLOTS = [
+    ("PAUSE_START", (1, 5)),
+    ("PAUSE_END", (2, 8)),
+    ("BEAM_SCREEN_ON", (1, 10)),
+    (_CONTENT, (0.5, 2)),
+    ("BEAM_SCREEN_OFF", (0.5, 2)),
+    ("TRIGGER_ACTIVATED", (2, 10)),
+    ("TRIGGER_RESPONSE", (0, 0)),       # 간격 = 반응시간 (조건별 정규분포)
+    ("TRIGGER_DEACTIVATED", (3, 8)),
+    ("WAYPOINT_REACHED", (30, 90)),
+    ("CONFIDENCE_RATED", (0, 0)),
+    ("VERIFICATION_ANSWERED", (2, 6)),
+    ("MISSION_COMPLETE", (0, 0)),
+    ("DIFFICULTY_RATED", (0, 0)),
+    ("MISSION_START", (3, 8)),
+]
+PROLOGUE_SLOTS = [("ROUTE_START", (0, 0)), ("MISSION_START", (5, 15))]
+EPILOGUE_SLOTS = [("ROUTE_END", (5, 15))]
+
+EVENT_TYPES = sorted(
+    {e for e, _ in WAYPOINT_SLOTS + PROLOGUE_SLOTS + EPILOGUE_SLOTS if e != _CONTENT}
+    | {e for e, _ in BEAM_CONTENT.values()}
+)
+
+# 효과 가정 (analyze_device_switching 데모와 같은 값)
+PAUSE_PROB = 0.3
+SWITCH_PROB = {"trigger": 0.65, "normal": 0.25}
+REACTION_TIME = {"glass_only": (5.5, 1.5), "hybrid": (3.5, 1.5)}
+WRONG_DIRECTION = {"glass_only": 0.29, "hybrid": 0.10}
+CONFIDENCE_BASE = {"trigger": {"glass_only": 3.2, "hybrid": 4.8}, "normal": {"glass_only": 5.0, "hybrid": 5.8}}
+ACCURACY = {"glass_only": 0.60, "hybrid": 0.88}
+DIFFICULTY_BASE = {"glass_only": 4.5, "hybrid": 3.0}
+ROUTE_TRIGGERS = {"A": ["T1", "T4"], "B": ["T2", "T3"]}
+MISSION_SEQUENCE = ["A1", "B1", "A2", "B2", "C1"]
+POI_TYPES = ["meeting_room", "vending_machine", "restroom", "emergency_exit"]
+CARD_TYPES = ["poi_detail", "sign_card", "landmark"]
+
+
+def participant_ids(n_participants: int) -> list:
+    """P01, P02, ... (참가자가 100명 이상이면 자릿수 확장)."""
+    width = max(2, len(str(n_participants)))
+    return [f"P{i:0{width}d}" for i in range(1, n_participants + 1)]
+
+
+def participant_route(pid_num: np.ndarray) -> np.ndarray:
+    """참가자 번호(1부터) → 경로 (홀수 A, 짝수 B)."""
+    return np.where(np.asarray(pid_num) % 2 == 1, "A", "B")
+
+
+def mission_ids(n_missions: int) -> list:
+    """미션 ID (A1, B1, A2, B2, C1 순서를 반복하며 번호 증가)."""
+    ids = []
+    for k in range(n_missions):
+        base = MISSION_SEQUENCE[k % len(MISSION_SEQUENCE)]
+        step = 2 if base[0] in "AB" else 1
+        ids.append(f"{base[0]}{int(base[1:]) + step * (k // len(MISSION_SEQUENCE))}")
+    return ids
+
+
+def is_trigger_waypoint(wp_idx: np.ndarray) -> np.ndarray:
+    """트리거 웨이포인트 여부 (0부터 센 번호; WP03, WP06, ...)."""
+    return np.asarray(wp_idx) % 3 == 2
+
+
+def is_mission_end(wp_idx: np.ndarray, n_waypoints: int) -> np.ndarray:
+    """미션 검증 웨이포인트 여부 (WP02, WP03, WP05, WP06, WP08, ...; 마지막 웨이포인트는 항상 포함)."""
+    wp_idx = np.asarray(wp_idx)
+    return (wp_idx % 3 != 0) | (wp_idx == n_waypoints - 1)
+
+
+# ──────────────────────────────────────────────
+# 2. 격자 / 테이블 구성 도구
+# ──────────────────────────────────────────────
+
+def session_grid(n_participants: int) -> tuple:
+    """세션(참가자 × 조건) 배열: (참가자 번호(0부터), 조건 번호, 세션 시작 시각).
+
+    참가자 순, 그 안에서 조건 순. 세션 시작은 참가자마다 1시간, 조건마다 30분 간격.
+    """
+    n_cond = len(CONDITIONS)
+    pid_idx = np.repeat(np.arange(n_participants), n_cond)
+    cond_idx = np.tile(np.arange(n_cond), n_participants)
+    start = BASE_TIME + pid_idx * np.timedelta64(3_600_000, "ms") + cond_idx * np.timedelta64(1_800_000, "ms")
+    return pid_idx, cond_idx, start
+
+
+def elapsed_ms(gaps: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """세션 × 슬롯 간격(초)을 발생한 슬롯만 누적한 경과 시각(ms, 0.1초 해상도)."""
+    return np.cumsum(np.round(gaps * 10).astype(np.int64) * mask, axis=1) * 100
+
+
+def per_condition(table: dict, cond_idx: np.ndarray) -> np.ndarray:
+    """조건 → 값 표를 세션(또는 행)의 조건 번호로 펼침."""
+    return np.array([table[c] for c in CONDITIONS])[cond_idx]
+
+
+def events_frame(rng: np.random.Generator, timestamp: np.ndarray, participant: pd.Categorical,
+                 condition: pd.Categorical, event_type: pd.Categorical, **columns) -> pd.DataFrame:
+    """행 배열 → EventLogger 컬럼 순서의 이벤트 테이블.
+
+    columns로 waypoint_id / mission_id / confidence_rating / difficulty_rating / verification_correct /
+    beam_content_type / extra_data 를 주고, 주지 않은 컬럼은 결측으로 둔다.
+    머리 회전은 rng로 생성하고 device_active는 조건에서 정한다.
+    """
+    n = len(timestamp)
+    rot = np.round((rng.random((n, 3)) * 2 - 1) * HEAD_ROTATION_RANGE, 1)
+    missing_cat = pd.Categorical.from_codes(np.full(n, -1), categories=pd.Index([], dtype=object))
+    missing_int = pd.array(np.full(n, np.nan), dtype="Int8")
+    out = {
+        "timestamp": timestamp,
+        "participant_id": participant,
+        "condition": condition,
+        "event_type": event_type,
+        "waypoint_id": columns.get("waypoint_id", missing_cat),
+        "head_rotation_x": rot[:, 0],
+        "head_rotation_y": rot[:, 1],
+        "head_rotation_z": rot[:, 2],
+        "device_active": pd.Categorical.from_codes(
+            condition.codes, [DEVICE_ACTIVE[c] for c in condition.categories]
+        ),
+        "confidence_rating": columns.get("confidence_rating", missing_int),
+        "mission_id": columns.get("mission_id", missing_cat),
+        "difficulty_rating": columns.get("difficulty_rating", missing_int),
+        "verification_correct": columns.get("verification_correct", missing_cat),
+        "beam_content_type": columns.get("beam_content_type", missing_cat),
+        "extra_data": pd.Series(columns.get("extra_data", text_column(n)), dtype=object),
+    }
+    return pd.DataFrame(out)
+
+
+def text_column(n: int, value: str = "{}") -> np.ndarray:
+    """같은 문자열로 채운 object 배열 (np.full의 object 채우기보다 빠름)."""
+    out = np.empty(n, dtype=object)
+    out[:] = value
+    return out
+
+
+def rating(values: np.ndarray, where: np.ndarray) -> pd.arrays.IntegerArray:
+    """1–7 평정 컬럼 (where가 아닌 행은 결측)."""
+    return pd.arrays.IntegerArray(np.clip(np.round(values), 1, 7).astype(np.int8), ~where)
+
+
+# ──────────────────────────────────────────────
+# 3. extra_data (EventLogger JSON 형식)
+# ──────────────────────────────────────────────
+
+# 작은 음이 아닌 정수의 문자열 표 (ndarray.astype(str)보다 훨씬 빠른 조회용)
+_NUMBER_STR = np.array([str(i) for i in range(10000)])
+
+
+@functools.lru_cache(maxsize=None)
+def _number_table(prefix: str, suffix: str = "") -> np.ndarray:
+    """접두어 + 정수 + 접미어 문자열 표 (JSON 키와 값을 행마다 따로 잇지 않고 표에서 조회)."""
+    return np.char.add(np.char.add(prefix, _NUMBER_STR), suffix)
+
+
+def _join(*parts) -> np.ndarray:
+    out = parts[0]
+    for p in parts[1:]:
+        out = np.char.add(out, p)
+    return out
+
+
+def _int_str(values: np.ndarray, prefix: str = ""):
+    """정수 표기 조각: 작은 음이 아닌 정수는 (코드, 표), 그 외는 문자열 배열."""
+    v = np.asarray(values, dtype=np.int64)
+    if len(v) and 0 <= v.min() and v.max() < len(_NUMBER_STR):
+        return v, _number_table(prefix)[:v.max() + 1]
+    return np.char.add(prefix, v.astype(str))
+
+
+def _f1(values: np.ndarray, prefix: str = "") -> list:
+    """소수 첫째 자리 표기 (C# F1과 동일), 정수 연산으로 변환. 조각 [정수부 + ".", (소수 첫째 자리 코드, 표)]."""
+    tenths = np.round(np.asarray(values, dtype=np.float64) * 10).astype(np.int64)
+    a = np.abs(tenths)
+    whole, negative = a // 10, tenths < 0
+    if len(a) and whole.max() < len(_NUMBER_STR):
+        head = _number_table(prefix, ".")[whole]
+        if negative.any():
+            head = np.where(negative, _number_table(prefix + "-", ".")[whole], head)
+    else:
+        head = _join(np.where(negative, prefix + "-", prefix), whole.astype(str), ".")
+    return [head, (a % 10, _NUMBER_STR[:10])]
+
+
+def _json_field(prefix: str, value, sel: np.ndarray) -> list:
+    """'"키":' 접두어를 붙인 JSON 값 표기의 조각 목록.
+
+    범주형/문자열은 따옴표, bool은 true/false, 실수는 F1, 정수는 그대로, 상수는 json.dumps.
+    조각은 문자열 배열 또는 (코드, 표) — 범주형·bool·상수·작은 정수는 행마다 잇지 않고 표에서 조회한다.
+    """
+    n = len(sel)
+    if isinstance(value, pd.Categorical):
+        quoted = [json.dumps(str(c), ensure_ascii=False) for c in value.categories] + ["null"]
+        return [(value.codes[sel] % len(quoted), np.array([prefix + q for q in quoted]))]
+    if not isinstance(value, np.ndarray):
+        return [(np.zeros(n, dtype=np.int64),
+                 np.array([prefix + json.dumps(value, ensure_ascii=False, separators=(",", ":"))]))]
+    v = value[sel]
+    if v.dtype.kind == "b":
+        return [(v.astype(np.int64), np.array([prefix + "false", prefix + "true"]))]
+    if v.dtype.kind in "iu":
+        return [_int_str(v, prefix)]
+    if v.dtype.kind == "f":
+        return _f1(v, prefix)
+    return [_join(prefix + '"', v.astype(str), '"')]
+
+
+def _join_pieces(pieces: list, max_table: int = 4096) -> np.ndarray:
+    """조각을 이어 문자열 배열로. 이웃한 (코드, 표) 조각은 표끼리 먼저 곱해 한 번의 조회로 합친다."""
+    merged = []
+    for p in pieces:
+        if (isinstance(p, tuple) and merged and isinstance(merged[-1], tuple)
+                and len(merged[-1][1]) * len(p[1]) <= max_table):
+            codes, table = merged[-1]
+            merged[-1] = (codes * len(p[1]) + p[0], np.char.add(table[:, None], p[1][None, :]).ravel())
+        else:
+            merged.append(p)
+    if len(merged) == 1 and isinstance(merged[0], tuple):
+        # 전부 표 조회로 합쳐졌으면 object 표에서 바로 조회 (문자열 객체 공유)
+        codes, table = merged[0]
+        return table.astype(object)[codes]
+    return _join(*[p[1][p[0]] if isinstance(p, tuple) else p for p in merged])
+
+
+def json_extra(event_type: pd.Categorical, spec: dict) -> np.ndarray:
+    """이벤트 유형별 extra_data JSON 문자열 (유형마다 배열 연산 한 번, 나머지는 "{}").
+
+    spec: 이벤트 유형 → [(키, 행 정렬 배열 / pd.Categorical / 상수), ...]
+    """
+    extra = text_column(len(event_type))
+    categories = list(event_type.categories)
+    for name, fields in spec.items():
+        if name not in categories:
+            continue
+        sel = np.flatnonzero(event_type.codes == categories.index(name))
+        if not len(sel):
+            continue
+        pieces = []
+        for i, (key, value) in enumerate(fields):
+            pieces += _json_field(("{" if i == 0 else ",") + f'"{key}":', value, sel)
+        pieces.append((np.zeros(len(sel), dtype=np.int64), np.array(["}"])))
+        extra[sel] = _join_pieces(pieces)
+    return extra
+
+
+# ──────────────────────────────────────────────
+# 4. 전체 경로 합성 로그
+# ──────────────────────────────────────────────
+
+def _slot_layout(n_waypoints: int, beam_events: int) -> tuple:
+    """세션 하나의 슬롯 열: (이벤트 유형, 웨이포인트 번호(-1 = 없음), 간격 하한, 간격 상한, 콘텐츠 순번)."""
+    cols = [(e, -1, g, 0) for e, g in PROLOGUE_SLOTS]
+    cols[1] = ("MISSION_START", 0, cols[1][2], 0)     # 첫 미션은 WP01에서 시작
+    for w in range(n_waypoints):
+        for e, g in WAYPOINT_SLOTS:
+            if e == _CONTENT:
+                cols.extend((e, w, g, k) for k in range(beam_events))
+            else:
+                cols.append((e, w, g, 0))
+    cols.extend((e, -1, g, 0) for e, g in EPILOGUE_SLOTS)
+    etype = np.array([c[0] for c in cols], dtype=object)
+    wp = np.array([c[1] for c in cols], dtype=np.int64)
+    lo = np.array([c[2][0] for c in cols], dtype=np.float64)
+    hi = np.array([c[2][1] for c in cols], dtype=np.float64)
+    rank = np.array([c[3] for c in cols], dtype=np.int64)
+    return etype, wp, lo, hi, rank
+
+
+def generate_events(n_participants: int = 24, n_waypoints: int = 8, beam_events: int = 3,
+                    seed: int = 0) -> pd.DataFrame:
+    """전체 경로 합성 이벤트 테이블 (EventLogger 원본 컬럼, 세션별 시각 순).
+
+    세션 = 참가자 × 조건. beam_events는 Hybrid 기기 전환 1회당 최대 Beam Pro 콘텐츠 이벤트 수로,
+    웨이포인트당 이벤트 밀도를 조절한다. 같은 인자와 seed면 항상 같은 테이블을 반환한다.
+    """
+    rng = np.random.default_rng(seed)
+    pid_idx, cond_idx, session_start = session_grid(n_participants)
+    S = len(pid_idx)
+    etype, col_wp, lo, hi, rank = _slot_layout(n_waypoints, beam_events)
+    L = len(etype)
+    hybrid = np.array(CONDITIONS)[cond_idx] == "hybrid"
+
+    # 슬롯 열 속성
+    has_wp = col_wp >= 0
+    wp_c = np.maximum(col_wp, 0)
+    wp_range = np.arange(n_waypoints)
+    end_wps = np.flatnonzero(is_mission_end(wp_range, n_waypoints))
+    col_trigger = has_wp & is_trigger_waypoint(wp_c)
+    col_end = has_wp & is_mission_end(wp_c, n_waypoints)
+    is_pause = np.isin(etype, ["PAUSE_START", "PAUSE_END"])
+    is_beam = np.isin(etype, ["BEAM_SCREEN_ON", "BEAM_SCREEN_OFF"])
+    is_content = etype == _CONTENT
+    is_trigger = np.isin(etype, ["TRIGGER_ACTIVATED", "TRIGGER_RESPONSE", "TRIGGER_DEACTIVATED"])
+    is_verify = np.isin(etype, ["VERIFICATION_ANSWERED", "MISSION_COMPLETE", "DIFFICULTY_RATED"])
+    is_start = etype == "MISSION_START"
+    # 미션 시작: 첫 미션(프롤로그) + 마지막이 아닌 검증 웨이포인트 끝
+    starts_mission = is_start & (~has_wp | (col_end & (wp_c != end_wps[-1])))
+    starts_mission[1] = True
+
+    # 발생 마스크 (세션 × 슬롯)
+    paused = rng.random((S, n_waypoints)) < PAUSE_PROB
+    switch_p = np.where(is_trigger_waypoint(wp_range), SWITCH_PROB["trigger"], SWITCH_PROB["normal"])
+    switched = hybrid[:, None] & (rng.random((S, n_waypoints)) < switch_p)
+    n_content = rng.integers(1, beam_events + 1, size=(S, n_waypoints)) if beam_events else np.zeros((S, n_waypoints), int)
+
+    mask = np.ones((S, L), dtype=bool)
+    mask[:, is_pause] = paused[:, wp_c[is_pause]]
+    mask[:, is_beam] = switched[:, wp_c[is_beam]]
+    mask[:, is_content] = switched[:, wp_c[is_content]] & (rank[is_content] < n_content[:, wp_c[is_content]])
+    mask[:, is_trigger] = col_trigger[is_trigger]
+    mask[:, is_verify] = col_end[is_verify]
+    mask[:, is_start] = starts_mission[is_start]
+
+    # 간격 → 경과 시각
+    gaps = lo + (hi - lo) * rng.random((S, L))
+    is_resp = etype == "TRIGGER_RESPONSE"
+    rt = per_condition(REACTION_TIME, cond_idx)
+    gaps[:, is_resp] = np.maximum(1.0, rng.normal(rt[:, :1], rt[:, 1:], size=(S, int(is_resp.sum()))))
+    elapsed = elapsed_ms(gaps, mask)
+
+    # 미션 번호 (모든 세션에서 같은 열에서 시작)
+    mission_no = np.cumsum(starts_mission) - 1
+    n_missions = int(starts_mission.sum())
+    mission_start = elapsed[:, np.flatnonzero(starts_mission)]
+
+    # 세션 × 웨이포인트 / 세션 × 미션 단위 값
+    correct = rng.random((S, n_missions)) < per_condition(ACCURACY, cond_idx)[:, None]
+    difficulty = rng.normal(per_condition(DIFFICULTY_BASE, cond_idx)[:, None], 1, size=(S, n_missions))
+    conf_base = np.where(
+        is_trigger_waypoint(wp_range)[None, :],
+        per_condition(CONFIDENCE_BASE["trigger"], cond_idx)[:, None],
+        per_condition(CONFIDENCE_BASE["normal"], cond_idx)[:, None],
+    )
+    confidence = rng.normal(conf_base, 0.8)
+    wrong_dir = rng.random((S, n_waypoints)) < per_condition(WRONG_DIRECTION, cond_idx)[:, None]
+
+    # ── 발생한 슬롯만 행으로 (세션 순, 세션 안에서 슬롯 순 = 시각 순) ──
+    sess, col = np.nonzero(mask)
+    n = len(sess)
+    r_wp = col_wp[col]
+    r_wpc = wp_c[col]
+    r_mission = mission_no[col]
+    r_elapsed = elapsed[sess, col]
+
+    # 이벤트 유형 코드 (콘텐츠 슬롯은 행마다 유형 추첨)
+    slot_code = np.array([EVENT_TYPES.index(e) if e != _CONTENT else -1 for e in etype])
+    code = slot_code[col]
+    row_content = is_content[col]
+    c_code = np.searchsorted(np.cumsum([p for _, p in BEAM_CONTENT.values()]), rng.random(n), side="right")
+    content_event_code = np.array([EVENT_TYPES.index(e) for e, _ in BEAM_CONTENT.values()])
+    code[row_content] = content_event_code[c_code[row_content]]
+    event_type = pd.Categorical.from_codes(code, EVENT_TYPES)
+
+    # 같은 웨이포인트의 시작 슬롯부터 경과 시간(초)
+    def since(slot: str) -> np.ndarray:
+        src = np.zeros(L, dtype=np.int64)
+        src[has_wp] = np.flatnonzero(etype == slot)[wp_c[has_wp]]
+        return (r_elapsed - elapsed[sess, src[col]]) / 1000
+
+    route_b = (participant_route(pid_idx + 1) == "B").astype(np.int64)[sess]
+    trigger_code = 2 * route_b + (r_wpc // 3) % 2      # T1, T4 / T2, T3
+    triggers = pd.Categorical.from_codes(trigger_code, ROUTE_TRIGGERS["A"] + ROUTE_TRIGGERS["B"])
+    missions = pd.Categorical.from_codes(r_mission, mission_ids(n_missions))
+    r_correct = correct[sess, r_mission]
+    uniform = rng.random(n)
+    index = rng.integers(1, 10, size=n)
+
+    extra = json_extra(event_type, {
+        "ROUTE_START": [("route", pd.Categorical.from_codes(route_b, ["A", "B"]))],
+        "MISSION_START": [("mission_id", missions)],
+        "PAUSE_END": [("pause_duration_s", gaps[sess, col])],
+        "BEAM_SCREEN_OFF": [("duration_s", since("BEAM_SCREEN_ON"))],
+        "BEAM_POI_VIEWED": [("poi_id", pd.Categorical.from_codes(index - 1, [f"poi_{i:02d}" for i in range(1, 10)])),
+                            ("poi_type", pd.Categorical.from_codes(index % len(POI_TYPES), POI_TYPES)),
+                            ("view_duration_s", 1 + 4 * uniform)],
+        "BEAM_INFO_CARD_OPENED": [("card_id", pd.Categorical.from_codes(index % 7, [f"card_{i:02d}" for i in range(1, 8)])),
+                                  ("card_type", pd.Categorical.from_codes(index % len(CARD_TYPES), CARD_TYPES)),
+                                  ("auto_shown", uniform < 0.4)],
+        "BEAM_COMPARISON_VIEWED": [("comparison_id", pd.Categorical.from_codes(index % 2, ["comp_01", "comp_02"])),
+                                   ("items_compared", ["item_A", "item_B"])],
+        "BEAM_MAP_ZOOMED": [("zoom_level", 1 + 2 * uniform)],
+        "BEAM_MISSION_REF_VIEWED": [("mission_id", missions), ("ref_type", "briefing_review")],
+        "TRIGGER_ACTIVATED": [("trigger_type", triggers)],
+        "TRIGGER_RESPONSE": [("trigger_type", triggers), ("reaction_time_s", gaps[sess, col]),
+                             ("wrong_direction", wrong_dir[sess, r_wpc])],
+        "TRIGGER_DEACTIVATED": [("trigger_type", triggers), ("duration_s", since("TRIGGER_ACTIVATED"))],
+        "VERIFICATION_ANSWERED": [("mission_id", missions), ("answer", index % 4), ("correct", r_correct),
+                                  ("rt_s", 2 + 6 * uniform)],
+        "MISSION_COMPLETE": [("mission_id", missions), ("correct", r_correct),
+                             ("duration_s", (r_elapsed - mission_start[sess, r_mission]) // 1000)],
+        "DIFFICULTY_RATED": [("mission_id", missions),
+                             ("rating", np.clip(np.round(difficulty[sess, r_mission]), 1, 7).astype(np.int64))],
+    })
+
+    codes = event_type.codes
+    is_ver = codes == EVENT_TYPES.index("VERIFICATION_ANSWERED")
+    return events_frame(
+        rng,
+        session_start[sess] + r_elapsed.astype("timedelta64[ms]"),
+        pd.Categorical.from_codes(pid_idx[sess], participant_ids(n_participants)),
+        pd.Categorical.from_codes(cond_idx[sess], CONDITIONS),
+        event_type,
+        waypoint_id=pd.Categorical.from_codes(r_wp, [f"WP{i:02d}" for i in range(1, n_waypoints + 1)]),
+        confidence_rating=rating(confidence[sess, r_wpc], codes == EVENT_TYPES.index("CONFIDENCE_RATED")),
+        mission_id=missions,
+        difficulty_rating=rating(difficulty[sess, r_mission], codes == EVENT_TYPES.index("DIFFICULTY_RATED")),
+        verification_correct=pd.Categorical.from_codes(np.where(is_ver, r_correct.astype(int), -1), ["false", "true"]),
+        beam_content_type=pd.Categorical.from_codes(np.where(row_content, c_code, -1), BEAM_CONTENT_TYPES),
+        extra_data=extra,
+    )
+
+
+# ──────────────────────────────────────────────
+# 4b. 고빈도 머리 자세 스트림 (HeadTracker .hpose)
+# ──────────────────────────────────────────────
+
+HEAD_DOWN_OFFSET = 35.0         # Beam Pro를 내려다볼 때 pitch 증가량 (도)
+GLANCE_DURATION = (1.0, 3.0)    # 내려다보는 시간 범위 (초)
+BACKGROUND_GLANCES_PER_MIN = 0.5
+SCAN_AMPLITUDE = 40.0           # 좌우로 훑어볼 때 yaw 진폭 (도)
+SCAN_DURATION = (1.5, 3.0)      # 훑어보는 시간 범위 (초, 한 번 왕복)
+BACKGROUND_SCANS_PER_MIN = 1.0
+
+
+def generate_head_pose(start: np.datetime64, end: np.datetime64, glance_times: np.ndarray = None,
+                       rate: float = 72.0, seed: int = 0, scan_times: np.ndarray = None) -> tuple:
+    """세션 [start, end) 구간의 머리 자세 샘플 (timestamp_us int64, 회전 (n, 3) float32: Unity 오일러각 0–360).
+
+    glance_times(예: BEAM_SCREEN_ON 시각)와 무작위 배경 시점에서 GLANCE_DURATION 동안 고개를 숙이고,
+    scan_times(예: TRIGGER_ACTIVATED 시각)와 무작위 배경 시점에서 SCAN_DURATION 동안 좌우로 한 번 훑어본다.
+    """
+    rng = np.random.default_rng(seed)
+    t0 = np.datetime64(start, "us").astype(np.int64)
+    t1 = np.datetime64(end, "us").astype(np.int64)
+    n = max(int((t1 - t0) / 1e6 * rate), 0)
+    t_us = t0 + np.round(np.arange(n) * (1e6 / rate) + rng.normal(0, 200, n)).astype(np.int64)
+    t_us = np.maximum.accumulate(t_us)
+
+    glances = np.asarray(glance_times if glance_times is not None else [], dtype="datetime64[us]").astype(np.int64)
+    n_bg = rng.poisson(BACKGROUND_GLANCES_PER_MIN * (t1 - t0) / 60e6)
+    glances = np.concatenate([glances, rng.integers(t0, max(t1, t0 + 1), n_bg)])
+    dur_us = (rng.uniform(*GLANCE_DURATION, len(glances)) * 1e6).astype(np.int64)
+    # 차분 배열로 내려다보는 구간 표시 (구간 수와 무관하게 한 번의 누적합)
+    mark = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(mark, np.searchsorted(t_us, glances), 1)
+    np.add.at(mark, np.searchsorted(t_us, glances + dur_us), -1)
+    down = np.cumsum(mark[:-1]) > 0
+
+    pitch = rng.normal(5.0, 2.0, n) + HEAD_DOWN_OFFSET * down
+    yaw = np.cumsum(rng.normal(0, 0.4, n)) + rng.uniform(0, 360)
+    scans = np.asarray(scan_times if scan_times is not None else [], dtype="datetime64[us]").astype(np.int64)
+    n_bg = rng.poisson(BACKGROUND_SCANS_PER_MIN * (t1 - t0) / 60e6)
+    scans = np.sort(np.concatenate([scans, rng.integers(t0, max(t1, t0 + 1), n_bg)]))
+    if len(scans):
+        # 샘플마다 직전 훑어보기 시작 기준 위상 (겹치면 나중 것만)
+        k = np.searchsorted(scans, t_us, side="right") - 1
+        scan_us = rng.uniform(*SCAN_DURATION, len(scans)) * 1e6
+        phase = (t_us - scans[np.maximum(k, 0)]) / scan_us[np.maximum(k, 0)]
+        yaw += np.where((k >= 0) & (phase < 1), SCAN_AMPLITUDE * np.sin(2 * np.pi * phase), 0.0)
+    roll = rng.normal(0, 1.5, n)
+    rot = np.stack([pitch, yaw, roll], axis=1) % 360
+    return t_us, rot.astype(np.float32)
+
+
+# ──────────────────────────────────────────────
+# 5. 원본 CSV 기록 (EventLogger 파일 단위)
+# ──────────────────────────────────────────────
+
+def write_raw_logs(events: pd.DataFrame, raw_dir: Path, sessions_per_chunk: int = 2000) -> list:
+    """이벤트 테이블을 세션(참가자 × 조건)마다 EventLogger 형식 CSV로 기록하고 파일 목록을 반환.
+
+    파일명: {participant_id}_{glass|hybrid}_{route}_{yyyyMMdd_HHmmss}.csv, UTF-8 BOM + 헤더.
+    세션 묶음마다 CSV 본문을 한 번에 만들고 줄 위치로 잘라 쓰므로 세션 수가 많아도 빠르다.
+    events는 세션별로 연속된 행이어야 한다 (generate_events() 결과).
+    """
+    raw_dir = Path(raw_dir)
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    header = ("\ufeff" + ",".join(RAW_COLUMNS) + "\n").encode("utf-8")
+
+    pid = events["participant_id"].astype("category")
+    cond = events["condition"].astype("category")
+    key = pid.cat.codes.to_numpy(np.int64) * len(cond.cat.categories) + cond.cat.codes.to_numpy(np.int64)
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(key)) + 1, [len(events)]])
+    paths = []
+    for c0 in range(0, len(bounds) - 1, sessions_per_chunk):
+        b = bounds[c0:c0 + sessions_per_chunk + 1]
+        chunk = events.iloc[b[0]:b[-1]]
+        out = chunk[RAW_COLUMNS].copy()
+        out["timestamp"] = np.datetime_as_string(chunk["timestamp"].to_numpy("datetime64[ms]"), unit="ms")
+        body = out.to_csv(index=False, header=False, lineterminator="\n").encode("utf-8")
+        line_end = np.flatnonzero(np.frombuffer(body, dtype=np.uint8) == ord("\n")) + 1
+        offsets = np.concatenate([[0], line_end[b[1:] - b[0] - 1]])
+
+        first = chunk.iloc[b[:-1] - b[0]]
+        pids = first["participant_id"].astype(str).to_numpy()
+        conds = first["condition"].astype(str).to_numpy()
+        started = pd.DatetimeIndex(first["timestamp"]).strftime("%Y%m%d_%H%M%S")
+        for i, (p, c, stamp) in enumerate(zip(pids, conds, started)):
+            path = raw_dir / f"{p}_{FILE_CONDITION_NAMES[c]}_{participant_route(int(p[1:]))}_{stamp}.csv"
+            path.write_bytes(header + body[offsets[i]:offsets[i + 1]])
+            paths.append(path)
+    return paths
+
+
+# ──────────────────────────────────────────────
+# 6. 메인
+# ──────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 이벤트 로그 생성 (EventLogger CSV 형식)")
+    parser.add_argument("--participants", type=int, default=24)
+    parser.add_argument("--waypoints", type=int, default=8)
+    parser.add_argument("--beam-events", type=int, default=3, help="기기 전환 1회당 최대 콘텐츠 이벤트 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, required=True, help="CSV를 기록할 디렉토리")
+    args = parser.parse_args(argv)
+
+    events = generate_events(args.participants, args.waypoints, args.beam_events, args.seed)
+    paths = write_raw_logs(events, args.out)
+    print(f"[합성] 이벤트 {len(events)}개 / 세션 {len(paths)}개 → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
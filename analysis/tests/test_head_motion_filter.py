@@ -0,0 +1,61 @@
+"""조건 필터(--condition hybrid)로 실행해도 머리 자세 스트림의 조건 구간이 필터 없는 실행과 같은지 확인.
+
+    python -m pytest analysis/tests
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import analyze_head_motion  # noqa: E402
+import event_store  # noqa: E402
+import head_pose  # noqa: E402
+import synthetic  # noqa: E402
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    """합성 이벤트 + 참가자마다 두 조건을 이어 담은 스트림 하나 (HeadTracker와 같은 배치)."""
+    events = synthetic.generate_events(n_participants=2, seed=7)
+    for i, (pid, grp) in enumerate(events.groupby("participant_id", observed=True)):
+        t_us, rot = synthetic.generate_head_pose(grp["timestamp"].min(), grp["timestamp"].max(), rate=10.0, seed=i)
+        cond = synthetic.FILE_CONDITION_NAMES[grp.sort_values("timestamp")["condition"].iloc[0]]
+        head_pose.write_stream(tmp_path / f"{pid}_{cond}_A_20260315_100000{head_pose.SUFFIX}", t_us, rot, 10.0)
+    # 저장소 대신 합성 이벤트에서 필터로 행 선택 (경계 로드가 조건 항목을 뺀 필터를 쓰는지도 함께 확인)
+    monkeypatch.setattr(event_store, "load_events",
+                        lambda *a, filters=None, **kw: event_store.filter_rows(events, filters))
+    yield events, tmp_path
+    event_store.set_filter({})
+
+
+def _run(events, pose_dir, argv):
+    parser = argparse.ArgumentParser()
+    event_store.add_filter_arguments(parser)
+    event_store.apply_filter_arguments(parser, parser.parse_args(argv))
+    samples, _ = analyze_head_motion.load_samples(event_store.filter_rows(events), pose_dir)
+    return samples.groupby(["participant_id", "condition"]).size().to_dict()
+
+
+def test_condition_filter_keeps_stream_segments(session):
+    events, pose_dir = session
+    full = _run(events, pose_dir, [])
+    hybrid = _run(events, pose_dir, ["--condition", "hybrid"])
+    assert {k for k in hybrid} == {k for k in full if k[1] == "hybrid"}
+    assert hybrid == {k: n for k, n in full.items() if k[1] == "hybrid"}
+
+
+def test_segments_end_at_last_condition_event(session):
+    events, pose_dir = session
+    for path in head_pose.pose_files(pose_dir):
+        stream = head_pose.HeadPoseStream(path)
+        ev = events[events["participant_id"] == stream.participant_id]
+        for condition, lo, hi in head_pose.condition_segments(stream, ev):
+            last = ev.loc[ev["condition"] == condition, "timestamp"].max()
+            assert stream.timestamps[hi - 1] <= last.to_datetime64()
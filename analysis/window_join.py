@@ -0,0 +1,141 @@
+"""
+시간 창(as-of window) 조인 엔진
+- "기준(anchor) 이벤트 시각 t 기준 [t-before, t+after] 안의 대상 이벤트"를 모든 기준 이벤트에 대해 한 번에 계산
+- 참가자(또는 참가자×조건)별로 정렬된 시각 배열에 np.searchsorted 적용 → O((기준 + 대상) log 대상)
+- 트리거 후 Beam Pro 전환, 미션 완료 전 콘텐츠 열람, 트리거 전후 확신도 등 창 분석에서 공용으로 사용
+"""
+
+import numpy as np
+import pandas as pd
+
+# ──────────────────────────────────────────────
+# 1. 정렬 키 구성
+# ──────────────────────────────────────────────
+
+_CLOSED = {
+    # closed → (하한 searchsorted side, 상한 searchsorted side)
+    "neither": ("right", "left"),
+    "both": ("left", "right"),
+    "left": ("left", "left"),
+    "right": ("right", "right"),
+}
+
+
+def _group_codes(anchors: pd.DataFrame, events: pd.DataFrame, by: list) -> tuple:
+    """anchors/events 공통 그룹 코드 (키가 결측이면 -1)."""
+    keys = pd.concat([anchors[by], events[by]], ignore_index=True)
+    for col in by:
+        if isinstance(keys[col].dtype, pd.CategoricalDtype):
+            keys[col] = keys[col].astype(object)
+    codes = keys.groupby(by, sort=False, dropna=True).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    return codes[:len(anchors)], codes[len(anchors):]
+
+
+def _to_us(ts: pd.Series) -> np.ndarray:
+    return ts.to_numpy(dtype="datetime64[us]").astype(np.int64)
+
+
+class _SortedEvents:
+    """그룹 코드와 시각으로 정렬된 대상 이벤트. 그룹별 시각 축을 한 줄로 이어 붙여 검색."""
+
+    def __init__(self, anchors, events, by, time_col, pad_us):
+        by = [by] if isinstance(by, str) else list(by)
+        a_key, e_key = _group_codes(anchors, events, by)
+        a_t, e_t = _to_us(anchors[time_col]), _to_us(events[time_col])
+
+        valid = e_key >= 0
+        order = np.flatnonzero(valid)[np.lexsort((e_t[valid], e_key[valid]))]
+        self.order = order
+        self.e_key = e_key[order]
+        self.a_key = a_key
+
+        # 그룹마다 구간 [offset, offset + span) 을 배정하여 (그룹, 시각)을 단일 int64 축으로 변환
+        n_groups = int(max(a_key.max(initial=-1), e_key.max(initial=-1))) + 1 or 1
+        all_t = np.concatenate([a_t, e_t])
+        all_k = np.concatenate([a_key, e_key])
+        ok = all_k >= 0
+        t_min = np.full(n_groups, np.iinfo(np.int64).max)
+        t_max = np.full(n_groups, np.iinfo(np.int64).min)
+        np.minimum.at(t_min, all_k[ok], all_t[ok])
+        np.maximum.at(t_max, all_k[ok], all_t[ok])
+        used = t_max >= t_min
+        t_min = np.where(used, t_min, 0)
+        span = int((t_max[used] - t_min[used]).max(initial=0)) + 2 * pad_us + 1
+        if n_groups * span >= 2 ** 62:
+            raise OverflowError("시간 창 조인: 그룹 수 × 시간 범위가 int64 범위를 초과")
+        self.base = np.arange(n_groups, dtype=np.int64) * span - t_min + pad_us
+
+        self.axis = e_t[order] + self.base[self.e_key] if len(order) else np.empty(0, np.int64)
+        self.a_valid = a_key >= 0
+        self.a_axis = np.where(self.a_valid, a_t + self.base[np.maximum(a_key, 0)], 0)
+
+    def bounds(self, before_us, after_us, closed):
+        lo_side, hi_side = _CLOSED[closed]
+        lo = np.searchsorted(self.axis, self.a_axis - before_us, side=lo_side)
+        hi = np.searchsorted(self.axis, self.a_axis + after_us, side=hi_side)
+        hi = np.where(self.a_valid, np.maximum(hi, lo), lo)
+        return lo, hi
+
+
+def _seconds_to_us(seconds) -> int:
+    return int(round(pd.Timedelta(seconds=seconds) / pd.Timedelta(microseconds=1)))
+
+
+# ──────────────────────────────────────────────
+# 2. 창 조인
+# ──────────────────────────────────────────────
+
+def window_counts(anchors: pd.DataFrame, events: pd.DataFrame, before: float = 0,
+                  after: float = 0, by="participant_id", time_col: str = "timestamp",
+                  closed: str = "neither") -> np.ndarray:
+    """각 기준 이벤트의 [t-before, t+after](초) 창 안에 있는 대상 이벤트 수 (anchors 순서)."""
+    before_us, after_us = _seconds_to_us(before), _seconds_to_us(after)
+    idx = _SortedEvents(anchors, events, by, time_col, max(before_us, after_us))
+    lo, hi = idx.bounds(before_us, after_us, closed)
+    return hi - lo
+
+
+def window_pairs(anchors: pd.DataFrame, events: pd.DataFrame, before: float = 0,
+                 after: float = 0, by="participant_id", time_col: str = "timestamp",
+                 closed: str = "neither") -> pd.DataFrame:
+    """기준-대상 이벤트 쌍 테이블.
+
+    반환 컬럼: anchor (anchors 인덱스 라벨), event (events 인덱스 라벨).
+    기준 이벤트 순서, 그 안에서는 대상 이벤트 시각 순으로 정렬된다.
+    """
+    before_us, after_us = _seconds_to_us(before), _seconds_to_us(after)
+    idx = _SortedEvents(anchors, events, by, time_col, max(before_us, after_us))
+    lo, hi = idx.bounds(before_us, after_us, closed)
+    counts = hi - lo
+    total = int(counts.sum())
+    a_pos = np.repeat(np.arange(len(anchors)), counts)
+    starts = np.repeat(lo - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+    e_pos = idx.order[starts + np.arange(total)]
+    return pd.DataFrame({
+        "anchor": anchors.index.to_numpy()[a_pos],
+        "event": events.index.to_numpy()[e_pos],
+    })
+
+
+def asof_event(anchors: pd.DataFrame, events: pd.DataFrame, direction: str = "backward",
+               by="participant_id", time_col: str = "timestamp",
+               allow_exact_matches: bool = False) -> pd.Series:
+    """각 기준 이벤트 직전(backward) 또는 직후(forward)의 같은 그룹 대상 이벤트 인덱스 라벨.
+
+    해당 이벤트가 없으면 결측. allow_exact_matches=False면 같은 시각은 제외한다.
+    """
+    idx = _SortedEvents(anchors, events, by, time_col, 0)
+    n = len(idx.axis)
+    if direction == "backward":
+        pos = np.searchsorted(idx.axis, idx.a_axis, side="right" if allow_exact_matches else "left") - 1
+    elif direction == "forward":
+        pos = np.searchsorted(idx.axis, idx.a_axis, side="left" if allow_exact_matches else "right")
+    else:
+        raise ValueError(f"direction은 'backward' 또는 'forward': {direction}")
+    in_range = (pos >= 0) & (pos < n)
+    safe = np.clip(pos, 0, max(n - 1, 0))
+    found = in_range & idx.a_valid & (n > 0)
+    if n:
+        found &= idx.e_key[safe] == idx.a_key
+    labels = events.index.to_numpy()[idx.order[safe]] if n else np.empty(len(anchors), dtype=object)
+    return pd.Series(labels, index=anchors.index, dtype=object).where(found)